@@ -0,0 +1,29 @@
+"""Cold startup of the CLI, one fresh interpreter per command."""
+
+import subprocess
+import sys
+
+from lily_assistant.cli.cli import COMMANDS
+
+
+def startup(*args):
+
+    def bench():
+        subprocess.run(
+            [
+                sys.executable,
+                '-c',
+                'from lily_assistant.cli.cli import cli; cli()',
+            ] + list(args),
+            stdout=subprocess.DEVNULL,
+            check=True)
+
+    return bench
+
+
+bench_startup = startup('--help')
+
+# -- `<command> --help` imports only the module of the given command
+for command in COMMANDS:
+    globals()['bench_startup_{}'.format(command.replace('-', '_'))] = (
+        startup(command, '--help'))
@@ -0,0 +1,45 @@
+"""`Config` read / write round trips."""
+
+import os
+
+from lily_assistant.config import Config
+
+from helpers import get_scratch_dir, in_directory
+
+
+ROUND_TRIPS = 100
+
+
+def create_project(path):
+
+    with in_directory(path):
+        Config.create_empty('app')
+
+
+def get_project():
+    return get_scratch_dir('config', create_project)
+
+
+def bench_read():
+
+    with in_directory(get_project()):
+        for _ in range(ROUND_TRIPS):
+            Config().version
+
+
+def bench_read_uncached():
+
+    with in_directory(get_project()):
+        for _ in range(ROUND_TRIPS):
+            Config._cache.clear()
+            Config().version
+
+
+def bench_write_read():
+
+    with in_directory(get_project()):
+        for index in range(ROUND_TRIPS):
+            Config().version = '1.0.{}'.format(index)
+            assert Config().version == '1.0.{}'.format(index)
+
+        assert os.path.exists(Config.get_config_path())
@@ -0,0 +1,40 @@
+"""`Copier.copy` on a scratch git repository."""
+
+import os
+import shutil
+import subprocess
+
+from lily_assistant.cli.copier import Copier
+
+from helpers import get_scratch_dir, in_directory, quiet
+
+
+def create_repo(path):
+
+    subprocess.run(
+        ['git', 'init', '-q', path],
+        stdout=subprocess.DEVNULL,
+        check=True)
+
+
+def get_repo():
+    return get_scratch_dir('copier', create_repo)
+
+
+def bench_copy():
+    """Copy into a repository where everything is installed already."""
+
+    with in_directory(get_repo()), quiet():
+        Copier().copy('app')
+
+
+def bench_copy_fresh():
+
+    with in_directory(get_repo()) as path, quiet():
+        for name in ['.lily', '.github']:
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+        for name in os.listdir(os.path.join(path, '.git', 'hooks')):
+            os.remove(os.path.join(path, '.git', 'hooks', name))
+
+        Copier().copy('app')
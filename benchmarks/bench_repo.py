@@ -0,0 +1,34 @@
+"""Throughput of `Repo.execute` on synthetic large outputs."""
+
+import shlex
+import sys
+
+from lily_assistant.repo.repo import Repo
+
+from helpers import quiet
+
+
+LINES = 100000
+
+LINE_LENGTH = 80
+
+
+def execute(script):
+
+    command = '{python} -c {script}'.format(
+        python=shlex.quote(sys.executable), script=shlex.quote(script))
+
+    def bench():
+        with quiet():
+            Repo().execute(command)
+
+    return bench
+
+
+bench_execute_lines = execute(
+    'import sys; sys.stdout.write({line!r} * {lines})'.format(
+        line='x' * (LINE_LENGTH - 1) + '\n', lines=LINES))
+
+bench_execute_single_line = execute(
+    'import sys; sys.stdout.write({char!r} * {size})'.format(
+        char='x', size=LINES * LINE_LENGTH))
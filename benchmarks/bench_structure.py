@@ -0,0 +1,79 @@
+"""`StructureChecker` and `find_project_name` on a large generated tree.
+
+The size of the tree can be changed with `LILY_BENCH_FILES` (100k files by
+default).
+
+"""
+
+import os
+import shutil
+
+from lily_assistant.checkers.structure import StructureChecker
+
+from helpers import get_scratch_dir, in_directory, write
+
+
+FILES = int(os.environ.get('LILY_BENCH_FILES', 100000))
+
+# -- files per package, each package has its tests package
+PACKAGE_SIZE = 50
+
+
+def create_project(path):
+
+    for name in [
+            'env.sh',
+            'pytest.ini',
+            'README.md',
+            'requirements.txt',
+            'test-requirements.txt',
+            'setup.py',
+            'Makefile',
+            '.gitignore']:
+        write(os.path.join(path, name))
+
+    os.makedirs(os.path.join(path, '.git'))
+    write(os.path.join(path, 'app', '__init__.py'))
+    write(os.path.join(path, 'tests', '__init__.py'))
+
+    # -- half of the files are modules, the other half their tests
+    for index in range(FILES // 2):
+        package = 'package_{}'.format(index // PACKAGE_SIZE)
+        module = 'module_{}.py'.format(index % PACKAGE_SIZE)
+        if index % PACKAGE_SIZE == 0:
+            write(os.path.join(path, 'app', package, '__init__.py'))
+            write(os.path.join(
+                path, 'tests', 'test_' + package, '__init__.py'))
+
+        write(os.path.join(path, 'app', package, module))
+        write(os.path.join(path, 'tests', 'test_' + package, 'test_' + module))
+
+
+def get_project():
+    return get_scratch_dir('structure', create_project)
+
+
+def bench_find_project_name():
+
+    with in_directory(get_project()):
+        StructureChecker.find_project_name()
+
+
+def bench_is_valid():
+
+    with in_directory(get_project()):
+        assert StructureChecker().is_valid()
+
+
+def bench_is_valid_deep():
+    """Deep check with the listings cached by the previous runs."""
+
+    with in_directory(get_project()):
+        assert StructureChecker(deep=True).is_valid()
+
+
+def bench_is_valid_deep_cold():
+
+    with in_directory(get_project()) as path:
+        shutil.rmtree(os.path.join(path, '.lily'), ignore_errors=True)
+        assert StructureChecker(deep=True).is_valid()
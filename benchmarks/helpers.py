@@ -0,0 +1,53 @@
+
+import atexit
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+
+
+_scratch_dirs = {}
+
+
+def get_scratch_dir(name, create):
+    """Temporary directory built once per run by `create(path)`.
+
+    Directories are removed when the benchmarks process exits.
+
+    """
+
+    if name not in _scratch_dirs:
+        path = tempfile.mkdtemp(prefix='lily_bench_{}_'.format(name))
+        atexit.register(shutil.rmtree, path, True)
+        create(path)
+        _scratch_dirs[name] = path
+
+    return _scratch_dirs[name]
+
+
+@contextlib.contextmanager
+def in_directory(path):
+
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield path
+
+    finally:
+        os.chdir(previous)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow everything printed to stdout (e.g. by `click.secho`)."""
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def write(path, content=''):
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
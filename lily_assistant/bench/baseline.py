@@ -0,0 +1,77 @@
+
+import json
+import os
+import platform
+import sys
+
+from lily_assistant.config import Config
+
+
+def get_baseline_path():
+    return os.path.join(Config.get_lily_path(), 'bench_baseline.json')
+
+
+def get_results_path():
+    return os.path.join(Config.get_cache_path(), 'bench_results.json')
+
+
+def dump(results):
+    """Serialize benchmark `results` together with the environment."""
+
+    return json.dumps(
+        {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'benchmarks': results,
+        },
+        indent=4,
+        sort_keys=True) + '\n'
+
+
+def load(path):
+    """Read benchmark results stored by `dump`, `{}` if there are none."""
+
+    try:
+        with open(path) as f:
+            return json.loads(f.read()).get('benchmarks', {})
+
+    except (OSError, ValueError):
+        return {}
+
+
+def save(path, results):
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(dump(results))
+
+    os.replace(tmp_path, path)
+
+
+def compare(results, baseline, threshold):
+    """Find benchmarks whose median regressed more than `threshold` %.
+
+    Benchmarks missing in either `results` or `baseline` are not compared.
+    Returns list of `(benchmark_id, baseline_median, median, change)`
+    sorted from the worst regression, where `change` is in percent.
+
+    """
+
+    regressions = []
+    for benchmark_id, stats in results.items():
+        reference = baseline.get(benchmark_id)
+        if not reference or not reference.get('median'):
+            continue
+
+        change = 100.0 * (stats['median'] / reference['median'] - 1)
+        if change > threshold:
+            regressions.append(
+                (benchmark_id, reference['median'], stats['median'], change))
+
+    regressions.sort(key=lambda regression: (-regression[3], regression[0]))
+
+    return regressions
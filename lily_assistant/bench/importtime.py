@@ -0,0 +1,190 @@
+
+import json
+import os
+import platform
+import subprocess
+import sys
+
+from lily_assistant.config import Config
+
+
+def get_baseline_path():
+    return os.path.join(Config.get_lily_path(), 'import_budget.json')
+
+
+def parse(output, module=None):
+    """Parse output of `python -X importtime`.
+
+    Returns `{name: (self_ms, cumulative_ms)}` of all imported modules or,
+    if `module` is given, only of the ones imported by importing it (the
+    interpreter's own startup imports are skipped then).
+
+    """
+
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+
+        self_time, cumulative, name = parts
+        try:
+            entries.append((
+                name.strip(),
+                len(name) - len(name.lstrip()),
+                int(self_time) / 1000.0,
+                int(cumulative) / 1000.0))
+
+        # -- the header
+        except ValueError:
+            continue
+
+    if module is not None:
+        entries = get_subtree(entries, module)
+
+    return {
+        name: (self_time, cumulative)
+        for name, _, self_time, cumulative in entries}
+
+
+def get_subtree(entries, module):
+    """Entries of `module` and of all the modules nested under it.
+
+    Modules are listed after all the modules they imported, indented
+    deeper than themselves.
+
+    """
+
+    for index, (name, indent, _, _) in enumerate(entries):
+        if name == module:
+            start = index
+            while start > 0 and entries[start - 1][1] > indent:
+                start -= 1
+
+            return entries[start:index + 1]
+
+    return []
+
+
+class ImportTimer:
+    """Measure the import of `module` in fresh interpreters.
+
+    The first run (compiling the bytecode) is discarded, out of the
+    following `repeat` runs the lowest times of each module are taken.
+
+    """
+
+    class ImportFailed(Exception):
+        pass
+
+    def __init__(self, module, cwd, repeat=3):
+        self.module = module
+        self.cwd = cwd
+        self.repeat = repeat
+
+    def measure(self):
+
+        self.run()
+        times = {}
+        for _ in range(self.repeat):
+            for name, (self_time, cumulative) in self.run().items():
+                if name in times:
+                    self_time = min(self_time, times[name][0])
+                    cumulative = min(cumulative, times[name][1])
+
+                times[name] = (self_time, cumulative)
+
+        return times
+
+    def run(self):
+
+        env = {
+            key: value
+            for key, value in os.environ.items()
+            if key not in ('PYTHONPROFILEIMPORTTIME', 'PYTHONSTARTUP')}
+        process = subprocess.run(
+            [
+                sys.executable, '-X', 'importtime',
+                '-c', 'import {}'.format(self.module),
+            ],
+            cwd=self.cwd,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            universal_newlines=True)
+
+        times = parse(process.stderr, self.module)
+        if process.returncode != 0 or self.module not in times:
+            raise ImportTimer.ImportFailed(
+                'import of {module} failed:\n\n{output}'.format(
+                    module=self.module,
+                    output='\n'.join(
+                        line
+                        for line in process.stderr.splitlines()
+                        if not line.startswith('import time:'))))
+
+        return times
+
+
+def load(path):
+    """Read baseline stored by `save`, `{}` if there is none."""
+
+    try:
+        with open(path) as f:
+            return {
+                name: tuple(value)
+                for name, value in json.loads(f.read())['modules'].items()}
+
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def save(path, module, times):
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(json.dumps(
+            {
+                'module': module,
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'modules': {
+                    name: [round(self_time, 3), round(cumulative, 3)]
+                    for name, (self_time, cumulative) in times.items()},
+            },
+            indent=4,
+            sort_keys=True) + '\n')
+
+    os.replace(tmp_path, path)
+
+
+def get_budget(baseline_ms, threshold, slack_ms=5.0):
+    """Compute the allowed cumulative import time (ms) of the baseline.
+
+    The baseline may grow by `threshold` percent, but at least by
+    `slack_ms` so that tiny packages don't fail due to the noise.
+
+    """
+
+    return baseline_ms + max(baseline_ms * threshold / 100.0, slack_ms)
+
+
+def get_offenders(times, baseline, count=10):
+    """Find modules with the highest self import time.
+
+    Returns list of `(module, self_ms, cumulative_ms, baseline_self_ms)`
+    where `baseline_self_ms` is `None` for modules new to the baseline.
+
+    """
+
+    offenders = sorted(
+        (
+            (name, self_time, cumulative, baseline.get(name, (None,))[0])
+            for name, (self_time, cumulative) in times.items()),
+        key=lambda offender: (-offender[1], offender[0]))
+
+    return offenders[:count]
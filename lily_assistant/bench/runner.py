@@ -0,0 +1,185 @@
+
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from lily_assistant.checkers.walker import Walker
+
+
+def discover(paths):
+    """Find `bench_*.py` files under `paths` (files or directories).
+
+    Files ignored by `.gitignore` (e.g. virtualenvs) and hidden
+    directories are skipped. Returns sorted list of `(name, path)` of the
+    found files, where `name` is the path relative to the searched
+    directory, therefore it does not depend on the directory the
+    benchmarks are run from.
+
+    """
+
+    found = set()
+    for path in paths:
+        if os.path.isfile(path):
+            found.add((os.path.basename(path), path))
+            continue
+
+        for directory, files in Walker(path).walk().items():
+            parts = directory.split('/') if directory else []
+            if any(p.startswith('.') or p == '__pycache__' for p in parts):
+                continue
+
+            for name in files:
+                if name.startswith('bench_') and name.endswith('.py'):
+                    found.add((
+                        '/'.join(parts + [name]),
+                        os.path.join(path, *(parts + [name]))))
+
+    return sorted(found)
+
+
+def load_module(path):
+    """Import the benchmark module at `path`.
+
+    Its directory is put in front of `sys.path` so that the benchmark
+    modules can share helpers placed next to them.
+
+    """
+
+    directory = os.path.dirname(os.path.abspath(path))
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+
+    name = 'lily_bench_{}'.format(
+        os.path.splitext(os.path.basename(path))[0])
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def get_functions(module):
+    """Find `bench_*` callables of `module` sorted by their names."""
+
+    return sorted(
+        (name, value)
+        for name, value in vars(module).items()
+        if name.startswith('bench_') and callable(value))
+
+
+def measure(function, warmup=1, repeat=5):
+    """Time `function` called `repeat` times after `warmup` calls.
+
+    Returns stats (in seconds) of the timed calls.
+
+    """
+
+    for _ in range(warmup):
+        function()
+
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started_at)
+
+    return {
+        'min': min(timings),
+        'max': max(timings),
+        'mean': statistics.mean(timings),
+        'median': statistics.median(timings),
+        'repeat': repeat,
+    }
+
+
+class BenchRunner:
+    """Run all benchmarks found in `paths`.
+
+    Each benchmark is identified by `<name>::<function name>`, see
+    `discover` for the `name` of the benchmarks file. Every benchmark (and
+    listing of benchmarks of each file) runs in a fresh interpreter, so
+    the benchmarks don't share imports, caches nor garbage with each other
+    nor with the runner itself.
+
+    """
+
+    class BenchmarkError(Exception):
+        pass
+
+    def __init__(self, paths, warmup=1, repeat=5, pattern=None):
+        self.paths = paths
+        self.warmup = warmup
+        self.repeat = repeat
+        self.pattern = pattern
+
+    def collect(self):
+        """Find benchmarks, returns list of `(benchmark_id, path, name)`."""
+
+        benchmarks = []
+        for file_name, path in discover(self.paths):
+            for name in self.call(path):
+                benchmark_id = '{file_name}::{name}'.format(
+                    file_name=file_name, name=name)
+                if not self.pattern or self.pattern in benchmark_id:
+                    benchmarks.append((benchmark_id, path, name))
+
+        return benchmarks
+
+    def run(self, report=None):
+        """Run benchmarks, call `report(benchmark_id, stats)` after each.
+
+        Returns `{benchmark_id: stats}`.
+
+        """
+
+        results = {}
+        for benchmark_id, path, name in self.collect():
+            results[benchmark_id] = self.call(
+                path,
+                name,
+                '--warmup', str(self.warmup),
+                '--repeat', str(self.repeat))
+            if report:
+                report(benchmark_id, results[benchmark_id])
+
+        return results
+
+    def get_env(self):
+        """Environment making the workers import this very `lily_assistant`.
+
+        It may not be installed in the environment (e.g. while working on
+        `lily_assistant` itself).
+
+        """
+
+        root_dir = os.path.dirname(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        python_path = os.environ.get('PYTHONPATH')
+
+        return dict(
+            os.environ,
+            PYTHONPATH=(
+                os.pathsep.join([root_dir, python_path])
+                if python_path else root_dir))
+
+    def call(self, path, *args):
+
+        process = subprocess.run(
+            [
+                sys.executable, '-m', 'lily_assistant.bench.worker', path,
+            ] + list(args),
+            env=self.get_env(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE)
+        if process.returncode != 0:
+            raise BenchRunner.BenchmarkError(
+                '{path} {args} failed:\n\n{stderr}'.format(
+                    path=path,
+                    args=' '.join(args),
+                    stderr=process.stderr.decode('utf-8', 'replace')))
+
+        return json.loads(process.stdout.decode('utf-8'))
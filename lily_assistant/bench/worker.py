@@ -0,0 +1,53 @@
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+from .runner import get_functions, load_module, measure
+
+
+def main(argv=None):
+    """Time a single benchmark of the file, or list its benchmarks.
+
+    The result is written as JSON to the original stdout, everything the
+    benchmark prints itself ends up on stderr.
+
+    """
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('path')
+    parser.add_argument('name', nargs='?')
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    # -- fd 1 points to stderr while the benchmark runs, so even output
+    # -- written directly to it does not mix with the result
+    sys.stdout.flush()
+    stdout = os.dup(1)
+    os.dup2(2, 1)
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            functions = dict(get_functions(load_module(args.path)))
+            if args.name is None:
+                result = sorted(functions)
+
+            else:
+                result = measure(
+                    functions[args.name],
+                    warmup=args.warmup,
+                    repeat=args.repeat)
+
+    finally:
+        sys.stderr.flush()
+        os.dup2(stdout, 1)
+        os.close(stdout)
+
+    sys.stdout.write(json.dumps(result))
+    sys.stdout.flush()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -1,16 +1,148 @@
 
+from collections import namedtuple
+import re
+
 
 class CommitMessageChecker:
     """Check commit message.
 
-    Placeholder for upcoming checker which will be asserting if commit
-    message asserts to the specifications defined here:
+    Asserts if commit message follows the specification defined here:
     https://github.com/angular/angular.js/blob/master/DEVELOPERS.md#-git-commit-guidelines
 
+        <type>(<scope>): <subject>
+        <BLANK LINE>
+        <body>
+        <BLANK LINE>
+        <footer>
+
+    The message is parsed in a single pass over its lines using the
+    precompiled patterns, all the violations are collected in `errors`.
+
+    Merge, revert, autosquash (`fixup!`, `squash!`) and version upgrade
+    (`VERSION: x.y.z`) commits are accepted as they are generated by tools.
+
     """
 
+    Error = namedtuple('Error', ['line', 'code', 'message'])
+
+    TYPES = (
+        'feat',
+        'fix',
+        'docs',
+        'style',
+        'refactor',
+        'perf',
+        'test',
+        'chore',
+        'build',
+        'ci',
+        'revert',
+    )
+
+    MAX_LINE_LENGTH = 100
+
+    HEADER_REGEX = re.compile(
+        r'(?P<type>\w+)'
+        r'(?:\((?P<scope>[^()]*)\))?'
+        r'(?P<breaking>!)?'
+        r': (?P<subject>\S.*)\Z')
+
+    GENERATED_REGEX = re.compile(
+        r'(?:Merge |Revert "|fixup! |squash! |VERSION: \d+\.\d+\.\d+)')
+
+    SCISSORS = '# ------------------------ >8 ------------------------'
+
     def __init__(self, message):
         self.message = message
+        self.errors = []
+
+    def get_lines(self):
+
+        lines = []
+        for line in self.message.splitlines():
+            if line == self.SCISSORS:
+                break
+
+            if not line.startswith('#'):
+                lines.append(line.rstrip())
+
+        while lines and not lines[-1]:
+            lines.pop()
+
+        while lines and not lines[0]:
+            lines.pop(0)
+
+        return lines
+
+    def parse(self):
+
+        Error = self.Error  # noqa
+        errors = []
+        lines = self.get_lines()
+        if not lines:
+            return [Error(1, 'empty', 'commit message is empty')]
+
+        header = lines[0]
+        if self.GENERATED_REGEX.match(header):
+            return []
+
+        for number, line in enumerate(lines, start=1):
+            if len(line) > self.MAX_LINE_LENGTH:
+                errors.append(Error(
+                    number,
+                    'line-length',
+                    'line is longer than {} characters'.format(
+                        self.MAX_LINE_LENGTH)))
+
+            if number == 1:
+                errors.extend(self.parse_header(line))
+
+            elif number == 2 and line:
+                errors.append(Error(
+                    number,
+                    'blank-line',
+                    'header must be separated from the body by a blank '
+                    'line'))
+
+        return errors
+
+    def parse_header(self, header):
+
+        Error = self.Error  # noqa
+        match = self.HEADER_REGEX.match(header)
+        if not match:
+            return [Error(
+                1,
+                'header-format',
+                'header must follow the `<type>(<scope>): <subject>` '
+                'format')]
+
+        errors = []
+        if match.group('type') not in self.TYPES:
+            errors.append(Error(
+                1,
+                'type',
+                'type must be one of: {}'.format(', '.join(self.TYPES))))
+
+        subject = match.group('subject')
+        if subject[0].isupper():
+            errors.append(Error(
+                1,
+                'subject-case',
+                'subject must not start with a capital letter'))
+
+        if subject.endswith('.'):
+            errors.append(Error(
+                1, 'subject-period', 'subject must not end with a dot'))
+
+        return errors
 
     def is_valid(self):
-        return True
+        self.errors = self.parse()
+
+        return not self.errors
+
+    def render_errors(self):
+        return '\n'.join(
+            'line {e.line}: {e.message} [{e.code}]'.format(e=e)
+            for e in self.errors)
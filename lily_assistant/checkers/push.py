@@ -0,0 +1,238 @@
+
+from collections import namedtuple
+import hashlib
+import json
+import os
+
+from . import commit_message
+from .commit_message import CommitMessageChecker
+from lily_assistant.repo.verify import get_commits
+
+
+ZERO_SHA = '0' * 40
+
+# -- hash of the empty tree, base of ranges starting at a root commit
+EMPTY_TREE = '4b825dc642cb6eb9a060e54bf8d69288fbee4904'
+
+
+PushedRef = namedtuple(
+    'PushedRef', ['local_ref', 'local_sha', 'remote_ref', 'remote_sha'])
+
+
+def parse_refs(lines):
+    """Parse refs given to the `pre-push` hook on its stdin.
+
+    Each line is `<local ref> <local sha> <remote ref> <remote sha>`,
+    deleted refs (with the zero local sha) have nothing to check and are
+    skipped.
+
+    """
+
+    refs = []
+    for line in lines:
+        parts = line.split()
+        if len(parts) != 4 or parts[1] == ZERO_SHA:
+            continue
+
+        refs.append(PushedRef(*parts))
+
+    return refs
+
+
+def get_fingerprint(command=None):
+    """Hash of the checks themselves, results of other checks don't count.
+
+    `command` is the one verifying the pushed tips (see `PushChecker`).
+
+    """
+
+    digest = hashlib.sha256()
+    for path in [__file__, commit_message.__file__]:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+
+    digest.update((command or '').encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+class PushCache:
+    """Ranges and commits which were already verified before a push.
+
+    Only the last `max_entries` of each are kept, everything is forgotten
+    once the checks change (see `get_fingerprint`).
+
+    """
+
+    MAX_ENTRIES = 5000
+
+    def __init__(self, path, fingerprint, max_entries=None):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self.ranges, self.commits = self.load()
+
+    def load(self):
+
+        try:
+            with open(self.path) as f:
+                data = json.loads(f.read())
+
+        except (OSError, ValueError):
+            return [], []
+
+        if data.get('fingerprint') != self.fingerprint:
+            return [], []
+
+        return data.get('ranges', []), data.get('commits', [])
+
+    def add(self, ranges, commits):
+
+        added = set(ranges) | set(commits)
+        self.ranges = [r for r in self.ranges if r not in added] + ranges
+        self.commits = [c for c in self.commits if c not in added] + commits
+
+    def save(self):
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps({
+                'fingerprint': self.fingerprint,
+                'ranges': self.ranges[-self.max_entries:],
+                'commits': self.commits[-self.max_entries:],
+            }))
+
+        os.replace(tmp_path, self.path)
+
+
+class PushChecker:
+    """Check commits about to be pushed which are not on the remote yet.
+
+    Commits of all the pushed refs are collected at once and each one's
+    message is checked only once (and never again in the following pushes,
+    see `PushCache`). Each pushed range is checked as a whole, not commit
+    by commit: its diff (`git diff --check <base> <tip>`) and, with the
+    `verifier` (see `RangeVerifier`), the tip itself (e.g. linted and its
+    structure checked in a worktree).
+
+    `remote` is the name or the url of the remote as passed to the hook,
+    commits of the unknown remotes are checked against all of them.
+
+    """
+
+    def __init__(self, repo, cache, remote=None, verifier=None):
+        self.repo = repo
+        self.cache = cache
+        self.remote = remote
+        self.verifier = verifier
+        self.remote_name = None
+        self.errors = []
+        self.ranges = []
+        self.commits = []
+        self.invalid = set()
+
+    def get_exclude(self, ref):
+        """Revisions which are already on the remote."""
+
+        exclude = [
+            '--remotes={}'.format(self.remote_name)
+            if self.remote_name else '--remotes']
+        if ref.remote_sha != ZERO_SHA and self.repo.has_commit(ref.remote_sha):
+            exclude.append(ref.remote_sha)
+
+        return exclude
+
+    def get_base(self, boundaries):
+
+        if not boundaries:
+            return EMPTY_TREE
+
+        if len(boundaries) == 1:
+            return boundaries[0]
+
+        return self.repo.get_merge_base(boundaries)
+
+    def check(self, refs):
+        """Check `refs`, returns number of the newly checked commits.
+
+        The problems found are collected in `errors`.
+
+        """
+
+        checked = set(self.cache.commits)
+        if self.remote:
+            self.remote_name = self.repo.get_remote_name(self.remote)
+
+        for ref in refs:
+            exclude = self.get_exclude(ref)
+            commits, boundaries = self.repo.get_new_commits(
+                ref.local_sha, exclude)
+            if not commits:
+                continue
+
+            rev_range = '{}..{}'.format(
+                self.get_base(boundaries), ref.local_sha)
+            if rev_range in self.cache.ranges or rev_range in self.ranges:
+                continue
+
+            range_errors = len(self.errors)
+            if not checked.issuperset(commits):
+                self.check_messages(
+                    [ref.local_sha, '--not'] + exclude, checked)
+
+            self.check_diff(ref, rev_range)
+            if self.verifier:
+                self.check_tip(ref, rev_range)
+
+            if (
+                    len(self.errors) == range_errors and
+                    self.invalid.isdisjoint(commits)):
+                self.ranges.append(rev_range)
+
+        return len(self.commits) + len(self.invalid)
+
+    def check_messages(self, revs, checked):
+
+        for commit_hash, message in self.repo.iter_commits(revs):
+            if commit_hash in checked:
+                continue
+
+            checked.add(commit_hash)
+            checker = CommitMessageChecker(message)
+            if checker.is_valid():
+                self.commits.append(commit_hash)
+
+            else:
+                self.invalid.add(commit_hash)
+                self.errors.append('{commit_hash} {header}\n\n{errors}'.format(
+                    commit_hash=commit_hash[:10],
+                    header=message.strip().split('\n')[0],
+                    errors=checker.render_errors()))
+
+    def check_diff(self, ref, rev_range):
+
+        base, tip = rev_range.split('..')
+        problems = self.repo.check_diff(base, tip)
+        if problems:
+            self.errors.append('{ref} {rev_range}\n\n{problems}'.format(
+                ref=ref.local_ref,
+                rev_range=rev_range,
+                problems=problems.strip()))
+
+    def check_tip(self, ref, rev_range):
+
+        commit, = get_commits(
+            self.verifier.pool.base_path, '{}^!'.format(ref.local_sha))
+        if not self.verifier.verify(commit):
+            self.errors.append(
+                '{ref} {rev_range}\n\n`{command}` failed at {sha}'.format(
+                    ref=ref.local_ref,
+                    rev_range=rev_range,
+                    command=self.verifier.command,
+                    sha=ref.local_sha[:10]))
+
+    def save(self):
+
+        self.cache.add(self.ranges, self.commits)
+        self.cache.save()
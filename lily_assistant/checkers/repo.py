@@ -1,9 +1,12 @@
 
-from subprocess import Popen, PIPE
+import re
+from subprocess import Popen, PIPE, run
 
 
 class GitRepo:
 
+    HUNK_REGEX = re.compile(rb'^@@ -\S+ \+(\d+)(?:,(\d+))? @@')
+
     @property
     def active_branch(self):
 
@@ -12,3 +15,179 @@ class GitRepo:
             active_branch = str(proc.stdout.read(), encoding='utf-8')
 
             return active_branch.strip().lower()
+
+    def iter_commits(self, rev_range, chunk_size=64 * 1024):
+        """Stream `(commit_hash, message)` of all commits in `rev_range`.
+
+        Commits are read from `git log -z` in chunks therefore even ranges
+        with thousands of commits are never loaded into memory at once.
+        `rev_range` is either a single range or list of revisions (e.g.
+        `[tip, '--not', '--remotes']`).
+
+        """
+
+        revs = [rev_range] if isinstance(rev_range, str) else list(rev_range)
+        command = ['git', 'log', '-z', '--format=%H%n%B'] + revs
+        with Popen(command, stdout=PIPE, stderr=PIPE) as proc:
+            rest = b''
+            for chunk in iter(lambda: proc.stdout.read(chunk_size), b''):
+                records = (rest + chunk).split(b'\0')
+                rest = records.pop()
+                for record in records:
+                    yield self.parse_commit(record)
+
+            if rest.strip():
+                yield self.parse_commit(rest)
+
+            # -- git fails (e.g. on unknown revisions) before any output
+            error = proc.stderr.read()
+
+        if proc.returncode != 0:
+            raise OSError(
+                'git log {rev_range} failed: {error}'.format(
+                    rev_range=' '.join(revs),
+                    error=str(error, encoding='utf-8', errors='replace').strip()))
+
+    def get_new_commits(self, tip, exclude):
+        """Find commits reachable from `tip` but not from `exclude` revs.
+
+        Returns `(commits, boundaries)` where the boundaries are the
+        excluded parents of the new commits (where the range starts).
+
+        """
+
+        output = self.check_output(
+            ['git', 'rev-list', '--boundary', tip, '--not'] + list(exclude))
+        commits, boundaries = [], []
+        for line in output.split():
+            if line.startswith('-'):
+                boundaries.append(line[1:])
+
+            else:
+                commits.append(line)
+
+        return commits, boundaries
+
+    def has_commit(self, rev):
+
+        try:
+            self.check_output(
+                ['git', 'cat-file', '-e', '{}^{{commit}}'.format(rev)])
+
+        except OSError:
+            return False
+
+        return True
+
+    def get_remote_name(self, remote):
+        """Name of the `remote` given by its name or url, `None` if unknown.
+
+        git passes the url instead of the name to the `pre-push` hook when
+        pushing straight to the url.
+
+        """
+
+        proc = run(
+            ['git', 'config', '--get-regexp', r'^remote\..*\.(push)?url$'],
+            stdout=PIPE,
+            stderr=PIPE,
+            universal_newlines=True)
+        names = {}
+        for line in proc.stdout.splitlines():
+            key, _, url = line.partition(' ')
+            names.setdefault(url, key[len('remote.'):].rsplit('.', 1)[0])
+
+        if remote in names.values():
+            return remote
+
+        return names.get(remote)
+
+    def get_merge_base(self, revs):
+        return self.check_output(
+            ['git', 'merge-base', '--octopus'] + list(revs)).strip()
+
+    def check_diff(self, base, tip):
+        """Whitespace errors and conflict markers added by `base..tip`.
+
+        Returns the problems as reported by `git diff --check` (empty if
+        there are none).
+
+        """
+
+        proc = run(
+            ['git', 'diff', '--check', '--no-color', base, tip],
+            stdout=PIPE,
+            stderr=PIPE)
+        if proc.returncode not in (0, 2):
+            raise OSError(
+                'git diff --check returned exit code: {code}'.format(
+                    code=proc.returncode))
+
+        return str(proc.stdout, encoding='utf-8', errors='replace')
+
+    def check_output(self, command):
+
+        proc = run(command, stdout=PIPE, stderr=PIPE)
+        if proc.returncode != 0:
+            raise OSError(
+                '{command} returned exit code: {code}'.format(
+                    command=' '.join(command[:2]), code=proc.returncode))
+
+        return str(proc.stdout, encoding='utf-8', errors='replace')
+
+    def parse_commit(self, record):
+
+        commit_hash, _, message = str(
+            record, encoding='utf-8', errors='replace').partition('\n')
+
+        return commit_hash.strip(), message
+
+    def get_changed_lines(self, rev=None):
+        """Lines added or modified by the staged changes.
+
+        Returns `{path: set(line_numbers)}` with paths relative to the
+        current directory. If `rev` is given the working tree is compared
+        against it instead of the index.
+
+        """
+
+        command = [
+            'git',
+            '-c', 'core.quotePath=false',
+            'diff',
+            '-U0',
+            '--no-color',
+            '--no-ext-diff',
+            '--relative',
+            '--diff-filter=d',
+            '--src-prefix=a/',
+            '--dst-prefix=b/',
+        ] + ([rev] if rev else ['--cached'])
+        with Popen(command, stdout=PIPE) as proc:
+            changed_lines = self.parse_diff(proc.stdout)
+
+        if proc.returncode != 0:
+            raise OSError(
+                'git diff returned exit code: {code}'.format(
+                    code=proc.returncode))
+
+        return changed_lines
+
+    def parse_diff(self, lines):
+
+        changed_lines, path = {}, None
+        for line in lines:
+            if line.startswith(b'+++ '):
+                path = str(
+                    line[4:].rstrip(b'\n'), encoding='utf-8', errors='replace')
+                path = path[2:] if path.startswith('b/') else None
+
+            elif path and line.startswith(b'@@ '):
+                match = self.HUNK_REGEX.match(line)
+                start = int(match.group(1))
+                count = int(match.group(2) or 1)
+                if count:
+                    changed_lines.setdefault(path, set()).update(
+                        range(start, start + count))
+
+        return changed_lines
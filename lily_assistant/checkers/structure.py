@@ -1,7 +1,11 @@
 
+import ast
+import fnmatch
 import os
 import textwrap
-import setuptools
+
+from lily_assistant.config import Config
+from .walker import Walker
 
 
 class File:
@@ -46,6 +50,153 @@ class Directory(File):
         return True
 
 
+class ModuleTestsRule:
+    """Every source module must have its matching test module.
+
+    `<src_dir>/a/b.py` is expected to be tested in `tests/test_a/test_b.py`.
+    Private modules (starting with `_`, e.g. `__init__.py`) are skipped.
+
+    """
+
+    def __init__(self, src_dir, tests_dir='tests'):
+        self.src_dir = src_dir
+        self.tests_dir = tests_dir
+
+    def get_test_path(self, path, name):
+
+        parts = [p for p in path.split('/')[1:] if p]
+
+        return '/'.join(
+            [self.tests_dir] +
+            ['test_{}'.format(p) for p in parts] +
+            ['test_{}'.format(name)])
+
+    def check(self, tree):
+
+        errors = []
+        for path in sorted(tree):
+            if path.split('/')[0] != self.src_dir:
+                continue
+
+            for name in sorted(tree[path]):
+                if not name.endswith('.py') or name.startswith('_'):
+                    continue
+
+                test_path = self.get_test_path(path, name)
+                test_dir, test_name = test_path.rsplit('/', 1)
+                if test_name not in tree.get(test_dir, ()):
+                    errors.append(
+                        'Missing: `{test_path}` test module for '
+                        '`{path}/{name}`'.format(
+                            test_path=test_path, path=path, name=name))
+
+        return errors
+
+
+def find_package_data(base_path):
+    """Patterns of the data files shipped by the project (`fnmatch` style).
+
+    Collected from the literal `package_data` and `data_files` arguments
+    of `setup.py` (it's parsed, never run) and from `MANIFEST.in`, paths
+    are relative to `base_path`.
+
+    """
+
+    patterns = []
+    try:
+        with open(os.path.join(base_path, 'setup.py')) as f:
+            module = ast.parse(f.read())
+
+    except (OSError, SyntaxError, ValueError):
+        module = None
+
+    for node in ast.walk(module) if module else []:
+        if not isinstance(node, ast.keyword):
+            continue
+
+        try:
+            value = ast.literal_eval(node.value)
+
+        except ValueError:
+            continue
+
+        if node.arg == 'package_data' and isinstance(value, dict):
+            for package, files in value.items():
+                prefix = (package.replace('.', '/') if package else '*') + '/'
+                patterns.extend(prefix + name for name in files)
+
+        elif node.arg == 'data_files' and isinstance(value, (list, tuple)):
+            for entry in value:
+                files = entry[1] if isinstance(entry, (list, tuple)) else [entry]
+                patterns.extend(files)
+
+    try:
+        with open(os.path.join(base_path, 'MANIFEST.in')) as f:
+            lines = f.read().splitlines()
+
+    except OSError:
+        lines = []
+
+    for line in lines:
+        command, *args = line.split() or ['']
+        if command == 'include':
+            patterns.extend(args)
+
+        elif command == 'recursive-include' and args:
+            directory = args[0].rstrip('/')
+            for name in args[1:]:
+                patterns.extend([
+                    '{}/{}'.format(directory, name),
+                    '{}/*/{}'.format(directory, name),
+                ])
+
+        elif command == 'graft' and args:
+            patterns.append('{}/*'.format(args[0].rstrip('/')))
+
+        elif command == 'global-include':
+            patterns.extend('*/' + name for name in args)
+
+    return patterns
+
+
+class StrayFileRule:
+    """Package directories can contain only the allowed files.
+
+    Besides the `allowed_files` (names) the declared `package_data`
+    (paths, see `find_package_data`) is allowed as well.
+
+    """
+
+    ALLOWED_FILES = ['*.py', '*.pyi', 'py.typed']
+
+    def __init__(self, src_dir, allowed_files=None, package_data=None):
+        self.src_dir = src_dir
+        self.allowed_files = allowed_files or self.ALLOWED_FILES
+        self.package_data = package_data or []
+
+    def check(self, tree):
+
+        errors = []
+        for path in sorted(tree):
+            files = tree[path]
+            if (
+                    path.split('/')[0] != self.src_dir or
+                    '__init__.py' not in files):
+                continue
+
+            for name in sorted(files):
+                if not any(
+                        fnmatch.fnmatch(name, pattern)
+                        for pattern in self.allowed_files) and not any(
+                            fnmatch.fnmatch(path + '/' + name, pattern)
+                            for pattern in self.package_data):
+                    errors.append(
+                        'Stray: `{path}/{name}` file in the package '
+                        '`{path}`'.format(path=path, name=name))
+
+        return errors
+
+
 class StructureChecker:
     """Checks if the project is compliant with the structure guidelines.
 
@@ -63,16 +214,22 @@ class StructureChecker:
     ├── test-requirements.txt
     └── setup.py
 
+    In the `deep` mode the whole project tree (except of the files ignored
+    by `.gitignore`) is additionally checked against the `RULES`.
+
     """
 
     REQUIRED_STRUCTURE = []
 
+    RULES = []
+
     class BrokenStructure(Exception):
         pass
 
-    def __init__(self):
+    def __init__(self, deep=False, allowed_files=None):
 
         self.errors = []
+        self.deep = deep
         self.REQUIRED_STRUCTURE = [
             File(
                 name='env.sh',
@@ -110,9 +267,22 @@ class StructureChecker:
                 purpose='project code directory'),
         ]
 
+        if deep:
+            project_name = StructureChecker.find_project_name()
+            self.RULES = [
+                ModuleTestsRule(project_name),
+                StrayFileRule(
+                    project_name,
+                    allowed_files,
+                    find_package_data(os.getcwd())),
+            ]
+
     @classmethod
     def find_project_name(cls):
 
+        # -- imported lazily since `setuptools` is expensive to import
+        import setuptools
+
         try:
             return [
                 p
@@ -138,6 +308,15 @@ class StructureChecker:
             if not entity.is_valid():
                 self.errors.extend(entity.errors)
 
+        if self.RULES:
+            tree = Walker(
+                os.getcwd(),
+                cache_path=os.path.join(
+                    Config.get_cache_path(), 'structure.json')).walk()
+
+            for rule in self.RULES:
+                self.errors.extend(rule.check(tree))
+
         if self.errors:
             return False
 
@@ -145,11 +324,10 @@ class StructureChecker:
             return True
 
     def raise_errors(self):
-        errors = textwrap.indent(
-            text='\n'.join(self.errors),
-            prefix=12 * ' ' + '+ ').strip()
+        errors = textwrap.indent(text='\n'.join(self.errors), prefix='+ ')
         project_name = StructureChecker.find_project_name()
 
+        # -- formatted after dedenting, so that all the errors line up
         raise self.BrokenStructure(textwrap.dedent('''
 
             !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
@@ -0,0 +1,213 @@
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import json
+import os
+import re
+
+
+class GitIgnore:
+    """Minimal `.gitignore` matcher.
+
+    Supports the subset of the gitignore syntax used in practice: comments,
+    negations (`!`), directory only patterns (trailing `/`), anchored
+    patterns (containing `/`) and the `*`, `?`, `[...]` and `**` wildcards.
+
+    """
+
+    def __init__(self, base, lines):
+        self.base = base
+        self.patterns = []
+
+        for line in lines:
+            line = line.rstrip('\n').rstrip()
+            if not line or line.startswith('#'):
+                continue
+
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            anchored = '/' in line
+            line = line.lstrip('/')
+            if not line:
+                continue
+
+            self.patterns.append(
+                (self.compile(line), negate, dir_only, anchored))
+
+    @classmethod
+    def from_file(cls, base, path):
+        with open(path, errors='replace') as f:
+            return cls(base, f.readlines())
+
+    @staticmethod
+    def compile(pattern):
+
+        regex = ''
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith('**/', i):
+                regex += '(?:.*/)?'
+                i += 3
+
+            elif pattern.startswith('**', i):
+                regex += '.*'
+                i += 2
+
+            elif pattern[i] == '*':
+                regex += '[^/]*'
+                i += 1
+
+            elif pattern[i] == '?':
+                regex += '[^/]'
+                i += 1
+
+            elif pattern[i] == '[' and ']' in pattern[i + 1:]:
+                end = pattern.index(']', i + 1)
+                regex += '[' + pattern[i + 1:end].replace('!', '^', 1) + ']'
+                i = end + 1
+
+            else:
+                regex += re.escape(pattern[i])
+                i += 1
+
+        return re.compile(regex + r'\Z')
+
+    def match(self, path, is_dir):
+        """Decide if `path` (relative to the project root) is ignored.
+
+        Returns `True` / `False` if one of the patterns decided about the
+        path and `None` if none of them applies.
+
+        """
+
+        if self.base:
+            if not path.startswith(self.base + '/'):
+                return None
+
+            path = path[len(self.base) + 1:]
+
+        name = path.rsplit('/', 1)[-1]
+        decision = None
+        for regex, negate, dir_only, anchored in self.patterns:
+            if dir_only and not is_dir:
+                continue
+
+            if regex.match(path if anchored else name):
+                decision = not negate
+
+        return decision
+
+
+class Walker:
+    """Parallel `os.scandir` based walker honouring `.gitignore` files.
+
+    Ignored directories are pruned before they are scanned. Listings of
+    directories are cached together with their `mtime` so that on the next
+    run directories which were not changed are not scanned again (only
+    single `stat` is needed to prove that).
+
+    """
+
+    ALWAYS_IGNORED = ('.git',)
+
+    def __init__(self, root, cache_path=None, workers=None):
+        self.root = root
+        self.cache_path = cache_path
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.cache = self.load_cache()
+
+    def load_cache(self):
+
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+
+        try:
+            with open(self.cache_path) as f:
+                return json.loads(f.read())
+
+        except ValueError:
+            return {}
+
+    def save_cache(self, cache):
+
+        if not self.cache_path:
+            return
+
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with open(self.cache_path, 'w') as f:
+            f.write(json.dumps(cache))
+
+    def walk(self):
+        """Return mapping of relative directory path to its files."""
+
+        tree = {}
+        cache = {}
+        with ThreadPoolExecutor(self.workers) as executor:
+            pending = {executor.submit(self.scan, '', [])}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, entry, files, dirs = future.result()
+                    cache[path] = entry
+                    tree[path] = files
+                    for name, rules in dirs:
+                        pending.add(
+                            executor.submit(
+                                self.scan, self.join(path, name), rules))
+
+        self.cache = cache
+        self.save_cache(cache)
+
+        return tree
+
+    def scan(self, path, rules):
+
+        full_path = os.path.join(self.root, path)
+        mtime = os.stat(full_path).st_mtime_ns
+        entry = self.cache.get(path)
+        if not entry or entry[0] != mtime:
+            files, dirs = [], []
+            with os.scandir(full_path) as entries:
+                for e in entries:
+                    if e.is_dir(follow_symlinks=False):
+                        dirs.append(e.name)
+
+                    else:
+                        files.append(e.name)
+
+            entry = [mtime, sorted(files), sorted(dirs)]
+
+        _, files, dirs = entry
+        if '.gitignore' in files:
+            rules = rules + [
+                GitIgnore.from_file(
+                    path, os.path.join(full_path, '.gitignore'))]
+
+        files = {
+            name
+            for name in files
+            if not self.is_ignored(self.join(path, name), False, rules)}
+        dirs = [
+            (name, rules)
+            for name in dirs
+            if (
+                name not in self.ALWAYS_IGNORED and
+                not self.is_ignored(self.join(path, name), True, rules))]
+
+        return path, entry, files, dirs
+
+    def is_ignored(self, path, is_dir, rules):
+
+        ignored = False
+        for rule in rules:
+            decision = rule.match(path, is_dir)
+            if decision is not None:
+                ignored = decision
+
+        return ignored
+
+    def join(self, path, name):
+        return '{}/{}'.format(path, name) if path else name
@@ -0,0 +1,276 @@
+
+import codecs
+import json
+import os
+import shutil
+import time
+import zlib
+
+from lily_assistant.config import Config
+
+
+def get_logs_path():
+    return os.path.join(Config.get_lily_path(), 'logs')
+
+
+class OutputArchive:
+    """Zlib compressed archive of the output of a single run.
+
+    Each run gets its own directory `<logs>/<run_id>` with the metadata of
+    the run in `meta.json` and its output in segments `output.<n>.z`, each
+    one a separate zlib stream. Once the current segment grows above
+    `segment_size` (compressed) bytes a new one is started and only the
+    first one and the last `segments - 1` of them are kept, therefore
+    neither the start of the output (the setup, the first traceback) nor
+    its end (where the failure is) is ever lost.
+
+    When the run is closed the oldest runs are removed so that at most
+    `max_runs` runs taking together at most `max_size` bytes are kept.
+
+    """
+
+    SEGMENT_SIZE = 1024 * 1024
+
+    SEGMENTS = 4
+
+    MAX_RUNS = 50
+
+    MAX_SIZE = 16 * 1024 * 1024
+
+    # -- runs still running are not removed (e.g. the one which spawned
+    # -- the current run) unless they were killed long time ago
+    STALE_AFTER = 24 * 60 * 60
+
+    PASSED = 'passed'
+
+    FAILED = 'failed'
+
+    RUNNING = 'running'
+
+    def __init__(
+            self,
+            path,
+            command,
+            segment_size=None,
+            segments=None,
+            max_runs=None,
+            max_size=None):
+        self.path = path
+        self.command = command
+        self.segment_size = segment_size or self.SEGMENT_SIZE
+        self.segments = segments or self.SEGMENTS
+        self.max_runs = max_runs or self.MAX_RUNS
+        self.max_size = max_size or self.MAX_SIZE
+        self.run_path = None
+        self.started = None
+        self.file = None
+        self.compressor = None
+        self.index = -1
+        self.size = 0
+
+    @property
+    def is_open(self):
+        return self.run_path is not None
+
+    def open(self):
+
+        self.started = time.time()
+        run_id = '{time}.{microseconds:06d}-{pid}'.format(
+            time=time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started)),
+            microseconds=int(self.started % 1 * 1000000),
+            pid=os.getpid())
+        self.run_path = os.path.join(self.path, run_id)
+        os.makedirs(self.run_path, exist_ok=True)
+        self.exclude()
+        self.write_meta(self.RUNNING)
+        self.start_segment()
+
+    def exclude(self):
+        """Keep the runs (and the rest of the state) out of git.
+
+        Otherwise `git add .` (e.g. of `push-upgraded-version`) commits
+        them, the archive lives in `<project>/.lily/logs`.
+
+        """
+
+        # -- imported lazily, only the runs writing anything pay for it
+        from lily_assistant.repo.exclude import exclude_state
+
+        try:
+            exclude_state(os.path.dirname(os.path.dirname(self.path)))
+
+        except OSError:
+            pass
+
+    def write(self, text):
+        """Append `text` to the archive, opening it on the first write."""
+
+        if not self.is_open:
+            self.open()
+
+        data = self.compressor.compress(text.encode('utf-8', 'replace'))
+        if data:
+            self.file.write(data)
+            self.size += len(data)
+            if self.size >= self.segment_size:
+                self.start_segment()
+
+    def close(self, status):
+
+        if not self.is_open:
+            return
+
+        self.finish_segment()
+        self.write_meta(status)
+        self.prune()
+        self.run_path = None
+
+    def start_segment(self):
+
+        self.finish_segment()
+        self.index += 1
+        self.file = open(
+            os.path.join(self.run_path, 'output.{}.z'.format(self.index)),
+            'wb')
+        self.compressor = zlib.compressobj()
+        self.size = 0
+
+        # -- the first segment is pinned, only the middle ones rotate
+        obsolete = self.index - max(self.segments - 1, 1)
+        if obsolete >= 1:
+            os.remove(os.path.join(
+                self.run_path, 'output.{}.z'.format(obsolete)))
+
+    def finish_segment(self):
+
+        if self.file is not None:
+            self.file.write(self.compressor.flush())
+            self.file.close()
+            self.file = None
+
+    def write_meta(self, status):
+
+        meta = {
+            'command': self.command,
+            'status': status,
+            'started': round(self.started, 3),
+        }
+        if status != self.RUNNING:
+            meta['finished'] = round(time.time(), 3)
+
+        tmp_path = os.path.join(self.run_path, 'meta.json.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps(meta))
+
+        os.replace(tmp_path, os.path.join(self.run_path, 'meta.json'))
+
+    def prune(self):
+        """Remove the oldest runs exceeding the retention limits."""
+
+        total = 0
+        for index, run in enumerate(reversed(list_runs(self.path))):
+            total += get_size(run['path'])
+            if run['path'] == self.run_path or (
+                    run.get('status') == self.RUNNING and
+                    run.get('started', 0) > time.time() - self.STALE_AFTER):
+                continue
+
+            if index >= self.max_runs or total > self.max_size:
+                shutil.rmtree(run['path'], ignore_errors=True)
+
+
+class ArchiveTee:
+    """Stream passing everything written to it to `record` as well."""
+
+    def __init__(self, stream, record):
+        self.stream = stream
+        self.record = record
+        self.decoder = codecs.getincrementaldecoder('utf-8')('replace')
+
+    def write(self, data):
+
+        self.record(
+            self.decoder.decode(data) if isinstance(data, bytes) else data)
+
+        return self.stream.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def get_size(path):
+
+    try:
+        return sum(entry.stat().st_size for entry in os.scandir(path))
+
+    except OSError:
+        return 0
+
+
+def list_runs(path):
+    """List archived runs ordered from the oldest.
+
+    Each one is the content of its `meta.json` together with the `id` and
+    the `path` of the run.
+
+    """
+
+    try:
+        run_ids = sorted(
+            entry.name for entry in os.scandir(path) if entry.is_dir())
+
+    except FileNotFoundError:
+        return []
+
+    runs = []
+    for run_id in run_ids:
+        run_path = os.path.join(path, run_id)
+        try:
+            with open(os.path.join(run_path, 'meta.json')) as f:
+                run = json.loads(f.read())
+
+        except (OSError, ValueError):
+            continue
+
+        run.update({'id': run_id, 'path': run_path})
+        runs.append(run)
+
+    return runs
+
+
+def read_output(run_path, chunk_size=64 * 1024):
+    """Decompress the output of the run, yields chunks of text.
+
+    Segments of runs which did not exit cleanly are not finished, whatever
+    was written of them is decompressed. Rotated out segments are marked
+    by a line saying how many of them were skipped.
+
+    """
+
+    indexes = []
+    for name in os.listdir(run_path):
+        if name.startswith('output.') and name.endswith('.z'):
+            try:
+                indexes.append(int(name[len('output.'):-len('.z')]))
+
+            except ValueError:
+                continue
+
+    previous = -1
+    for index in sorted(indexes):
+        if index > previous + 1:
+            yield '\n[... {} segment(s) of output rotated out ...]\n'.format(
+                index - previous - 1)
+
+        previous = index
+        decompressor = zlib.decompressobj()
+        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        with open(os.path.join(run_path, 'output.{}.z'.format(index)), 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                try:
+                    yield decoder.decode(decompressor.decompress(chunk))
+
+                except zlib.error:
+                    break
+
+        yield decoder.decode(decompressor.flush(), final=True)
@@ -0,0 +1,117 @@
+
+import os
+
+import click
+
+from .logger import Logger
+from lily_assistant.bench import baseline
+from lily_assistant.bench.runner import BenchRunner
+from lily_assistant.config import Config
+
+
+logger = Logger()
+
+
+def default_threshold():
+    return float(os.environ.get('BENCH_THRESHOLD', 10))
+
+
+def report(benchmark_id, stats):
+
+    logger.report('{median:10.4f}s  {min:10.4f}s  {benchmark_id}'.format(
+        median=stats['median'], min=stats['min'], benchmark_id=benchmark_id))
+
+
+@click.command()
+@click.argument('paths', nargs=-1)
+@click.option(
+    '-k', 'pattern',
+    default=None,
+    help='run only benchmarks whose id contains the given text')
+@click.option(
+    '--warmup',
+    type=int,
+    default=1,
+    help='number of untimed calls before the timed ones')
+@click.option(
+    '--repeat',
+    type=int,
+    default=5,
+    help='number of timed calls of each benchmark')
+@click.option(
+    '--threshold',
+    type=float,
+    default=default_threshold,
+    help=(
+        'maximal allowed regression of the median in percent (defaults to '
+        'BENCH_THRESHOLD or 10)'))
+@click.option(
+    '--save-baseline',
+    is_flag=True,
+    default=False,
+    help='store the results as the new baseline instead of comparing')
+def bench(paths, pattern, warmup, repeat, threshold, save_baseline):
+    """Run benchmarks and compare them with the baseline.
+
+    Benchmarks are the `bench_*` functions of the `bench_*.py` files found
+    in PATHS (by default in the whole project). Each one is run in its own
+    subprocess with `--warmup` untimed and `--repeat` timed calls. The run
+    fails if the median of any benchmark regressed by more than
+    `--threshold` percent comparing to `.lily/bench_baseline.json`.
+
+    Benchmarks missing in the baseline (e.g. on the first run) are added to
+    it, the results of the last run are kept in
+    `.lily/cache/bench_results.json`.
+
+    """
+
+    runner = BenchRunner(
+        list(paths) or [Config.get_project_path()],
+        warmup=warmup,
+        repeat=repeat,
+        pattern=pattern)
+
+    logger.report('{:>11}  {:>11}  {}'.format('median', 'min', 'benchmark'))
+    try:
+        results = runner.run(report=report)
+
+    except BenchRunner.BenchmarkError as e:
+        raise click.ClickException(str(e))
+
+    if not results:
+        logger.info('no benchmarks found')
+        return
+
+    baseline.save(baseline.get_results_path(), results)
+
+    path = baseline.get_baseline_path()
+    reference = baseline.load(path)
+    regressions = [] if save_baseline else baseline.compare(
+        results, reference, threshold)
+    added = [
+        benchmark_id
+        for benchmark_id in results
+        if save_baseline or benchmark_id not in reference]
+    if added:
+        reference.update({
+            benchmark_id: results[benchmark_id] for benchmark_id in added})
+        baseline.save(path, reference)
+        logger.info('stored baseline of {count} benchmark(s) in {path}'.format(
+            count=len(added), path=path))
+
+    if regressions:
+        for benchmark_id, before, after, change in regressions:
+            logger.report(
+                '{change:+7.1f}%  {before:.4f}s -> {after:.4f}s  '
+                '{benchmark_id}'.format(
+                    change=change,
+                    before=before,
+                    after=after,
+                    benchmark_id=benchmark_id))
+
+        raise click.ClickException(
+            '{count} benchmark(s) regressed by more than {threshold:.1f}%'
+            .format(count=len(regressions), threshold=threshold))
+
+    logger.info('no benchmark regressed by more than {:.1f}%'.format(
+        threshold))
@@ -0,0 +1,158 @@
+
+import os
+
+import click
+
+from ..checkers.commit_message import CommitMessageChecker
+from ..checkers.repo import GitRepo
+from ..checkers.structure import StructureChecker
+from .logger import Logger
+from lily_assistant.config import Config
+
+
+logger = Logger()
+
+
+@click.command()
+@click.option(
+    '--deep',
+    is_flag=True,
+    default=False,
+    help=(
+        'check also the whole project tree against the deep structure '
+        'rules (can be enabled permanently via `structure.deep` in the '
+        '`.lily/config.json`)'))
+def has_correct_structure(deep):
+    """Check if the repo has the required file / directory structure."""
+
+    structure = Config().structure if Config.exists() else {}
+    checker = StructureChecker(
+        deep=deep or structure.get('deep', False),
+        allowed_files=structure.get('allowed_package_files'))
+    if not checker.is_valid():
+        checker.raise_errors()
+
+
+@click.command()
+@click.argument('commit_msg_path')
+def is_commit_message_valid(commit_msg_path):
+    """Check if commit message follows standards."""
+
+    with open(commit_msg_path) as f:
+        message = f.read()
+
+    checker = CommitMessageChecker(message)
+    is_valid = checker.is_valid()
+
+    if is_valid:
+        logger.info('COMMIT MESSAGE: {message}'.format(message=message))
+
+    else:
+        logger.error(
+            'your commit message is not following the commit message '
+            'convention.\n\n' + checker.render_errors())
+
+    assert is_valid
+
+
+@click.command()
+@click.argument('rev_range')
+def check_commits(rev_range):
+    """Check if messages of all commits in the REV_RANGE follow standards.
+
+    Example: `lily_assistant check-commits origin/master..HEAD`
+
+    """
+
+    checked, invalid = 0, 0
+    try:
+        for commit_hash, message in GitRepo().iter_commits(rev_range):
+            checked += 1
+            checker = CommitMessageChecker(message)
+            if not checker.is_valid():
+                invalid += 1
+                logger.error('{commit_hash} {header}\n\n{errors}'.format(
+                    commit_hash=commit_hash[:10],
+                    header=message.strip().split('\n')[0],
+                    errors=checker.render_errors()))
+
+    except OSError as e:
+        raise click.ClickException(str(e))
+
+    if invalid:
+        raise click.ClickException(
+            '{invalid} out of {checked} commits are not following the commit '
+            'message convention'.format(invalid=invalid, checked=checked))
+
+    logger.info('all {checked} commits are valid'.format(checked=checked))
+
+
+@click.command()
+@click.argument('remote', required=False)
+@click.argument('url', required=False)
+@click.option(
+    '--command',
+    default='lily_assistant run lint && lily_assistant has-correct-structure',
+    show_default=True,
+    help=(
+        'shell command verifying the tip of each pushed range in a '
+        'worktree, empty to check only the messages and the diffs'))
+def pre_push(remote, url, command):
+    """Check commits pushed to the REMOTE which are not there yet.
+
+    Meant to be run by the `pre-push` git hook which passes the pushed refs
+    on the stdin. Messages of the new commits, the whole diff of each
+    pushed range and its tip (linted and its structure checked, see
+    `--command`) are checked once, ranges and commits which passed are
+    remembered in `.lily/cache/pre_push.json` and not checked again.
+
+    """
+
+    # -- the push stack is loaded only by the hook using it, the other gates
+    # -- of this module are run on every commit
+    from ..checkers.push import (
+        get_fingerprint,
+        parse_refs,
+        PushCache,
+        PushChecker,
+    )
+    from lily_assistant.repo.verify import RangeVerifier
+    from lily_assistant.repo.worktrees import WorktreePool
+
+    refs = parse_refs(click.get_text_stream('stdin').read().splitlines())
+    cache_path = Config.get_cache_path()
+    verifier = None
+    if command:
+        verifier = RangeVerifier(
+            WorktreePool(Config.get_project_path(), 1),
+            command,
+            os.path.join(cache_path, 'verify.json'))
+
+    checker = PushChecker(
+        GitRepo(),
+        PushCache(
+            os.path.join(cache_path, 'pre_push.json'),
+            get_fingerprint(command)),
+        remote=remote or url,
+        verifier=verifier)
+
+    try:
+        checked = checker.check(refs)
+
+    except (WorktreePool.WorktreeError, OSError) as e:
+        raise click.ClickException(str(e))
+
+    finally:
+        if verifier:
+            verifier.save()
+
+    checker.save()
+    if checker.errors:
+        for error in checker.errors:
+            logger.error(error)
+
+        raise click.ClickException(
+            'pushed commits are not passing the checks')
+
+    logger.info('checked {checked} new commit(s) of {refs} ref(s)'.format(
+        checked=checked, refs=len(refs)))
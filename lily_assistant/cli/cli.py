@@ -1,18 +1,12 @@
 
+import importlib
 import os
+import sys
+
 import click
 
-from .copier import Copier
-from ..checkers.commit_message import CommitMessageChecker
-from ..checkers.repo import GitRepo
-from ..checkers.structure import StructureChecker
+from .archive import get_logs_path, OutputArchive
 from .logger import Logger
-from lily_assistant.repo.repo import Repo
-from lily_assistant.repo.version import VersionRenderer
-from lily_assistant.config import Config
-
-
-logger = Logger()
 
 
 """
@@ -30,180 +24,112 @@ if not os.environ.get('LANG'):  # pragma: no cover
     os.environ['LANG'] = 'en_US.utf-8'
 
 
-@click.group()
-def cli():
-    """Expose multiple commands allowing one to work with lily_assistant."""
-    pass
-
-
-@click.command()
-@click.argument('src_dir')
-def init(src_dir):
-    """Init `Lily-Assistant`.
-
-    During this operation the following will take place:
-    - git hooks will be copied to `./.git/hooks`
-    - `.lily/lily_assistant.makefile` will be copied to the root project
-      directory.
-
-    WARNING it is assumed that this command will be invoked in the root
-    of the project.
-
-    :param src_dir: name of your source directory
-
-    """
-    Copier().copy(src_dir)
-
-    logger.info('''
-
-        Please insert the following line at the top of your Makefile:
-
-        include .lily/lily_assistant.makefile
-    ''')
-
-
-@click.command()
-def has_correct_structure():
-    """Check if the repo has the required file / directory structure."""
-
-    checker = StructureChecker()
-    if not checker.is_valid():
-        checker.raise_errors()
-
-
-@click.command()
-def is_not_master():
-    """Check if one is not on master branch.
-
-    Check if one is not attempting to perform certain operations directly
-    against `master` branch.
-
-    """
-
-    is_not_master = GitRepo().active_branch != 'master'
-    if not is_not_master:
-        logger.error('''
-            you shouldn't perform this action on the master branch
-        ''')
-
-    assert is_not_master
-
-
-@click.command()
-@click.argument('commit_msg_path')
-def is_commit_message_valid(commit_msg_path):
-    """Check if commit message follows standards."""
-
-    with open(commit_msg_path) as f:
-        message = f.read()
-
-    is_valid = CommitMessageChecker(message).is_valid()
-
-    if is_valid:
-        logger.info('COMMIT MESSAGE: {message}'.format(message=message))
-
-    else:
-        logger.error('''
-            your commit message is not following the commit message convention.
-        ''')
-
-    assert is_valid
-
-
-@click.command()
-def is_virtualenv():
-    """Check if tests / code is executed against virtual environment."""
+class LazyGroup(click.Group):
+    """Group importing module of a command only when it gets dispatched.
 
-    is_virtualenv = len(os.environ.get('VIRTUAL_ENV', '').strip()) > 0
-    if not is_virtualenv:
-        logger.error('''
-            You must run your tests & code against VIRTUAL ENVIRONMENT
-        ''')
-
-    assert is_virtualenv
-
-
-@click.command()
-@click.argument('upgrade_type', type=click.Choice([
-    v.value for v in VersionRenderer.VERSION_UPGRADE
-]))
-def upgrade_version(upgrade_type):
-    """Upgrade version of the repo artefacts.
-
-    - update config.yaml file with version and last_commit_hash
+    Thanks to that the trivial gates (e.g. `is-virtualenv`) do not pay for
+    importing the dependencies of all the other commands.
 
     """
 
-    config = Config()
-    repo = Repo()
-    version = VersionRenderer()
-
-    if not repo.all_changes_commited():
-        raise click.ClickException(
-            'Not all changes were commited! One cannot upgrade version with '
-            'some changes still being not commited')
-
-    # -- next_version
-    config.next_version = version.render_next_version(
-        config.version, upgrade_type)
-
-    # -- next_last_commit_hash
-    config.next_last_commit_hash = repo.current_commit_hash
-
-    logger.info(f'''
-        - Next config version upgraded to: {config.next_version}
-    ''')
-
-
-@click.command()
-def push_upgraded_version():
-    """Push Upgraded version and all of its artefacts.
-
-    - add commit with artefacts
-
-    - tag branch with the version of repo
-
-    - push changes to the remote
-
-    """
-
-    config = Config()
-    repo = Repo()
-
-    # -- version
-    config.version = config.next_version
-    config.next_version = None
-
-    # -- last_commit_hash
-    config.last_commit_hash = config.next_last_commit_hash
-    config.next_last_commit_hash = None
-
-    # -- add all artefacts coming from the post upgrade step
-    repo.add_all()
-    repo.commit('VERSION: {}'.format(config.version))
-    repo.push()
-
-    logger.info(f'''
-        - Version upgraded to: {config.version}
-    ''')
-
-
-cli.add_command(init)
-
-
-cli.add_command(has_correct_structure)
-
-
-cli.add_command(is_not_master)
-
-
-cli.add_command(is_commit_message_valid)
-
-
-cli.add_command(is_virtualenv)
-
-
-cli.add_command(upgrade_version)
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx):
+        return sorted(
+            set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, name):
+
+        if name not in self.commands and name in self.lazy_commands:
+            module_name, command_name = self.lazy_commands[name].split(':')
+            module = importlib.import_module(module_name)
+            self.add_command(getattr(module, command_name), name)
+
+        return super().get_command(ctx, name)
+
+    def invoke(self, ctx):
+
+        status = OutputArchive.FAILED
+        try:
+            result = super().invoke(ctx)
+            status = OutputArchive.PASSED
+
+            return result
+
+        except click.exceptions.Exit as e:
+            if e.exit_code == 0:
+                status = OutputArchive.PASSED
+
+            raise
+
+        except click.ClickException as e:
+            # -- in the JSON mode the failure is an event like all the
+            # -- others instead of the plain text written by click
+            if Logger.log_format != Logger.JSON:
+                Logger.record('Error: {}\n'.format(e.format_message()))
+                raise
+
+            Logger().error(e.format_message())
+            ctx.exit(e.exit_code)
+
+        finally:
+            Logger.close(status)
+
+
+COMMANDS = {
+    'init': 'lily_assistant.cli.init:init',
+    'has-correct-structure': (
+        'lily_assistant.cli.checkers:has_correct_structure'),
+    'is-not-master': 'lily_assistant.cli.gates:is_not_master',
+    'is-commit-message-valid': (
+        'lily_assistant.cli.checkers:is_commit_message_valid'),
+    'is-virtualenv': 'lily_assistant.cli.gates:is_virtualenv',
+    'check-commits': 'lily_assistant.cli.checkers:check_commits',
+    'pre-push': 'lily_assistant.cli.checkers:pre_push',
+    'check-staged': 'lily_assistant.cli.staged:check_staged',
+    'upgrade-version': 'lily_assistant.cli.version:upgrade_version',
+    'push-upgraded-version': (
+        'lily_assistant.cli.version:push_upgraded_version'),
+    'version': 'lily_assistant.cli.version:version',
+    'run': 'lily_assistant.cli.run:run',
+    'coverage': 'lily_assistant.cli.coverage:coverage',
+    'test': 'lily_assistant.cli.test:test',
+    'tests': 'lily_assistant.cli.tests:tests',
+    'bench': 'lily_assistant.cli.bench:bench',
+    'import-budget': 'lily_assistant.cli.import_budget:import_budget',
+    'logs': 'lily_assistant.cli.logs:logs',
+    'watch': 'lily_assistant.cli.watch:watch',
+    'verify-range': 'lily_assistant.cli.verify:verify_range',
+}
+
+
+@click.group(cls=LazyGroup, lazy_commands=COMMANDS)
+@click.option(
+    '--log-format',
+    type=click.Choice([Logger.TEXT, Logger.JSON]),
+    default=Logger.TEXT,
+    envvar='LILY_LOG_FORMAT',
+    show_default=True,
+    help='write logs as text or as newline delimited JSON events')
+@click.option(
+    '--quiet',
+    is_flag=True,
+    default=False,
+    envvar='LILY_QUIET',
+    help='print output of the executed commands only if they fail')
+@click.pass_context
+def cli(ctx, log_format, quiet):
+    """Expose multiple commands allowing one to work with lily_assistant."""
 
+    # -- only projects already initialized archive the output of their runs
+    # -- (and reading the archive is not a run worth archiving)
+    archive = None
+    if ctx.invoked_subcommand != 'logs' and os.path.isdir(
+            os.path.dirname(get_logs_path())):
+        archive = OutputArchive(
+            get_logs_path(),
+            ' '.join(['lily_assistant'] + sys.argv[1:]))
 
-cli.add_command(push_upgraded_version)
+    Logger.configure(log_format=log_format, quiet=quiet, archive=archive)
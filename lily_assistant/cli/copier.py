@@ -1,11 +1,19 @@
 
 import os
-import re
-import shutil
-
-import click
+import stat
+import subprocess
+import sys
 
 from lily_assistant.config import Config
+from lily_assistant.repo.exclude import exclude, exclude_state
+from .logger import Logger
+from .template import Template, write_if_changed
+
+
+logger = Logger()
+
+
+EXECUTABLE = stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
 
 
 class Copier:
@@ -16,58 +24,164 @@ class Copier:
     def __init__(self):
         self.root_dir = os.getcwd()
 
-    def copy(self, src_dir):
+    def copy(self, src_dir, symlink_hooks=False):
 
         self.create_empty_config(src_dir)
 
-        self.copy_hooks()
+        exclude_state(self.root_dir)
+
+        self.copy_hooks(symlink=symlink_hooks)
 
         self.copy_makefile(src_dir)
 
+        self.copy_ci(src_dir)
+
     def create_empty_config(self, src_dir):
 
         if not Config.exists():
             Config.create_empty(src_dir)
 
-    def copy_hooks(self):
+    def copy_hooks(self, symlink=False):
+        """Install bundled git hooks incrementally.
 
-        git_dir = os.path.join(self.root_dir, '.git')
-        copy_hooks_dir = os.path.join(git_dir, 'hooks')
-        if os.path.exists(git_dir):
-            if os.path.exists(copy_hooks_dir):
-                shutil.rmtree(copy_hooks_dir)
+        Only hooks which are missing or differ from the bundled ones are
+        (atomically) written, all the other hooks present in the hooks
+        directory (e.g. custom ones) are left untouched. Therefore
+        re-running it costs only a few `stat` / `read` calls.
 
-        else:
+        """
+
+        git_dir = os.path.join(self.root_dir, '.git')
+        if not os.path.exists(git_dir):
             raise Copier.NotProjectRootException(
                 'it seems that you\'ve executed not from the root of the '
                 'project.')
 
-        shutil.copytree(self.base_hooks_path, copy_hooks_dir)
+        copy_hooks_dir = self.get_hooks_dir()
+        os.makedirs(copy_hooks_dir, exist_ok=True)
 
-        click.secho(
-            'copied git hooks to {copy_hooks_dir}'.format(
-                copy_hooks_dir=copy_hooks_dir),
-            fg='blue')
+        # -- rendered with the paths of this machine, never committed
+        rendered_hooks_dir = os.path.join(self.root_dir, '.lily', 'hooks')
+        if symlink:
+            exclude(self.root_dir, rendered_hooks_dir)
 
-    def copy_makefile(self, src_dir):
+        installed = []
+        for name in sorted(os.listdir(self.base_hooks_path)):
+            source = os.path.join(self.base_hooks_path, name)
+            target = os.path.join(copy_hooks_dir, name)
+            if symlink:
+                rendered = os.path.join(rendered_hooks_dir, name)
+                changed = self.install_hook(source, rendered)
+                changed = self.link_hook(rendered, target) or changed
+
+            else:
+                changed = self.install_hook(source, target)
+
+            if changed:
+                installed.append(name)
+
+        if installed:
+            logger.echo(
+                'installed git hooks {hooks} to {copy_hooks_dir}'.format(
+                    hooks=', '.join(installed),
+                    copy_hooks_dir=copy_hooks_dir),
+                level='debug')
+
+        else:
+            logger.echo(
+                'git hooks in {copy_hooks_dir} are up to date'.format(
+                    copy_hooks_dir=copy_hooks_dir),
+                level='debug')
+
+    def get_hooks_dir(self):
+        """Resolve hooks directory respecting `core.hooksPath` & worktrees.
+
+        Falls back to `.git/hooks` if git cannot resolve it for the project
+        root.
+
+        """
+
+        try:
+            output = subprocess.check_output(
+                ['git', 'rev-parse', '--show-toplevel', '--git-path', 'hooks'],
+                cwd=self.root_dir,
+                stderr=subprocess.DEVNULL,
+                universal_newlines=True)
+
+        except (OSError, subprocess.CalledProcessError):
+            output = ''
+
+        lines = output.splitlines()
+        if (
+                len(lines) == 2 and
+                os.path.realpath(lines[0]) ==
+                os.path.realpath(self.root_dir)):
+            return os.path.join(self.root_dir, lines[1])
+
+        return os.path.join(self.root_dir, '.git', 'hooks')
 
-        config = Config()
+    def install_hook(self, source, target):
 
-        with open(self.base_makefile_path, 'r') as makefile:
-            content = makefile.read()
-            content = re.sub(r'{%\s*SRC_DIR\s*%}', src_dir, content)
-            content = re.sub(r'{%\s*VERSION\s*%}', config.version, content)
+        content = Template.from_file(source).render(self.get_context())
+        mode = os.stat(source).st_mode | EXECUTABLE
+
+        return write_if_changed(target, content, mode)
+
+    def link_hook(self, source, target):
+
+        if os.path.islink(target) and os.readlink(target) == source:
+            return False
+
+        tmp_path = os.path.join(
+            os.path.dirname(target),
+            '.{}.{}.link'.format(os.path.basename(target), os.getpid()))
+        os.symlink(source, tmp_path)
+        os.replace(tmp_path, target)
+
+        return True
+
+    def get_context(self, src_dir=None):
+        """Variables available in all the rendered artefacts."""
+
+        context = {
+            'PYTHON': sys.executable,
+            'PYTHON_VERSION': '{0}.{1}'.format(*sys.version_info[:2]),
+        }
+
+        if Config.exists():
+            context['VERSION'] = Config().version
+
+        if src_dir:
+            context['SRC_DIR'] = src_dir
+
+        return context
+
+    def copy_makefile(self, src_dir):
 
         makefile_path = os.path.join(
             self.root_dir, '.lily', 'lily_assistant.makefile')
 
-        with open(makefile_path, 'w') as f:
-            f.write(content)
+        self.render(self.base_makefile_path, makefile_path, src_dir)
 
-        click.secho(
-            'copied lily_assistant makefile to {makefile_path}'.format(
-                makefile_path=makefile_path),
-            fg='blue')
+    def copy_ci(self, src_dir):
+
+        for name in sorted(os.listdir(self.base_ci_path)):
+            self.render(
+                os.path.join(self.base_ci_path, name),
+                os.path.join(self.root_dir, '.lily', 'ci', name),
+                src_dir)
+
+    def render(self, template_path, path, src_dir):
+
+        content = Template.from_file(template_path).render(
+            self.get_context(src_dir))
+
+        if write_if_changed(path, content):
+            logger.echo('rendered {path}'.format(path=path), level='debug')
+
+        else:
+            logger.echo(
+                '{path} is up to date'.format(path=path), level='debug')
 
     @property
     def base_makefile_path(self):
@@ -76,6 +190,13 @@ class Copier:
             os.path.dirname(os.path.abspath(__file__)),
             'base.makefile')
 
+    @property
+    def base_ci_path(self):
+
+        return os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            'ci')
+
     @property
     def base_hooks_path(self):
 
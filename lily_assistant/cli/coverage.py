@@ -0,0 +1,192 @@
+
+import glob
+import os
+
+import click
+
+from .logger import Logger
+from lily_assistant.checkers.repo import GitRepo
+from lily_assistant.config import Config
+from lily_assistant.coverage.data import CoverageData
+from lily_assistant.coverage.diff import DiffCoverage
+from lily_assistant.coverage.html_report import HtmlReport
+from lily_assistant.coverage.report import CoverageReport
+
+
+logger = Logger()
+
+
+def get_report(data_file):
+
+    source = Config().src_dir if Config.exists() else None
+
+    return CoverageReport(data_path=data_file, source=source)
+
+
+def default_threshold():
+    return float(os.environ.get('TEST_COVERAGE_THRESHOLD', 90))
+
+
+@click.group()
+def coverage():
+    """Work with the existing coverage data without re-running tests."""
+    pass
+
+
+@coverage.command()
+@click.option('--data-file', default=None, help='coverage data file')
+def report(data_file):
+    """Print coverage report of the source directory."""
+
+    try:
+        logger.report(get_report(data_file).render())
+
+    except CoverageData.MissingData as e:
+        raise click.ClickException(str(e))
+
+
+@coverage.command()
+@click.option('--data-file', default=None, help='coverage data file')
+@click.option(
+    '--directory', '-d',
+    default='coverage_html',
+    help='output directory of the html report')
+def html(data_file, directory):
+    """Render html coverage report incrementally.
+
+    Only pages of files whose source or coverage changed since the last
+    rendering are rendered again.
+
+    """
+
+    try:
+        rendered = HtmlReport(get_report(data_file), directory).render()
+
+    except CoverageData.MissingData as e:
+        raise click.ClickException(str(e))
+
+    logger.info('rendered {count} page(s) in {directory}'.format(
+        count=len(rendered), directory=directory))
+
+
+@coverage.command()
+@click.option('--data-file', default=None, help='coverage data file')
+@click.option(
+    '--fail-under',
+    type=float,
+    default=default_threshold,
+    help=(
+        'minimal coverage percent (defaults to TEST_COVERAGE_THRESHOLD or '
+        '90)'))
+def gate(data_file, fail_under):
+    """Fail if total coverage is lower than the threshold."""
+
+    try:
+        percent = get_report(data_file).percent
+
+    except CoverageData.MissingData as e:
+        raise click.ClickException(str(e))
+
+    check_threshold(percent, fail_under)
+
+
+def check_threshold(percent, fail_under):
+
+    if percent < fail_under:
+        raise click.ClickException(
+            'total coverage {percent:.2f}% is less than {fail_under:.2f}%'
+            .format(percent=percent, fail_under=fail_under))
+
+    logger.info('total coverage {percent:.2f}% reached {fail_under:.2f}%'
+                .format(percent=percent, fail_under=fail_under))
+
+
+@coverage.command()
+@click.option('--data-file', default=None, help='coverage data file')
+@click.option(
+    '--fail-under',
+    type=float,
+    default=default_threshold,
+    help=(
+        'minimal coverage percent of the changed lines (defaults to '
+        'TEST_COVERAGE_THRESHOLD or 90)'))
+@click.option(
+    '--against',
+    default=None,
+    help=(
+        'compare the working tree against this revision instead of '
+        'checking the staged changes'))
+def diff(data_file, fail_under, against):
+    """Fail if coverage of the added or modified lines is too low.
+
+    Changed lines are taken from `git diff --cached -U0` therefore only
+    the code which is about to be committed is checked. It's meant to be
+    combined with running only the tests related to the change.
+
+    """
+
+    try:
+        diff_coverage = DiffCoverage(
+            get_report(data_file), GitRepo().get_changed_lines(against))
+        percent = diff_coverage.percent
+
+    except (CoverageData.MissingData, OSError) as e:
+        raise click.ClickException(str(e))
+
+    if not diff_coverage.statements:
+        logger.info('no changed statements to check')
+        return
+
+    logger.report(diff_coverage.render())
+    if percent < fail_under:
+        raise click.ClickException(
+            'coverage of changed lines {percent:.2f}% is less than '
+            '{fail_under:.2f}%'.format(percent=percent, fail_under=fail_under))
+
+    logger.info(
+        'coverage of changed lines {percent:.2f}% reached {fail_under:.2f}%'
+        .format(percent=percent, fail_under=fail_under))
+
+
+@coverage.command()
+@click.argument('data_files', nargs=-1)
+@click.option(
+    '--data-file',
+    default=None,
+    help='combined coverage data file (by default `.coverage`)')
+@click.option(
+    '--fail-under',
+    type=float,
+    default=default_threshold,
+    help=(
+        'minimal coverage percent (defaults to TEST_COVERAGE_THRESHOLD or '
+        '90)'))
+def combine(data_files, data_file, fail_under):
+    """Merge coverage DATA_FILES and check the total coverage.
+
+    Meant for the data collected by the shards of tests (`lily_assistant
+    test --shard i/N`) so that the coverage threshold is applied once, to
+    all of them. By default all `.coverage.*` files are merged.
+
+    """
+
+    base_path = Config.get_project_path()
+    data_file = data_file or os.path.join(
+        base_path, os.environ.get('COVERAGE_FILE', '.coverage'))
+    data_files = list(data_files) or sorted(
+        path
+        for path in glob.glob(os.path.join(base_path, '.coverage.*'))
+        if not path.endswith('.tmp'))
+    if not data_files:
+        raise click.ClickException('no coverage data files to combine')
+
+    try:
+        CoverageData.combine(data_files, data_file)
+        percent = get_report(data_file).percent
+
+    except CoverageData.MissingData as e:
+        raise click.ClickException(str(e))
+
+    logger.info('combined {count} data file(s) into {data_file}'.format(
+        count=len(data_files), data_file=data_file))
+    check_threshold(percent, fail_under)
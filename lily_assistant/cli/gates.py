@@ -0,0 +1,45 @@
+
+import os
+
+import click
+
+from ..checkers.repo import GitRepo
+from .logger import Logger
+
+
+# -- trivial gates run by the git hooks, kept apart from the other checkers
+# -- so that they do not pay for importing what they never use
+
+
+logger = Logger()
+
+
+@click.command()
+def is_not_master():
+    """Check if one is not on master branch.
+
+    Check if one is not attempting to perform certain operations directly
+    against `master` branch.
+
+    """
+
+    is_not_master = GitRepo().active_branch != 'master'
+    if not is_not_master:
+        logger.error('''
+            you shouldn't perform this action on the master branch
+        ''')
+
+    assert is_not_master
+
+
+@click.command()
+def is_virtualenv():
+    """Check if tests / code is executed against virtual environment."""
+
+    is_virtualenv = len(os.environ.get('VIRTUAL_ENV', '').strip()) > 0
+    if not is_virtualenv:
+        logger.error('''
+            You must run your tests & code against VIRTUAL ENVIRONMENT
+        ''')
+
+    assert is_virtualenv
@@ -0,0 +1,123 @@
+
+import os
+
+import click
+
+from .logger import Logger
+from lily_assistant.bench import importtime
+from lily_assistant.config import Config
+
+
+logger = Logger()
+
+
+def default_threshold():
+    return float(os.environ.get('IMPORT_BUDGET_THRESHOLD', 20))
+
+
+def render_offenders(offenders):
+
+    lines = ['{:>10}  {:>10}  {:>10}  {}'.format(
+        'self', 'cumulative', 'change', 'module')]
+    for name, self_time, cumulative, baseline_self_time in offenders:
+        lines.append('{self:8.2f}ms  {cumulative:8.2f}ms  {change:>10}  {name}'
+                     .format(
+                         self=self_time,
+                         cumulative=cumulative,
+                         change=(
+                             'new' if baseline_self_time is None else
+                             '{:+.2f}ms'.format(
+                                 self_time - baseline_self_time)),
+                         name=name))
+
+    return '\n'.join(lines)
+
+
+@click.command()
+@click.argument('module', required=False)
+@click.option(
+    '--threshold',
+    type=float,
+    default=default_threshold,
+    help=(
+        'maximal allowed growth of the import time in percent (defaults to '
+        'IMPORT_BUDGET_THRESHOLD or 20)'))
+@click.option(
+    '--top', '-n',
+    type=int,
+    default=10,
+    help='number of the slowest modules to report')
+@click.option(
+    '--repeat',
+    type=int,
+    default=3,
+    help='number of measured imports, the fastest one counts')
+@click.option(
+    '--save-baseline',
+    is_flag=True,
+    default=False,
+    help='store the measured times as the new baseline')
+@click.option(
+    '--pre-commit',
+    is_flag=True,
+    default=False,
+    help=(
+        'run only if enabled by `import_budget.pre_commit` in the '
+        '`.lily/config.json` and never store the baseline'))
+def import_budget(module, threshold, top, repeat, save_baseline, pre_commit):
+    """Check the import time of the source package against its budget.
+
+    MODULE (by default the `src_dir` of the project) is imported by a
+    fresh interpreter with `-X importtime`. Its cumulative import time may
+    exceed the one stored in `.lily/import_budget.json` (commit it) by at
+    most `--threshold` percent (or 5ms), otherwise the modules with the
+    highest self import time are reported and the check fails.
+
+    """
+
+    config = Config() if Config.exists() else None
+    settings = (config and config.import_budget) or {}
+    if pre_commit and not settings.get('pre_commit'):
+        return
+
+    module = module or settings.get('module') or (config and config.src_dir)
+    if not module:
+        raise click.ClickException('no module to import given')
+
+    try:
+        times = importtime.ImportTimer(
+            module, Config.get_project_path(), repeat=repeat).measure()
+
+    except importtime.ImportTimer.ImportFailed as e:
+        raise click.ClickException(str(e))
+
+    path = importtime.get_baseline_path()
+    baseline = importtime.load(path)
+    total = times[module][1]
+    if save_baseline or module not in baseline:
+        if pre_commit:
+            logger.info('no import time baseline of {module} in {path}'.format(
+                module=module, path=path))
+            return
+
+        importtime.save(path, module, times)
+        logger.info(
+            'import of {module} took {total:.2f}ms, stored it as the '
+            'baseline in {path}'.format(module=module, total=total, path=path))
+        return
+
+    budget = importtime.get_budget(baseline[module][1], threshold)
+    if total > budget:
+        logger.report(render_offenders(
+            importtime.get_offenders(times, baseline, top)))
+        raise click.ClickException(
+            'import of {module} took {total:.2f}ms, budget: {budget:.2f}ms '
+            '(baseline: {baseline:.2f}ms)'.format(
+                module=module,
+                total=total,
+                budget=budget,
+                baseline=baseline[module][1]))
+
+    logger.info(
+        'import of {module} took {total:.2f}ms, budget: {budget:.2f}ms'.format(
+            module=module, total=total, budget=budget))
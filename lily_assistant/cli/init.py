@@ -0,0 +1,42 @@
+
+import click
+
+from .copier import Copier
+from .logger import Logger
+
+
+logger = Logger()
+
+
+@click.command()
+@click.argument('src_dir')
+@click.option(
+    '--symlink-hooks',
+    is_flag=True,
+    default=False,
+    help=(
+        'symlink git hooks to the ones rendered in `.lily/hooks` instead '
+        'of copying them'))
+def init(src_dir, symlink_hooks):
+    """Init `Lily-Assistant`.
+
+    During this operation the following will take place:
+    - git hooks will be installed to `./.git/hooks` (or `core.hooksPath`),
+      only the ones which changed are rewritten
+    - `.lily/lily_assistant.makefile` will be copied to the root project
+      directory.
+
+    WARNING it is assumed that this command will be invoked in the root
+    of the project.
+
+    :param src_dir: name of your source directory
+
+    """
+    Copier().copy(src_dir, symlink_hooks=symlink_hooks)
+
+    logger.info('''
+
+        Please insert the following line at the top of your Makefile:
+
+        include .lily/lily_assistant.makefile
+    ''')
@@ -1,17 +1,287 @@
 
+import atexit
+import codecs
+from collections import deque
+import json
+import sys
 import textwrap
+import time
 
 import click
 
+from .archive import ArchiveTee
+
+
+class JsonSink:
+    """Buffered writer of newline delimited JSON events.
+
+    Events are written to the `stream` in chunks of at least `buffer_size`
+    bytes (and on `flush`), not one by one.
+
+    """
+
+    def __init__(self, stream, buffer_size=64 * 1024):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.size = 0
+
+    def write(self, event):
+
+        line = json.dumps(event, ensure_ascii=False) + '\n'
+        self.buffer.append(line)
+        self.size += len(line)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+
+        if self.buffer:
+            self.stream.write(''.join(self.buffer))
+            self.stream.flush()
+            self.buffer, self.size = [], 0
+
+
+class OutputStream:
+    """File-like object passing lines written to it to `Logger.output`.
+
+    Used for the output of the code run in-process (e.g. `pytest.main`)
+    which writes to a stream instead of logging, accepts text as well as
+    bytes (decoded as utf-8). The last unfinished line is passed on
+    `finish`.
+
+    """
+
+    encoding = 'utf-8'
+
+    def __init__(self, logger, source):
+        self.logger = logger
+        self.source = source
+        self.decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self.pending = ''
+
+    def write(self, data):
+
+        if isinstance(data, bytes):
+            data = self.decoder.decode(data)
+
+        lines = (self.pending + data).split('\n')
+        self.pending = lines.pop()
+        for line in lines:
+            self.logger.output(line, self.source)
+
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+    def finish(self, failed):
+        """Log the unfinished line, print the kept output if `failed`."""
+
+        if self.pending:
+            self.logger.output(self.pending, self.source)
+            self.pending = ''
+
+        if failed:
+            self.logger.dump_output(self.source)
+
+        else:
+            self.logger.discard_output(self.source)
+
 
 class Logger:
+    """Log messages and output of subprocesses as text or JSON events.
+
+    The format is shared by all loggers and set up once (see `configure`)
+    by the global `--log-format` and `--quiet` options.
+
+    With `quiet` the output of subprocesses is not printed but kept (last
+    `QUIET_LINES` lines of each source) until `dump_output` prints it, e.g.
+    when the subprocess failed.
+
+    With an `archive` (see `OutputArchive`) all the messages and the whole
+    output are archived as well, no matter if they were printed.
+
+    """
+
+    TEXT = 'text'
+
+    JSON = 'json'
+
+    QUIET_LINES = 1000
+
+    COLORS = {
+        'debug': 'blue',
+        'info': 'yellow',
+        'warning': 'yellow',
+        'error': 'red',
+    }
+
+    log_format = TEXT
+
+    quiet = False
+
+    sink = None
+
+    buffers = {}
+
+    archive = None
+
+    @classmethod
+    def configure(
+            cls, log_format=TEXT, quiet=False, stream=None, archive=None):
+
+        if cls.sink:
+            cls.sink.flush()
+
+        cls.log_format = log_format
+        cls.quiet = quiet
+        cls.buffers = {}
+        cls.archive = archive
+        cls.sink = None
+        if log_format == cls.JSON:
+            cls.sink = JsonSink(stream or sys.stdout)
+
+    @classmethod
+    def flush(cls):
+
+        if cls.sink:
+            cls.sink.flush()
+
+    @classmethod
+    def close(cls, status):
+        """Flush the events and close the archive of the run."""
+
+        cls.flush()
+        if cls.archive:
+            try:
+                cls.archive.close(status)
+
+            except OSError:
+                pass
+
+            cls.archive = None
+
+    @classmethod
+    def record(cls, text):
+        """Archive `text`, failing archive gets disabled for the run."""
+
+        if cls.archive:
+            try:
+                cls.archive.write(text)
+
+            except OSError:
+                cls.archive = None
+
+    @classmethod
+    def tee(cls, stream):
+        """Wrap `stream` so that whatever is written to it is archived."""
+
+        if cls.archive:
+            return ArchiveTee(stream, cls.record)
+
+        return stream
 
     def info(self, text):
 
         text = textwrap.dedent(text).strip()
-        click.secho('[INFO]\n\n{text}'.format(text=text), fg='yellow')
+        self.record('[INFO]\n\n{text}\n'.format(text=text))
+        if self.sink:
+            self.write('info', text)
+
+        else:
+            click.secho('[INFO]\n\n{text}'.format(text=text), fg='yellow')
 
     def error(self, text):
 
         text = textwrap.dedent(text).strip()
-        click.secho('[ERROR]\n\n{text}'.format(text=text), fg='red')
+        self.record('[ERROR]\n\n{text}\n'.format(text=text))
+        if self.sink:
+            self.write('error', text)
+            self.sink.flush()
+
+        else:
+            click.secho('[ERROR]\n\n{text}'.format(text=text), fg='red')
+
+    def echo(self, text, level='info', fg=None, **fields):
+        """Log single line `text` (colored by `fg` in the text mode).
+
+        By default the color depends on the `level`, `fg=''` disables it.
+
+        """
+
+        self.record(text + '\n')
+        if self.sink:
+            self.write(level, text, **fields)
+
+        else:
+            click.secho(text, fg=self.COLORS.get(level) if fg is None else fg)
+
+    def report(self, text):
+        """Print `text` produced by the command itself (e.g. a table)."""
+
+        self.record(text + '\n')
+        if self.sink:
+            self.write('info', text, event='report')
+
+        else:
+            click.echo(text)
+
+    def stream(self, source):
+        """Get stream logging what is written to it as output of `source`.
+
+        Returns `None` if plain text written straight to the stdout is
+        fine, i.e. in the text mode without `quiet`.
+
+        """
+
+        if self.sink or self.quiet:
+            return OutputStream(self, source)
+
+        return None
+
+    def output(self, line, source, prefix=''):
+        """Log `line` of the output of the subprocess `source`."""
+
+        line = line.rstrip('\n')
+        self.record(prefix + line + '\n')
+        if self.quiet:
+            buffer = self.buffers.get(source)
+            if buffer is None:
+                buffer = self.buffers[source] = deque(maxlen=self.QUIET_LINES)
+
+            buffer.append((line, prefix))
+
+        else:
+            self.write_output(line, source, prefix)
+
+    def dump_output(self, source):
+        """Print the output of `source` kept in the quiet mode."""
+
+        for line, prefix in self.buffers.pop(source, []):
+            self.write_output(line, source, prefix)
+
+    def write_output(self, line, source, prefix):
+
+        if self.sink:
+            self.write('debug', line, source=source, event='output')
+
+        else:
+            click.echo(prefix + line)
+
+    def discard_output(self, source):
+        self.buffers.pop(source, None)
+
+    def write(self, level, message, **fields):
+
+        event = {'time': round(time.time(), 3), 'level': level}
+        event.update(fields)
+        event['message'] = message
+        self.sink.write(event)
+
+
+# -- events still buffered when the process exits
+atexit.register(Logger.flush)
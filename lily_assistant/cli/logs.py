@@ -0,0 +1,89 @@
+
+import time
+
+import click
+
+from .archive import get_logs_path, list_runs, OutputArchive, read_output
+from .logger import Logger
+
+
+logger = Logger()
+
+
+def render_run(run):
+
+    finished = run.get('finished')
+
+    return '{started}  {status:<7}  {duration:>8}  {command}'.format(
+        started=time.strftime(
+            '%Y-%m-%d %H:%M:%S', time.localtime(run.get('started', 0))),
+        status=run.get('status', '?'),
+        duration=(
+            '{:.1f}s'.format(finished - run['started'])
+            if finished else '-'),
+        command=run.get('command', ''))
+
+
+def iter_lines(chunks):
+
+    pending = ''
+    for chunk in chunks:
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+        yield from lines
+
+    if pending:
+        yield pending
+
+
+@click.group()
+def logs():
+    """Inspect the archived output of the recent runs (`.lily/logs`)."""
+    pass
+
+
+@logs.command()
+@click.option(
+    '--any',
+    'any_status',
+    is_flag=True,
+    default=False,
+    help='show the most recent run whatever its status')
+def last(any_status):
+    """Show the output of the most recent failed run."""
+
+    runs = [
+        run
+        for run in list_runs(get_logs_path())
+        if any_status or run.get('status') == OutputArchive.FAILED]
+    if not runs:
+        raise click.ClickException(
+            'no {}runs archived in {}'.format(
+                '' if any_status else 'failed ', get_logs_path()))
+
+    run = runs[-1]
+    if Logger.log_format == Logger.JSON:
+        logger.report(render_run(run))
+        for line in iter_lines(read_output(run['path'])):
+            logger.report(line)
+
+        return
+
+    click.secho(render_run(run), fg='blue')
+    for chunk in read_output(run['path']):
+        click.echo(chunk, nl=False)
+
+
+@logs.command(name='list')
+@click.option(
+    '--count', '-n', type=int, default=10, help='number of runs to show')
+def list_(count):
+    """List the most recent archived runs."""
+
+    runs = list_runs(get_logs_path())
+    if not runs:
+        logger.report('no runs archived yet')
+        return
+
+    for run in reversed(runs[-count:]):
+        logger.report(render_run(run))
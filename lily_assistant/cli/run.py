@@ -0,0 +1,48 @@
+
+import click
+
+from .logger import Logger
+from lily_assistant.runner.runner import Runner
+from lily_assistant.runner.targets import get_targets
+
+
+logger = Logger()
+
+
+@click.command(context_settings={'ignore_unknown_options': True})
+@click.argument('target')
+@click.argument('args', nargs=-1, type=click.UNPROCESSED)
+@click.option(
+    '--force',
+    is_flag=True,
+    default=False,
+    help='run all steps even if their inputs did not change')
+@click.option(
+    '--jobs',
+    type=int,
+    default=None,
+    help='maximum number of steps run concurrently')
+def run(target, args, force, jobs):
+    """Run TARGET of the lily_assistant makefile natively.
+
+    Understands the same targets as `.lily/lily_assistant.makefile`
+    (`lint`, `test`, `test_all`, `upgrade_version_*`) plus `check` (`lint`
+    and `test_all` at once) and respects their overrides (of whole targets
+    as well as of their steps) from the project's `Makefile`. Extra ARGS
+    are passed to py.test of the `test` target.
+
+    """
+
+    targets = get_targets(list(args), Runner.load_overrides())
+    if target not in targets:
+        raise click.ClickException(
+            'unknown target: {target}, choose from: {targets}'.format(
+                target=target, targets=', '.join(sorted(targets))))
+
+    try:
+        Runner(targets[target], force=force, workers=jobs).run()
+
+    except Runner.TaskFailed as e:
+        raise click.ClickException(str(e))
+
+    logger.info('{target} succeeded'.format(target=target))
@@ -0,0 +1,100 @@
+
+import os
+import subprocess
+
+import click
+
+from .logger import Logger
+from lily_assistant.config import Config
+from lily_assistant.repo.snapshot import IndexSnapshot
+
+
+logger = Logger()
+
+
+DEFAULT_COMMAND = 'make lint && make test_all'
+
+
+def run_command(command, cwd, env):
+
+    process = subprocess.Popen(
+        ['sh', '-c', command],
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True)
+    for line in process.stdout:
+        logger.output(line, 'checks')
+
+    if process.wait() != 0:
+        logger.dump_output('checks')
+
+    else:
+        logger.discard_output('checks')
+
+    return process.returncode
+
+
+@click.command()
+@click.option(
+    '--command',
+    default=DEFAULT_COMMAND,
+    show_default=True,
+    help='shell command checking the files')
+@click.option(
+    '--pre-commit',
+    is_flag=True,
+    default=False,
+    help=(
+        'check the staged snapshot only if enabled by `pre_commit.snapshot` '
+        'in the `.lily/config.json`, the working tree otherwise'))
+def check_staged(command, pre_commit):
+    """Run the checks against the staged version of the files.
+
+    Staged files are materialised in a temporary tree in `.lily/snapshots`
+    (excluded in `.git/info/exclude`, only the ones differing from the
+    working tree are written, all the others are hardlinked) and the
+    checks run there, therefore unstaged changes and untracked files
+    (apart from `env.sh`, the generated makefile and `pre_commit.local_files`)
+    cannot make them pass (or fail). Git commands of the checks see the
+    snapshot with the staged index. If the working tree matches the index
+    the checks run in place.
+
+    """
+
+    config = Config() if Config.exists() else None
+    settings = (config and config.pre_commit) or {}
+    base_path = Config.get_project_path()
+    snapshot = IndexSnapshot(
+        base_path,
+        os.path.join(Config.get_lily_path(), 'snapshots'),
+        settings.get('local_files'))
+
+    try:
+        if pre_commit and not settings.get('snapshot') or (
+                not snapshot.is_needed()):
+            exit_code = run_command(command, base_path, dict(os.environ))
+
+        else:
+            with snapshot:
+                logger.info(
+                    'checking the staged files ({checked_out} checked out, '
+                    '{linked} hardlinked)'.format(
+                        checked_out=len(snapshot.checked_out),
+                        linked=snapshot.linked))
+
+                # -- test results cached by content are valid in both trees
+                env = dict(os.environ, **snapshot.get_env())
+                env['LILY_TEST_CACHE_PATH'] = os.path.join(
+                    Config.get_cache_path(), 'tests')
+                env['PYTHONPATH'] = os.pathsep.join(
+                    [snapshot.path] + (
+                        [env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+                exit_code = run_command(command, snapshot.path, env)
+
+    except (IndexSnapshot.SnapshotError, OSError) as e:
+        raise click.ClickException(str(e))
+
+    if exit_code != 0:
+        raise click.ClickException('checks of the staged files failed')
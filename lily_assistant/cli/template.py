@@ -0,0 +1,112 @@
+
+import hashlib
+import os
+import re
+import tempfile
+
+
+class Template:
+    """Template of the artefacts generated by `lily_assistant`.
+
+    Placeholders take the form of `{% VARIABLE %}`. The template is compiled
+    once into the list of literal chunks and variables, therefore rendering
+    is a single pass join. Placeholders missing in the context are rendered
+    verbatim.
+
+    """
+
+    VARIABLE_REGEX = re.compile(r'{%\s*(\w+)\s*%}')
+
+    # -- compiled templates keyed by path, valid until the file changes
+    _cache = {}
+
+    def __init__(self, source):
+
+        self.chunks = []
+        position = 0
+        for match in self.VARIABLE_REGEX.finditer(source):
+            self.chunks.append(
+                (source[position:match.start()],
+                 match.group(1),
+                 match.group(0)))
+            position = match.end()
+
+        self.tail = source[position:]
+
+    @classmethod
+    def from_file(cls, path):
+
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = cls._cache.get(path)
+        if cached is None or cached[0] != key:
+            with open(path, 'r') as f:
+                cached = (key, cls(f.read()))
+
+            cls._cache[path] = cached
+
+        return cached[1]
+
+    def render(self, context):
+
+        parts = []
+        for literal, name, placeholder in self.chunks:
+            parts.append(literal)
+            parts.append(str(context.get(name, placeholder)))
+
+        parts.append(self.tail)
+
+        return ''.join(parts)
+
+
+def write_if_changed(path, content, mode=None):
+    """Atomically write `content` to `path` unless it's already there.
+
+    Returns `True` if the file was written. Thanks to that unchanged
+    artefacts keep their `mtime` and do not force `make` (or any other
+    tooling) to reparse them.
+
+    """
+
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+
+    if is_up_to_date(path, content, mode):
+        return False
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix='.{}.'.format(os.path.basename(path)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+
+        os.chmod(tmp_path, (mode if mode is not None else 0o644) & 0o777)
+        os.replace(tmp_path, path)
+
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    return True
+
+
+def is_up_to_date(path, content, mode=None):
+
+    try:
+        stat = os.lstat(path)
+
+    except FileNotFoundError:
+        return False
+
+    if os.path.islink(path) or stat.st_size != len(content):
+        return False
+
+    if mode is not None and (stat.st_mode & 0o777) != (mode & 0o777):
+        return False
+
+    with open(path, 'rb') as f:
+        return (
+            hashlib.sha256(f.read()).digest() ==
+            hashlib.sha256(content).digest())
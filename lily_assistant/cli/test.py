@@ -0,0 +1,170 @@
+
+import os
+import sys
+
+import click
+
+from .logger import Logger
+from lily_assistant.config import Config
+from lily_assistant.testing.partition import parse_shard
+from lily_assistant.testing.warm import WarmClient
+
+
+logger = Logger()
+
+
+def validate_shard(ctx, param, value):
+
+    if value is not None:
+        try:
+            parse_shard(value)
+
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+
+    return value
+
+
+@click.command(context_settings={'ignore_unknown_options': True})
+@click.argument('args', nargs=-1, type=click.UNPROCESSED)
+@click.option(
+    '--no-cache',
+    is_flag=True,
+    default=False,
+    help='run all selected tests even if they passed in the same state')
+@click.option(
+    '--warm',
+    is_flag=True,
+    default=False,
+    help=(
+        'run tests in a child forked from a parent process which keeps the '
+        'dependencies of the project imported'))
+@click.option(
+    '--shard',
+    default=None,
+    callback=validate_shard,
+    help=(
+        'run only the i-th out of N shards of the tests given as i/N, '
+        'shards are balanced using the recorded timings of tests'))
+@click.option(
+    '--profile',
+    is_flag=True,
+    default=False,
+    help=(
+        'profile the tests with the sampling profiler and write the '
+        'reports next to the html coverage report'))
+@click.option(
+    '--memory',
+    is_flag=True,
+    default=False,
+    help=(
+        'track the peak and retained memory of each test and flag the '
+        'ones whose peak grew'))
+@click.option(
+    '--stop-warm',
+    is_flag=True,
+    default=False,
+    help='stop the parent process of the `--warm` runs and exit')
+def test(args, no_cache, warm, shard, profile, memory, stop_warm):
+    """Run selected tests (ARGS are passed to py.test).
+
+    Test modules which passed before and since then did not change (nor
+    any project module they import, nor the environment) are skipped and
+    reported as a "cached pass". The results are kept in
+    `.lily/cache/tests`.
+
+    With `--warm` the first run spawns a parent process which imports all
+    the dependencies of the project and stays in the background, the
+    following runs are forked from it therefore they do not pay for those
+    imports again. The parent gets recycled as soon as any module it
+    imported changes (it exits as well after 30 minutes of inactivity or on
+    `--stop-warm`).
+
+    With `--profile` the stacks of the running tests are sampled every 5ms
+    of CPU time (all selected tests are run, the cache is bypassed). The
+    hotspots aggregated by function and by test are written to
+    `coverage_html/profile.txt` and the stacks to
+    `coverage_html/profile.collapsed` (readable by the flamegraph tools).
+
+    With `--memory` the memory allocated by each test is traced (see
+    `lily_assistant tests memory`), tests whose peak grew comparing to
+    their recent runs are reported together with their top allocation
+    sites.
+
+    With `--shard i/N` only the i-th out of N deterministic, timing
+    balanced shards of the collected test modules is run (e.g. on one of
+    N CI nodes).
+
+    """
+
+    if stop_warm:
+        get_warm_client().stop()
+        return
+
+    pytest_args = [
+        '-p', 'lily_assistant.testing.plugin',
+        '-p', 'lily_assistant.testing.tracker',
+    ]
+    if no_cache or profile:
+        pytest_args.append('--lily-no-cache')
+
+    if profile:
+        pytest_args += ['-p', 'lily_assistant.testing.profiler', '--lily-profile']
+
+    if memory:
+        pytest_args += ['-p', 'lily_assistant.testing.memory', '--lily-memory']
+
+    if shard:
+        pytest_args += [
+            '-p', 'lily_assistant.testing.shard',
+            '--lily-shard={}'.format(shard),
+        ]
+
+    pytest_args += list(args) or ['tests']
+
+    # -- in the JSON or quiet mode the output of py.test gets logged line by
+    # -- line like the output of the subprocesses
+    stream = logger.stream('py.test')
+    if warm:
+        exit_code = run_warm(
+            pytest_args, stream or Logger.tee(sys.stdout.buffer))
+
+    else:
+        # -- imported only when tests are really run, not when listing
+        # -- commands
+        import pytest
+
+        # -- the terminal reporter of py.test writes to `sys.stdout`
+        stdout, sys.stdout = sys.stdout, stream or Logger.tee(sys.stdout)
+        try:
+            exit_code = pytest.main(pytest_args)
+
+        finally:
+            sys.stdout = stdout
+
+    if stream:
+        stream.finish(failed=exit_code != 0)
+
+    click.get_current_context().exit(int(exit_code))
+
+
+def get_warm_client():
+
+    directories = ['tests']
+    if Config.exists():
+        directories.insert(0, Config().src_dir)
+
+    return WarmClient(Config.get_project_path(), directories)
+
+
+def run_warm(pytest_args, output):
+
+    if not hasattr(os, 'fork'):
+        raise click.ClickException(
+            '--warm is not supported on this platform')
+
+    try:
+        return get_warm_client().run(pytest_args, output)
+
+    except OSError as e:
+        raise click.ClickException(str(e))
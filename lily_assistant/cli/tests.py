@@ -0,0 +1,109 @@
+
+import json
+import os
+
+import click
+
+from .logger import Logger
+from .template import write_if_changed
+from lily_assistant.config import Config
+from lily_assistant.testing.history import ResultHistory
+from lily_assistant.testing.memory import (
+    format_size,
+    get_history_path,
+    MemoryHistory,
+)
+from lily_assistant.testing.shard import get_timings_path
+
+
+logger = Logger()
+
+
+def get_history():
+    return ResultHistory(os.path.join(Config.get_cache_path(), 'test_history'))
+
+
+@click.group()
+def tests():
+    """Inspect the history of tests runs."""
+    pass
+
+
+@tests.command()
+@click.option(
+    '--count', '-n', type=int, default=10, help='number of tests to show')
+def slowest(count):
+    """Show tests with the highest mean duration of their recent runs."""
+
+    tests = get_history().get_slowest(count)
+    if not tests:
+        logger.report('no tests history yet')
+        return
+
+    logger.report('{:>9}  {:>9}  {}'.format('mean', 'last', 'test'))
+    for nodeid, mean, last in tests:
+        logger.report('{mean:8.2f}s  {last:8.2f}s  {nodeid}'.format(
+            mean=mean, last=last, nodeid=nodeid))
+
+
+@tests.command()
+@click.option(
+    '--count', '-n', type=int, default=10, help='number of tests to show')
+def flaky(count):
+    """Show tests which both passed and failed in their recent runs."""
+
+    tests = get_history().get_flaky(count)
+    if not tests:
+        logger.report('no flaky tests found')
+        return
+
+    for nodeid, flips, failures, runs in tests:
+        logger.report(
+            '{flips:3d} flips  {failures:3d}/{runs:<3d} failed  {nodeid}'
+            .format(flips=flips, failures=failures, runs=runs, nodeid=nodeid))
+
+
+@tests.command()
+@click.option(
+    '--count', '-n', type=int, default=10, help='number of tests to show')
+def memory(count):
+    """Show tests with the highest peak memory of their recent runs.
+
+    The history is recorded by `lily_assistant test --memory` in
+    `.lily/cache/memory_history`.
+
+    """
+
+    tests = MemoryHistory(get_history_path()).get_largest(count)
+    if not tests:
+        logger.report('no memory history yet')
+        return
+
+    logger.report('{:>10}  {:>10}  {:>10}  {}'.format(
+        'peak', 'last peak', 'retained', 'test'))
+    for nodeid, peak, last_peak, retained in tests:
+        logger.report('{peak:>10}  {last_peak:>10}  {retained:>10}  {nodeid}'.format(
+            peak=format_size(peak),
+            last_peak=format_size(last_peak),
+            retained=format_size(retained),
+            nodeid=nodeid))
+
+
+@tests.command()
+def timings():
+    """Store mean durations of tests in `.lily/test_timings.json`.
+
+    The file is meant to be committed so that all CI nodes running
+    `lily_assistant test --shard i/N` balance the shards in the same way.
+
+    """
+
+    tests = get_history().get_slowest(count=None)
+    path = get_timings_path()
+    write_if_changed(path, json.dumps(
+        {nodeid: round(mean, 4) for nodeid, mean, _ in tests},
+        indent=4,
+        sort_keys=True) + '\n')
+
+    logger.info('stored timings of {count} tests in {path}'.format(
+        count=len(tests), path=path))
@@ -0,0 +1,92 @@
+
+import os
+
+import click
+
+from .logger import Logger
+from lily_assistant.config import Config
+from lily_assistant.repo.verify import get_commits, RangeVerifier
+from lily_assistant.repo.worktrees import WorktreePool
+
+
+logger = Logger()
+
+
+# -- `run check` measures coverage which turns the test result cache off
+DEFAULT_COMMAND = 'lily_assistant run lint && lily_assistant test'
+
+
+@click.command()
+@click.argument('rev_range')
+@click.option(
+    '--jobs', '-j',
+    type=click.IntRange(min=1),
+    default=os.cpu_count() or 1,
+    show_default=True,
+    help='number of commits verified at once (and of worktrees)')
+@click.option(
+    '--bisect',
+    is_flag=True,
+    default=False,
+    help=(
+        'find the first failing commit verifying JOBS midpoints at once '
+        'instead of verifying all the commits'))
+@click.option(
+    '--command',
+    default=DEFAULT_COMMAND,
+    show_default=True,
+    help='shell command verifying a single commit')
+def verify_range(rev_range, jobs, bisect, command):
+    """Verify each commit of the REV_RANGE in parallel.
+
+    Commits are checked out in a pool of reusable worktrees kept in the
+    git directory (`.git/lily/worktrees`), all of them share the test result cache of the main
+    checkout and trees which already passed are not verified again. Fails
+    with the first failing commit.
+
+    Example: `lily_assistant verify-range origin/master..HEAD --jobs 4`
+
+    """
+
+    base_path = Config.get_project_path()
+    try:
+        commits = get_commits(base_path, rev_range)
+
+    except OSError as e:
+        raise click.ClickException(str(e))
+
+    if not commits:
+        logger.info('no commits in {}'.format(rev_range))
+
+        return
+
+    cache_path = Config.get_cache_path()
+    env = dict(os.environ)
+    env['LILY_TEST_CACHE_PATH'] = os.path.join(cache_path, 'tests')
+    verifier = RangeVerifier(
+        WorktreePool(base_path, min(jobs, len(commits))),
+        command,
+        os.path.join(cache_path, 'verify.json'),
+        jobs=jobs,
+        env=env)
+
+    try:
+        if bisect:
+            failed = verifier.bisect(commits)
+
+        else:
+            failed = verifier.verify_all(commits)
+
+    except (WorktreePool.WorktreeError, OSError) as e:
+        raise click.ClickException(str(e))
+
+    finally:
+        verifier.save()
+
+    if failed:
+        raise click.ClickException(
+            'first failing commit: {sha} {subject}'.format(
+                sha=failed.sha[:10], subject=failed.subject))
+
+    logger.info('all {count} commit(s) of {rev_range} passed'.format(
+        count=len(commits), rev_range=rev_range))
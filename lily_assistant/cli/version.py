@@ -0,0 +1,105 @@
+
+import subprocess
+import sys
+
+import click
+
+from .logger import Logger
+from lily_assistant.repo.repo import Repo
+from lily_assistant.repo.version import VersionRenderer
+from lily_assistant.config import Config
+
+
+logger = Logger()
+
+
+@click.command()
+@click.argument('upgrade_type', type=click.Choice([
+    v.value for v in VersionRenderer.VERSION_UPGRADE
+]))
+def upgrade_version(upgrade_type):
+    """Upgrade version of the repo artefacts.
+
+    - update config.yaml file with version and last_commit_hash
+
+    """
+
+    config = Config()
+    repo = Repo()
+    version = VersionRenderer()
+
+    if not repo.all_changes_commited():
+        raise click.ClickException(
+            'Not all changes were commited! One cannot upgrade version with '
+            'some changes still being not commited')
+
+    # -- next_version
+    config.next_version = version.render_next_version(
+        config.version, upgrade_type)
+
+    # -- next_last_commit_hash
+    config.next_last_commit_hash = repo.current_commit_hash
+
+    logger.info(f'''
+        - Next config version upgraded to: {config.next_version}
+    ''')
+
+
+@click.command()
+def push_upgraded_version():
+    """Push Upgraded version and all of its artefacts.
+
+    - add commit with artefacts
+
+    - tag branch with the version of repo
+
+    - push changes to the remote
+
+    """
+
+    config = Config()
+    repo = Repo()
+
+    # -- version
+    config.version = config.next_version
+    config.next_version = None
+
+    # -- last_commit_hash
+    config.last_commit_hash = config.next_last_commit_hash
+    config.next_last_commit_hash = None
+
+    # -- add all artefacts coming from the post upgrade step
+    repo.add_all()
+    repo.commit('VERSION: {}'.format(config.version))
+    repo.push()
+
+    logger.info(f'''
+        - Version upgraded to: {config.version}
+    ''')
+
+
+@click.command()
+@click.option(
+    '--fast',
+    is_flag=True,
+    default=False,
+    help=(
+        'read the version from `.lily/config.json` instead of running '
+        '`python setup.py --version`'))
+def version(fast):
+    """Print version of the project.
+
+    The `--fast` variant is the one used by the generated Makefile since it
+    does not boot `setuptools`.
+
+    """
+
+    if fast:
+        # -- a plain value (also in the JSON or quiet mode) read by `make`
+        click.echo(Config().version)
+
+    else:
+        logger.report(subprocess.check_output(
+            [sys.executable, 'setup.py', '--version'],
+            cwd=Config.get_project_path(),
+            universal_newlines=True).strip())
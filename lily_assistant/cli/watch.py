@@ -0,0 +1,169 @@
+
+import os
+import subprocess
+import sys
+import time
+
+import click
+
+from .logger import Logger
+from .test import get_warm_client
+from lily_assistant.config import Config
+from lily_assistant.watch.inotify import InotifyWatcher
+from lily_assistant.watch.polling import PollingWatcher
+from lily_assistant.watch.session import (
+    collect,
+    fall_back,
+    get_watcher,
+    WatchSession,
+)
+
+
+logger = Logger()
+
+
+def run_tests(modules, warm):
+
+    pytest_args = [
+        '-p', 'lily_assistant.testing.plugin',
+        '-p', 'lily_assistant.testing.tracker',
+    ] + list(modules)
+    if warm:
+        stream = logger.stream('py.test')
+        try:
+            exit_code = get_warm_client().run(
+                pytest_args, stream or Logger.tee(sys.stdout.buffer))
+
+        except OSError as e:
+            logger.echo(
+                'warm run failed ({}), running py.test directly'.format(e),
+                level='warning')
+
+        else:
+            if stream:
+                stream.finish(failed=exit_code != 0)
+
+            return exit_code
+
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'pytest'] + pytest_args,
+        cwd=Config.get_project_path(),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True)
+    for line in process.stdout:
+        logger.output(line, 'py.test')
+
+    if process.wait() != 0:
+        logger.dump_output('py.test')
+
+    else:
+        logger.discard_output('py.test')
+
+    return process.returncode
+
+
+@click.command()
+@click.option(
+    '--lint/--no-lint',
+    default=True,
+    help='lint the changed files')
+@click.option(
+    '--test/--no-test',
+    default=True,
+    help='run the test modules affected by the changes')
+@click.option(
+    '--warm/--no-warm',
+    default=hasattr(os, 'fork'),
+    help='run tests forked from the warm parent (see `test --warm`)')
+@click.option(
+    '--polling',
+    is_flag=True,
+    default=False,
+    help='poll the files for changes instead of using inotify')
+@click.option(
+    '--interval',
+    type=float,
+    default=0.5,
+    help='polling interval in seconds')
+@click.option(
+    '--debounce',
+    type=float,
+    default=0.2,
+    help='seconds without changes closing a burst of changes')
+def watch(lint, test, warm, polling, interval, debounce):
+    """Lint and test continuously as the files change.
+
+    The source directory and `tests` are watched with inotify (or polled
+    if it's not available). After each burst of changes the changed files
+    are linted and the test modules importing (even transitively) any of
+    the changed modules are run. The import graph and the linter stay
+    loaded between the runs and tests run forked from the warm parent.
+
+    """
+
+    base_path = Config.get_project_path()
+    directories = [
+        directory
+        for directory in [Config().src_dir, 'tests']
+        if os.path.isdir(os.path.join(base_path, directory))]
+
+    watcher = get_watcher(
+        base_path, directories, polling=polling, interval=interval)
+    session = WatchSession(base_path, directories)
+    logger.info('watching {directories} ({method}), press Ctrl+C to stop'.format(
+        directories=', '.join(directories),
+        method=(
+            'polling' if isinstance(watcher, PollingWatcher) else 'inotify')))
+
+    try:
+        while True:
+            try:
+                changed = collect(watcher, debounce=debounce)
+
+            except InotifyWatcher.Exhausted as e:
+                logger.echo(
+                    '{}, switching to polling'.format(e), level='warning')
+                watcher = fall_back(watcher, interval=interval)
+                changed = e.changed
+
+            paths, test_modules = session.get_affected(changed)
+            if not lint:
+                paths = []
+
+            if not test:
+                test_modules = []
+
+            if paths or test_modules:
+                run_cycle(session, paths, test_modules, warm)
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        watcher.close()
+
+
+def run_cycle(session, paths, test_modules, warm):
+
+    started = time.monotonic()
+    results = []
+    failed = False
+    if paths:
+        logger.echo('[LINT] {}'.format(' '.join(paths)), level='debug')
+        errors = session.lint(paths)
+        failed = failed or errors > 0
+        results.append('lint: {} error(s)'.format(errors))
+
+    if test_modules:
+        logger.echo('[TEST] {}'.format(' '.join(test_modules)), level='debug')
+        exit_code = run_tests(test_modules, warm)
+        failed = failed or exit_code != 0
+        results.append('tests: {}'.format(
+            'failed' if exit_code else 'passed'))
+
+    logger.echo(
+        '[WATCH] {results} in {duration:.2f}s'.format(
+            results=', '.join(results),
+            duration=time.monotonic() - started),
+        level='error' if failed else 'info')
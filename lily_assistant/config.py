@@ -1,13 +1,31 @@
 
+import copy
 import json
 import os
 
 
 class Config:
 
+    # -- parsed configs keyed by path, valid as long as the file is unchanged
+    _cache = {}
+
     def __init__(self):
-        with open(self.get_config_path()) as f:
-            self.config = json.loads(f.read())
+        self.config = self.read(self.get_config_path())
+
+    @classmethod
+    def read(cls, path):
+
+        stat = os.stat(path)
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        cached = cls._cache.get(path)
+        if cached is None or cached[0] != key:
+            with open(path) as f:
+                cached = (key, json.loads(f.read()))
+
+            cls._cache[path] = cached
+
+        # -- nested sections are mutable too, callers must not share them
+        return copy.deepcopy(cached[1])
 
     @classmethod
     def get_project_path(cls):
@@ -21,6 +39,10 @@ class Config:
     def get_lily_path(cls):
         return os.path.join(os.getcwd(), '.lily')
 
+    @classmethod
+    def get_cache_path(cls):
+        return os.path.join(cls.get_lily_path(), 'cache')
+
     @classmethod
     def exists(cls):
         return os.path.exists(cls.get_config_path())
@@ -49,20 +71,28 @@ class Config:
         return cls()
 
     def _save(self):
-        with open(self.get_config_path(), 'w') as f:
-            f.write(
-                json.dumps(
-                    {
-                        'name': self.name,
-                        'src_dir': self.src_dir,
-                        'repository': self.repository,
-                        'version': self.version,
-                        'next_version': self.next_version,
-                        'last_commit_hash': self.last_commit_hash,
-                        'next_last_commit_hash': self.next_last_commit_hash,
-                    },
-                    indent=4,
-                    sort_keys=False))
+
+        config = {
+            'name': self.name,
+            'src_dir': self.src_dir,
+            'repository': self.repository,
+            'version': self.version,
+            'next_version': self.next_version,
+            'last_commit_hash': self.last_commit_hash,
+            'next_last_commit_hash': self.next_last_commit_hash,
+        }
+
+        # -- optional sections (e.g. `structure`) are preserved as they are
+        for key, value in self.config.items():
+            config.setdefault(key, value)
+
+        path = self.get_config_path()
+        with open(path, 'w') as f:
+            f.write(json.dumps(config, indent=4, sort_keys=False))
+
+        stat = os.stat(path)
+        self._cache[path] = (
+            (stat.st_ino, stat.st_mtime_ns, stat.st_size), dict(config))
 
     @property
     def name(self):
@@ -92,6 +122,27 @@ class Config:
         return os.path.join(
             self.get_project_path(), self.config['src_dir'])
 
+    #
+    # STRUCTURE
+    #
+    @property
+    def structure(self):
+        return self.config.get('structure') or {}
+
+    #
+    # IMPORT_BUDGET
+    #
+    @property
+    def import_budget(self):
+        return self.config.get('import_budget') or {}
+
+    #
+    # PRE_COMMIT
+    #
+    @property
+    def pre_commit(self):
+        return self.config.get('pre_commit') or {}
+
     #
     # VERSION
     #
@@ -0,0 +1,145 @@
+
+import ast
+import hashlib
+import re
+
+
+class Analysis:
+    """Statements, executed and missing lines of a single source file.
+
+    Statements are computed from the AST in the same way coverage.py does
+    it: docstrings are not statements, multi-line statements are reported
+    by their first line and `# pragma: no cover` (or any of the
+    `exclude_lines` regexes) excludes the line (or the whole block if it's
+    placed at its header).
+
+    """
+
+    EXCLUDE_REGEX = re.compile(
+        r'#\s*(pragma|PRAGMA)[:\s]?\s*(no|NO)\s*(cover|COVER)')
+
+    def __init__(self, path, executed, exclude_lines=None):
+
+        with open(path, 'rb') as f:
+            self.source = f.read()
+
+        self.path = path
+        if exclude_lines is None:
+            self.exclude_regex = self.EXCLUDE_REGEX
+
+        elif exclude_lines:
+            self.exclude_regex = re.compile(
+                '|'.join('(?:{})'.format(line) for line in exclude_lines))
+
+        else:
+            self.exclude_regex = None
+
+        self.statements, self.line_map = self.find_statements()
+        self.executed = {
+            self.line_map[line]
+            for line in executed
+            if line in self.line_map} & self.statements
+        self.missing = self.statements - self.executed
+
+    @property
+    def source_hash(self):
+        return hashlib.sha256(self.source).hexdigest()
+
+    @property
+    def percent(self):
+
+        if not self.statements:
+            return 100.0
+
+        return 100.0 * len(self.executed) / len(self.statements)
+
+    def find_statements(self):
+
+        text = self.source.decode('utf-8', errors='replace')
+        excluded_lines = {
+            number
+            for number, line in enumerate(text.splitlines(), start=1)
+            if self.exclude_regex and self.exclude_regex.search(line)}
+
+        statements, line_map = set(), {}
+        try:
+            tree = ast.parse(text)
+
+        except SyntaxError:
+            return statements, line_map
+
+        def visit(body, is_scope):
+            for index, node in enumerate(body):
+                if is_scope and index == 0 and self.is_docstring(node):
+                    continue
+
+                first, last = self.get_header_lines(node)
+                header = range(first, last + 1)
+                if excluded_lines.intersection(header):
+                    continue
+
+                # -- decorators are executed as separate statements
+                for decorator in getattr(node, 'decorator_list', []):
+                    decorator_last = getattr(
+                        decorator, 'end_lineno', None) or decorator.lineno
+                    statements.add(decorator.lineno)
+                    for line in range(decorator.lineno, decorator_last + 1):
+                        line_map.setdefault(line, decorator.lineno)
+
+                statements.add(first)
+                for line in header:
+                    line_map.setdefault(line, first)
+
+                for name, children in self.get_bodies(node):
+                    visit(children, name == 'scope')
+
+        visit(tree.body, True)
+
+        return statements, line_map
+
+    def is_docstring(self, node):
+
+        if not isinstance(node, ast.Expr):
+            return False
+
+        # -- `Str.s` for python < 3.8, `Constant.value` for the newer ones
+        value = getattr(node.value, 'value', getattr(node.value, 's', None))
+
+        return isinstance(value, str)
+
+    def get_header_lines(self, node):
+
+        first = node.lineno
+        bodies = [children for _, children in self.get_bodies(node)]
+        if bodies:
+            last = max(
+                first, min(self.get_start_line(c[0]) for c in bodies) - 1)
+
+        else:
+            last = getattr(node, 'end_lineno', None) or node.lineno
+
+        return first, last
+
+    def get_start_line(self, node):
+        return min(
+            [node.lineno] +
+            [d.lineno for d in getattr(node, 'decorator_list', [])])
+
+    def get_bodies(self, node):
+
+        is_scope = isinstance(
+            node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+        bodies = []
+        for name in ('body', 'orelse', 'finalbody'):
+            children = getattr(node, name, None)
+            if isinstance(children, list) and children and isinstance(
+                    children[0], ast.stmt):
+                bodies.append(('scope' if is_scope else name, children))
+
+        for handler in getattr(node, 'handlers', []):
+            bodies.append(('handler', [handler]))
+
+        for case in getattr(node, 'cases', []):
+            bodies.append(('case', case.body))
+
+        return bodies
@@ -0,0 +1,114 @@
+import configparser
+import fnmatch
+import os
+
+from .analysis import Analysis
+
+
+class CoverageConfig:
+    """Settings of coverage.py which the reports honour.
+
+    They are read like coverage.py does it: from the file pointed by
+    `COVERAGE_RCFILE`, or `.coveragerc` (`[run]` and `[report]`), or the
+    first one of `setup.cfg` and `tox.ini` with `[coverage:run]` or
+    `[coverage:report]` sections. Only `omit` and `source` of `run` and
+    `exclude_lines` and `exclude_also` of `report` are honoured, the
+    `pyproject.toml` is not read.
+
+    """
+
+    def __init__(self, base_path):
+        self.base_path = base_path
+        self.omit = []
+        self.source = []
+        self.exclude_lines = None
+        self.exclude_also = []
+        self.path = None
+
+        parser, prefix = self.find()
+        if parser:
+            self.omit = self.get_list(parser, prefix + 'run', 'omit')
+            self.source = self.get_list(parser, prefix + 'run', 'source')
+            if parser.has_option(prefix + 'report', 'exclude_lines'):
+                self.exclude_lines = self.get_lines(
+                    parser, prefix + 'report', 'exclude_lines')
+
+            self.exclude_also = self.get_lines(
+                parser, prefix + 'report', 'exclude_also')
+
+    def find(self):
+        """Find the parsed config file together with its sections prefix."""
+
+        rc_path = os.environ.get('COVERAGE_RCFILE')
+        candidates = (
+            [(rc_path, '')] if rc_path else
+            [('.coveragerc', ''), ('setup.cfg', 'coverage:'),
+             ('tox.ini', 'coverage:')])
+        for name, prefix in candidates:
+            path = os.path.join(self.base_path, name)
+            parser = configparser.RawConfigParser()
+            try:
+                if not parser.read(path):
+                    continue
+
+            except configparser.Error:
+                continue
+
+            if not prefix or any(
+                    section.startswith(prefix)
+                    for section in parser.sections()):
+                self.path = path
+
+                return parser, prefix
+
+        return None, ''
+
+    def get_list(self, parser, section, option):
+        """Values separated by commas or new lines."""
+
+        return [
+            value.strip()
+            for line in self.get_lines(parser, section, option)
+            for value in line.split(',')
+            if value.strip()]
+
+    def get_lines(self, parser, section, option):
+        """Values separated by new lines (e.g. regexes containing commas)."""
+
+        if not parser.has_option(section, option):
+            return []
+
+        return [
+            line.strip()
+            for line in parser.get(section, option).splitlines()
+            if line.strip()]
+
+    @property
+    def exclude(self):
+        """Regexes of excluded lines, `None` for the default pragma."""
+
+        if self.exclude_lines is None and not self.exclude_also:
+            return None
+
+        exclude_lines = self.exclude_lines
+        if exclude_lines is None:
+            exclude_lines = [Analysis.EXCLUDE_REGEX.pattern]
+
+        return exclude_lines + self.exclude_also
+
+    def is_omitted(self, path):
+        """Check if `path` (relative to `base_path`) matches `omit`.
+
+        Patterns not starting with a wildcard are relative to `base_path`.
+
+        """
+
+        path = os.path.join(self.base_path, path)
+        for pattern in self.omit:
+            if not pattern.startswith(('*', '?')):
+                pattern = os.path.join(self.base_path, pattern)
+
+            if fnmatch.fnmatch(path, pattern):
+                return True
+
+        return False
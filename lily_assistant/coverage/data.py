@@ -0,0 +1,155 @@
+
+import os
+import sqlite3
+import time
+
+
+def lines_to_numbits(lines):
+    """Encode the set of line numbers into coverage.py's `numbits` blob."""
+
+    numbits = bytearray(max(lines) // 8 + 1 if lines else 0)
+    for line in lines:
+        numbits[line // 8] |= 1 << (line % 8)
+
+    return bytes(numbits)
+
+
+def numbits_to_lines(numbits):
+    """Decode `numbits` blob of coverage.py into the set of line numbers."""
+
+    lines = set()
+    for index, byte in enumerate(numbits):
+        for bit in range(8):
+            if byte & (1 << bit):
+                lines.add(index * 8 + bit)
+
+    return lines
+
+
+class CoverageData:
+    """Read-only access to the `.coverage` SQLite database.
+
+    The database is read directly (without importing `coverage`), lines
+    executed in all the contexts are merged together.
+
+    """
+
+    class MissingData(Exception):
+        pass
+
+    # -- schema of coverage.py's (5.0+) data file
+    SCHEMA_VERSION = 7
+
+    SCHEMA = '''
+        CREATE TABLE coverage_schema (version integer);
+        CREATE TABLE meta (key text, value text, unique (key));
+        CREATE TABLE file (id integer primary key, path text, unique (path));
+        CREATE TABLE context (
+            id integer primary key, context text, unique (context));
+        CREATE TABLE line_bits (
+            file_id integer, context_id integer, numbits blob,
+            foreign key (file_id) references file (id),
+            foreign key (context_id) references context (id),
+            unique (file_id, context_id));
+        CREATE TABLE arc (
+            file_id integer, context_id integer, fromno integer,
+            tono integer,
+            foreign key (file_id) references file (id),
+            foreign key (context_id) references context (id),
+            unique (file_id, context_id, fromno, tono));
+        CREATE TABLE tracer (
+            file_id integer primary key, tracer text,
+            foreign key (file_id) references file (id));
+    '''
+
+    def __init__(self, path):
+        self.path = path
+
+    def connect(self):
+
+        if not os.path.exists(self.path):
+            raise CoverageData.MissingData(
+                'coverage data file {} does not exist, run the tests with '
+                'coverage first (e.g. `make test_all`)'.format(self.path))
+
+        return sqlite3.connect(self.path)
+
+    def read(self):
+        """Return mapping of measured file path to its executed lines."""
+
+        connection = self.connect()
+        try:
+            files = dict(connection.execute('SELECT id, path FROM file'))
+            meta = dict(connection.execute('SELECT key, value FROM meta'))
+            lines = {path: set() for path in files.values()}
+
+            if meta.get('has_arcs') in ('1', 'True', 'true'):
+                rows = connection.execute(
+                    'SELECT file_id, fromno, tono FROM arc')
+                for file_id, from_line, to_line in rows:
+                    lines[files[file_id]].update(
+                        abs(n) for n in (from_line, to_line) if n)
+
+            else:
+                rows = connection.execute(
+                    'SELECT file_id, numbits FROM line_bits')
+                for file_id, numbits in rows:
+                    lines[files[file_id]].update(numbits_to_lines(numbits))
+
+        finally:
+            connection.close()
+
+        return lines
+
+    def write(self, lines):
+        """Write executed `lines` (`{path: set(lines)}`) as line data.
+
+        The file is replaced atomically and stays readable by coverage.py.
+
+        """
+
+        tmp_path = self.path + '.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        connection = sqlite3.connect(tmp_path)
+        try:
+            connection.executescript(self.SCHEMA)
+            connection.execute(
+                'INSERT INTO coverage_schema VALUES (?)',
+                (self.SCHEMA_VERSION,))
+            connection.executemany('INSERT INTO meta VALUES (?, ?)', [
+                ('has_arcs', '0'),
+                ('when', time.strftime('%Y-%m-%d %H:%M:%S')),
+            ])
+            connection.execute("INSERT INTO context VALUES (1, '')")
+            for file_id, path in enumerate(sorted(lines), 1):
+                connection.execute(
+                    'INSERT INTO file VALUES (?, ?)', (file_id, path))
+                connection.execute(
+                    'INSERT INTO line_bits VALUES (?, 1, ?)',
+                    (file_id, lines_to_numbits(lines[path])))
+
+            connection.commit()
+
+        finally:
+            connection.close()
+
+        os.replace(tmp_path, self.path)
+
+    @classmethod
+    def combine(cls, paths, output_path):
+        """Merge executed lines of all data files in `paths`.
+
+        Branch (arc) data is merged as line data. Returns the merged lines.
+
+        """
+
+        lines = {}
+        for path in paths:
+            for measured_path, executed in cls(path).read().items():
+                lines.setdefault(measured_path, set()).update(executed)
+
+        cls(output_path).write(lines)
+
+        return lines
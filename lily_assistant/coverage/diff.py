@@ -0,0 +1,88 @@
+
+import os
+
+from .report import render_lines
+
+
+class DiffCoverage:
+    """Coverage of the added or modified lines only.
+
+    Changed lines are mapped onto the statements of the reported files
+    (continuation lines of a multi-line statement count as the statement
+    itself), lines which are not statements (comments, blank lines etc.) are
+    ignored.
+
+    :param report: `CoverageReport` providing the executed lines and
+        telling which files are reported
+    :param changed_lines: `{path: set(line_numbers)}` with paths relative to
+        the project root (e.g. `GitRepo().get_changed_lines()`)
+
+    """
+
+    def __init__(self, report, changed_lines):
+        self.report = report
+        self.changed_lines = changed_lines
+        self._files = None
+
+    @property
+    def files(self):
+        """Sorted list of `(path, changed_statements, missing)`."""
+
+        if self._files is None:
+            self._files = []
+            for path in sorted(self.changed_lines):
+                if not self.is_checked(path):
+                    continue
+
+                analysis = self.report.analyze(path)
+                statements = {
+                    analysis.line_map[line]
+                    for line in self.changed_lines[path]
+                    if line in analysis.line_map} & analysis.statements
+                if statements:
+                    self._files.append(
+                        (path, statements, statements & analysis.missing))
+
+        return self._files
+
+    def is_checked(self, path):
+
+        return (
+            path.endswith('.py') and
+            self.report.is_reported(path) and
+            os.path.exists(os.path.join(self.report.base_path, path)))
+
+    @property
+    def statements(self):
+        return sum(len(statements) for _, statements, _ in self.files)
+
+    @property
+    def missing(self):
+        return sum(len(missing) for _, _, missing in self.files)
+
+    @property
+    def percent(self):
+
+        if not self.statements:
+            return 100.0
+
+        return 100.0 * (self.statements - self.missing) / self.statements
+
+    def render(self):
+
+        lines = [
+            '{path}: {covered} / {count} changed statement(s) covered'.format(
+                path=path,
+                covered=len(statements) - len(missing),
+                count=len(statements)) +
+            ('' if not missing else ', missing: {}'.format(
+                render_lines(statements, missing)))
+            for path, statements, missing in self.files]
+        lines.append(
+            'TOTAL: {covered} / {count} changed statement(s) covered '
+            '({percent:.2f}%)'.format(
+                covered=self.statements - self.missing,
+                count=self.statements,
+                percent=self.percent))
+
+        return '\n'.join(lines)
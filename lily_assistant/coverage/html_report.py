@@ -0,0 +1,143 @@
+
+import hashlib
+import html
+import json
+import os
+
+from lily_assistant.cli.template import write_if_changed
+
+
+class HtmlReport:
+    """Incremental HTML rendering of the `CoverageReport`.
+
+    Page of a file is rendered again only if its source or its coverage
+    changed since the last rendering (fingerprints are kept in the
+    `status.lily.json` file of the output directory).
+
+    """
+
+    VERSION = 1
+
+    STATUS_FILE = 'status.lily.json'
+
+    def __init__(self, report, directory):
+        self.report = report
+        self.directory = directory
+        self.status_path = os.path.join(directory, self.STATUS_FILE)
+
+    def load_status(self):
+
+        try:
+            with open(self.status_path) as f:
+                status = json.loads(f.read())
+
+        except (OSError, ValueError):
+            return {}
+
+        if status.get('version') != self.VERSION:
+            return {}
+
+        return status.get('files', {})
+
+    def render(self):
+        """Render the report, return paths of the (re)rendered pages."""
+
+        os.makedirs(self.directory, exist_ok=True)
+        previous = self.load_status()
+        status, rendered = {}, []
+
+        for path, analysis in self.report.analyses:
+            fingerprint = self.get_fingerprint(analysis)
+            page_path = os.path.join(self.directory, self.get_page_name(path))
+            status[path] = fingerprint
+            if previous.get(path) == fingerprint and os.path.exists(page_path):
+                continue
+
+            write_if_changed(page_path, self.render_file(path, analysis))
+            rendered.append(page_path)
+
+        # -- pages of files which are not reported anymore
+        for path in set(previous) - set(status):
+            page_path = os.path.join(self.directory, self.get_page_name(path))
+            if os.path.exists(page_path):
+                os.remove(page_path)
+
+        index_path = os.path.join(self.directory, 'index.html')
+        if write_if_changed(index_path, self.render_index()):
+            rendered.append(index_path)
+
+        write_if_changed(
+            self.status_path,
+            json.dumps({'version': self.VERSION, 'files': status}, indent=4))
+
+        return rendered
+
+    def get_fingerprint(self, analysis):
+
+        digest = hashlib.sha256(analysis.source_hash.encode('utf-8'))
+        digest.update(repr(sorted(analysis.statements)).encode('utf-8'))
+        digest.update(repr(sorted(analysis.executed)).encode('utf-8'))
+
+        return digest.hexdigest()
+
+    def get_page_name(self, path):
+        return path.replace(os.sep, '_').replace('.', '_') + '.html'
+
+    def render_page(self, title, body):
+
+        return (
+            '<!DOCTYPE html>\n'
+            '<html>\n<head>\n<meta charset="utf-8">\n'
+            '<title>{title}</title>\n'
+            '<style>\n'
+            'body {{ font-family: monospace; }}\n'
+            'table {{ border-collapse: collapse; }}\n'
+            'td, th {{ padding: 0 8px; text-align: left; }}\n'
+            '.run {{ background: #dfd; }}\n'
+            '.mis {{ background: #fdd; }}\n'
+            'pre {{ margin: 0; }}\n'
+            '</style>\n'
+            '</head>\n<body>\n<h1>{title}</h1>\n{body}\n</body>\n</html>\n'
+        ).format(title=html.escape(title), body=body)
+
+    def render_index(self):
+
+        rows = ''.join(
+            '<tr><td><a href="{page}">{path}</a></td><td>{statements}</td>'
+            '<td>{missing}</td><td>{percent:.0f}%</td></tr>\n'.format(
+                page=self.get_page_name(path),
+                path=html.escape(path),
+                statements=len(a.statements),
+                missing=len(a.missing),
+                percent=a.percent)
+            for path, a in self.report.analyses)
+
+        return self.render_page(
+            'Coverage report: {:.0f}%'.format(self.report.percent),
+            '<table>\n<tr><th>Module</th><th>Statements</th><th>Missing</th>'
+            '<th>Coverage</th></tr>\n{rows}</table>'.format(rows=rows))
+
+    def render_file(self, path, analysis):
+
+        lines = analysis.source.decode('utf-8', errors='replace').splitlines()
+        rows = []
+        for number, line in enumerate(lines, start=1):
+            if number in analysis.missing:
+                css = ' class="mis"'
+
+            elif number in analysis.executed:
+                css = ' class="run"'
+
+            else:
+                css = ''
+
+            rows.append(
+                '<tr{css}><td>{number}</td><td><pre>{line}</pre></td>'
+                '</tr>\n'.format(
+                    css=css, number=number, line=html.escape(line)))
+
+        return self.render_page(
+            '{path}: {percent:.0f}%'.format(
+                path=path, percent=analysis.percent),
+            '<p><a href="index.html">index</a></p>\n'
+            '<table>\n{rows}</table>'.format(rows=''.join(rows)))
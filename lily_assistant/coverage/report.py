@@ -0,0 +1,167 @@
+
+import os
+
+from lily_assistant.config import Config
+from .analysis import Analysis
+from .config import CoverageConfig
+from .data import CoverageData
+
+
+class CoverageReport:
+    """Coverage computed in-process from the existing `.coverage` data.
+
+    :param data_path: path of the coverage data file (by default the one
+        pointed by `COVERAGE_FILE` or `.coverage` in the project root)
+    :param source: directory (relative to the project root) which should be
+        reported, its files which were never executed are reported too. By
+        default the `[run] source` of the coverage config is used
+
+    Files matching `[run] omit` of the coverage config are not reported and
+    its `[report] exclude_lines` are applied (see `CoverageConfig`).
+
+    """
+
+    def __init__(self, data_path=None, source=None):
+        self.base_path = Config.get_project_path()
+        self.data_path = data_path or os.path.join(
+            self.base_path, os.environ.get('COVERAGE_FILE', '.coverage'))
+        self.config = CoverageConfig(self.base_path)
+        self.sources = [
+            self.get_source_path(s)
+            for s in ([source] if source else self.config.source)]
+        self._executed = None
+        self._analyses = None
+
+    @property
+    def executed(self):
+        """Executed lines keyed by the path relative to the project root."""
+
+        if self._executed is None:
+            self._executed = {
+                os.path.relpath(path, self.base_path): lines
+                for path, lines in CoverageData(self.data_path).read().items()}
+
+        return self._executed
+
+    @property
+    def analyses(self):
+        """Sorted list of `(relative_path, Analysis)` of reported files."""
+
+        if self._analyses is None:
+            paths = {p for p in self.executed if self.is_reported(p)}
+            paths.update(self.find_source_files())
+
+            self._analyses = [
+                (path, self.analyze(path))
+                for path in sorted(paths)
+                if os.path.exists(os.path.join(self.base_path, path))]
+
+        return self._analyses
+
+    def analyze(self, path):
+        return Analysis(
+            os.path.join(self.base_path, path),
+            self.executed.get(path, ()),
+            self.config.exclude)
+
+    def get_source_path(self, source):
+        """Normalize directory (or dotted package name) `source`."""
+
+        source = os.path.normpath(source.strip(os.sep))
+        if not os.path.isdir(os.path.join(self.base_path, source)):
+            source = source.replace('.', os.sep)
+
+        return source
+
+    def is_reported(self, path):
+
+        if path.startswith('..') or os.path.isabs(path):
+            return False
+
+        if self.config.is_omitted(path):
+            return False
+
+        if self.sources:
+            return any(
+                path.startswith(source + os.sep) for source in self.sources)
+
+        return True
+
+    def find_source_files(self):
+
+        paths = []
+        for source in self.sources:
+            source_path = os.path.join(self.base_path, source)
+            for directory, dirs, files in os.walk(source_path):
+                dirs[:] = [d for d in dirs if d != '__pycache__']
+                paths.extend(
+                    os.path.relpath(os.path.join(directory, f), self.base_path)
+                    for f in files
+                    if f.endswith('.py'))
+
+        return [path for path in paths if not self.config.is_omitted(path)]
+
+    @property
+    def statements(self):
+        return sum(len(a.statements) for _, a in self.analyses)
+
+    @property
+    def missing(self):
+        return sum(len(a.missing) for _, a in self.analyses)
+
+    @property
+    def percent(self):
+
+        if not self.statements:
+            return 100.0
+
+        return 100.0 * (self.statements - self.missing) / self.statements
+
+    def render(self):
+
+        rows = [
+            (path,
+             str(len(a.statements)),
+             str(len(a.missing)),
+             '{:.0f}%'.format(a.percent),
+             self.render_missing(a))
+            for path, a in self.analyses]
+        rows.append((
+            'TOTAL',
+            str(self.statements),
+            str(self.missing),
+            '{:.0f}%'.format(self.percent),
+            ''))
+
+        width = max([len('Name')] + [len(r[0]) for r in rows])
+        line = '{:<%d}  {:>6}  {:>6}  {:>6}   {}' % width
+        header = line.format('Name', 'Stmts', 'Miss', 'Cover', 'Missing')
+        separator = '-' * len(header)
+
+        return '\n'.join(
+            [header, separator] +
+            [line.format(*r).rstrip() for r in rows[:-1]] +
+            [separator, line.format(*rows[-1]).rstrip()])
+
+    def render_missing(self, analysis):
+        return render_lines(analysis.statements, analysis.missing)
+
+
+def render_lines(statements, missing):
+    """Render `missing` lines as ranges of `statements`, e.g. `3, 7-10`."""
+
+    ranges, start, end = [], None, None
+    for line in sorted(statements):
+        if line in missing:
+            start = line if start is None else start
+            end = line
+
+        elif start is not None:
+            ranges.append((start, end))
+            start = None
+
+    if start is not None:
+        ranges.append((start, end))
+
+    return ', '.join(
+        str(s) if s == e else '{}-{}'.format(s, e) for s, e in ranges)
@@ -0,0 +1,61 @@
+"""Fast entry point of the `commit-msg` git hook.
+
+Usage:
+
+    python -m lily_assistant.hooks.commit_msg <commit_msg_path>
+
+It deliberately imports nothing but the checker itself (no `click`, no
+CLI) so that the hook costs not much more than the interpreter startup.
+
+"""
+
+import sys
+
+from lily_assistant.checkers.commit_message import CommitMessageChecker
+
+
+COLORS = {
+    'INFO': '\033[33m',
+    'ERROR': '\033[31m',
+}
+
+
+def log(stream, level, text):
+
+    text = '[{level}]\n\n{text}\n'.format(level=level, text=text.strip())
+    if stream.isatty():
+        text = '{color}{text}\033[0m'.format(color=COLORS[level], text=text)
+
+    stream.write(text)
+
+
+def main(argv=None):
+
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        sys.stderr.write(
+            'usage: python -m lily_assistant.hooks.commit_msg '
+            '<commit_msg_path>\n')
+
+        return 2
+
+    with open(argv[0]) as f:
+        message = f.read()
+
+    checker = CommitMessageChecker(message)
+    if checker.is_valid():
+        log(sys.stdout, 'INFO', 'COMMIT MESSAGE: {}'.format(message))
+
+        return 0
+
+    log(
+        sys.stderr,
+        'ERROR',
+        'your commit message is not following the commit message '
+        'convention.\n\n' + checker.render_errors())
+
+    return 1
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
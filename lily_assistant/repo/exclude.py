@@ -0,0 +1,84 @@
+import os
+import subprocess
+
+
+# -- state of the runs written to `.lily`, local to the clone
+STATE_PATHS = [
+    os.path.join('.lily', 'cache'),
+    os.path.join('.lily', 'logs'),
+]
+
+
+def get_exclude_path(base_path):
+    """Resolve `info/exclude` of the repository of `base_path`.
+
+    Returns `None` if `base_path` is not the root of a repository.
+
+    """
+
+    git_path = os.path.join(base_path, '.git')
+
+    # -- the common case resolved without spawning git on each run
+    if os.path.isdir(git_path):
+        return os.path.join(git_path, 'info', 'exclude')
+
+    if not os.path.exists(git_path):
+        return None
+
+    try:
+        output = subprocess.check_output(
+            ['git', 'rev-parse', '--git-path', 'info/exclude'],
+            cwd=base_path,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True)
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return os.path.join(base_path, output.strip())
+
+
+def exclude(base_path, *paths):
+    """Make git ignore directories `paths` without touching `.gitignore`.
+
+    Meant for the files local to the clone (snapshots, rendered hooks, the
+    state of the runs) which the projects do not ignore themselves, the
+    patterns are added to `info/exclude` of the repository only once.
+
+    """
+
+    exclude_path = get_exclude_path(base_path)
+    if exclude_path is None:
+        return
+
+    patterns = []
+    for path in paths:
+        relative_path = os.path.relpath(path, base_path)
+        if not relative_path.startswith(os.pardir):
+            patterns.append('/{}/'.format(relative_path.replace(os.sep, '/')))
+
+    try:
+        with open(exclude_path) as f:
+            content = f.read()
+
+    except FileNotFoundError:
+        content = ''
+
+    existing = set(content.splitlines())
+    missing = [pattern for pattern in patterns if pattern not in existing]
+    if not missing:
+        return
+
+    os.makedirs(os.path.dirname(exclude_path), exist_ok=True)
+    with open(exclude_path, 'a') as f:
+        if content and not content.endswith('\n'):
+            f.write('\n')
+
+        f.write(''.join(pattern + '\n' for pattern in missing))
+
+
+def exclude_state(base_path):
+    """Make git ignore the state of the runs (see `STATE_PATHS`)."""
+
+    exclude(
+        base_path, *[os.path.join(base_path, path) for path in STATE_PATHS])
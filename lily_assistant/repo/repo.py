@@ -4,11 +4,13 @@ import re
 from subprocess import Popen, PIPE, STDOUT
 import shlex
 
-import click
-
+from lily_assistant.cli.logger import Logger
 from lily_assistant.config import Config
 
 
+logger = Logger()
+
+
 class Repo:
 
     def __init__(self):
@@ -90,8 +92,8 @@ class Repo:
     #
     def execute(self, command):
 
-        click.secho(f'[EXECUTE] {command}', fg='blue')
-        captured = ''
+        logger.echo(f'[EXECUTE] {command}', level='debug', command=command)
+        captured = []
 
         p = Popen(
             self.split_command(command),
@@ -100,23 +102,20 @@ class Repo:
             bufsize=1,
             universal_newlines=True)
 
-        while p.poll() is not None:
-            line = p.stdout.readline()
-            captured += line
-            click.secho(line, fg='white')
-
-        # -- final read
-        line = p.stdout.read()
-        captured += line
-        click.secho(line, fg='white')
+        for line in p.stdout:
+            captured.append(line)
+            logger.output(line, command)
 
         # -- fetch return code
-        p.communicate()
+        p.wait()
         if p.returncode != 0:
+            logger.dump_output(command)
             raise OSError(
                 f'Command: {command} return exit code: {p.returncode}')
 
-        return captured
+        logger.discard_output(command)
+
+        return ''.join(captured)
 
     def split_command(self, command):
 
@@ -0,0 +1,188 @@
+
+import os
+import shutil
+import subprocess
+import tempfile
+
+from .exclude import exclude
+
+
+# -- modes of index entries which are not regular files
+SYMLINK_MODE = '120000'
+GITLINK_MODE = '160000'
+
+
+class IndexSnapshot:
+    """Staged state of the repository materialised in a temporary tree.
+
+    Only the files whose staged version differs from the working tree are
+    written (`git checkout-index --prefix`), all the other staged files are
+    hardlinked from the working tree, untracked files are left out. Thanks
+    to that checks run against exactly what is about to be committed
+    without stashing (which touches every file and invalidates caches).
+
+    The hardlinked files are shared with the working tree, therefore the
+    checks run in the snapshot must not modify the tracked files in place.
+
+    Snapshots are created in `parent_path` (inside of the project, so that
+    hardlinking works) which gets excluded in `info/exclude` of the
+    repository, the projects do not have to ignore it themselves. Git would
+    resolve the project itself from there, therefore the checks must run
+    with `get_env` pointing git at the snapshot and a copy of the index.
+
+    Untracked `local_files` the checks need (e.g. `env.sh`) are hardlinked
+    as well if they exist.
+
+    """
+
+    LOCAL_FILES = [
+        'env.sh',
+        os.path.join('.lily', 'config.json'),
+        os.path.join('.lily', 'lily_assistant.makefile'),
+    ]
+
+    class SnapshotError(Exception):
+        pass
+
+    def __init__(self, base_path, parent_path, local_files=None):
+        self.base_path = base_path
+        self.parent_path = parent_path
+        self.local_files = self.LOCAL_FILES + list(local_files or [])
+        self.path = None
+        self.git_path = None
+        self.index_path = None
+        self.checked_out = []
+        self.linked = 0
+
+    def __enter__(self):
+        self.create()
+
+        return self
+
+    def __exit__(self, *exc_info):
+        self.remove()
+
+    def is_needed(self):
+        """Check if the working tree differs from the index at all."""
+
+        return bool(
+            self.get_unstaged() or
+            self.git(['ls-files', '-z', '--others', '--exclude-standard']))
+
+    def create(self):
+
+        entries = self.get_index()
+        unstaged = self.get_unstaged()
+        # -- it cannot live in the git directory, git refuses to work there
+        exclude(self.base_path, self.parent_path)
+        os.makedirs(self.parent_path, exist_ok=True)
+        self.path = tempfile.mkdtemp(prefix='snapshot-', dir=self.parent_path)
+
+        for path, mode in entries.items():
+            if mode == GITLINK_MODE:
+                os.makedirs(os.path.join(self.path, path), exist_ok=True)
+
+            elif mode == SYMLINK_MODE or path in unstaged:
+                self.checked_out.append(path)
+
+            else:
+                self.link(path)
+
+        if self.checked_out:
+            self.git(
+                ['checkout-index', '--prefix={}{}'.format(self.path, os.sep),
+                 '-z', '--stdin'],
+                stdin='\0'.join(self.checked_out))
+
+        for path in self.local_files:
+            if path not in entries and os.path.isfile(
+                    os.path.join(self.base_path, path)):
+                self.link(path)
+
+        # -- a copy, so that git refreshing it in the snapshot does not
+        # -- touch the index of the commit in progress
+        self.git_path = self.git(['rev-parse', '--absolute-git-dir']).strip()
+        self.index_path = self.path + '.index'
+        shutil.copyfile(
+            os.path.join(
+                self.base_path,
+                self.git(['rev-parse', '--git-path', 'index']).strip()),
+            self.index_path)
+
+    def get_env(self):
+        """Environment of git commands run in the snapshot."""
+
+        return {
+            'GIT_DIR': self.git_path,
+            'GIT_WORK_TREE': self.path,
+            'GIT_INDEX_FILE': self.index_path,
+        }
+
+    def link(self, path):
+
+        source = os.path.join(self.base_path, path)
+        target = os.path.join(self.path, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.link(source, target)
+
+        # -- e.g. filesystems not supporting hardlinks
+        except OSError:
+            shutil.copy2(source, target)
+
+        self.linked += 1
+
+    def remove(self):
+
+        if self.path:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.path = None
+
+        if self.index_path:
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+
+            self.index_path = None
+
+    def get_index(self):
+        """Map staged paths to their modes, fail if there are conflicts."""
+
+        entries = {}
+        for entry in self.git(['ls-files', '-z', '--stage']).split('\0'):
+            if not entry:
+                continue
+
+            info, path = entry.split('\t', 1)
+            mode, _, stage = info.split()
+            if stage != '0':
+                raise IndexSnapshot.SnapshotError(
+                    'unmerged path: {}'.format(path))
+
+            entries[path] = mode
+
+        return entries
+
+    def get_unstaged(self):
+        """Find paths whose working tree version differs from the staged one."""
+
+        return {
+            path
+            for path in self.git(
+                ['diff', '--name-only', '-z', '--no-renames']).split('\0')
+            if path}
+
+    def git(self, args, stdin=None):
+
+        proc = subprocess.run(
+            ['git', '-c', 'core.quotepath=off'] + args,
+            cwd=self.base_path,
+            input=stdin,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True)
+        if proc.returncode != 0:
+            raise IndexSnapshot.SnapshotError(
+                'git {command} failed: {error}'.format(
+                    command=args[0], error=proc.stderr.strip()))
+
+        return proc.stdout
@@ -0,0 +1,192 @@
+
+from collections import namedtuple
+from concurrent.futures import as_completed, ThreadPoolExecutor
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+
+from lily_assistant.cli.logger import Logger
+
+
+logger = Logger()
+
+
+Commit = namedtuple('Commit', ['sha', 'tree', 'subject'])
+
+
+def get_commits(base_path, rev_range):
+    """List commits of `rev_range` from the oldest one."""
+
+    proc = subprocess.run(
+        ['git', 'log', '--reverse', '--format=%H %T %s', rev_range],
+        cwd=base_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True)
+    if proc.returncode != 0:
+        raise OSError(
+            'git log {rev_range} failed: {error}'.format(
+                rev_range=rev_range, error=proc.stderr.strip()))
+
+    return [
+        Commit(*(line.split(' ', 2) + [''])[:3])
+        for line in proc.stdout.splitlines()]
+
+
+class RangeVerifier:
+    """Run `command` against commits, each one in a worktree of the pool.
+
+    Commits are verified `jobs` at a time. Trees which already passed the
+    same command (in any worktree, in any run) are not verified again,
+    see `cache_path`. `env` is the environment of the command (e.g. with
+    the test result cache shared by all the worktrees).
+
+    """
+
+    def __init__(self, pool, command, cache_path, jobs=1, env=None):
+        self.pool = pool
+        self.command = command
+        self.cache_path = cache_path
+        self.jobs = jobs
+        self.env = env
+        self.lock = threading.Lock()
+        self.passed = self.load()
+
+    #
+    # CACHE
+    #
+    def get_key(self, commit):
+        return hashlib.sha256('{}\0{}'.format(
+            commit.tree, self.command).encode('utf-8')).hexdigest()
+
+    def load(self):
+
+        try:
+            with open(self.cache_path) as f:
+                return set(json.loads(f.read()))
+
+        except (OSError, ValueError):
+            return set()
+
+    def save(self):
+
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = self.cache_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps(sorted(self.passed)))
+
+        os.replace(tmp_path, self.cache_path)
+
+    #
+    # VERIFY
+    #
+    def verify(self, commit):
+        """Run the command against `commit`, returns `True` if it passed."""
+
+        key = self.get_key(commit)
+        if key in self.passed:
+            self.report(commit, 'PASS', 'cached')
+
+            return True
+
+        started = time.monotonic()
+        source = commit.sha[:10]
+        with self.pool.checkout(commit.sha) as worktree:
+            env = dict(self.env or os.environ)
+            env['PYTHONPATH'] = os.pathsep.join(
+                [worktree] + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+            process = subprocess.Popen(
+                ['sh', '-c', self.command],
+                cwd=worktree,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True)
+            for line in process.stdout:
+                with self.lock:
+                    logger.output(line, source, prefix='[{}] '.format(source))
+
+            passed = process.wait() == 0
+
+        with self.lock:
+            if passed:
+                logger.discard_output(source)
+                self.passed.add(key)
+
+            else:
+                logger.dump_output(source)
+
+            self.report(
+                commit,
+                'PASS' if passed else 'FAIL',
+                '{:.1f}s'.format(time.monotonic() - started))
+
+        return passed
+
+    def report(self, commit, status, details):
+
+        logger.echo(
+            '[{status}] {sha} {subject} ({details})'.format(
+                status=status,
+                sha=commit.sha[:10],
+                subject=commit.subject,
+                details=details),
+            level='info' if status == 'PASS' else 'error',
+            commit=commit.sha)
+
+    def verify_all(self, commits):
+        """Verify all `commits`, returns the first failing one (or `None`).
+
+        Once a commit fails the commits following it are not verified
+        anymore (unless they are already running).
+
+        """
+
+        failed = None
+        with ThreadPoolExecutor(self.jobs) as executor:
+            futures = {
+                executor.submit(self.verify, commit): index
+                for index, commit in enumerate(commits)}
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+
+                index = futures[future]
+                if not future.result() and (failed is None or index < failed):
+                    failed = index
+                    for other, other_index in futures.items():
+                        if other_index > index:
+                            other.cancel()
+
+        return None if failed is None else commits[failed]
+
+    def bisect(self, commits):
+        """Find the first failing commit verifying `jobs` midpoints at once.
+
+        Assumes that all the commits after the first failing one fail as
+        well (as `git bisect` does). Each round splits the remaining range
+        into `jobs + 1` parts, therefore it takes `log(n) / log(jobs + 1)`
+        rounds.
+
+        """
+
+        good, bad = -1, len(commits)
+        with ThreadPoolExecutor(self.jobs) as executor:
+            while bad - good > 1:
+                count = min(self.jobs, bad - good - 1)
+                points = [
+                    good + (bad - good) * (i + 1) // (count + 1)
+                    for i in range(count)]
+                results = executor.map(
+                    lambda point: self.verify(commits[point]), points)
+                for point, passed in zip(points, list(results)):
+                    if not passed:
+                        bad = point
+                        break
+
+                    good = point
+
+        return commits[bad] if bad < len(commits) else None
@@ -0,0 +1,109 @@
+
+import contextlib
+import os
+import queue
+import shutil
+import subprocess
+import threading
+
+
+class WorktreePool:
+    """Pool of at most `size` reusable detached git worktrees.
+
+    Worktrees live in `path` (by default `lily/worktrees/<index>` in the
+    git directory, so they are never seen as untracked files of the
+    project) and survive the run, therefore next time only the files
+    which differ between the commits get checked out and all the caches
+    kept inside of the worktrees (ignored files are never cleaned) are
+    still there.
+
+    """
+
+    class WorktreeError(Exception):
+        pass
+
+    def __init__(self, base_path, size, path=None):
+        self.base_path = base_path
+        self.size = size
+        self.path = path
+        self.free = queue.Queue()
+        self.created = 0
+        self.lock = threading.Lock()
+        self.prepared = False
+
+    def prepare(self):
+        """Forget worktrees removed by hand, reuse the existing ones."""
+
+        self.git(['worktree', 'prune'])
+        if self.path is None:
+            # -- shared by the linked worktrees of the project as well
+            self.path = os.path.join(
+                self.base_path,
+                self.git(['rev-parse', '--git-common-dir']).strip(),
+                'lily',
+                'worktrees')
+
+        os.makedirs(self.path, exist_ok=True)
+        self.prepared = True
+
+    @contextlib.contextmanager
+    def checkout(self, commit):
+        """Check out `commit` in a free worktree and yield its path."""
+
+        worktree = self.acquire()
+        try:
+            self.git(
+                ['checkout', '--detach', '--force', '--quiet', commit],
+                cwd=worktree)
+            self.git(['clean', '-d', '--force', '--quiet'], cwd=worktree)
+
+            yield worktree
+
+        finally:
+            self.free.put(worktree)
+
+    def acquire(self):
+
+        try:
+            return self.free.get_nowait()
+
+        except queue.Empty:
+            pass
+
+        with self.lock:
+            if not self.prepared:
+                self.prepare()
+
+            if self.created < self.size:
+                worktree = os.path.join(self.path, str(self.created))
+                self.created += 1
+                self.create(worktree)
+
+                return worktree
+
+        return self.free.get()
+
+    def create(self, worktree):
+
+        if os.path.exists(os.path.join(worktree, '.git')):
+            return
+
+        if os.path.exists(worktree):
+            shutil.rmtree(worktree)
+
+        self.git(['worktree', 'add', '--detach', '--quiet', worktree, 'HEAD'])
+
+    def git(self, args, cwd=None):
+
+        proc = subprocess.run(
+            ['git'] + args,
+            cwd=cwd or self.base_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True)
+        if proc.returncode != 0:
+            raise WorktreePool.WorktreeError(
+                'git {command} failed:\n\n{output}'.format(
+                    command=' '.join(args[:2]), output=proc.stdout.strip()))
+
+        return proc.stdout
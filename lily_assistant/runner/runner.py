@@ -0,0 +1,291 @@
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import hashlib
+import json
+import os
+import re
+import subprocess
+import threading
+
+from lily_assistant.cli.logger import Logger
+from lily_assistant.config import Config
+
+
+logger = Logger()
+
+
+class Runner:
+    """Run graph of tasks natively, without spawning `make` for each step.
+
+    - `env.sh` is sourced only once per run,
+    - tasks which do not depend on each other are run concurrently,
+    - tasks with declared inputs are skipped if the inputs hash the same
+      as during their last successful run (and so are the lifecycle steps,
+      e.g. `test_setup`, around them),
+    - tasks overwritten in the project's `Makefile` are delegated to
+      `make <task>` so that the user's overrides are still respected, and
+      so are the plain values it assigns to the environment variables the
+      tasks depend on (e.g. `TEST_COVERAGE_THRESHOLD := 95`).
+
+    """
+
+    TARGET_REGEX = re.compile(r'^([A-Za-z0-9_.\-]+)\s*:(?!=)', re.MULTILINE)
+
+    VARIABLE_REGEX = re.compile(
+        r'^(?:override\s+)?([A-Za-z0-9_]+)\s*(\?=|:{0,2}=)[ \t]*(.*?)\s*$',
+        re.MULTILINE)
+
+    class TaskFailed(Exception):
+        pass
+
+    def __init__(self, tasks, force=False, workers=None):
+        self.tasks = {task.name: task for task in tasks}
+        self.force = force
+        self.workers = workers or os.cpu_count() or 1
+        self.base_path = Config.get_project_path()
+        self.state_path = os.path.join(Config.get_cache_path(), 'run.json')
+        self.state = self.load_state()
+        self.output_lock = threading.Lock()
+        self.env = None
+        self.overrides = None
+        self.skipped = None
+
+    #
+    # STATE
+    #
+    def load_state(self):
+
+        try:
+            with open(self.state_path) as f:
+                state = json.loads(f.read())
+
+        except (OSError, ValueError):
+            state = {}
+
+        state.setdefault('tasks', {})
+        state.setdefault('files', {})
+
+        return state
+
+    def save_state(self):
+
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        with open(self.state_path, 'w') as f:
+            f.write(json.dumps(self.state))
+
+    def hash_file(self, path):
+        """Content hash of the file, reused as long as it's not modified."""
+
+        stat = os.stat(os.path.join(self.base_path, path))
+        key = [stat.st_mtime_ns, stat.st_size]
+        cached = self.state['files'].get(path)
+        if cached and cached[:2] == key:
+            return cached[2]
+
+        with open(os.path.join(self.base_path, path), 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+
+        self.state['files'][path] = key + [digest]
+
+        return digest
+
+    #
+    # ENVIRONMENT
+    #
+    def load_env(self):
+        """Source `env.sh` once and capture the resulting environment."""
+
+        env_path = os.path.join(self.base_path, 'env.sh')
+        if not os.path.exists(env_path):
+            return dict(os.environ)
+
+        output = subprocess.check_output(
+            ['bash', '-c', 'source env.sh && env -0'],
+            cwd=self.base_path)
+
+        env = {}
+        for entry in output.split(b'\0'):
+            name, sep, value = entry.partition(b'=')
+            if sep:
+                env[name.decode('utf-8')] = value.decode(
+                    'utf-8', errors='replace')
+
+        return env
+
+    @classmethod
+    def load_overrides(cls):
+        """Names of targets defined in the project's own `Makefile`."""
+
+        makefile_path = os.path.join(Config.get_project_path(), 'Makefile')
+        if not os.path.exists(makefile_path):
+            return set()
+
+        with open(makefile_path) as f:
+            return set(cls.TARGET_REGEX.findall(f.read()))
+
+    def apply_variables(self, env):
+        """Apply values the project's `Makefile` gives to variables of tasks.
+
+        Like in `make` they win over the environment, unless assigned with
+        `?=`. Values referring to other variables are left to `make`.
+
+        """
+
+        names = {name for task in self.tasks.values() for name in task.env}
+        makefile_path = os.path.join(self.base_path, 'Makefile')
+        if not names or not os.path.exists(makefile_path):
+            return env
+
+        with open(makefile_path) as f:
+            content = f.read()
+
+        env = dict(env)
+        for name, operator, value in self.VARIABLE_REGEX.findall(content):
+            if name not in names or '$' in value:
+                continue
+
+            if operator != '?=' or name not in env:
+                env[name] = value
+
+        return env
+
+    def get_skipped(self):
+        """Find tasks whose inputs did not change since their last run.
+
+        Lifecycle steps (tasks without a command of their own, even if
+        overwritten) are skipped as well if all the tasks they surround
+        are skipped, e.g. there is no point in `test_setup` if the tests
+        are up to date.
+
+        """
+
+        if self.force:
+            return set()
+
+        skipped = set()
+        for task in self.tasks.values():
+            if (
+                    task.name not in self.overrides and
+                    task.command is not None and
+                    task.inputs and
+                    self.state['tasks'].get(task.name) == task.get_digest(
+                        self.base_path, self.hash_file, self.env)):
+                skipped.add(task.name)
+
+        for task in self.tasks.values():
+            if task.command is not None:
+                continue
+
+            surrounded = {
+                name
+                for name in set(task.deps) | {
+                    other.name
+                    for other in self.tasks.values()
+                    if task.name in other.deps}
+                if name in self.tasks and self.tasks[name].command is not None}
+            if surrounded and surrounded <= skipped:
+                skipped.add(task.name)
+
+        return skipped
+
+    #
+    # RUN
+    #
+    def run(self):
+
+        self.env = self.apply_variables(self.load_env())
+        self.overrides = self.load_overrides()
+        self.skipped = self.get_skipped()
+
+        done, failed = set(), []
+        running = {}
+        with ThreadPoolExecutor(self.workers) as executor:
+            while True:
+                if not failed:
+                    for task in self.tasks.values():
+                        if (
+                                task.name not in done and
+                                task.name not in running.values() and
+                                all(d in done for d in task.deps)):
+                            future = executor.submit(self.run_task, task)
+                            running[future] = task.name
+
+                if not running:
+                    break
+
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        future.result()
+                        done.add(name)
+
+                    except Runner.TaskFailed as e:
+                        failed.append(e)
+
+        self.save_state()
+
+        if failed:
+            raise failed[0]
+
+        pending = set(self.tasks) - done
+        if pending:
+            raise Runner.TaskFailed(
+                'unresolved dependencies of: {}'.format(
+                    ', '.join(sorted(pending))))
+
+    def run_task(self, task):
+
+        if task.name in self.skipped:
+            if task.command is not None:
+                self.echo(task.name, 'up to date, skipping')
+
+            return
+
+        if task.name in self.overrides:
+            command = ['make', task.name]
+            digest = None
+
+        elif task.command is None:
+            return
+
+        else:
+            command = task.command
+            digest = (
+                task.get_digest(self.base_path, self.hash_file, self.env)
+                if task.inputs else None)
+
+        self.echo(task.name, ' '.join(command))
+        process = subprocess.Popen(
+            command,
+            cwd=self.base_path,
+            env=self.env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True)
+
+        for line in process.stdout:
+            with self.output_lock:
+                logger.output(
+                    line, task.name, prefix='[{}] '.format(task.name))
+
+        if process.wait() != 0:
+            with self.output_lock:
+                logger.dump_output(task.name)
+
+            self.state['tasks'].pop(task.name, None)
+            raise Runner.TaskFailed(
+                '{name} returned exit code: {code}'.format(
+                    name=task.name, code=process.returncode))
+
+        with self.output_lock:
+            logger.discard_output(task.name)
+
+        if digest:
+            self.state['tasks'][task.name] = digest
+
+    def echo(self, name, line):
+
+        with self.output_lock:
+            logger.echo(
+                '[{name}] {line}'.format(name=name, line=line), fg='', task=name)
@@ -0,0 +1,163 @@
+
+import shlex
+
+from lily_assistant.config import Config
+from .task import Task
+
+
+FLAKE8_IGNORE = (
+    'N818,D100,D101,D102,D103,D104,D105,D106,D107,D202,D204,W504,W606')
+
+# -- resolved by the shell of the task, therefore after `env.sh` (and the
+# -- value given in the project's `Makefile`, see `Runner`) is applied
+THRESHOLD_ENV = 'TEST_COVERAGE_THRESHOLD'
+
+FAIL_UNDER = '--cov-fail-under="${TEST_COVERAGE_THRESHOLD:-90}"'
+
+
+def shell(command):
+    """Run `command` by the shell so that `FAIL_UNDER` gets expanded."""
+
+    return [
+        'sh', '-c',
+        ' '.join(
+            arg if arg == FAIL_UNDER else shlex.quote(arg)
+            for arg in command),
+    ]
+
+
+def get_targets(args=None, overrides=None):
+    """Targets of `.lily/lily_assistant.makefile` understood natively.
+
+    :param args: extra arguments passed to the `test` target (the same as
+        `tests` variable of `make test tests=...`)
+    :param overrides: names of targets overwritten in the project's
+        `Makefile`, overwritten targets are run by `make` as a whole
+
+    """
+
+    src_dir = Config().src_dir
+    overrides = overrides or set()
+
+    # -- every file (package data, templates, fixtures, ...) counts, not
+    # -- only the python modules
+    lint_config = ['.flake8', 'setup.cfg', 'tox.ini']
+    test_inputs = [
+        src_dir,
+        'tests',
+        'conftest.py',
+        'env.sh',
+        'pytest.ini',
+        'setup.cfg',
+        'tox.ini',
+        'pyproject.toml',
+        '.coveragerc',
+        'requirements.txt',
+        'test-requirements.txt',
+    ]
+
+    def target(name, tasks):
+        """Replace `tasks` with `make <name>` if the target is overwritten."""
+
+        return [Task(name)] if name in overrides else tasks
+
+    def lint(name, path):
+        return Task(
+            name,
+            [
+                'flake8',
+                '--max-line-length', '100',
+                '--ignore', FLAKE8_IGNORE,
+                path,
+            ],
+            inputs=[path] + lint_config)
+
+    def pytest(name, paths, deps, fail_under=True):
+        command = [
+            'py.test',
+            '-p', 'lily_assistant.testing.tracker',
+            '--cov={}'.format(src_dir),
+        ] + ([FAIL_UNDER] if fail_under else []) + [
+            '-r', 'w', '-s', '-vv',
+        ] + list(paths)
+
+        return Task(
+            name,
+            shell(command) if fail_under else command,
+            deps=deps,
+            inputs=test_inputs,
+            env=[THRESHOLD_ENV] if fail_under else [])
+
+    def upgrade_version(upgrade_type):
+        return [
+            Task('upgrade_version_setup'),
+            Task(
+                'lily_assistant_upgrade_version_{}'.format(
+                    upgrade_type.lower()),
+                ['lily_assistant', 'upgrade-version', upgrade_type],
+                deps=['upgrade_version_setup']),
+            Task(
+                'upgrade_version_post_upgrade',
+                deps=[
+                    'lily_assistant_upgrade_version_{}'.format(
+                        upgrade_type.lower()),
+                ]),
+            Task(
+                'lily_assistant_push_upgraded_version',
+                ['lily_assistant', 'push-upgraded-version'],
+                deps=['upgrade_version_post_upgrade']),
+            Task(
+                'upgrade_version_teardown',
+                deps=['lily_assistant_push_upgraded_version']),
+        ]
+
+    lint_tasks = [
+        lint('lint_tests', 'tests'),
+        lint('lint_src', src_dir),
+    ]
+    test_all_tasks = [
+        Task('test_setup'),
+        pytest('lily_assistant_test_all', ['tests'], ['test_setup']),
+        Task('test_teardown', deps=['lily_assistant_test_all']),
+    ]
+
+    return {
+        'lint': target('lint', lint_tasks),
+        'test': target('test', [
+            Task('assert_test_setup_was_run'),
+            Task(
+                'lily_assistant_test',
+                shell([
+                    'lily_assistant', 'test',
+                    '--cov={}'.format(src_dir),
+                    FAIL_UNDER,
+                    '-r', 'w', '-s', '-vv',
+                ] + list(args or [])),
+                deps=['assert_test_setup_was_run'],
+                env=[THRESHOLD_ENV]),
+        ]),
+        'test_diff_coverage': target('test_diff_coverage', [
+            Task('assert_test_setup_was_run'),
+            pytest(
+                'lily_assistant_test_diff_coverage',
+                args or [],
+                ['assert_test_setup_was_run'],
+                fail_under=False),
+            # -- `coverage diff` reads the threshold from the environment
+            Task(
+                'lily_assistant_diff_coverage',
+                ['lily_assistant', 'coverage', 'diff'],
+                deps=['lily_assistant_test_diff_coverage'],
+                env=[THRESHOLD_ENV]),
+        ]),
+        'test_all': target('test_all', test_all_tasks),
+        'check': (
+            target('lint', lint_tasks) +
+            target('test_all', test_all_tasks)),
+        'upgrade_version_patch': target(
+            'upgrade_version_patch', upgrade_version('PATCH')),
+        'upgrade_version_minor': target(
+            'upgrade_version_minor', upgrade_version('MINOR')),
+        'upgrade_version_major': target(
+            'upgrade_version_major', upgrade_version('MAJOR')),
+    }
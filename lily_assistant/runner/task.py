@@ -0,0 +1,78 @@
+
+import glob
+import hashlib
+import os
+
+
+def walk_files(path):
+    """Yield all the files under `path` except of the generated ones.
+
+    Bytecode (and `__pycache__`) and hidden directories (`.mypy_cache`
+    and alike) are written by the very tools run by the tasks, hidden
+    files (e.g. `.flake8`) are kept.
+
+    """
+
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [
+            name
+            for name in dirs
+            if name != '__pycache__' and not name.startswith('.')]
+        for name in files:
+            if not name.endswith(('.pyc', '.pyo')):
+                yield os.path.join(root, name)
+
+
+class Task:
+    """Single step of a target.
+
+    :param name: name of the step (the same as the name of the makefile
+        target it replaces, so that it can be overwritten by the user)
+    :param command: command to execute (list of arguments), `None` for the
+        lifecycle placeholders which do nothing unless overwritten
+    :param deps: names of tasks which must succeed before this one
+    :param inputs: glob patterns of files (or directories, standing for all
+        the files in them) the result depends on, the task is skipped if
+        they hash the same as during its last successful run
+    :param env: names of environment variables the result depends on as
+        well (e.g. thresholds resolved by the shell of the command)
+
+    """
+
+    def __init__(self, name, command=None, deps=None, inputs=None, env=None):
+        self.name = name
+        self.command = command
+        self.deps = deps or []
+        self.inputs = inputs or []
+        self.env = env or []
+
+    def get_input_paths(self, base_path):
+
+        paths = set()
+        for pattern in self.inputs:
+            path = os.path.join(base_path, pattern)
+            if os.path.isdir(path):
+                paths.update(
+                    os.path.relpath(p, base_path) for p in walk_files(path))
+
+            else:
+                paths.update(
+                    os.path.relpath(p, base_path)
+                    for p in glob.glob(path, recursive=True)
+                    if os.path.isfile(p))
+
+        return sorted(paths)
+
+    def get_digest(self, base_path, hash_file, env=None):
+        """Hash of the command, its variables of `env` and its inputs."""
+
+        digest = hashlib.sha256()
+        digest.update(repr(self.command).encode('utf-8'))
+        for name in self.env:
+            digest.update(repr((name, (env or {}).get(name))).encode('utf-8'))
+
+        for path in self.get_input_paths(base_path):
+            digest.update(path.encode('utf-8'))
+            digest.update(hash_file(path).encode('utf-8'))
+
+        return digest.hexdigest()
@@ -0,0 +1,167 @@
+
+import glob
+import hashlib
+import os
+import platform
+import sys
+
+
+class ResultCache:
+    """Bounded on-disk store of the keys of passing test modules.
+
+    Each entry is a tiny file named after the key, its `mtime` tells when
+    the entry was last used. Once there are more than `max_entries`
+    entries the least recently used ones are evicted.
+
+    """
+
+    MAX_ENTRIES = 4096
+
+    def __init__(self, path, max_entries=None):
+        self.path = path
+        self.max_entries = max_entries or self.MAX_ENTRIES
+
+    def get_entry_path(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+    def contains(self, key):
+
+        entry_path = self.get_entry_path(key)
+        try:
+            # -- mark as recently used
+            os.utime(entry_path)
+
+        except OSError:
+            return False
+
+        return True
+
+    def add(self, key, module):
+
+        entry_path = self.get_entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        with open(entry_path, 'w') as f:
+            f.write(module)
+
+    def evict(self):
+        """Remove the least recently used entries above the limit."""
+
+        entries = []
+        for entry_path in glob.glob(os.path.join(self.path, '*', '*')):
+            try:
+                entries.append((os.stat(entry_path).st_mtime_ns, entry_path))
+
+            except OSError:
+                pass
+
+        entries.sort(reverse=True)
+        for _, entry_path in entries[self.max_entries:]:
+            try:
+                os.remove(entry_path)
+
+            except OSError:
+                pass
+
+
+class KeyBuilder:
+    """Content-addressed keys of the test modules.
+
+    The key of a module is the hash of:
+    - its own content and the content of all in-project modules it
+      (transitively) imports,
+    - the `conftest.py` files applying to it,
+    - the environment fingerprint (interpreter, installed distributions
+      and the test configuration files).
+
+    """
+
+    CONFIG_FILES = (
+        'env.sh',
+        'pytest.ini',
+        'setup.cfg',
+        'tox.ini',
+        'pyproject.toml',
+    )
+
+    def __init__(self, base_path, import_graph):
+        self.base_path = base_path
+        self.import_graph = import_graph
+        self._hashes = {}
+        self._fingerprint = None
+
+    def hash_file(self, path):
+
+        if path not in self._hashes:
+            try:
+                with open(os.path.join(self.base_path, path), 'rb') as f:
+                    self._hashes[path] = hashlib.sha256(f.read()).hexdigest()
+
+            except OSError:
+                self._hashes[path] = None
+
+        return self._hashes[path]
+
+    @property
+    def fingerprint(self):
+
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            digest.update(sys.version.encode('utf-8'))
+            digest.update(sys.executable.encode('utf-8'))
+            digest.update(platform.platform().encode('utf-8'))
+            for name in self.get_distributions():
+                digest.update(name.encode('utf-8'))
+
+            for path in self.CONFIG_FILES:
+                digest.update('{}:{}'.format(
+                    path, self.hash_file(path)).encode('utf-8'))
+
+            self._fingerprint = digest.hexdigest()
+
+        return self._fingerprint
+
+    def get_distributions(self):
+        """Names of the installed distributions (including versions).
+
+        Listing of the `*.dist-info` / `*.egg-info` entries is enough and
+        way cheaper than asking `importlib.metadata`.
+
+        """
+
+        names = []
+        for entry in sys.path:
+            try:
+                names.extend(
+                    name
+                    for name in os.listdir(entry or '.')
+                    if name.endswith(('.dist-info', '.egg-info', '.egg-link')))
+
+            except OSError:
+                pass
+
+        return sorted(names)
+
+    def get_conftests(self, path):
+
+        conftests = []
+        parts = path.split(os.sep)[:-1]
+        for index in range(len(parts) + 1):
+            conftest = os.path.join(*(parts[:index] + ['conftest.py']))
+            if os.path.isfile(os.path.join(self.base_path, conftest)):
+                conftests.append(conftest)
+
+        return conftests
+
+    def get_key(self, path):
+
+        path = self.import_graph.normalize(path)
+        dependencies = set()
+        for module in [path] + self.get_conftests(path):
+            dependencies.update(self.import_graph.get_dependencies(module))
+
+        digest = hashlib.sha256(self.fingerprint.encode('utf-8'))
+        for dependency in sorted(dependencies):
+            digest.update('{}:{}\n'.format(
+                dependency, self.hash_file(dependency)).encode('utf-8'))
+
+        return digest.hexdigest()
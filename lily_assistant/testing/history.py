@@ -0,0 +1,161 @@
+
+import os
+
+
+class History:
+    """Append-only history of the results of the tests.
+
+    Each run appends one line per test with the tab separated `run`, the
+    values of the result (see `FIELDS`) and `nodeid`. Once the file grows
+    above `max_size` bytes it's compacted to the last `max_runs` results of
+    each test.
+
+    """
+
+    # -- `(parse, template)` of each value of the results
+    FIELDS = []
+
+    MAX_SIZE = 4 * 1024 * 1024
+
+    MAX_RUNS = 20
+
+    def __init__(self, path, max_size=None, max_runs=None):
+        self.path = path
+        self.max_size = max_size or self.MAX_SIZE
+        self.max_runs = max_runs or self.MAX_RUNS
+
+    def format(self, run, values, nodeid):
+
+        return '\t'.join(
+            [str(run)] +
+            [
+                template.format(value)
+                for (_, template), value in zip(self.FIELDS, values)] +
+            [nodeid]) + '\n'
+
+    def append(self, run, results):
+        """Append `results` (list of `(nodeid, *values)`)."""
+
+        if not results:
+            return
+
+        lines = ''.join(
+            self.format(run, values, nodeid)
+            for nodeid, *values in results)
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(lines)
+
+        if os.path.getsize(self.path) > self.max_size:
+            self.compact()
+
+    def read(self):
+        """Results grouped by test: `{nodeid: [(run, *values)]}`.
+
+        Results of each test are ordered from the oldest to the newest.
+
+        """
+
+        count = len(self.FIELDS) + 2
+        tests = {}
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    parts = line.rstrip('\n').split('\t', count - 1)
+                    if len(parts) != count:
+                        continue
+
+                    run, *values, nodeid = parts
+                    try:
+                        tests.setdefault(nodeid, []).append((int(run),) + tuple(
+                            parse(value)
+                            for (parse, _), value in zip(self.FIELDS, values)))
+
+                    except ValueError:
+                        continue
+
+        except FileNotFoundError:
+            pass
+
+        return tests
+
+    def compact(self):
+
+        records = sorted(
+            (result, nodeid)
+            for nodeid, results in self.read().items()
+            for result in results[-self.max_runs:])
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(''.join(
+                self.format(result[0], result[1:], nodeid)
+                for result, nodeid in records))
+
+        os.replace(tmp_path, self.path)
+
+
+class ResultHistory(History):
+    """History of durations and outcomes of the tests.
+
+    Results are `(outcome, duration)` where `outcome` is one of `p`
+    (passed), `f` (failed) and `s` (skipped).
+
+    """
+
+    FIELDS = [(str, '{}'), (float, '{:.4f}')]
+
+    PASSED = 'p'
+
+    FAILED = 'f'
+
+    SKIPPED = 's'
+
+    def get_slowest(self, count=10):
+        """Find tests with the highest mean duration of their recent runs.
+
+        Returns list of `(nodeid, mean_duration, last_duration)`.
+
+        """
+
+        slowest = []
+        for nodeid, results in self.read().items():
+            durations = [
+                duration
+                for _, outcome, duration in results[-self.max_runs:]
+                if outcome != self.SKIPPED]
+            if durations:
+                slowest.append((
+                    nodeid,
+                    sum(durations) / len(durations),
+                    durations[-1]))
+
+        slowest.sort(key=lambda test: (-test[1], test[0]))
+
+        return slowest[:count]
+
+    def get_flaky(self, count=10):
+        """Find tests which both passed and failed in their recent runs.
+
+        The more often the outcome flips between consecutive runs the more
+        flaky the test is. Returns list of `(nodeid, flips, failures, runs)`.
+
+        """
+
+        flaky = []
+        for nodeid, results in self.read().items():
+            outcomes = [
+                outcome
+                for _, outcome, _ in results[-self.max_runs:]
+                if outcome != self.SKIPPED]
+            failures = outcomes.count(self.FAILED)
+            if 0 < failures < len(outcomes):
+                flips = sum(
+                    1 for previous, current in zip(outcomes, outcomes[1:])
+                    if previous != current)
+                flaky.append((nodeid, flips, failures, len(outcomes)))
+
+        flaky.sort(key=lambda test: (-test[1], -test[2], test[0]))
+
+        return flaky[:count]
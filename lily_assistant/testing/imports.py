@@ -0,0 +1,109 @@
+
+import ast
+import os
+
+
+class ImportGraph:
+    """Static graph of imports between the modules of the project.
+
+    Imports are found in the AST of each module (so nothing gets imported)
+    and resolved against the project root, therefore only in-project
+    modules take part in the graph. Importing `a.b.c` depends on
+    `a/__init__.py`, `a/b/__init__.py` and `a/b/c.py` (or
+    `a/b/c/__init__.py`) since all of them are executed.
+
+    Imports placed inside of functions are taken into account as well, it
+    errs on the side of invalidating too much.
+
+    """
+
+    def __init__(self, base_path):
+        self.base_path = base_path
+        self._imports = {}
+
+    def get_dependencies(self, path):
+        """Relative paths of `path` and all modules it transitively imports."""
+
+        path = self.normalize(path)
+        seen, pending = set(), [path]
+        while pending:
+            current = pending.pop()
+            if current in seen:
+                continue
+
+            seen.add(current)
+            pending.extend(self.get_imports(current) - seen)
+
+        return seen
+
+    def normalize(self, path):
+        return os.path.relpath(
+            os.path.join(self.base_path, path), self.base_path)
+
+    def get_imports(self, path):
+        """Relative paths of in-project modules imported directly by `path`."""
+
+        if path not in self._imports:
+            self._imports[path] = self.find_imports(path)
+
+        return self._imports[path]
+
+    def invalidate(self, paths):
+        """Forget the imports of `paths` (e.g. after they were modified)."""
+
+        for path in paths:
+            self._imports.pop(self.normalize(path), None)
+
+    def find_imports(self, path):
+
+        try:
+            with open(os.path.join(self.base_path, path), 'rb') as f:
+                tree = ast.parse(f.read())
+
+        except (OSError, SyntaxError, ValueError):
+            return set()
+
+        # -- package the relative imports are resolved against
+        package = path.split(os.sep)[:-1]
+        imports = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    imports.update(self.resolve(alias.name.split('.')))
+
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    if node.level - 1 > len(package):
+                        continue
+
+                    parts = package[:len(package) - node.level + 1]
+
+                else:
+                    parts = []
+
+                parts = parts + (node.module.split('.') if node.module else [])
+                imports.update(self.resolve(parts))
+
+                # -- `from a import b` where `b` might be a submodule
+                for alias in node.names:
+                    if alias.name != '*':
+                        imports.update(
+                            self.resolve(parts + [alias.name], parents=False))
+
+        imports.discard(path)
+
+        return imports
+
+    def resolve(self, parts, parents=True):
+
+        paths = set()
+        for index in range(1 if parents else len(parts), len(parts) + 1):
+            relative = os.path.join(*parts[:index])
+            for candidate in (
+                    relative + '.py',
+                    os.path.join(relative, '__init__.py')):
+                if os.path.isfile(os.path.join(self.base_path, candidate)):
+                    paths.add(candidate)
+                    break
+
+        return paths
@@ -0,0 +1,234 @@
+
+import gc
+import os
+import statistics
+import time
+import tracemalloc
+
+import _pytest
+import pluggy
+import pytest
+
+from lily_assistant.config import Config
+from .history import History
+
+
+def format_size(size):
+
+    for unit in ['B', 'KiB', 'MiB']:
+        if abs(size) < 1024:
+            return '{:.1f}{}'.format(size, unit)
+
+        size /= 1024.0
+
+    return '{:.1f}GiB'.format(size)
+
+
+def get_history_path():
+    return os.path.join(Config.get_cache_path(), 'memory_history')
+
+
+class MemoryHistory(History):
+    """History of the peak and retained memory of the tests.
+
+    Results are `(peak, retained)`, both in bytes.
+
+    """
+
+    FIELDS = [(int, '{}'), (int, '{}')]
+
+    def get_baselines(self):
+        """Median peak of the recent runs of each test: `{nodeid: peak}`."""
+
+        return {
+            nodeid: statistics.median(
+                peak for _, peak, _ in results[-self.max_runs:])
+            for nodeid, results in self.read().items()}
+
+    def get_largest(self, count=10):
+        """Find tests with the highest median peak of their recent runs.
+
+        Returns list of `(nodeid, median_peak, last_peak, last_retained)`.
+
+        """
+
+        largest = [
+            (
+                nodeid,
+                statistics.median(peak for _, peak, _ in results[-self.max_runs:]),
+                results[-1][1],
+                results[-1][2])
+            for nodeid, results in self.read().items()]
+        largest.sort(key=lambda test: (-test[1], test[0]))
+
+        return largest[:count]
+
+
+class MemoryPlugin:
+    """Track the peak and retained memory allocated by each test.
+
+    Tracing is restarted before each test, therefore only the blocks
+    allocated by the test (its setup, call and teardown) are traced. The
+    peak is the highest traced memory during the test, the retained
+    memory is the one still allocated after its teardown (and a garbage
+    collection).
+
+    A test is flagged if its peak grew by more than `threshold` percent
+    (and at least by `min_growth` bytes) comparing to the median peak of
+    its recent runs. The top allocation sites of the flagged tests are the
+    ones of the blocks still alive at the end of their call phase (e.g.
+    kept by fixtures or leaked), tracemalloc can't tell where the blocks
+    freed before came from.
+
+    """
+
+    def __init__(
+            self,
+            history,
+            base_path,
+            threshold=20.0,
+            min_growth=256 * 1024,
+            top=5,
+            frames=1):
+        self.history = history
+        self.base_path = os.path.abspath(base_path) + os.sep
+        self.threshold = threshold
+        self.min_growth = min_growth
+        self.top = top
+        self.frames = frames
+        self.baselines = {}
+        self.results = {}
+        self.sites = {}
+        self.flagged = []
+
+    def get_limit(self, nodeid):
+
+        baseline = self.baselines.get(nodeid)
+        if baseline is None:
+            return None
+
+        return baseline + max(baseline * self.threshold / 100.0, self.min_growth)
+
+    def pytest_sessionstart(self, session):
+        self.baselines = self.history.get_baselines()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+
+        tracemalloc.stop()
+        tracemalloc.start(self.frames)
+        try:
+            yield
+
+        finally:
+            gc.collect()
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.results[item.nodeid] = (peak, retained)
+
+            limit = self.get_limit(item.nodeid)
+            if limit is not None and peak > limit:
+                self.flagged.append(
+                    (item.nodeid, peak, self.baselines[item.nodeid], retained))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+
+        yield
+
+        # -- taken only for the tests already over their limit, the snapshot
+        # -- is cheap since only blocks of the current test are traced
+        limit = self.get_limit(item.nodeid)
+        if (
+                limit is not None and
+                tracemalloc.is_tracing() and
+                tracemalloc.get_traced_memory()[1] > limit):
+            self.sites[item.nodeid] = self.get_sites(
+                tracemalloc.take_snapshot())
+
+    def get_sites(self, snapshot):
+        """Top allocation sites as `(location, size, count)`."""
+
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ] + [
+            tracemalloc.Filter(False, os.path.join(
+                os.path.dirname(os.path.abspath(module.__file__)), '*'))
+            for module in [_pytest, pluggy]
+        ])
+
+        sites = []
+        for stat in snapshot.statistics('lineno')[:self.top]:
+            frame = stat.traceback[0]
+            path = os.path.abspath(frame.filename)
+            if path.startswith(self.base_path):
+                path = path[len(self.base_path):]
+
+            sites.append((
+                '{path}:{line}'.format(path=path, line=frame.lineno),
+                stat.size,
+                stat.count))
+
+        return sites
+
+    def pytest_sessionfinish(self, session, exitstatus):
+
+        self.history.append(int(time.time()), [
+            (nodeid, peak, retained)
+            for nodeid, (peak, retained) in self.results.items()])
+
+    def pytest_terminal_summary(self, terminalreporter):
+
+        if not self.flagged:
+            return
+
+        terminalreporter.section('lily_assistant memory', yellow=True)
+        self.flagged.sort(key=lambda test: -(test[1] - test[2]))
+        for nodeid, peak, baseline, retained in self.flagged:
+            terminalreporter.write_line(
+                '{nodeid}: peak {peak} (baseline {baseline}, {change:+.0f}%), '
+                'retained {retained}'.format(
+                    nodeid=nodeid,
+                    peak=format_size(peak),
+                    baseline=format_size(baseline),
+                    change=100.0 * (peak / baseline - 1) if baseline else 100,
+                    retained=format_size(retained)))
+            for location, size, count in self.sites.get(nodeid, []):
+                terminalreporter.write_line(
+                    '    {size:>10}  {count:7d} blocks  {location}'.format(
+                        size=format_size(size),
+                        count=count,
+                        location=location))
+
+
+def pytest_addoption(parser):
+
+    group = parser.getgroup('lily_assistant')
+    group.addoption(
+        '--lily-memory',
+        action='store_true',
+        default=False,
+        help='track the peak and retained memory of each test')
+    group.addoption(
+        '--lily-memory-threshold',
+        type=float,
+        default=20.0,
+        help=(
+            'flag tests whose peak grew by more than this percent '
+            '(default: 20)'))
+
+
+def pytest_configure(config):
+
+    if not config.getoption('lily_memory') or config.getoption(
+            'collectonly'):
+        return
+
+    config.pluginmanager.register(
+        MemoryPlugin(
+            MemoryHistory(get_history_path()),
+            Config.get_project_path(),
+            threshold=config.getoption('lily_memory_threshold')),
+        'lily_assistant_memory')
@@ -0,0 +1,42 @@
+# -- imported by the CLI itself (validation of `--shard`), therefore free of
+# -- `pytest` and of the plugins: `py.test` warns about the modules of `-p`
+# -- plugins imported before it starts since it cannot rewrite them
+
+
+def parse_shard(value):
+    """Parse `i/N` into `(i, N)` with `1 <= i <= N`."""
+
+    try:
+        index, count = (int(part) for part in value.split('/'))
+
+    except ValueError:
+        raise ValueError(
+            'shard must be given as i/N (e.g. 1/4), got: {}'.format(value))
+
+    if not 1 <= index <= count:
+        raise ValueError(
+            'shard index must be between 1 and {count}, got: {index}'.format(
+                count=count, index=index))
+
+    return index, count
+
+
+def split(weights, count):
+    """Split units into `count` bins of similar total weight.
+
+    Greedy bin packing: the heaviest units go first, each one to the
+    currently lightest bin. Ties are resolved by the unit's name and the
+    bin's index, therefore the split is deterministic.
+
+    :param weights: `{unit: weight}`
+
+    """
+
+    bins = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for unit in sorted(weights, key=lambda unit: (-weights[unit], unit)):
+        index = min(range(count), key=lambda index: (loads[index], index))
+        bins[index].append(unit)
+        loads[index] += weights[unit]
+
+    return bins
@@ -0,0 +1,160 @@
+
+import os
+
+import pytest
+
+from lily_assistant.config import Config
+from .cache import KeyBuilder, ResultCache
+from .imports import ImportGraph
+
+
+# -- pytest's exit code of the session without any tests run
+NO_TESTS_COLLECTED = 5
+
+
+def get_module(nodeid):
+    return os.path.normpath(nodeid.split('::')[0])
+
+
+class CachePlugin:
+    """Skip test modules which already passed in the very same state.
+
+    A module is skipped (reported as a "cached pass") if its key (see
+    `KeyBuilder`) is found in the `ResultCache`. Only modules whose all
+    tests were selected and passed are stored in the cache: the selected
+    tests of a module are compared with all the tests collected for it
+    (e.g. `tests/test_a.py::test_one` deselects nothing but still runs
+    only a part of the module).
+
+    """
+
+    def __init__(self, cache, key_builder):
+        self.cache = cache
+        self.key_builder = key_builder
+        self.keys = {}
+        self.counts = {}
+        self.finished = {}
+        self.failed = set()
+        self.partial = set()
+        self.cached = []
+        self.children = {}
+
+    def pytest_collectreport(self, report):
+
+        if report.passed:
+            self.children[report.nodeid] = [
+                (node.nodeid, isinstance(node, pytest.Item))
+                for node in report.result]
+
+    def get_collected(self, nodeid):
+        """Find ids of all tests collected under `nodeid`.
+
+        Returns `None` if some of the collectors under `nodeid` were not
+        collected at all (because they were not selected).
+
+        """
+
+        if nodeid not in self.children:
+            return None
+
+        collected = set()
+        for child, is_item in self.children[nodeid]:
+            if is_item:
+                collected.add(child)
+                continue
+
+            child_collected = self.get_collected(child)
+            if child_collected is None:
+                return None
+
+            collected |= child_collected
+
+        return collected
+
+    # -- `trylast` in order to see all the deselections done before
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, session, config, items):
+
+        modules = {}
+        for item in items:
+            modules.setdefault(get_module(item.nodeid), []).append(item)
+
+        cached = set()
+        for module, module_items in modules.items():
+            key = self.key_builder.get_key(module)
+            if self.cache.contains(key):
+                cached.add(module)
+                self.cached.append((module, len(module_items)))
+
+            else:
+                self.keys[module] = key
+                self.counts[module] = len(module_items)
+                collected = self.get_collected(
+                    module_items[0].getparent(pytest.Module).nodeid)
+                if collected != {item.nodeid for item in module_items}:
+                    self.partial.add(module)
+
+        items[:] = [i for i in items if get_module(i.nodeid) not in cached]
+
+    def pytest_deselected(self, items):
+        self.partial.update(get_module(item.nodeid) for item in items)
+
+    def pytest_runtest_logreport(self, report):
+
+        module = get_module(report.nodeid)
+        if report.failed:
+            self.failed.add(module)
+
+        elif report.when == 'teardown':
+            self.finished[module] = self.finished.get(module, 0) + 1
+
+    def pytest_sessionfinish(self, session, exitstatus):
+
+        for module, key in self.keys.items():
+            if (
+                    module not in self.failed and
+                    module not in self.partial and
+                    self.finished.get(module) == self.counts[module]):
+                self.cache.add(key, module)
+
+        self.cache.evict()
+
+        if exitstatus == NO_TESTS_COLLECTED and self.cached:
+            session.exitstatus = 0
+
+    def pytest_terminal_summary(self, terminalreporter):
+
+        if self.cached:
+            terminalreporter.section('lily_assistant test cache')
+            for module, count in sorted(self.cached):
+                terminalreporter.write_line(
+                    '{module}: cached pass ({count} tests)'.format(
+                        module=module, count=count))
+
+
+def pytest_addoption(parser):
+
+    group = parser.getgroup('lily_assistant')
+    group.addoption(
+        '--lily-no-cache',
+        action='store_true',
+        default=False,
+        help='run all selected tests ignoring the test result cache')
+
+
+def pytest_configure(config):
+
+    # -- skipped modules would lower the measured coverage
+    if config.getoption('lily_no_cache') or getattr(
+            config.option, 'cov_source', None):
+        return
+
+    # -- worktrees of `verify-range` share the cache of the main checkout
+    cache_path = os.environ.get('LILY_TEST_CACHE_PATH') or os.path.join(
+        Config.get_cache_path(), 'tests')
+    base_path = Config.get_project_path()
+    config.pluginmanager.register(
+        CachePlugin(
+            ResultCache(cache_path),
+            KeyBuilder(base_path, ImportGraph(base_path))),
+        'lily_assistant_cache')
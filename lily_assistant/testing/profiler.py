@@ -0,0 +1,294 @@
+
+import os
+import signal
+import sys
+
+import _pytest
+import pluggy
+import pytest
+
+from lily_assistant.config import Config
+
+
+def get_internal_paths():
+    """Paths of the test runner itself, its frames are not sampled."""
+
+    return tuple(
+        os.path.dirname(os.path.abspath(module.__file__)) + os.sep
+        for module in [pytest, _pytest, pluggy]) + (os.path.abspath(__file__),)
+
+
+class Sampler:
+    """Statistical profiler of the main thread.
+
+    Every `interval` seconds of the CPU time (`SIGPROF`) the stack of the
+    interrupted frame is recorded under the current `label` (the running
+    test), up to the first frame of the test runner itself. Therefore the
+    overhead does not depend on the number of function calls made by the
+    tests.
+
+    """
+
+    def __init__(self, base_path, interval=0.005):
+        self.base_path = os.path.abspath(base_path) + os.sep
+        self.interval = interval
+        self.internal_paths = get_internal_paths()
+        self.label = None
+        self.stacks = {}
+        self.labels = {}
+        self.previous_handler = None
+
+    def start(self):
+
+        self.previous_handler = signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self.previous_handler or signal.SIG_DFL)
+
+    def sample(self, signum, frame):
+
+        if self.label is None:
+            return
+
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            label = self.labels.get(code)
+            if label is None:
+                if code.co_filename.startswith(self.internal_paths):
+                    break
+
+                label = self.labels[code] = self.get_label(code)
+
+            stack.append(label)
+            frame = frame.f_back
+
+        stack.append(self.label)
+        key = tuple(reversed(stack))
+        self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def get_label(self, code):
+        """Render `<path>:<function>` of the code.
+
+        Paths of the project's files are relative to its root, paths of
+        the other modules relative to their `sys.path` entry.
+
+        """
+
+        path = os.path.abspath(code.co_filename)
+        if path.startswith(self.base_path):
+            path = path[len(self.base_path):]
+
+        else:
+            roots = [
+                os.path.abspath(root) + os.sep
+                for root in sys.path
+                if root and path.startswith(os.path.abspath(root) + os.sep)]
+            if roots:
+                path = path[len(max(roots, key=len)):]
+
+        return '{path}:{name}'.format(
+            path=path.replace(os.sep, '/'),
+            name=getattr(code, 'co_qualname', code.co_name))
+
+
+class ProfileReport:
+    """Hotspots of the sampled stacks aggregated across the whole run.
+
+    :param stacks: `{(test, outermost frame, ..., innermost frame): count}`
+    :param interval: sampling interval in seconds
+
+    """
+
+    def __init__(self, stacks, interval):
+        self.stacks = stacks
+        self.interval = interval
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    def get_functions(self):
+        """Find the functions the samples hit.
+
+        Returns `{function: (self_samples, total_samples)}` where the
+        self samples are the ones hitting the function itself (not its
+        callees). Recursive calls are counted once per sample.
+
+        """
+
+        functions = {}
+        for (_, *frames), count in self.stacks.items():
+            for index, frame in enumerate(frames):
+                if frame in frames[index + 1:]:
+                    continue
+
+                own, total = functions.get(frame, (0, 0))
+                functions[frame] = (
+                    own + (count if index == len(frames) - 1 else 0),
+                    total + count)
+
+        return functions
+
+    def get_tests(self):
+        """Find the tests the samples hit.
+
+        Returns `{test: (samples, hottest_function)}`, where the hottest
+        function is the one with the most self samples during the test.
+
+        """
+
+        tests, hits = {}, {}
+        for (test, *frames), count in self.stacks.items():
+            tests[test] = tests.get(test, 0) + count
+            if frames:
+                key = (test, frames[-1])
+                hits[key] = hits.get(key, 0) + count
+
+        hottest = {}
+        for (test, frame), count in sorted(hits.items()):
+            if count > hits.get((test, hottest.get(test)), 0):
+                hottest[test] = frame
+
+        return {
+            test: (samples, hottest.get(test))
+            for test, samples in tests.items()}
+
+    def render(self, top=30):
+
+        seconds = self.interval
+        lines = [
+            '{samples} samples taken every {interval:.0f}ms of CPU time '
+            '(~{total:.2f}s)'.format(
+                samples=self.samples,
+                interval=self.interval * 1000,
+                total=self.samples * seconds),
+            '',
+            'FUNCTIONS (by self time)',
+            '{:>9}  {:>9}  {}'.format('self', 'total', 'function'),
+        ]
+        functions = sorted(
+            self.get_functions().items(),
+            key=lambda function: (-function[1][0], -function[1][1], function[0]))
+        for name, (own, total) in functions[:top]:
+            lines.append('{own:8.2f}s  {total:8.2f}s  {name}'.format(
+                own=own * seconds, total=total * seconds, name=name))
+
+        lines += [
+            '',
+            'TESTS',
+            '{:>9}  {}'.format('total', 'test (hottest function)'),
+        ]
+        tests = sorted(
+            self.get_tests().items(), key=lambda test: (-test[1][0], test[0]))
+        for test, (samples, hottest) in tests[:top]:
+            lines.append('{total:8.2f}s  {test}{hottest}'.format(
+                total=samples * seconds,
+                test=test,
+                hottest=' ({})'.format(hottest) if hottest else ''))
+
+        return '\n'.join(lines) + '\n'
+
+    def render_collapsed(self):
+        """Render stacks in the collapsed format read by flamegraph tools.
+
+        One line per stack: frames from the outermost separated by `;`
+        followed by the number of samples.
+
+        """
+
+        return ''.join(
+            '{stack} {count}\n'.format(stack=';'.join(stack), count=count)
+            for stack, count in sorted(self.stacks.items()))
+
+
+class ProfilePlugin:
+
+    def __init__(self, sampler, directory, top=30):
+        self.sampler = sampler
+        self.directory = directory
+        self.top = top
+        self.paths = []
+
+    def pytest_sessionstart(self, session):
+        self.sampler.start()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+
+        self.sampler.label = item.nodeid
+        try:
+            yield
+
+        finally:
+            self.sampler.label = None
+
+    def pytest_sessionfinish(self, session, exitstatus):
+
+        self.sampler.stop()
+        report = ProfileReport(self.sampler.stacks, self.sampler.interval)
+        os.makedirs(self.directory, exist_ok=True)
+        for name, content in [
+                ('profile.txt', report.render(self.top)),
+                ('profile.collapsed', report.render_collapsed())]:
+            path = os.path.join(self.directory, name)
+            with open(path, 'w') as f:
+                f.write(content)
+
+            self.paths.append(path)
+
+    def pytest_terminal_summary(self, terminalreporter):
+
+        terminalreporter.section('lily_assistant profile')
+        for path in self.paths:
+            terminalreporter.write_line(path)
+
+
+def pytest_addoption(parser):
+
+    group = parser.getgroup('lily_assistant')
+    group.addoption(
+        '--lily-profile',
+        action='store_true',
+        default=False,
+        help='profile the tests with the sampling profiler')
+    group.addoption(
+        '--lily-profile-dir',
+        default='coverage_html',
+        help=(
+            'directory of the `profile.txt` and `profile.collapsed` '
+            'reports (default: coverage_html)'))
+    group.addoption(
+        '--lily-profile-top',
+        type=int,
+        default=30,
+        help='number of functions and tests listed by the text report')
+    group.addoption(
+        '--lily-profile-interval',
+        type=float,
+        default=5.0,
+        help='sampling interval in milliseconds of CPU time (default: 5)')
+
+
+def pytest_configure(config):
+
+    if not config.getoption('lily_profile') or config.getoption(
+            'collectonly'):
+        return
+
+    if not hasattr(signal, 'setitimer'):
+        raise pytest.UsageError(
+            '--lily-profile is not supported on this platform')
+
+    base_path = Config.get_project_path()
+    config.pluginmanager.register(
+        ProfilePlugin(
+            Sampler(
+                base_path,
+                interval=config.getoption('lily_profile_interval') / 1000.0),
+            os.path.join(base_path, config.getoption('lily_profile_dir')),
+            top=config.getoption('lily_profile_top')),
+        'lily_assistant_profile')
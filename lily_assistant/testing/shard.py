@@ -0,0 +1,120 @@
+
+import json
+import os
+
+import pytest
+
+from lily_assistant.config import Config
+from .history import ResultHistory
+from .partition import parse_shard, split
+from .plugin import get_module
+
+
+def get_timings_path():
+    return os.path.join(Config.get_lily_path(), 'test_timings.json')
+
+
+def load_timings():
+    """Mean durations of tests keyed by their node ids.
+
+    The committed `.lily/test_timings.json` (see `lily_assistant tests
+    timings`) is preferred since all the CI nodes must split tests in the
+    same way, the local tests history is used otherwise.
+
+    """
+
+    try:
+        with open(get_timings_path()) as f:
+            return json.loads(f.read())
+
+    except (OSError, ValueError):
+        pass
+
+    history = ResultHistory(
+        os.path.join(Config.get_cache_path(), 'test_history'))
+
+    return {
+        nodeid: mean
+        for nodeid, mean, _ in history.get_slowest(count=None)}
+
+
+class ShardPlugin:
+    """Run only the `index`-th out of `count` shards of collected tests.
+
+    Test modules (not single tests, so module scoped fixtures are not set
+    up on many nodes) are split using the recorded timings of their tests.
+    Tests without any recorded timing are estimated with the mean duration
+    of the known ones. Without any timings the modules are split evenly by
+    their count.
+
+    """
+
+    def __init__(self, index, count, timings):
+        self.index = index
+        self.count = count
+        self.timings = timings
+
+    def get_weights(self, items):
+
+        known = [
+            self.timings[item.nodeid]
+            for item in items
+            if item.nodeid in self.timings]
+        if not known:
+            return {get_module(item.nodeid): 1.0 for item in items}
+
+        default = sum(known) / len(known)
+        weights = {}
+        for item in items:
+            module = get_module(item.nodeid)
+            weights[module] = (
+                weights.get(module, 0.0) +
+                self.timings.get(item.nodeid, default))
+
+        return weights
+
+    def pytest_collection_modifyitems(self, session, config, items):
+
+        modules = set(
+            split(self.get_weights(items), self.count)[self.index - 1])
+
+        selected, deselected = [], []
+        for item in items:
+            if get_module(item.nodeid) in modules:
+                selected.append(item)
+
+            else:
+                deselected.append(item)
+
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+
+    def pytest_report_header(self, config):
+        return 'lily_assistant shard: {index}/{count}'.format(
+            index=self.index, count=self.count)
+
+
+def pytest_addoption(parser):
+
+    group = parser.getgroup('lily_assistant')
+    group.addoption(
+        '--lily-shard',
+        default=None,
+        help='run only the i-th out of N shards of tests given as i/N')
+
+
+def pytest_configure(config):
+
+    value = config.getoption('lily_shard')
+    if not value:
+        return
+
+    try:
+        index, count = parse_shard(value)
+
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+
+    config.pluginmanager.register(
+        ShardPlugin(index, count, load_timings()), 'lily_assistant_shard')
@@ -0,0 +1,118 @@
+
+import os
+import time
+
+from lily_assistant.config import Config
+from .history import ResultHistory
+
+
+class TrackerPlugin:
+    """Record durations and outcomes of tests and enforce time budgets.
+
+    :param test_budget: maximal duration (in seconds) of a single test
+        (setup, call and teardown together)
+    :param suite_budget: maximal duration (in seconds) of the whole run
+
+    """
+
+    def __init__(self, history, test_budget=None, suite_budget=None):
+        self.history = history
+        self.test_budget = test_budget
+        self.suite_budget = suite_budget
+        self.results = {}
+        self.started_at = time.monotonic()
+        self.duration = None
+        self.slow_tests = []
+
+    def pytest_sessionstart(self, session):
+        self.started_at = time.monotonic()
+
+    def pytest_runtest_logreport(self, report):
+
+        outcome, duration = self.results.get(
+            report.nodeid, (ResultHistory.PASSED, 0.0))
+        if report.failed:
+            outcome = ResultHistory.FAILED
+
+        elif report.skipped and outcome != ResultHistory.FAILED:
+            outcome = ResultHistory.SKIPPED
+
+        self.results[report.nodeid] = (
+            outcome, duration + getattr(report, 'duration', 0.0))
+
+    def pytest_sessionfinish(self, session, exitstatus):
+
+        self.duration = time.monotonic() - self.started_at
+        self.history.append(int(time.time()), [
+            (nodeid, outcome, duration)
+            for nodeid, (outcome, duration) in self.results.items()])
+
+        if self.test_budget:
+            self.slow_tests = sorted(
+                (
+                    (nodeid, duration)
+                    for nodeid, (_, duration) in self.results.items()
+                    if duration > self.test_budget),
+                key=lambda test: -test[1])
+
+        if self.is_over_budget() and exitstatus == 0:
+            session.exitstatus = 1
+
+    def is_over_budget(self):
+
+        return bool(self.slow_tests) or bool(
+            self.suite_budget and self.duration > self.suite_budget)
+
+    def pytest_terminal_summary(self, terminalreporter):
+
+        if not self.is_over_budget():
+            return
+
+        terminalreporter.section('lily_assistant time budgets', red=True)
+        for nodeid, duration in self.slow_tests:
+            terminalreporter.write_line(
+                '{nodeid} took {duration:.2f}s, budget: {budget:.2f}s'.format(
+                    nodeid=nodeid,
+                    duration=duration,
+                    budget=self.test_budget))
+
+        if self.suite_budget and self.duration > self.suite_budget:
+            terminalreporter.write_line(
+                'whole run took {duration:.2f}s, budget: {budget:.2f}s'.format(
+                    duration=self.duration, budget=self.suite_budget))
+
+
+def get_budget(config, name):
+
+    value = config.getoption(name) or config.getini(name)
+
+    return float(value) if value else None
+
+
+def pytest_addoption(parser):
+
+    group = parser.getgroup('lily_assistant')
+    for name, description in (
+            ('lily_test_budget', 'maximal duration (seconds) of a test'),
+            ('lily_suite_budget', 'maximal duration (seconds) of the run')):
+        group.addoption(
+            '--{}'.format(name.replace('_', '-')),
+            dest=name,
+            default=None,
+            help=description)
+        parser.addini(name, help=description, default='')
+
+
+def pytest_configure(config):
+
+    # -- nothing is run while only collecting tests
+    if config.getoption('collectonly'):
+        return
+
+    config.pluginmanager.register(
+        TrackerPlugin(
+            ResultHistory(
+                os.path.join(Config.get_cache_path(), 'test_history')),
+            test_budget=get_budget(config, 'lily_test_budget'),
+            suite_budget=get_budget(config, 'lily_suite_budget')),
+        'lily_assistant_tracker')
@@ -0,0 +1,500 @@
+import ast
+import hashlib
+import json
+import os
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+
+
+# -- passed with each run since they change the options or the output of
+# -- py.test, the rest of the environment is inherited by the parent from the
+# -- client spawning it (see `get_env_digest`)
+RUN_ENV = [
+    'COLUMNS',
+    'FORCE_COLOR',
+    'LINES',
+    'NO_COLOR',
+    'PY_COLORS',
+    'PYTEST_ADDOPTS',
+    'PYTEST_PLUGINS',
+    'TERM',
+]
+
+# -- set on their own by shells and make, they do not change the runs
+VOLATILE_ENV = [
+    '_',
+    'MAKEFLAGS',
+    'MAKELEVEL',
+    'MFLAGS',
+    'OLDPWD',
+    'PWD',
+    'SHLVL',
+]
+
+
+def get_socket_dir():
+    """Directory of the sockets of the warm parents of the user.
+
+    Paths of unix sockets are limited to ~100 characters, therefore it's
+    the runtime directory of the user or a directory of the user in the
+    temporary directory rather than `.lily` of the project.
+
+    """
+
+    runtime_path = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_path and os.path.isdir(runtime_path):
+        return os.path.join(runtime_path, 'lily_assistant')
+
+    return os.path.join(
+        tempfile.gettempdir(), 'lily_assistant-{}'.format(os.getuid()))
+
+
+def get_socket_path(base_path):
+    """Path of the socket the warm parent of the project listens on."""
+
+    digest = hashlib.sha256(
+        os.path.realpath(base_path).encode('utf-8')).hexdigest()
+
+    return os.path.join(
+        get_socket_dir(), 'warm_{}.sock'.format(digest[:16]))
+
+
+def make_socket_dir(path):
+    """Create the directory of sockets accessible only by the user.
+
+    An existing one must be owned by the user and private, otherwise
+    another user could have planted it (e.g. in the shared temporary
+    directory) to serve the runs or read them.
+
+    """
+
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = check_owner(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_mode & 0o077:
+        raise OSError(
+            '{} must be a directory accessible only by its owner'.format(path))
+
+
+def check_owner(path):
+
+    info = os.lstat(path)
+    if info.st_uid != os.getuid():
+        raise OSError('{} is not owned by the current user'.format(path))
+
+    return info
+
+
+def get_env_digest(environ):
+    """Digest of the environment a warm parent serves.
+
+    Variables of `RUN_ENV` (sent with each run) and `VOLATILE_ENV` are left
+    out, so the environment itself never leaves the client.
+
+    """
+
+    items = sorted(
+        (name, value)
+        for name, value in environ.items()
+        if name not in RUN_ENV and name not in VOLATILE_ENV)
+
+    return hashlib.sha256(json.dumps(items).encode('utf-8')).hexdigest()
+
+
+def find_dependencies(base_path, directories):
+    """Names of top level modules imported by the project but not its own."""
+
+    names = set()
+    for directory in directories:
+        for root, dirs, files in os.walk(os.path.join(base_path, directory)):
+            dirs[:] = [d for d in dirs if d != '__pycache__']
+            for name in files:
+                if name.endswith('.py'):
+                    names.update(find_imports(os.path.join(root, name)))
+
+    return sorted(
+        name
+        for name in names
+        if not (
+            os.path.exists(os.path.join(base_path, name + '.py')) or
+            os.path.isdir(os.path.join(base_path, name))))
+
+
+def find_imports(path):
+
+    try:
+        with open(path, 'rb') as f:
+            tree = ast.parse(f.read())
+
+    except (OSError, SyntaxError, ValueError):
+        return set()
+
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+
+        elif isinstance(node, ast.ImportFrom) and not node.level:
+            names.add(node.module.split('.')[0])
+
+    return names
+
+
+class WarmServer:
+    """Parent process keeping the test dependencies imported.
+
+    Each request forks a child which runs `pytest.main` with the output
+    redirected to the client connection, therefore the child starts with
+    all the heavy dependencies already imported while still being isolated
+    from the other runs.
+
+    If any of the modules imported by the parent changed since it was
+    warmed up, or the client runs in a different environment (see
+    `get_env_digest`), the parent refuses to serve (so the client can spawn
+    a fresh one) and exits. It exits as well after `idle_timeout` seconds
+    without any request.
+
+    """
+
+    RECYCLE = 'recycle'
+
+    STOPPED = 'stopped'
+
+    def __init__(self, base_path, socket_path, idle_timeout=1800):
+        self.base_path = base_path
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.modules = {}
+        self.env_digest = get_env_digest(os.environ)
+
+    def preload(self, names):
+
+        # -- pytest plugins are left to pytest, otherwise it could not
+        # -- rewrite their asserts
+        plugins = set(self.get_pytest_plugins())
+        for name in ['pytest'] + names:
+            if name in plugins:
+                continue
+
+            try:
+                __import__(name)
+
+            except Exception:
+                pass
+
+        self.modules = self.snapshot()
+
+    def get_pytest_plugins(self):
+
+        try:
+            from importlib.metadata import entry_points
+
+        except ImportError:
+            return []
+
+        try:
+            plugins = entry_points(group='pytest11')
+
+        except TypeError:
+            plugins = entry_points().get('pytest11', [])
+
+        return [plugin.value.split(':')[0].split('.')[0] for plugin in plugins]
+
+    def snapshot(self):
+        """Modification times of the files of all imported modules."""
+
+        modules = {}
+        for module in list(sys.modules.values()):
+            path = getattr(module, '__file__', None)
+            if path and path not in modules:
+                try:
+                    modules[path] = os.stat(path).st_mtime_ns
+
+                except OSError:
+                    pass
+
+        return modules
+
+    def is_stale(self):
+
+        for path, mtime in self.modules.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return True
+
+            except OSError:
+                return True
+
+        return False
+
+    def bind(self):
+
+        make_socket_dir(os.path.dirname(self.socket_path))
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        server.listen(8)
+
+        return server
+
+    def serve(self, server):
+
+        server.settimeout(self.idle_timeout)
+        try:
+            while True:
+                try:
+                    connection, _ = server.accept()
+
+                except socket.timeout:
+                    return
+
+                with connection:
+                    if not self.handle(connection, server):
+                        return
+
+        finally:
+            server.close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def handle(self, connection, server):
+
+        request = json.loads(read_line(connection))
+        if request.get('stop'):
+            connection.sendall(b'\0' + self.STOPPED.encode('utf-8'))
+
+            return False
+
+        if (
+                self.is_stale() or
+                request.get('env_digest') != self.env_digest):
+            connection.sendall(b'\0' + self.RECYCLE.encode('utf-8'))
+
+            return False
+
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            server.close()
+            os._exit(self.run_child(connection, request))
+
+        _, status = os.waitpid(pid, 0)
+        code = os.WEXITSTATUS(status) if os.WIFEXITED(status) else 1
+        connection.sendall('\0{}'.format(code).encode('utf-8'))
+
+        return True
+
+    def run_child(self, connection, request):  # pragma: no cover
+
+        try:
+            os.chdir(request['cwd'])
+            for name in RUN_ENV:
+                os.environ.pop(name, None)
+
+            os.environ.update(request['env'])
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(connection.fileno(), 1)
+            os.dup2(connection.fileno(), 2)
+
+            import pytest
+
+            code = int(pytest.main(request['args']))
+
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            code = 1
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        return code
+
+
+class WarmClient:
+    """Run tests by the warm parent, spawning it if needed.
+
+    :param directories: directories (relative to `base_path`) whose
+        imports are preloaded by the parent
+
+    """
+
+    class Recycle(Exception):
+        pass
+
+    STARTUP_TIMEOUT = 60
+
+    def __init__(self, base_path, directories):
+        self.base_path = base_path
+        self.directories = directories
+        self.socket_path = get_socket_path(base_path)
+
+    def run(self, args, output):
+        """Run py.test with `args`, stream its output to `output` (binary).
+
+        Returns the exit code of the run.
+
+        """
+
+        try:
+            return self.request(args, output)
+
+        except WarmClient.Recycle:
+            self.wait_for_exit()
+
+            return self.request(args, output)
+
+    def stop(self):
+        """Stop the warm parent if it's running.
+
+        Returns `True` if there was one to stop.
+
+        """
+
+        if not os.path.exists(self.socket_path):
+            return False
+
+        self.check()
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        with connection:
+            try:
+                connection.connect(self.socket_path)
+
+            except OSError:
+                return False
+
+            connection.sendall(b'{"stop": true}\n')
+            read_line(connection)
+
+        self.wait_for_exit()
+
+        return True
+
+    def check(self):
+        """Refuse to talk to sockets of other users."""
+
+        make_socket_dir(os.path.dirname(self.socket_path))
+        if os.path.lexists(self.socket_path):
+            check_owner(self.socket_path)
+
+    def connect(self):
+
+        self.check()
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(self.socket_path)
+
+        except OSError:
+            connection.close()
+
+            # -- left behind by the parent which did not exit cleanly
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+            self.spawn()
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.connect(self.socket_path)
+
+        return connection
+
+    def spawn(self):
+
+        log_path = os.path.join(self.base_path, '.lily', 'cache', 'warm.log')
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        with open(log_path, 'ab') as log:
+            subprocess.Popen(
+                [
+                    sys.executable, '-m', 'lily_assistant.testing.warm',
+                    self.base_path,
+                ] + list(self.directories),
+                cwd=self.base_path,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                start_new_session=True)
+
+        deadline = time.monotonic() + self.STARTUP_TIMEOUT
+        while not os.path.exists(self.socket_path):
+            if time.monotonic() > deadline:
+                raise OSError(
+                    'warm test runner did not start, see {}'.format(log_path))
+
+            time.sleep(0.01)
+
+    def wait_for_exit(self):
+
+        deadline = time.monotonic() + self.STARTUP_TIMEOUT
+        while (
+                os.path.exists(self.socket_path) and
+                time.monotonic() < deadline):
+            time.sleep(0.01)
+
+    def request(self, args, output):
+
+        with self.connect() as connection:
+            connection.sendall(json.dumps({
+                'args': list(args),
+                'cwd': os.getcwd(),
+                'env': {
+                    name: os.environ[name]
+                    for name in RUN_ENV
+                    if name in os.environ},
+                'env_digest': get_env_digest(os.environ),
+            }).encode('utf-8') + b'\n')
+
+            # -- output is streamed as it comes, the `\0<code>` trailer
+            # -- closes it
+            tail = None
+            for chunk in iter(lambda: connection.recv(64 * 1024), b''):
+                if tail is None:
+                    output_part, separator, rest = chunk.partition(b'\0')
+                    output.write(output_part)
+                    output.flush()
+                    if separator:
+                        tail = separator + rest
+
+                else:
+                    tail += chunk
+
+        if tail is None:
+            raise OSError('warm test runner closed the connection')
+
+        position = tail.rfind(b'\0')
+        output.write(tail[:position])
+        output.flush()
+        code = tail[position + 1:].decode('utf-8')
+        if code == WarmServer.RECYCLE:
+            raise WarmClient.Recycle()
+
+        return int(code)
+
+
+def read_line(connection):
+
+    data = b''
+    while not data.endswith(b'\n'):
+        chunk = connection.recv(64 * 1024)
+        if not chunk:
+            break
+
+        data += chunk
+
+    return data.decode('utf-8')
+
+
+def main(argv=None):  # pragma: no cover
+
+    base_path, *directories = argv or sys.argv[1:]
+    server = WarmServer(base_path, get_socket_path(base_path))
+    listening = server.bind()
+    server.preload(find_dependencies(base_path, directories))
+    server.serve(listening)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
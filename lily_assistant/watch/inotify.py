@@ -0,0 +1,226 @@
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+    IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+EVENT = struct.Struct('iIII')
+
+
+def load_libc():
+    """Load libc exposing inotify, `None` if it's not available."""
+
+    try:
+        libc = ctypes.CDLL(
+            ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        init, add_watch = libc.inotify_init1, libc.inotify_add_watch
+
+    except (OSError, AttributeError):
+        return None
+
+    init.argtypes = [ctypes.c_int]
+    init.restype = ctypes.c_int
+    add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    add_watch.restype = ctypes.c_int
+
+    return libc
+
+
+def is_skipped(name):
+    return name == '__pycache__' or name.startswith('.')
+
+
+def find_files(base_path, path):
+    """Relative paths of the files under `path` (skipped ones excluded)."""
+
+    found = []
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [name for name in dirs if not is_skipped(name)]
+        found.extend(
+            os.path.relpath(os.path.join(root, name), base_path)
+            for name in files)
+
+    return found
+
+
+class InotifyWatcher:
+    """Watch `directories` of the project (recursively) with inotify.
+
+    inotify watches single directories, therefore each one gets its own
+    watch, the ones created later included.
+
+    """
+
+    class Unavailable(Exception):
+        pass
+
+    class Exhausted(Unavailable):
+        """Watch limit reached while watching, carries the changes seen."""
+
+        def __init__(self, message, changed):
+            super().__init__(message)
+            self.changed = changed
+
+    def __init__(self, base_path, directories):
+        self.base_path = base_path
+        self.libc = load_libc()
+        if self.libc is None:
+            raise InotifyWatcher.Unavailable('inotify is not available')
+
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise InotifyWatcher.Unavailable(
+                os.strerror(ctypes.get_errno()))
+
+        self.directories = directories
+        self.paths = {}
+        try:
+            for directory in directories:
+                self.add_tree(os.path.join(base_path, directory))
+
+        except InotifyWatcher.Unavailable:
+            self.close()
+            raise
+
+    def add_tree(self, path):
+        """Watch `path` and its subdirectories.
+
+        Returns relative paths of the files found in them since those were
+        possibly created before the watch was added.
+
+        """
+
+        found = []
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [name for name in dirs if not is_skipped(name)]
+            self.add_watch(root)
+            found.extend(
+                os.path.relpath(os.path.join(root, name), self.base_path)
+                for name in files)
+
+        return found
+
+    def add_watch(self, path):
+
+        wd = self.libc.inotify_add_watch(
+            self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            code = ctypes.get_errno()
+
+            # -- running out of watches is fatal, the vanished ones are not
+            if code == errno.ENOSPC:
+                raise InotifyWatcher.Unavailable(
+                    'inotify watch limit reached (see '
+                    '/proc/sys/fs/inotify/max_user_watches)')
+
+            return
+
+        self.paths[wd] = path
+
+    def wait(self, timeout=None):
+        """Wait up to `timeout` seconds for changes.
+
+        Returns set of relative paths of the changed files (empty on
+        timeout).
+
+        """
+
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+
+        except BlockingIOError:
+            return set()
+
+        return self.parse(data)
+
+    def parse(self, data):
+        """Find the changed files according to the events in `data`.
+
+        If the watches run out for a new directory its files are reported
+        nevertheless and `Exhausted` is raised with all the changes, the
+        caller is expected to switch to polling then.
+
+        """
+
+        changed = set()
+        exhausted = None
+        offset = 0
+        while offset + EVENT.size <= len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            # -- events got lost, all files are considered changed
+            if mask & IN_Q_OVERFLOW:
+                for directory in self.directories:
+                    path = os.path.join(self.base_path, directory)
+                    try:
+                        changed.update(self.add_tree(path))
+
+                    except InotifyWatcher.Unavailable as e:
+                        changed.update(find_files(self.base_path, path))
+                        exhausted = e
+
+                continue
+
+            directory = self.paths.get(wd)
+            if directory is None:
+                continue
+
+            if mask & IN_IGNORED:
+                del self.paths[wd]
+                continue
+
+            if not name:
+                continue
+
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and not is_skipped(name):
+                    try:
+                        changed.update(self.add_tree(path))
+
+                    except InotifyWatcher.Unavailable as e:
+                        changed.update(find_files(self.base_path, path))
+                        exhausted = e
+
+                continue
+
+            changed.add(os.path.relpath(path, self.base_path))
+
+        if exhausted:
+            raise InotifyWatcher.Exhausted(str(exhausted), changed)
+
+        return changed
+
+    def close(self):
+        os.close(self.fd)
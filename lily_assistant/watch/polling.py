@@ -0,0 +1,73 @@
+
+import os
+import time
+
+from .inotify import is_skipped
+
+
+class PollingWatcher:
+    """Watch `directories` of the project by polling `stat` of the files.
+
+    Used wherever inotify is not available (other platforms, network file
+    systems, exhausted watches).
+
+    """
+
+    def __init__(self, base_path, directories, interval=0.5):
+        self.base_path = base_path
+        self.directories = directories
+        self.interval = interval
+        self.files = self.scan()
+
+    def scan(self):
+        """Stat all files: `{relative path: (mtime_ns, size)}`."""
+
+        files = {}
+        for directory in self.directories:
+            path = os.path.join(self.base_path, directory)
+            for root, dirs, names in os.walk(path):
+                dirs[:] = [name for name in dirs if not is_skipped(name)]
+                for name in names:
+                    full_path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(full_path)
+
+                    except OSError:
+                        continue
+
+                    files[os.path.relpath(full_path, self.base_path)] = (
+                        stat.st_mtime_ns, stat.st_size)
+
+        return files
+
+    def wait(self, timeout=None):
+        """Wait up to `timeout` seconds for changes.
+
+        Returns set of relative paths of the changed files (empty on
+        timeout).
+
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            files = self.scan()
+            changed = {
+                path
+                for path in set(files) | set(self.files)
+                if files.get(path) != self.files.get(path)}
+            self.files = files
+            if changed:
+                return changed
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return set()
+
+                time.sleep(min(self.interval, remaining))
+
+            else:
+                time.sleep(self.interval)
+
+    def close(self):
+        pass
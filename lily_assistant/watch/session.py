@@ -0,0 +1,155 @@
+
+import os
+import time
+
+from lily_assistant.runner.targets import FLAKE8_IGNORE
+from lily_assistant.testing.imports import ImportGraph
+from .inotify import InotifyWatcher
+from .polling import PollingWatcher
+
+
+def get_watcher(base_path, directories, polling=False, interval=0.5):
+    """Watch with inotify if possible, fall back to polling otherwise."""
+
+    if not polling:
+        try:
+            return InotifyWatcher(base_path, directories)
+
+        except InotifyWatcher.Unavailable:
+            pass
+
+    return PollingWatcher(base_path, directories, interval=interval)
+
+
+def collect(watcher, debounce=0.2, max_delay=2.0, timeout=None):
+    """Wait for changes and gather the ones following within `debounce`.
+
+    Saving of a file usually produces a burst of events (and editors or
+    `git checkout` touch many files at once), the burst is handled as a
+    single change unless it lasts longer than `max_delay` seconds.
+
+    `InotifyWatcher.Exhausted` raised in the middle of the burst carries
+    the whole burst.
+
+    """
+
+    changed = watcher.wait(timeout)
+    deadline = time.monotonic() + max_delay
+    while changed and time.monotonic() < deadline:
+        try:
+            more = watcher.wait(debounce)
+
+        except InotifyWatcher.Exhausted as e:
+            e.changed |= changed
+            raise
+
+        if not more:
+            break
+
+        changed |= more
+
+    return changed
+
+
+def fall_back(watcher, interval=0.5):
+    """Replace `watcher` which ran out of inotify watches with polling."""
+
+    watcher.close()
+
+    return PollingWatcher(
+        watcher.base_path, watcher.directories, interval=interval)
+
+
+def is_test_module(path):
+
+    name = os.path.basename(path)
+
+    return name.endswith('.py') and (
+        name.startswith('test_') or name.endswith('_test.py'))
+
+
+class WatchSession:
+    """Lint the changed files and re-run the test modules they affect.
+
+    The session lives as long as the watch, therefore the import graph of
+    the project (and the imported linter) is kept warm between the cycles,
+    only the imports of the changed modules are parsed again.
+
+    """
+
+    def __init__(self, base_path, directories, test_directory='tests'):
+        self.base_path = base_path
+        self.directories = directories
+        self.test_directory = test_directory
+        self.import_graph = ImportGraph(base_path)
+        self.modules = self.find_modules()
+        self.style_guide = None
+
+    def find_modules(self):
+
+        modules = set()
+        for directory in self.directories:
+            for root, dirs, files in os.walk(
+                    os.path.join(self.base_path, directory)):
+                dirs[:] = [name for name in dirs if name != '__pycache__']
+                modules.update(
+                    os.path.relpath(os.path.join(root, name), self.base_path)
+                    for name in files
+                    if name.endswith('.py'))
+
+        return modules
+
+    def get_affected(self, changed):
+        """Find what to lint and test after `changed` files.
+
+        Returns `(paths, test_modules)`: the changed python files which
+        still exist and the test modules importing (transitively) any of
+        the changed modules, placed under a changed `conftest.py` or
+        changed themselves.
+
+        """
+
+        changed = {path for path in changed if path.endswith('.py')}
+        existing = {
+            path
+            for path in changed
+            if os.path.isfile(os.path.join(self.base_path, path))}
+
+        # -- created and removed modules change how imports resolve
+        if existing - self.modules or self.modules & (changed - existing):
+            self.import_graph = ImportGraph(self.base_path)
+
+        else:
+            self.import_graph.invalidate(changed)
+
+        self.modules = (self.modules - changed) | existing
+        conftest_dirs = tuple(
+            os.path.dirname(path) + os.sep
+            for path in changed
+            if os.path.basename(path) == 'conftest.py')
+        test_modules = {
+            path
+            for path in self.modules
+            if (
+                is_test_module(path) and
+                path.startswith(self.test_directory + os.sep) and (
+                    path.startswith(conftest_dirs) or
+                    self.import_graph.get_dependencies(path) & changed))}
+
+        return sorted(existing), sorted(test_modules)
+
+    def lint(self, paths):
+        """Lint `paths` in-process, returns the number of errors."""
+
+        # -- set up once (plugins loaded, options parsed), reused by all
+        # -- the following cycles
+        if self.style_guide is None:
+            from flake8.api import legacy
+
+            self.style_guide = legacy.get_style_guide(
+                max_line_length=100, ignore=FLAKE8_IGNORE.split(','))
+
+        return self.style_guide.check_files([
+            os.path.relpath(os.path.join(self.base_path, path))
+            for path in paths
+        ]).total_errors
@@ -51,8 +51,10 @@ setup(
             'README.md',
             '.lily/config.json',
             'lily_assistant/cli/base.makefile',
+            'lily_assistant/cli/ci/github-actions.yml',
             'lily_assistant/cli/hooks/commit-msg',
             'lily_assistant/cli/hooks/pre-commit',
+            'lily_assistant/cli/hooks/pre-push',
         ],
     )],
     include_package_data=True,
@@ -0,0 +1,64 @@
+import json
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.bench import baseline
+
+
+class BaselineTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+
+    #
+    # SAVE / LOAD
+    #
+    def test_save_load(self):
+
+        path = str(self.tmpdir.join('.lily', 'bench_baseline.json'))
+        results = {'bench_a.py::bench_x': {'median': 0.5, 'min': 0.25}}
+
+        baseline.save(path, results)
+
+        assert baseline.load(path) == results
+        with open(path) as f:
+            stored = json.loads(f.read())
+
+        assert set(stored) == {'benchmarks', 'platform', 'python'}
+
+    def test_load__missing_or_broken(self):
+
+        path = self.tmpdir.join('baseline.json')
+
+        assert baseline.load(str(path)) == {}
+
+        path.write('{broken')
+
+        assert baseline.load(str(path)) == {}
+
+    #
+    # COMPARE
+    #
+    def test_compare(self):
+
+        reference = {
+            'a': {'median': 1.0},
+            'b': {'median': 1.0},
+            'c': {'median': 1.0},
+            'd': {'median': 0.0},
+        }
+        results = {
+            'a': {'median': 1.05},
+            'b': {'median': 1.5},
+            'c': {'median': 1.2},
+            'd': {'median': 1.0},
+            'e': {'median': 3.0},
+        }
+
+        assert baseline.compare(results, reference, threshold=10) == [
+            ('b', 1.0, 1.5, pytest.approx(50.0)),
+            ('c', 1.0, 1.2, pytest.approx(20.0)),
+        ]
+        assert baseline.compare(results, reference, threshold=60) == []
@@ -0,0 +1,113 @@
+import textwrap
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.bench import importtime
+
+
+OUTPUT = textwrap.dedent('''
+    import time: self [us] | cumulative | imported package
+    import time:       100 |        100 |   _io
+    import time:       200 |        300 | io
+    import time:      1000 |       1000 |     app.b
+    import time:       500 |       1500 |   app.a
+    import time:       250 |       1750 | app
+    something else
+    import time:        50 |         50 | json
+''')
+
+
+class ImportTimeTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+
+    #
+    # PARSE
+    #
+    def test_parse(self):
+
+        assert importtime.parse(OUTPUT) == {
+            '_io': (0.1, 0.1),
+            'io': (0.2, 0.3),
+            'app.b': (1.0, 1.0),
+            'app.a': (0.5, 1.5),
+            'app': (0.25, 1.75),
+            'json': (0.05, 0.05),
+        }
+
+    def test_parse__module(self):
+
+        assert importtime.parse(OUTPUT, 'app') == {
+            'app.b': (1.0, 1.0),
+            'app.a': (0.5, 1.5),
+            'app': (0.25, 1.75),
+        }
+        assert importtime.parse(OUTPUT, 'app.a') == {
+            'app.b': (1.0, 1.0),
+            'app.a': (0.5, 1.5),
+        }
+        assert importtime.parse(OUTPUT, 'missing') == {}
+
+    #
+    # IMPORT_TIMER
+    #
+    def test_measure(self):
+
+        self.tmpdir.join('app', '__init__.py').write(
+            'import app.slow\n', ensure=True)
+        self.tmpdir.join('app', 'slow.py').write(
+            'import time\ntime.sleep(0.01)\n')
+
+        times = importtime.ImportTimer(
+            'app', str(self.tmpdir), repeat=2).measure()
+
+        assert set(times) >= {'app', 'app.slow'}
+        assert 'site' not in times
+        assert times['app.slow'][0] >= 10
+        assert times['app'][1] >= times['app.slow'][1]
+
+    def test_measure__import_failed(self):
+
+        self.tmpdir.join('app', '__init__.py').write(
+            'raise ValueError("broken")\n', ensure=True)
+
+        with pytest.raises(importtime.ImportTimer.ImportFailed) as e:
+            importtime.ImportTimer('app', str(self.tmpdir)).measure()
+
+        assert 'ValueError: broken' in str(e.value)
+        assert 'import time:' not in str(e.value)
+
+    #
+    # SAVE / LOAD
+    #
+    def test_save_load(self):
+
+        path = str(self.tmpdir.join('.lily', 'import_budget.json'))
+
+        assert importtime.load(path) == {}
+
+        importtime.save(path, 'app', {'app': (0.25, 1.75)})
+
+        assert importtime.load(path) == {'app': (0.25, 1.75)}
+
+    #
+    # GET_BUDGET / GET_OFFENDERS
+    #
+    def test_get_budget(self):
+
+        assert importtime.get_budget(100.0, 20) == 120.0
+        assert importtime.get_budget(10.0, 20) == 15.0
+        assert importtime.get_budget(10.0, 20, slack_ms=1.0) == 12.0
+
+    def test_get_offenders(self):
+
+        times = importtime.parse(OUTPUT, 'app')
+        baseline = {'app.a': (0.25, 1.0), 'app': (0.25, 1.25)}
+
+        assert importtime.get_offenders(times, baseline, count=2) == [
+            ('app.b', 1.0, 1.0, None),
+            ('app.a', 0.5, 1.5, 0.25),
+        ]
@@ -0,0 +1,115 @@
+import os
+import sys
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.bench.runner import (
+    BenchRunner,
+    discover,
+    get_functions,
+    load_module,
+    measure,
+)
+
+
+class RunnerTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        mocker.patch.object(sys, 'path', list(sys.path))
+        yield
+        sys.modules.pop('helpers', None)
+
+    def setUp(self):
+        self.tmpdir.join('benchmarks', 'helpers.py').write(
+            'CALLS = []\n', ensure=True)
+        self.tmpdir.join('benchmarks', 'bench_a.py').write(
+            'from helpers import CALLS\n'
+            '\n'
+            'def bench_x():\n'
+            '    CALLS.append("x")\n'
+            '\n'
+            'def make():\n'
+            '    return lambda: CALLS.append("y")\n'
+            '\n'
+            'bench_y = make()\n'
+            'bench_z = 12\n'
+            '\n'
+            'def helper():\n'
+            '    pass\n',
+            ensure=True)
+        self.tmpdir.join('benchmarks', 'nested', 'bench_b.py').write(
+            'def bench_w():\n'
+            '    pass\n',
+            ensure=True)
+        self.tmpdir.join('benchmarks', 'not_bench.py').write('', ensure=True)
+        self.tmpdir.join('benchmarks', '.hidden', 'bench_c.py').write(
+            '', ensure=True)
+        self.path = str(self.tmpdir.join('benchmarks'))
+
+    #
+    # DISCOVER
+    #
+    def test_discover(self):
+
+        assert discover([self.path]) == [
+            ('bench_a.py', os.path.join(self.path, 'bench_a.py')),
+            (
+                os.path.join('nested', 'bench_b.py'),
+                os.path.join(self.path, 'nested', 'bench_b.py')),
+        ]
+
+    def test_discover__files(self):
+
+        path = os.path.join(self.path, 'nested', 'bench_b.py')
+
+        assert discover([path, path]) == [('bench_b.py', path)]
+
+    #
+    # LOAD_MODULE / GET_FUNCTIONS
+    #
+    def test_get_functions(self):
+
+        module = load_module(os.path.join(self.path, 'bench_a.py'))
+
+        assert [name for name, _ in get_functions(module)] == [
+            'bench_x', 'bench_y']
+
+    #
+    # MEASURE
+    #
+    def test_measure(self):
+
+        calls = []
+
+        stats = measure(lambda: calls.append(1), warmup=2, repeat=3)
+
+        assert len(calls) == 5
+        assert stats['repeat'] == 3
+        assert 0 <= stats['min'] <= stats['median'] <= stats['max']
+        assert stats['min'] <= stats['mean'] <= stats['max']
+
+    #
+    # BENCH_RUNNER
+    #
+    def test_run(self):
+
+        reported = []
+
+        results = BenchRunner([self.path], warmup=0, repeat=2).run(
+            report=lambda benchmark_id, stats: reported.append(benchmark_id))
+
+        assert sorted(results) == reported == [
+            'bench_a.py::bench_x',
+            'bench_a.py::bench_y',
+            os.path.join('nested', 'bench_b.py') + '::bench_w',
+        ]
+        assert results['bench_a.py::bench_x']['repeat'] == 2
+
+    def test_run__pattern(self):
+
+        results = BenchRunner([self.path], pattern='bench_x').run()
+
+        assert list(results) == ['bench_a.py::bench_x']
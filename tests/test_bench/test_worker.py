@@ -0,0 +1,40 @@
+import json
+import sys
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.bench.worker import main
+
+
+class WorkerTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker, capfd):
+        self.tmpdir = tmpdir
+        self.capfd = capfd
+        mocker.patch.object(sys, 'path', list(sys.path))
+
+    def setUp(self):
+        self.path = self.tmpdir.join('bench_a.py')
+        self.path.write(
+            'def bench_y():\n'
+            '    print("noise")\n'
+            '\n'
+            'def bench_x():\n'
+            '    pass\n')
+
+    def test_main__list(self):
+
+        main([str(self.path)])
+
+        out, _ = self.capfd.readouterr()
+        assert json.loads(out) == ['bench_x', 'bench_y']
+
+    def test_main__measure(self):
+
+        main([str(self.path), 'bench_y', '--warmup', '1', '--repeat', '3'])
+
+        out, err = self.capfd.readouterr()
+        assert json.loads(out)['repeat'] == 3
+        assert err == 'noise\n' * 4
@@ -1,4 +1,3 @@
-
 from unittest import TestCase
 
 from lily_assistant.checkers.commit_message import CommitMessageChecker
@@ -6,6 +5,93 @@ from lily_assistant.checkers.commit_message import CommitMessageChecker
 
 class CommitMessageCheckerTestCase(TestCase):
 
-    def test_is_valid(self):
+    def assert_errors(self, message, codes):
+
+        checker = CommitMessageChecker(message)
+
+        assert checker.is_valid() is (not codes)
+        assert [(e.line, e.code) for e in checker.errors] == codes
+
+    #
+    # IS_VALID
+    #
+    def test_is_valid__header_only(self):
+
+        self.assert_errors('feat: add deep structure rules', [])
+        self.assert_errors('fix(cli): handle missing config', [])
+        self.assert_errors('refactor(*)!: drop python 3.6', [])
+
+    def test_is_valid__body_and_footer(self):
+
+        self.assert_errors(
+            'perf(walker): cache directory listings\n'
+            '\n'
+            'Unchanged directories are not scanned anymore.\n'
+            '\n'
+            'Closes #123\n',
+            [])
+
+    def test_is_valid__git_comments_are_ignored(self):
+
+        self.assert_errors(
+            '\n'
+            'docs: describe hooks\n'
+            '# Please enter the commit message for your changes.\n'
+            '# ------------------------ >8 ------------------------\n'
+            'diff --git a/README.md b/README.md\n',
+            [])
+
+    def test_is_valid__generated_commits(self):
+
+        self.assert_errors('Merge branch \'feature\' into development', [])
+        self.assert_errors('Revert "feat: add deep structure rules"', [])
+        self.assert_errors('fixup! feat: add deep structure rules', [])
+        self.assert_errors('VERSION: 1.2.13', [])
+
+    def test_is_valid__empty(self):
+
+        self.assert_errors('', [(1, 'empty')])
+        self.assert_errors('\n# only comment\n', [(1, 'empty')])
+
+    def test_is_valid__header_format(self):
+
+        self.assert_errors('message', [(1, 'header-format')])
+        self.assert_errors('feat:missing space', [(1, 'header-format')])
+        self.assert_errors('feat(cli: add', [(1, 'header-format')])
+        self.assert_errors('feat: ', [(1, 'header-format')])
+
+    def test_is_valid__type(self):
+
+        self.assert_errors('feature: add rules', [(1, 'type')])
+
+    def test_is_valid__subject(self):
+
+        self.assert_errors('feat: Add rules', [(1, 'subject-case')])
+        self.assert_errors('feat: add rules.', [(1, 'subject-period')])
+        self.assert_errors(
+            'feat: Add rules.', [(1, 'subject-case'), (1, 'subject-period')])
+
+    def test_is_valid__blank_line(self):
+
+        self.assert_errors('feat: add rules\nbody', [(2, 'blank-line')])
+
+    def test_is_valid__line_length(self):
+
+        self.assert_errors(
+            'feat: ' + 100 * 'a', [(1, 'line-length')])
+        self.assert_errors(
+            'feat: add rules\n\n' + 101 * 'b', [(3, 'line-length')])
+
+    #
+    # RENDER_ERRORS
+    #
+    def test_render_errors(self):
+
+        checker = CommitMessageChecker('feature: Add rules')
+        checker.is_valid()
 
-        assert CommitMessageChecker('message').is_valid() is True
+        assert checker.render_errors() == (
+            'line 1: type must be one of: feat, fix, docs, style, refactor, '
+            'perf, test, chore, build, ci, revert [type]\n'
+            'line 1: subject must not start with a capital letter '
+            '[subject-case]')
@@ -0,0 +1,241 @@
+import subprocess
+from unittest import TestCase
+from unittest.mock import Mock
+
+import pytest
+
+from lily_assistant.checkers.push import (
+    EMPTY_TREE,
+    get_fingerprint,
+    parse_refs,
+    PushCache,
+    PushChecker,
+    PushedRef,
+    ZERO_SHA,
+)
+from lily_assistant.checkers.repo import GitRepo
+
+
+class ParseRefsTestCase(TestCase):
+
+    def test_parse_refs(self):
+
+        assert parse_refs([
+            'refs/heads/a {} refs/heads/a {}\n'.format('1' * 40, ZERO_SHA),
+            '(delete) {} refs/heads/b {}\n'.format(ZERO_SHA, '2' * 40),
+            '\n',
+        ]) == [
+            PushedRef('refs/heads/a', '1' * 40, 'refs/heads/a', ZERO_SHA),
+        ]
+
+
+class GetFingerprintTestCase(TestCase):
+
+    def test_get_fingerprint__command(self):
+
+        assert get_fingerprint() == get_fingerprint('')
+        assert get_fingerprint('make lint') != get_fingerprint()
+
+
+class PushCacheTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.path = str(tmpdir.join('cache', 'pre_push.json'))
+
+    def test_save_and_load(self):
+
+        cache = PushCache(self.path, 'abc', max_entries=2)
+        cache.add(['a..b'], ['c1', 'c2'])
+        cache.add(['b..c'], ['c3', 'c1'])
+        cache.save()
+
+        cache = PushCache(self.path, 'abc')
+
+        assert cache.ranges == ['a..b', 'b..c']
+        assert cache.commits == ['c3', 'c1']
+
+    def test_load__other_fingerprint(self):
+
+        cache = PushCache(self.path, 'abc')
+        cache.add(['a..b'], ['c1'])
+        cache.save()
+
+        cache = PushCache(self.path, 'def')
+
+        assert (cache.ranges, cache.commits) == ([], [])
+
+
+class PushCheckerTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, monkeypatch, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+
+        remote_dir = tmpdir.mkdir('remote.git')
+        self.git('init', '-q', '--bare', str(remote_dir))
+        self.work_dir = tmpdir.mkdir('work')
+        monkeypatch.chdir(str(self.work_dir))
+        self.git('init', '-q')
+        self.git('config', 'user.email', 'dev@example.com')
+        self.git('config', 'user.name', 'dev')
+        self.git('remote', 'add', 'origin', str(remote_dir))
+        self.base = self.commit('feat: initial commit', 'a.py', 'a = 1\n')
+        self.git('push', '-q', 'origin', 'HEAD:refs/heads/master')
+
+        self.cache = PushCache(
+            str(tmpdir.join('pre_push.json')), get_fingerprint())
+
+    def git(self, *args):
+        return subprocess.check_output(
+            ['git'] + list(args), universal_newlines=True).strip()
+
+    def commit(self, message, path, content):
+
+        self.work_dir.join(path).write(content)
+        self.git('add', path)
+        self.git('commit', '-q', '-m', message)
+
+        return self.git('rev-parse', 'HEAD')
+
+    def ref(self, tip, remote_sha=ZERO_SHA):
+        return PushedRef(
+            'refs/heads/feature', tip, 'refs/heads/feature', remote_sha)
+
+    def test_check__new_commits_only(self):
+
+        self.commit('feat: add b', 'b.py', 'b = 1\n')
+        tip = self.commit('fix: fix b', 'b.py', 'b = 2\n')
+        checker = PushChecker(GitRepo(), self.cache, remote='origin')
+
+        assert checker.check([self.ref(tip)]) == 2
+        assert checker.errors == []
+        assert checker.ranges == ['{}..{}'.format(self.base, tip)]
+
+    def test_check__invalid_commit_message(self):
+
+        first = self.commit('Added b', 'b.py', 'b = 1\n')
+        tip = self.commit('fix: fix b', 'b.py', 'b = 2\n')
+        checker = PushChecker(GitRepo(), self.cache, remote='origin')
+
+        assert checker.check([self.ref(tip)]) == 2
+        assert len(checker.errors) == 1
+        assert checker.errors[0].startswith(
+            '{} Added b'.format(first[:10]))
+        assert checker.ranges == []
+        assert checker.commits == [tip]
+
+    def test_check__aggregate_diff(self):
+
+        # -- the whitespace error fixed by the next commit is fine
+        self.commit('feat: add b', 'b.py', 'b = 1 \n')
+        tip = self.commit('fix: fix b', 'c.py', 'c = 1\n<<<<<<< HEAD\n')
+        checker = PushChecker(GitRepo(), self.cache, remote='origin')
+
+        checker.check([self.ref(tip)])
+
+        assert len(checker.errors) == 1
+        error = checker.errors[0]
+        assert error.startswith('refs/heads/feature {}..{}'.format(
+            self.base, tip))
+        assert 'b.py:1: trailing whitespace.' in error
+        assert 'c.py:2: leftover conflict marker' in error
+
+    def test_check__cached(self):
+
+        tip = self.commit('feat: add b', 'b.py', 'b = 1\n')
+        checker = PushChecker(GitRepo(), self.cache, remote='origin')
+        checker.check([self.ref(tip)])
+        checker.save()
+
+        check_diff = self.mocker.spy(GitRepo, 'check_diff')
+        iter_commits = self.mocker.spy(GitRepo, 'iter_commits')
+        checker = PushChecker(GitRepo(), self.cache, remote='origin')
+
+        assert checker.check([self.ref(tip)]) == 0
+        assert check_diff.call_count == 0
+        assert iter_commits.call_count == 0
+
+        # -- only the new commit's message is checked
+        tip = self.commit('feat: add c', 'c.py', 'c = 1\n')
+        checker = PushChecker(GitRepo(), self.cache, remote='origin')
+
+        assert checker.check([self.ref(tip)]) == 1
+        assert check_diff.call_count == 1
+
+    def test_check__already_on_remote(self):
+
+        tip = self.commit('feat: add b', 'b.py', 'b = 1\n')
+        self.git('push', '-q', 'origin', 'HEAD:refs/heads/other')
+        self.git('fetch', '-q', 'origin')
+        checker = PushChecker(GitRepo(), self.cache, remote='origin')
+
+        assert checker.check([self.ref(tip)]) == 0
+
+    def test_check__remote_url(self):
+
+        tip = self.commit('feat: add b', 'b.py', 'b = 1\n')
+        self.git('push', '-q', 'origin', 'HEAD:refs/heads/other')
+        self.git('fetch', '-q', 'origin')
+        checker = PushChecker(
+            GitRepo(), self.cache, remote=str(self.tmpdir.join('remote.git')))
+
+        assert checker.check([self.ref(tip)]) == 0
+        assert checker.remote_name == 'origin'
+
+    def test_check__unknown_remote_url(self):
+
+        tip = self.commit('feat: add b', 'b.py', 'b = 1\n')
+        checker = PushChecker(
+            GitRepo(), self.cache, remote='git@host:other.git')
+
+        # -- checked against all the remotes
+        assert checker.check([self.ref(tip)]) == 1
+        assert checker.remote_name is None
+        assert checker.ranges == ['{}..{}'.format(self.base, tip)]
+
+    def test_check__tip_verified(self):
+
+        tip = self.commit('feat: add b', 'b.py', 'b = 1\n')
+        verifier = Mock(
+            pool=Mock(base_path=str(self.work_dir)),
+            command='make lint',
+            verify=Mock(return_value=False))
+        checker = PushChecker(
+            GitRepo(), self.cache, remote='origin', verifier=verifier)
+
+        checker.check([self.ref(tip)])
+
+        commit, = verifier.verify.call_args[0]
+        assert commit.sha == tip
+        assert commit.tree == self.git('rev-parse', 'HEAD^{tree}')
+        assert commit.subject == 'feat: add b'
+        assert checker.errors == [
+            'refs/heads/feature {}..{}\n\n`make lint` failed at {}'.format(
+                self.base, tip, tip[:10])]
+        assert checker.ranges == []
+
+        verifier.verify.return_value = True
+        checker = PushChecker(
+            GitRepo(), self.cache, remote='origin', verifier=verifier)
+
+        checker.check([self.ref(tip)])
+
+        assert checker.errors == []
+        assert checker.ranges == ['{}..{}'.format(self.base, tip)]
+
+    def test_check__remote_sha(self):
+
+        previous = self.commit('feat: add b', 'b.py', 'b = 1\n')
+        tip = self.commit('feat: add c', 'c.py', 'c = 1\n')
+        checker = PushChecker(GitRepo(), self.cache, remote='origin')
+
+        assert checker.check([self.ref(tip, remote_sha=previous)]) == 1
+        assert checker.ranges == ['{}..{}'.format(previous, tip)]
+
+    def test_get_base__root(self):
+
+        checker = PushChecker(GitRepo(), self.cache)
+
+        assert checker.get_base([]) == EMPTY_TREE
@@ -1,3 +1,4 @@
+import io
 
 from unittest import TestCase
 from unittest.mock import MagicMock, Mock, call
@@ -34,3 +35,135 @@ class GitRepoTestCase(TestCase):
         assert Popen.call_args_list == [
             call(['git', 'rev-parse', '--abbrev-ref', 'HEAD'], stdout=-1),
         ]
+
+    #
+    # ITER_COMMITS
+    #
+    def test_iter_commits(self):
+
+        Popen = self.mocker.patch('lily_assistant.checkers.repo.Popen')  # noqa
+        output = io.BytesIO(
+            b'aaa111\nfeat: add rules\n\nbody\n\0'
+            b'bbb222\nfix: handle config\n\0'
+            b'ccc333\nVERSION: 1.2.13\n')
+        proc = Mock(stdout=output, returncode=0)
+        Popen.return_value = MagicMock(__enter__=Mock(return_value=proc))
+
+        commits = list(GitRepo().iter_commits('master..HEAD', chunk_size=7))
+
+        assert commits == [
+            ('aaa111', 'feat: add rules\n\nbody\n'),
+            ('bbb222', 'fix: handle config\n'),
+            ('ccc333', 'VERSION: 1.2.13\n'),
+        ]
+        assert Popen.call_args_list == [
+            call(
+                ['git', 'log', '-z', '--format=%H%n%B', 'master..HEAD'],
+                stdout=-1,
+                stderr=-1),
+        ]
+
+    def test_iter_commits__revisions(self):
+
+        Popen = self.mocker.patch('lily_assistant.checkers.repo.Popen')  # noqa
+        proc = Mock(stdout=io.BytesIO(b''), returncode=0)
+        Popen.return_value = MagicMock(__enter__=Mock(return_value=proc))
+
+        assert list(GitRepo().iter_commits(['aaa111', '--not', '--remotes'])) == []
+        assert Popen.call_args_list == [
+            call(
+                [
+                    'git', 'log', '-z', '--format=%H%n%B',
+                    'aaa111', '--not', '--remotes',
+                ],
+                stdout=-1,
+                stderr=-1),
+        ]
+
+    def test_iter_commits__git_fails(self):
+
+        Popen = self.mocker.patch('lily_assistant.checkers.repo.Popen')  # noqa
+        proc = Mock(
+            stdout=io.BytesIO(b''),
+            stderr=io.BytesIO(b"fatal: bad revision 'unknown..HEAD'\n"),
+            returncode=128)
+        Popen.return_value = MagicMock(__enter__=Mock(return_value=proc))
+
+        with pytest.raises(OSError) as e:
+            list(GitRepo().iter_commits('unknown..HEAD'))
+
+        assert e.value.args[0] == (
+            "git log unknown..HEAD failed: fatal: bad revision 'unknown..HEAD'")
+
+    #
+    # GET_CHANGED_LINES
+    #
+    def test_get_changed_lines(self):
+
+        Popen = self.mocker.patch('lily_assistant.checkers.repo.Popen')  # noqa
+        output = io.BytesIO(
+            b'diff --git a/code/a.py b/code/a.py\n'
+            b'index 1..2 100644\n'
+            b'--- a/code/a.py\n'
+            b'+++ b/code/a.py\n'
+            b'@@ -3 +3 @@ def a():\n'
+            b'-    x = 1\n'
+            b'+    x = 2\n'
+            b'@@ -10,0 +11,3 @@\n'
+            b'+y = 1\n'
+            b'+z = 2\n'
+            b'+w = 3\n'
+            b'@@ -20,2 +23,0 @@\n'
+            b'-gone = 1\n'
+            b'-gone = 2\n'
+            b'diff --git a/b.py b/b.py\n'
+            b'new file mode 100644\n'
+            b'--- /dev/null\n'
+            b'+++ b/b.py\n'
+            b'@@ -0,0 +1,2 @@\n'
+            b'+b = 1\n'
+            b'+@@ -1 +1 @@ not a hunk\n')
+        proc = Mock(stdout=output, returncode=0)
+        Popen.return_value = MagicMock(__enter__=Mock(return_value=proc))
+
+        assert GitRepo().get_changed_lines() == {
+            'code/a.py': {3, 11, 12, 13},
+            'b.py': {1, 2},
+        }
+        assert Popen.call_args_list == [
+            call(
+                [
+                    'git',
+                    '-c', 'core.quotePath=false',
+                    'diff',
+                    '-U0',
+                    '--no-color',
+                    '--no-ext-diff',
+                    '--relative',
+                    '--diff-filter=d',
+                    '--src-prefix=a/',
+                    '--dst-prefix=b/',
+                    '--cached',
+                ],
+                stdout=-1),
+        ]
+
+    def test_get_changed_lines__against_revision(self):
+
+        Popen = self.mocker.patch('lily_assistant.checkers.repo.Popen')  # noqa
+        proc = Mock(stdout=io.BytesIO(b''), returncode=0)
+        Popen.return_value = MagicMock(__enter__=Mock(return_value=proc))
+
+        assert GitRepo().get_changed_lines('master') == {}
+        assert Popen.call_args_list[0][0][0][-1] == 'master'
+
+    def test_get_changed_lines__git_fails(self):
+
+        Popen = self.mocker.patch('lily_assistant.checkers.repo.Popen')  # noqa
+        proc = Mock(stdout=io.BytesIO(b''), returncode=128)
+        Popen.return_value = MagicMock(__enter__=Mock(return_value=proc))
+
+        with pytest.raises(OSError) as e:
+            GitRepo().get_changed_lines()
+
+        assert e.value.args[0] == 'git diff returned exit code: 128'
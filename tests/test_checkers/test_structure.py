@@ -1,5 +1,6 @@
 
 import os
+import textwrap
 from unittest import TestCase
 
 import pytest
@@ -8,6 +9,9 @@ from lily_assistant.checkers.structure import (
     StructureChecker,
     File,
     Directory,
+    find_package_data,
+    ModuleTestsRule,
+    StrayFileRule,
 )
 from tests import remove_white_chars
 
@@ -239,3 +243,150 @@ class StructureCheckerTestCase(TestCase):
         ''')
 
         assert remove_white_chars(text) == expected
+
+        # -- all the errors are indented the same way
+        assert text.endswith(
+            '\nERRORS:\n'
+            '+ Missing: `requirements.txt` file. Its purpose is: to require\n'
+            '+ Missing: `images` directory. Its purpose is: to image\n')
+
+
+class ModuleTestsRuleTestCase(TestCase):
+
+    #
+    # CHECK
+    #
+    def test_check(self):
+
+        tree = {
+            '': {'setup.py'},
+            'code': {'__init__.py', 'config.py', 'main.py'},
+            'code/cli': {'__init__.py', 'cli.py', '_private.py'},
+            'tests': {'__init__.py', 'test_config.py'},
+            'tests/test_cli': {'__init__.py', 'test_cli.py'},
+        }
+
+        assert ModuleTestsRule('code').check(tree) == [
+            'Missing: `tests/test_main.py` test module for `code/main.py`',
+        ]
+
+
+class FindPackageDataTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+
+    def test_find_package_data(self):
+
+        self.tmpdir.join('setup.py').write(textwrap.dedent('''
+            from setuptools import setup
+
+            setup(
+                name='code',
+                install_requires=requirements,
+                package_data={'code.cli': ['*.makefile'], '': ['*.txt']},
+                data_files=[('', ['README.md', 'code/ci/ci.yml'])])
+        '''))
+        self.tmpdir.join('MANIFEST.in').write(textwrap.dedent('''
+            include code/VERSION
+            recursive-include code/templates *.html
+            graft code/static
+            global-include *.json
+        '''))
+
+        assert find_package_data(str(self.tmpdir)) == [
+            'code/cli/*.makefile',
+            '*/*.txt',
+            'README.md',
+            'code/ci/ci.yml',
+            'code/VERSION',
+            'code/templates/*.html',
+            'code/templates/*/*.html',
+            'code/static/*',
+            '*/*.json',
+        ]
+
+    def test_find_package_data__nothing_declared(self):
+
+        self.tmpdir.join('setup.py').write('setup(')
+
+        assert find_package_data(str(self.tmpdir)) == []
+
+
+class StrayFileRuleTestCase(TestCase):
+
+    #
+    # CHECK
+    #
+    def test_check(self):
+
+        tree = {
+            '': {'README.md'},
+            'code': {'__init__.py', 'config.py', 'notes.txt'},
+            'code/assets': {'logo.png'},
+            'code/cli': {'__init__.py', 'base.makefile'},
+        }
+
+        assert StrayFileRule('code').check(tree) == [
+            'Stray: `code/notes.txt` file in the package `code`',
+            'Stray: `code/cli/base.makefile` file in the package `code/cli`',
+        ]
+
+    def test_check__allowed_files(self):
+
+        tree = {
+            'code': {'__init__.py', 'notes.txt', 'base.makefile'},
+        }
+
+        assert StrayFileRule('code', ['*.py', '*.makefile']).check(tree) == [
+            'Stray: `code/notes.txt` file in the package `code`',
+        ]
+
+    def test_check__package_data(self):
+
+        tree = {
+            'code': {'__init__.py', 'notes.txt', 'VERSION'},
+            'code/cli': {'__init__.py', 'base.makefile', 'other.makefile'},
+        }
+        rule = StrayFileRule(
+            'code', package_data=['code/cli/base.makefile', '*/*.txt'])
+
+        assert rule.check(tree) == [
+            'Stray: `code/VERSION` file in the package `code`',
+            'Stray: `code/cli/other.makefile` file in the package `code/cli`',
+        ]
+
+
+class StructureCheckerDeepTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+
+    #
+    # IS_VALID
+    #
+    def test_is_valid__deep(self):
+
+        base_dir = self.tmpdir.mkdir('base')
+        base_dir.join('.gitignore').write('*.pyc\n')
+        code_dir = base_dir.mkdir('code')
+        code_dir.join('__init__.py').write('#')
+        code_dir.join('__init__.pyc').write('#')
+        code_dir.join('main.py').write('#')
+        code_dir.join('notes.txt').write('#')
+        base_dir.mkdir('tests').join('test_other.py').write('#')
+        os.chdir(str(base_dir))
+
+        checker = StructureChecker(deep=True)
+        self.mocker.patch.object(checker, 'REQUIRED_STRUCTURE', [])
+
+        assert checker.is_valid() is False
+        assert checker.errors == [
+            'Missing: `tests/test_main.py` test module for `code/main.py`',
+            'Stray: `code/notes.txt` file in the package `code`',
+        ]
+        assert os.path.exists(
+            str(base_dir.join('.lily', 'cache', 'structure.json')))
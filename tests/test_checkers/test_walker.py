@@ -0,0 +1,119 @@
+
+import json
+import os
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.checkers.walker import GitIgnore, Walker
+
+
+class GitIgnoreTestCase(TestCase):
+
+    #
+    # MATCH
+    #
+    def test_match__basename(self):
+
+        ignore = GitIgnore('', ['*.pyc', '__pycache__/'])
+
+        assert ignore.match('a.pyc', False) is True
+        assert ignore.match('code/deep/a.pyc', False) is True
+        assert ignore.match('code/__pycache__', True) is True
+        assert ignore.match('code/__pycache__', False) is None
+        assert ignore.match('code/a.py', False) is None
+
+    def test_match__anchored(self):
+
+        ignore = GitIgnore('', ['/build', 'docs/*.html', 'a/**/z'])
+
+        assert ignore.match('build', True) is True
+        assert ignore.match('code/build', True) is None
+        assert ignore.match('docs/index.html', False) is True
+        assert ignore.match('docs/deep/index.html', False) is None
+        assert ignore.match('a/z', False) is True
+        assert ignore.match('a/b/c/z', False) is True
+
+    def test_match__negation_and_comments(self):
+
+        ignore = GitIgnore('', ['# comment', '', '*.log', '!keep.log'])
+
+        assert ignore.match('debug.log', False) is True
+        assert ignore.match('keep.log', False) is False
+        assert ignore.match('# comment', False) is None
+
+    def test_match__nested_base(self):
+
+        ignore = GitIgnore('code', ['/local.py'])
+
+        assert ignore.match('code/local.py', False) is True
+        assert ignore.match('local.py', False) is None
+        assert ignore.match('other/local.py', False) is None
+
+
+class WalkerTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+
+    def setUp(self):
+        self.base_dir = self.tmpdir.mkdir('base')
+        self.base_dir.join('.gitignore').write('*.pyc\nbuild/\n')
+        self.base_dir.mkdir('.git').join('HEAD').write('ref')
+        self.base_dir.mkdir('build').join('out.py').write('#')
+        code_dir = self.base_dir.mkdir('code')
+        code_dir.join('__init__.py').write('#')
+        code_dir.join('__init__.pyc').write('#')
+        code_dir.join('.gitignore').write('/local.py\n')
+        code_dir.join('local.py').write('#')
+        code_dir.mkdir('sub').join('a.py').write('#')
+
+        self.cache_path = str(self.tmpdir.join('cache', 'structure.json'))
+
+    #
+    # WALK
+    #
+    def test_walk(self):
+
+        tree = Walker(str(self.base_dir), workers=2).walk()
+
+        assert tree == {
+            '': {'.gitignore'},
+            'code': {'__init__.py', '.gitignore'},
+            'code/sub': {'a.py'},
+        }
+
+    def test_walk__saves_cache(self):
+
+        Walker(str(self.base_dir), cache_path=self.cache_path).walk()
+
+        with open(self.cache_path) as f:
+            cache = json.loads(f.read())
+
+        assert set(cache.keys()) == {'', 'code', 'code/sub'}
+        assert cache['code/sub'][1:] == [['a.py'], []]
+
+    def test_walk__unchanged_directories_are_not_scanned(self):
+
+        Walker(str(self.base_dir), cache_path=self.cache_path).walk()
+        scandir = self.mocker.spy(os, 'scandir')
+
+        tree = Walker(str(self.base_dir), cache_path=self.cache_path).walk()
+
+        assert scandir.call_count == 0
+        assert tree['code/sub'] == {'a.py'}
+
+    def test_walk__changed_directories_are_scanned(self):
+
+        Walker(str(self.base_dir), cache_path=self.cache_path).walk()
+        sub_dir = self.base_dir.join('code', 'sub')
+        sub_dir.join('b.py').write('#')
+        os.utime(str(sub_dir), ns=(1, 1))
+        scandir = self.mocker.spy(os, 'scandir')
+
+        tree = Walker(str(self.base_dir), cache_path=self.cache_path).walk()
+
+        assert scandir.call_count == 1
+        assert tree['code/sub'] == {'a.py', 'b.py'}
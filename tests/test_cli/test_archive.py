@@ -0,0 +1,170 @@
+import io
+import json
+import os
+import time
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.cli.archive import (
+    ArchiveTee,
+    list_runs,
+    OutputArchive,
+    read_output,
+)
+
+
+class OutputArchiveTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+        self.logs_dir = str(tmpdir.join('logs'))
+
+    def read(self, run):
+        return ''.join(read_output(run['path']))
+
+    #
+    # WRITE & READ
+    #
+    def test_write__opens_archive_lazily(self):
+
+        archive = OutputArchive(self.logs_dir, 'lily_assistant run lint')
+        assert not os.path.exists(self.logs_dir)
+
+        archive.write('hello\n')
+        archive.write('żółw\n')
+
+        runs = list_runs(self.logs_dir)
+        assert len(runs) == 1
+        assert runs[0]['status'] == 'running'
+        assert runs[0]['command'] == 'lily_assistant run lint'
+
+        archive.close('failed')
+
+        run, = list_runs(self.logs_dir)
+        assert run['status'] == 'failed'
+        assert run['finished'] >= run['started']
+        assert self.read(run) == 'hello\nżółw\n'
+
+    def test_close__not_opened(self):
+
+        OutputArchive(self.logs_dir, 'lily_assistant version').close('passed')
+
+        assert list_runs(self.logs_dir) == []
+
+    def test_write__rotates_segments(self):
+
+        archive = OutputArchive(
+            self.logs_dir, 'cmd', segment_size=20000, segments=3)
+        lines = [
+            '{} {}\n'.format(i, os.urandom(1024).hex()) for i in range(200)]
+        for line in lines:
+            archive.write(line)
+
+        archive.close('failed')
+
+        run, = list_runs(self.logs_dir)
+        segments = [
+            name for name in os.listdir(run['path']) if name.endswith('.z')]
+        assert len(segments) == 3
+        assert 'output.0.z' in segments
+        output = self.read(run)
+
+        # -- both the start and the end of the output are kept
+        assert output.startswith(lines[0])
+        assert output.endswith(lines[-1])
+        assert lines[100] not in output
+        assert 'segment(s) of output rotated out ...]' in output
+
+    def test_read_output__unfinished_segment(self):
+
+        archive = OutputArchive(self.logs_dir, 'cmd')
+        content = os.urandom(200000).hex()
+        archive.write(content)
+        archive.file.flush()
+
+        # -- the run got killed, the stream is not finished
+        run, = list_runs(self.logs_dir)
+        output = self.read(run)
+
+        assert output and content.startswith(output)
+
+    #
+    # PRUNE
+    #
+    def test_prune__max_runs(self):
+
+        for i in range(4):
+            archive = OutputArchive(self.logs_dir, str(i), max_runs=2)
+            archive.write('run {}\n'.format(i))
+            archive.close('passed')
+
+        assert [run['command'] for run in list_runs(self.logs_dir)] == [
+            '2', '3']
+
+    def test_prune__max_size(self):
+
+        for i in range(3):
+            archive = OutputArchive(self.logs_dir, str(i), max_size=2000)
+            archive.write(os.urandom(1000).hex())
+            archive.close('passed')
+
+        assert [run['command'] for run in list_runs(self.logs_dir)] == ['2']
+
+    def test_prune__keeps_running(self):
+
+        running = OutputArchive(self.logs_dir, 'parent')
+        running.write('parent\n')
+
+        archive = OutputArchive(self.logs_dir, 'child', max_runs=1)
+        archive.write('child\n')
+        archive.close('passed')
+
+        assert [run['command'] for run in list_runs(self.logs_dir)] == [
+            'parent', 'child']
+
+    def test_prune__removes_stale_running(self):
+
+        running = OutputArchive(self.logs_dir, 'killed')
+        running.write('killed\n')
+        meta_path = os.path.join(running.run_path, 'meta.json')
+        with open(meta_path, 'w') as f:
+            f.write(json.dumps({
+                'command': 'killed',
+                'status': 'running',
+                'started': time.time() - 2 * OutputArchive.STALE_AFTER,
+            }))
+
+        archive = OutputArchive(self.logs_dir, 'next', max_runs=1)
+        archive.write('next\n')
+        archive.close('passed')
+
+        assert [run['command'] for run in list_runs(self.logs_dir)] == [
+            'next']
+
+    #
+    # LIST RUNS
+    #
+    def test_list_runs__skips_broken(self):
+
+        self.tmpdir.mkdir('logs').mkdir('20200101-000000.000000-1')
+
+        assert list_runs(self.logs_dir) == []
+        assert list_runs(str(self.tmpdir.join('missing'))) == []
+
+
+class ArchiveTeeTestCase(TestCase):
+
+    def test_write(self):
+
+        recorded = []
+        stream = io.BytesIO()
+        tee = ArchiveTee(stream, recorded.append)
+
+        tee.write('ż'.encode('utf-8')[:1])
+        tee.write('ż'.encode('utf-8')[1:] + b'!')
+        tee.flush()
+
+        assert stream.getvalue() == 'ż!'.encode('utf-8')
+        assert ''.join(recorded) == 'ż!'
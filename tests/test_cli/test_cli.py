@@ -1,19 +1,29 @@
+import json
 
 import os
+import sys
 from unittest import TestCase
-from unittest.mock import call, Mock
+from unittest.mock import call, Mock, PropertyMock
 import textwrap
 
 from click.testing import CliRunner
 import pytest
 
 from lily_assistant.checkers.commit_message import CommitMessageChecker
+from lily_assistant.checkers.push import PushChecker, PushedRef
 from lily_assistant.checkers.repo import GitRepo
-from lily_assistant.cli.cli import cli
+from lily_assistant.cli.cli import cli, COMMANDS
 from lily_assistant.cli.copier import Copier
+from lily_assistant.cli.logger import Logger
 from lily_assistant.config import Config
 from lily_assistant.repo.repo import Repo
+from lily_assistant.repo.snapshot import IndexSnapshot
+from lily_assistant.repo.verify import Commit, RangeVerifier
 from lily_assistant.repo.version import VersionRenderer
+from lily_assistant.runner.runner import Runner
+from lily_assistant.watch.inotify import InotifyWatcher
+from lily_assistant.watch.session import WatchSession
+from tests.test_coverage import create_coverage_data
 
 
 class ConfigMock:
@@ -77,9 +87,80 @@ class CliTestCase(TestCase):
         self.mocker.patch.object(
             Config, 'get_project_path').return_value = str(self.base_dir)
 
+        # -- archived only if the test creates the `.lily` directory
+        self.logs_dir = str(self.base_dir.join('.lily', 'logs'))
+        for module in ['cli', 'logs']:
+            self.mocker.patch(
+                'lily_assistant.cli.{}.get_logs_path'.format(module),
+                return_value=self.logs_dir)
+
     def setUp(self):
         self.runner = CliRunner()
 
+    #
+    # LIST COMMANDS
+    #
+    def test_help__lists_all_lazy_commands(self):
+
+        result = self.runner.invoke(cli, ['--help'])
+
+        assert result.exit_code == 0
+        for command in COMMANDS:
+            assert command in result.output
+
+    #
+    # LOG FORMAT
+    #
+    def test_log_format__json(self):
+
+        self.mocker.patch.object(
+            GitRepo, 'iter_commits'
+        ).return_value = iter([
+            ('aaa111', 'feat: add rules\n'),
+            ('bbb222', 'Added stuff\n'),
+        ])
+
+        try:
+            result = self.runner.invoke(
+                cli, ['--log-format', 'json', 'check-commits', 'master..HEAD'])
+
+        finally:
+            Logger.configure()
+
+        assert result.exit_code == 1
+        events = [json.loads(line) for line in result.output.splitlines()]
+        assert [event['level'] for event in events] == ['error', 'error']
+        assert events[0]['message'].startswith('bbb222 Added stuff')
+        assert events[1]['message'] == (
+            '1 out of 2 commits are not following the commit message '
+            'convention')
+        assert all(isinstance(event['time'], float) for event in events)
+
+    def test_log_format__from_env(self):
+
+        self.mocker.patch.object(GitRepo, 'active_branch', 'development')
+
+        try:
+            result = self.runner.invoke(
+                cli,
+                ['is-not-master'],
+                env={'LILY_LOG_FORMAT': 'json', 'LILY_QUIET': '1'})
+            log_format, quiet = Logger.log_format, Logger.quiet
+
+        finally:
+            Logger.configure()
+
+        assert result.exit_code == 0
+        assert (log_format, quiet) == ('json', True)
+
+    def test_log_format__invalid(self):
+
+        result = self.runner.invoke(
+            cli, ['--log-format', 'xml', 'is-not-master'])
+
+        assert result.exit_code == 2
+        assert "'xml' is not one of 'text', 'json'" in result.output
+
     #
     # INIT
     #
@@ -96,7 +177,17 @@ class CliTestCase(TestCase):
 
             include .lily/lily_assistant.makefile
         ''').strip()
-        assert copy.call_args_list == [call('src_dir')]
+        assert copy.call_args_list == [call('src_dir', symlink_hooks=False)]
+
+    def test_init__symlink_hooks(self):
+
+        copy = self.mocker.patch.object(Copier, 'copy')
+
+        result = self.runner.invoke(
+            cli, ['init', 'src_dir', '--symlink-hooks'])
+
+        assert result.exit_code == 0
+        assert copy.call_args_list == [call('src_dir', symlink_hooks=True)]
 
     #
     # HAS_CORRECT_STRUCTURE
@@ -105,7 +196,7 @@ class CliTestCase(TestCase):
 
         raise_errors = Mock()
         self.mocker.patch(
-            'lily_assistant.cli.cli.StructureChecker'
+            'lily_assistant.cli.checkers.StructureChecker'
         ).return_value = Mock(
             is_valid=Mock(return_value=True),
             raise_errors=raise_errors)
@@ -116,11 +207,24 @@ class CliTestCase(TestCase):
         assert result.output == ''
         assert raise_errors.call_count == 0
 
+    def test_has_correct_structure__deep(self):
+
+        self.mocker.patch.object(Config, 'exists').return_value = False
+        checker = self.mocker.patch(
+            'lily_assistant.cli.checkers.StructureChecker')
+        checker.return_value = Mock(is_valid=Mock(return_value=True))
+
+        result = self.runner.invoke(cli, ['has-correct-structure', '--deep'])
+
+        assert result.exit_code == 0
+        assert checker.call_args_list == [
+            call(deep=True, allowed_files=None)]
+
     def test_has_correct_structure__invalid(self):
 
         raise_errors = Mock()
         self.mocker.patch(
-            'lily_assistant.cli.cli.StructureChecker'
+            'lily_assistant.cli.checkers.StructureChecker'
         ).return_value = Mock(
             is_valid=Mock(return_value=False),
             raise_errors=raise_errors)
@@ -193,6 +297,229 @@ class CliTestCase(TestCase):
             your commit message is not following the commit message convention.
         ''').strip()
 
+    #
+    # CHECK_COMMITS
+    #
+    def test_check_commits__valid(self):
+
+        iter_commits = self.mocker.patch.object(GitRepo, 'iter_commits')
+        iter_commits.return_value = iter([
+            ('aaa111', 'feat: add rules\n'),
+            ('bbb222', 'VERSION: 1.2.13\n'),
+        ])
+
+        result = self.runner.invoke(cli, ['check-commits', 'master..HEAD'])
+
+        assert result.exit_code == 0
+        assert result.output.strip() == textwrap.dedent('''
+            [INFO]
+
+            all 2 commits are valid
+        ''').strip()
+        assert iter_commits.call_args_list == [call('master..HEAD')]
+
+    def test_check_commits__invalid(self):
+
+        self.mocker.patch.object(
+            GitRepo, 'iter_commits'
+        ).return_value = iter([
+            ('aaa111', 'feat: add rules\n'),
+            ('bbb222', 'Added stuff\n'),
+        ])
+
+        result = self.runner.invoke(cli, ['check-commits', 'master..HEAD'])
+
+        assert result.exit_code == 1
+        assert result.output.strip() == textwrap.dedent('''
+            [ERROR]
+
+            bbb222 Added stuff
+
+            line 1: header must follow the `<type>(<scope>): <subject>` format [header-format]
+            Error: 1 out of 2 commits are not following the commit message convention
+        ''').strip()
+
+    def test_check_commits__bad_range(self):
+
+        self.mocker.patch.object(
+            GitRepo, 'iter_commits',
+            side_effect=OSError(
+                "git log nope..HEAD failed: fatal: bad revision 'nope..HEAD'"))
+
+        result = self.runner.invoke(cli, ['check-commits', 'nope..HEAD'])
+
+        assert result.exit_code == 1
+        assert result.output == (
+            "Error: git log nope..HEAD failed: fatal: bad revision "
+            "'nope..HEAD'\n")
+
+    #
+    # PRE_PUSH
+    #
+    def test_pre_push__valid(self):
+
+        self.mocker.patch.object(
+            Config, 'get_cache_path').return_value = str(self.base_dir)
+        check = self.mocker.patch.object(
+            PushChecker, 'check', return_value=3)
+        save = self.mocker.patch.object(PushChecker, 'save')
+        refs = 'refs/heads/a {sha} refs/heads/a {zero}\n'.format(
+            sha='1' * 40, zero='0' * 40)
+
+        result = self.runner.invoke(
+            cli, ['pre-push', 'origin', 'git@host:repo.git'], input=refs)
+
+        assert result.exit_code == 0
+        assert result.output.strip() == textwrap.dedent('''
+            [INFO]
+
+            checked 3 new commit(s) of 1 ref(s)
+        ''').strip()
+        assert check.call_args_list == [call([
+            PushedRef('refs/heads/a', '1' * 40, 'refs/heads/a', '0' * 40),
+        ])]
+        assert save.call_count == 1
+
+    def test_pre_push__command(self):
+
+        self.mocker.patch.object(
+            Config, 'get_cache_path').return_value = str(self.base_dir)
+        checkers = []
+
+        def check(checker, refs):
+            checkers.append(checker)
+
+            return 0
+
+        self.mocker.patch.object(PushChecker, 'check', check)
+        self.mocker.patch.object(PushChecker, 'save')
+        save = self.mocker.patch.object(RangeVerifier, 'save')
+
+        result = self.runner.invoke(
+            cli, ['pre-push', 'git@host:repo.git', 'git@host:repo.git'],
+            input='')
+
+        assert result.exit_code == 0
+        checker, = checkers
+        assert checker.remote == 'git@host:repo.git'
+        assert checker.verifier.command == (
+            'lily_assistant run lint && lily_assistant has-correct-structure')
+        assert save.call_count == 1
+
+        result = self.runner.invoke(
+            cli, ['pre-push', 'origin', '--command', ''], input='')
+
+        assert result.exit_code == 0
+        assert checkers[1].verifier is None
+
+    def test_pre_push__invalid(self):
+
+        self.mocker.patch.object(
+            Config, 'get_cache_path').return_value = str(self.base_dir)
+
+        def check(checker, refs):
+            checker.errors.append('aaa111 Added stuff')
+
+            return 1
+
+        self.mocker.patch.object(PushChecker, 'check', check)
+        self.mocker.patch.object(PushChecker, 'save')
+
+        result = self.runner.invoke(cli, ['pre-push', 'origin'], input='')
+
+        assert result.exit_code == 1
+        assert result.output.strip() == textwrap.dedent('''
+            [ERROR]
+
+            aaa111 Added stuff
+            Error: pushed commits are not passing the checks
+        ''').strip()
+
+    #
+    # CHECK_STAGED
+    #
+    def mock_check_staged(self, settings, is_needed=True):
+
+        self.mocker.patch.object(Config, 'exists', return_value=True)
+        self.mocker.patch.object(Config, '__init__', return_value=None)
+        self.mocker.patch.object(
+            Config, 'pre_commit',
+            new_callable=PropertyMock,
+            return_value=settings)
+        self.mocker.patch.object(
+            IndexSnapshot, 'is_needed', return_value=is_needed)
+
+        def create(snapshot):
+            snapshot.path = str(self.base_dir.join('snapshot'))
+            snapshot.git_path = str(self.base_dir.join('.git'))
+            snapshot.index_path = snapshot.path + '.index'
+            snapshot.checked_out = ['a.py']
+            snapshot.linked = 2
+
+        self.mocker.patch.object(IndexSnapshot, 'create', create)
+        self.mocker.patch.object(IndexSnapshot, 'remove')
+
+        return self.mocker.patch(
+            'lily_assistant.cli.staged.run_command', return_value=0)
+
+    def test_check_staged__snapshot(self):
+
+        run_command = self.mock_check_staged({})
+
+        result = self.runner.invoke(cli, ['check-staged', '--command', 'ls'])
+
+        assert result.exit_code == 0
+        assert result.output.strip() == textwrap.dedent('''
+            [INFO]
+
+            checking the staged files (1 checked out, 2 hardlinked)
+        ''').strip()
+        (command, cwd, env), _ = run_command.call_args
+        assert (command, cwd) == ('ls', str(self.base_dir.join('snapshot')))
+        assert env['PYTHONPATH'].split(os.pathsep)[0] == cwd
+        assert env['LILY_TEST_CACHE_PATH'].endswith(
+            os.path.join('.lily', 'cache', 'tests'))
+        assert env['GIT_DIR'] == str(self.base_dir.join('.git'))
+        assert env['GIT_WORK_TREE'] == cwd
+        assert env['GIT_INDEX_FILE'] == cwd + '.index'
+        assert IndexSnapshot.remove.call_count == 1
+
+    def test_check_staged__pre_commit_disabled(self):
+
+        run_command = self.mock_check_staged({})
+
+        result = self.runner.invoke(cli, ['check-staged', '--pre-commit'])
+
+        assert result.exit_code == 0
+        assert result.output == ''
+        (command, cwd, env), _ = run_command.call_args
+        assert (command, cwd) == (
+            'make lint && make test_all', str(self.base_dir))
+
+    def test_check_staged__pre_commit_enabled(self):
+
+        run_command = self.mock_check_staged({'snapshot': True})
+        run_command.return_value = 2
+
+        result = self.runner.invoke(cli, ['check-staged', '--pre-commit'])
+
+        assert result.exit_code == 1
+        assert result.output.splitlines()[-1] == (
+            'Error: checks of the staged files failed')
+        (command, cwd, env), _ = run_command.call_args
+        assert cwd == str(self.base_dir.join('snapshot'))
+
+    def test_check_staged__not_needed(self):
+
+        run_command = self.mock_check_staged(
+            {'snapshot': True}, is_needed=False)
+
+        result = self.runner.invoke(cli, ['check-staged', '--pre-commit'])
+
+        assert result.exit_code == 0
+        (command, cwd, env), _ = run_command.call_args
+        assert cwd == str(self.base_dir)
+
     #
     # IS_VIRTUALENV
     #
@@ -236,7 +563,7 @@ class CliTestCase(TestCase):
             version='1.2.12',
             last_commit_hash='111111')
         self.mocker.patch(
-            'lily_assistant.cli.cli.Config',
+            'lily_assistant.cli.version.Config',
         ).return_value = config
 
         result = self.runner.invoke(
@@ -274,7 +601,7 @@ class CliTestCase(TestCase):
             last_commit_hash='111111',
             next_last_commit_hash=None)
         self.mocker.patch(
-            'lily_assistant.cli.cli.Config',
+            'lily_assistant.cli.version.Config',
         ).return_value = config
 
         result = self.runner.invoke(
@@ -319,7 +646,7 @@ class CliTestCase(TestCase):
             last_commit_hash='111111',
             next_last_commit_hash='222222')
         self.mocker.patch(
-            'lily_assistant.cli.cli.Config',
+            'lily_assistant.cli.version.Config',
         ).return_value = config
 
         result = self.runner.invoke(cli, ['push-upgraded-version'])
@@ -339,3 +666,827 @@ class CliTestCase(TestCase):
         assert repo_add_all.call_args_list == [call()]
         assert repo_commit.call_args_list == [call('VERSION: 1.2.13')]
         assert repo_push.call_args_list == [call()]
+
+    #
+    # VERSION
+    #
+    def test_version__fast(self):
+
+        self.mocker.patch(
+            'lily_assistant.cli.version.Config',
+        ).return_value = ConfigMock(version='1.2.12', last_commit_hash='1')
+        check_output = self.mocker.patch(
+            'lily_assistant.cli.version.subprocess.check_output')
+
+        result = self.runner.invoke(cli, ['version', '--fast'])
+
+        assert result.exit_code == 0
+        assert result.output == '1.2.12\n'
+        assert check_output.call_count == 0
+
+    def test_version__fast__json_and_quiet(self):
+
+        self.mocker.patch(
+            'lily_assistant.cli.version.Config',
+        ).return_value = ConfigMock(version='1.2.12', last_commit_hash='1')
+
+        try:
+            result = self.runner.invoke(
+                cli, ['--log-format', 'json', '--quiet', 'version', '--fast'])
+
+        finally:
+            Logger.configure()
+
+        assert result.exit_code == 0
+        assert result.output == '1.2.12\n'
+
+    def test_version(self):
+
+        check_output = self.mocker.patch(
+            'lily_assistant.cli.version.subprocess.check_output')
+        check_output.return_value = '1.2.13\n'
+
+        result = self.runner.invoke(cli, ['version'])
+
+        assert result.exit_code == 0
+        assert result.output == '1.2.13\n'
+        assert check_output.call_args_list == [
+            call(
+                [sys.executable, 'setup.py', '--version'],
+                cwd=str(self.base_dir),
+                universal_newlines=True),
+        ]
+
+    #
+    # RUN
+    #
+    def test_run(self):
+
+        get_targets = self.mocker.patch(
+            'lily_assistant.cli.run.get_targets',
+            return_value={'lint': ['lint tasks']})
+        runner = self.mocker.patch('lily_assistant.cli.run.Runner')
+        runner.load_overrides.return_value = {'lint'}
+
+        result = self.runner.invoke(cli, ['run', 'lint', '--jobs', '2'])
+
+        assert result.exit_code == 0
+        assert get_targets.call_args_list == [call([], {'lint'})]
+        assert runner.mock_calls == [
+            call.load_overrides(),
+            call(['lint tasks'], force=False, workers=2),
+            call().run(),
+        ]
+
+    def test_run__unknown_target(self):
+
+        self.mocker.patch(
+            'lily_assistant.cli.run.get_targets'
+        ).return_value = {'lint': [], 'test': []}
+
+        result = self.runner.invoke(cli, ['run', 'deploy'])
+
+        assert result.exit_code == 1
+        assert result.output.strip() == (
+            'Error: unknown target: deploy, choose from: lint, test')
+
+    def test_run__failed(self):
+
+        self.mocker.patch(
+            'lily_assistant.cli.run.get_targets'
+        ).return_value = {'lint': []}
+        self.mocker.patch.object(
+            Runner, 'run'
+        ).side_effect = Runner.TaskFailed('lint_src returned exit code: 1')
+
+        result = self.runner.invoke(cli, ['run', 'lint'])
+
+        assert result.exit_code == 1
+        assert result.output.strip() == (
+            'Error: lint_src returned exit code: 1')
+
+    #
+    # COVERAGE
+    #
+    def create_coverage(self):
+
+        self.mocker.patch.object(Config, 'exists').return_value = False
+        self.base_dir.join('a.py').write('a = 1\nb = 2\nc = 3\nd = 4\n')
+        create_coverage_data(
+            str(self.base_dir.join('.coverage')),
+            {str(self.base_dir.join('a.py')): {1, 2, 3}})
+
+    def test_coverage_report(self):
+
+        self.create_coverage()
+
+        result = self.runner.invoke(cli, ['coverage', 'report'])
+
+        assert result.exit_code == 0
+        assert result.output.splitlines()[2] == (
+            'a.py        4       1     75%   4')
+
+    def test_coverage_html(self):
+
+        self.create_coverage()
+        html_dir = str(self.base_dir.join('html'))
+
+        result = self.runner.invoke(cli, ['coverage', 'html', '-d', html_dir])
+
+        assert result.exit_code == 0
+        assert result.output.strip() == textwrap.dedent('''
+            [INFO]
+
+            rendered 2 page(s) in {}
+        ''').strip().format(html_dir)
+
+    def test_coverage_gate__passes(self):
+
+        self.create_coverage()
+
+        result = self.runner.invoke(
+            cli, ['coverage', 'gate', '--fail-under', '75'])
+
+        assert result.exit_code == 0
+        assert result.output.strip() == textwrap.dedent('''
+            [INFO]
+
+            total coverage 75.00% reached 75.00%
+        ''').strip()
+
+    def test_coverage_gate__fails(self):
+
+        self.create_coverage()
+        self.mocker.patch.dict(os.environ, {'TEST_COVERAGE_THRESHOLD': '80'})
+
+        result = self.runner.invoke(cli, ['coverage', 'gate'])
+
+        assert result.exit_code == 1
+        assert result.output.strip() == (
+            'Error: total coverage 75.00% is less than 80.00%')
+
+    def test_coverage_gate__missing_data(self):
+
+        self.mocker.patch.object(Config, 'exists').return_value = False
+
+        result = self.runner.invoke(cli, ['coverage', 'gate'])
+
+        assert result.exit_code == 1
+        assert 'run the tests with coverage first' in result.output
+
+    def test_coverage_diff__passes(self):
+
+        self.create_coverage()
+        self.mocker.patch.object(
+            GitRepo, 'get_changed_lines').return_value = {'a.py': {1, 2}}
+
+        result = self.runner.invoke(cli, ['coverage', 'diff'])
+
+        assert result.exit_code == 0
+        assert result.output.strip() == textwrap.dedent('''
+            a.py: 2 / 2 changed statement(s) covered
+            TOTAL: 2 / 2 changed statement(s) covered (100.00%)
+            [INFO]
+
+            coverage of changed lines 100.00% reached 90.00%
+        ''').strip()
+
+    def test_coverage_diff__fails(self):
+
+        self.create_coverage()
+        get_changed_lines = self.mocker.patch.object(
+            GitRepo, 'get_changed_lines')
+        get_changed_lines.return_value = {'a.py': {3, 4}}
+
+        result = self.runner.invoke(
+            cli, ['coverage', 'diff', '--against', 'HEAD~1'])
+
+        assert result.exit_code == 1
+        assert result.output.strip() == textwrap.dedent('''
+            a.py: 1 / 2 changed statement(s) covered, missing: 4
+            TOTAL: 1 / 2 changed statement(s) covered (50.00%)
+            Error: coverage of changed lines 50.00% is less than 90.00%
+        ''').strip()
+        assert get_changed_lines.call_args_list == [call('HEAD~1')]
+
+    def test_coverage_diff__nothing_changed(self):
+
+        self.create_coverage()
+        self.mocker.patch.object(
+            GitRepo, 'get_changed_lines').return_value = {'README.md': {1}}
+
+        result = self.runner.invoke(cli, ['coverage', 'diff'])
+
+        assert result.exit_code == 0
+        assert result.output.strip() == textwrap.dedent('''
+            [INFO]
+
+            no changed statements to check
+        ''').strip()
+
+    #
+    # TEST
+    #
+    def test_test(self):
+
+        main = self.mocker.patch('pytest.main', return_value=0)
+
+        result = self.runner.invoke(
+            cli, ['test', '-r', 'w', '-vv', 'tests/test_a.py'])
+
+        assert result.exit_code == 0
+        assert main.call_args_list == [
+            call([
+                '-p', 'lily_assistant.testing.plugin',
+                '-p', 'lily_assistant.testing.tracker',
+                '-r', 'w', '-vv', 'tests/test_a.py',
+            ]),
+        ]
+
+    def test_test__no_cache_and_failure(self):
+
+        main = self.mocker.patch('pytest.main', return_value=1)
+
+        result = self.runner.invoke(cli, ['test', '--no-cache'])
+
+        assert result.exit_code == 1
+        assert main.call_args_list == [
+            call([
+                '-p', 'lily_assistant.testing.plugin',
+                '-p', 'lily_assistant.testing.tracker',
+                '--lily-no-cache',
+                'tests',
+            ]),
+        ]
+
+    def test_test__json(self):
+
+        def main(args):
+            sys.stdout.write('collected 1 item\n\n1 passed\n')
+
+            return 0
+
+        self.mocker.patch('pytest.main', side_effect=main)
+
+        try:
+            result = self.runner.invoke(
+                cli, ['--log-format', 'json', 'test'])
+
+        finally:
+            Logger.configure()
+
+        assert result.exit_code == 0
+        events = [json.loads(line) for line in result.output.splitlines()]
+        assert [(e['source'], e['message']) for e in events] == [
+            ('py.test', 'collected 1 item'),
+            ('py.test', ''),
+            ('py.test', '1 passed'),
+        ]
+
+    def test_test__quiet(self):
+
+        def main(args):
+            sys.stdout.write('1 passed\n')
+
+            return 0
+
+        self.mocker.patch('pytest.main', side_effect=main)
+
+        try:
+            result = self.runner.invoke(cli, ['--quiet', 'test'])
+
+        finally:
+            Logger.configure()
+
+        assert result.exit_code == 0
+        assert result.output == ''
+
+    def test_test__warm(self):
+
+        self.mocker.patch.object(Config, 'exists').return_value = False
+        run = self.mocker.patch(
+            'lily_assistant.cli.test.WarmClient.run', return_value=0)
+
+        result = self.runner.invoke(cli, ['test', '--warm', 'tests/test_a.py'])
+
+        assert result.exit_code == 0
+        assert run.call_args_list[0][0][0] == [
+            '-p', 'lily_assistant.testing.plugin',
+            '-p', 'lily_assistant.testing.tracker',
+            'tests/test_a.py',
+        ]
+
+    def test_test__stop_warm(self):
+
+        self.mocker.patch.object(Config, 'exists').return_value = False
+        stop = self.mocker.patch('lily_assistant.cli.test.WarmClient.stop')
+
+        result = self.runner.invoke(cli, ['test', '--stop-warm'])
+
+        assert result.exit_code == 0
+        assert stop.call_count == 1
+
+    #
+    # TESTS
+    #
+    def create_tests_history(self):
+
+        cache_dir = self.base_dir.mkdir('.lily').mkdir('cache')
+        self.mocker.patch.object(
+            Config, 'get_cache_path').return_value = str(cache_dir)
+        cache_dir.join('test_history').write(
+            '1\tp\t0.5000\tt.py::a\n'
+            '1\tf\t2.0000\tt.py::b\n'
+            '2\tp\t1.5000\tt.py::a\n'
+            '2\tp\t1.0000\tt.py::b\n')
+
+    def test_tests_slowest(self):
+
+        self.create_tests_history()
+
+        result = self.runner.invoke(cli, ['tests', 'slowest', '-n', '5'])
+
+        assert result.exit_code == 0
+        assert result.output.splitlines() == [
+            '     mean       last  test',
+            '    1.50s      1.00s  t.py::b',
+            '    1.00s      1.50s  t.py::a',
+        ]
+
+    def test_tests_flaky(self):
+
+        self.create_tests_history()
+
+        result = self.runner.invoke(cli, ['tests', 'flaky'])
+
+        assert result.exit_code == 0
+        assert result.output == '  1 flips    1/2   failed  t.py::b\n'
+
+    def test_tests__no_history(self):
+
+        self.mocker.patch.object(
+            Config, 'get_cache_path').return_value = str(self.base_dir)
+
+        result = self.runner.invoke(cli, ['tests', 'slowest'])
+        assert result.output == 'no tests history yet\n'
+
+        result = self.runner.invoke(cli, ['tests', 'flaky'])
+        assert result.output == 'no flaky tests found\n'
+
+    def test_tests_timings(self):
+
+        self.create_tests_history()
+        lily_dir = self.base_dir.join('.lily')
+        self.mocker.patch.object(
+            Config, 'get_lily_path').return_value = str(lily_dir)
+
+        result = self.runner.invoke(cli, ['tests', 'timings'])
+
+        assert result.exit_code == 0
+        assert json.loads(lily_dir.join('test_timings.json').read()) == {
+            't.py::a': 1.0,
+            't.py::b': 1.5,
+        }
+
+    def test_test__profile(self):
+
+        main = self.mocker.patch('pytest.main', return_value=0)
+
+        result = self.runner.invoke(cli, ['test', '--profile'])
+
+        assert result.exit_code == 0
+        assert main.call_args_list[0][0][0][-5:] == [
+            '--lily-no-cache',
+            '-p', 'lily_assistant.testing.profiler',
+            '--lily-profile',
+            'tests',
+        ]
+
+    def test_test__memory(self):
+
+        main = self.mocker.patch('pytest.main', return_value=0)
+
+        result = self.runner.invoke(cli, ['test', '--memory'])
+
+        assert result.exit_code == 0
+        assert main.call_args_list[0][0][0][-4:] == [
+            '-p', 'lily_assistant.testing.memory',
+            '--lily-memory',
+            'tests',
+        ]
+
+    def test_tests_memory(self):
+
+        lily_dir = self.base_dir.mkdir('.lily')
+        self.mocker.patch.object(
+            Config, 'get_lily_path').return_value = str(lily_dir)
+
+        result = self.runner.invoke(cli, ['tests', 'memory'])
+        assert result.output == 'no memory history yet\n'
+
+        lily_dir.join('cache', 'memory_history').write(
+            '1\t2048\t0\tt.py::a\n'
+            '1\t1048576\t512\tt.py::b\n'
+            '2\t4096\t1024\tt.py::a\n',
+            ensure=True)
+
+        result = self.runner.invoke(cli, ['tests', 'memory', '-n', '5'])
+
+        assert result.exit_code == 0
+        assert result.output.splitlines() == [
+            '      peak   last peak    retained  test',
+            '    1.0MiB      1.0MiB      512.0B  t.py::b',
+            '    3.0KiB      4.0KiB      1.0KiB  t.py::a',
+        ]
+
+    def test_test__shard(self):
+
+        main = self.mocker.patch('pytest.main', return_value=0)
+
+        result = self.runner.invoke(cli, ['test', '--shard', '2/3'])
+
+        assert result.exit_code == 0
+        assert main.call_args_list[0][0][0][-4:] == [
+            '-p', 'lily_assistant.testing.shard',
+            '--lily-shard=2/3',
+            'tests',
+        ]
+
+    def test_test__invalid_shard(self):
+
+        main = self.mocker.patch('pytest.main', return_value=0)
+
+        result = self.runner.invoke(cli, ['test', '--shard', '4/3'])
+
+        assert result.exit_code == 2
+        assert 'shard index must be between 1 and 3, got: 4' in result.output
+        assert main.call_count == 0
+
+    def test_coverage_combine(self):
+
+        self.mocker.patch.object(Config, 'exists').return_value = False
+        self.base_dir.join('a.py').write('a = 1\nb = 2\nc = 3\nd = 4\n')
+        path = str(self.base_dir.join('a.py'))
+        create_coverage_data(
+            str(self.base_dir.join('.coverage.1')), {path: {1, 2}})
+        create_coverage_data(
+            str(self.base_dir.join('.coverage.2')), {path: {3, 4}})
+
+        result = self.runner.invoke(cli, ['coverage', 'combine'])
+
+        assert result.exit_code == 0
+        assert result.output.strip() == textwrap.dedent('''
+            [INFO]
+
+            combined 2 data file(s) into {}
+            [INFO]
+
+            total coverage 100.00% reached 90.00%
+        ''').strip().format(self.base_dir.join('.coverage'))
+
+    def test_coverage_combine__below_threshold(self):
+
+        self.mocker.patch.object(Config, 'exists').return_value = False
+        self.base_dir.join('a.py').write('a = 1\nb = 2\nc = 3\nd = 4\n')
+        shard = str(self.base_dir.join('shard'))
+        create_coverage_data(shard, {str(self.base_dir.join('a.py')): {1}})
+
+        result = self.runner.invoke(cli, ['coverage', 'combine', shard])
+
+        assert result.exit_code == 1
+        assert result.output.strip().endswith(
+            'Error: total coverage 25.00% is less than 90.00%')
+
+    def test_coverage_combine__nothing_to_combine(self):
+
+        result = self.runner.invoke(cli, ['coverage', 'combine'])
+
+        assert result.exit_code == 1
+        assert result.output.strip() == (
+            'Error: no coverage data files to combine')
+
+    #
+    # BENCH
+    #
+    def mock_bench_paths(self):
+
+        lily_dir = self.base_dir.join('.lily')
+        self.mocker.patch.object(
+            Config, 'get_lily_path').return_value = str(lily_dir)
+        self.mocker.patch.object(
+            Config, 'get_cache_path').return_value = str(lily_dir.join('cache'))
+
+        return lily_dir
+
+    def test_bench__stores_baseline(self):
+
+        lily_dir = self.mock_bench_paths()
+        self.base_dir.join('bench_a.py').write(
+            'def bench_x():\n'
+            '    print("noise")\n')
+
+        result = self.runner.invoke(cli, ['bench', '--repeat', '2'])
+
+        assert result.exit_code == 0
+        assert 'bench_a.py::bench_x' in result.output
+        assert 'noise' not in result.output
+        assert 'stored baseline of 1 benchmark(s)' in result.output
+        stored = json.loads(lily_dir.join('bench_baseline.json').read())
+        assert stored['benchmarks']['bench_a.py::bench_x']['repeat'] == 2
+        assert lily_dir.join('cache', 'bench_results.json').exists()
+
+    def test_bench__regression(self):
+
+        lily_dir = self.mock_bench_paths()
+        lily_dir.join('bench_baseline.json').write(json.dumps({
+            'benchmarks': {
+                'bench_a.py::bench_x': {'median': 1.0},
+                'bench_a.py::bench_y': {'median': 1.0},
+            },
+        }), ensure=True)
+        run = self.mocker.patch(
+            'lily_assistant.bench.runner.BenchRunner.run')
+        run.return_value = {
+            'bench_a.py::bench_x': {'median': 1.5, 'min': 1.5},
+            'bench_a.py::bench_y': {'median': 1.05, 'min': 1.0},
+        }
+
+        result = self.runner.invoke(cli, ['bench', '--threshold', '20'])
+
+        assert result.exit_code == 1
+        assert result.output.splitlines()[-2:] == [
+            '  +50.0%  1.0000s -> 1.5000s  bench_a.py::bench_x',
+            'Error: 1 benchmark(s) regressed by more than 20.0%',
+        ]
+
+        result = self.runner.invoke(
+            cli, ['bench', '--threshold', '20', '--save-baseline'])
+
+        assert result.exit_code == 0
+        stored = json.loads(lily_dir.join('bench_baseline.json').read())
+        assert stored['benchmarks'] == run.return_value
+
+    def test_bench__failing_benchmark(self):
+
+        self.mock_bench_paths()
+        self.base_dir.join('bench_a.py').write(
+            'def bench_x():\n'
+            '    raise ValueError("broken")\n')
+
+        result = self.runner.invoke(cli, ['bench'])
+
+        assert result.exit_code == 1
+        assert 'ValueError: broken' in result.output
+
+    #
+    # LOGS
+    #
+    def test_logs__last_failure(self):
+
+        self.base_dir.mkdir('.lily')
+        self.mocker.patch.object(
+            GitRepo, 'iter_commits'
+        ).return_value = iter([('bbb222', 'Added stuff\n')])
+        self.mocker.patch.object(GitRepo, 'active_branch', 'development')
+
+        result = self.runner.invoke(cli, ['check-commits', 'master..HEAD'])
+        assert result.exit_code == 1
+        result = self.runner.invoke(cli, ['is-not-master'])
+        assert result.exit_code == 0
+
+        result = self.runner.invoke(cli, ['logs', 'last'])
+
+        assert result.exit_code == 0
+        lines = result.output.splitlines()
+        assert ' failed ' in lines[0]
+        assert '\n'.join(lines[1:]) == textwrap.dedent('''
+            [ERROR]
+
+            bbb222 Added stuff
+
+            line 1: header must follow the `<type>(<scope>): <subject>` format [header-format]
+            Error: 1 out of 1 commits are not following the commit message convention
+        ''').strip()
+
+        # -- reading the logs is not archived itself
+        result = self.runner.invoke(cli, ['logs', 'list'])
+
+        assert result.exit_code == 0
+        assert len(result.output.splitlines()) == 1
+
+    def test_logs__last_no_failures(self):
+
+        result = self.runner.invoke(cli, ['logs', 'last'])
+
+        assert result.exit_code == 1
+        assert result.output.strip() == (
+            'Error: no failed runs archived in {}'.format(self.logs_dir))
+
+    def test_logs__list_empty(self):
+
+        result = self.runner.invoke(cli, ['logs', 'list'])
+
+        assert result.exit_code == 0
+        assert result.output == 'no runs archived yet\n'
+
+    #
+    # WATCH
+    #
+    def test_watch(self):
+
+        self.mocker.patch.object(Config, '__init__', return_value=None)
+        self.mocker.patch.object(
+            Config, 'src_dir', new_callable=PropertyMock, return_value='app')
+        app_dir = self.base_dir.mkdir('app')
+        app_dir.join('a.py').write('a = 1\n')
+        self.base_dir.mkdir('tests').join('test_a.py').write(
+            'from app.a import a\n')
+        self.mocker.patch(
+            'lily_assistant.cli.watch.collect',
+            side_effect=[
+                {os.path.join('app', 'a.py')},
+                {os.path.join('app', 'b.txt')},
+                KeyboardInterrupt,
+            ])
+        lint = self.mocker.patch.object(
+            WatchSession, 'lint', return_value=0)
+        run_tests = self.mocker.patch(
+            'lily_assistant.cli.watch.run_tests', return_value=1)
+
+        result = self.runner.invoke(cli, ['watch', '--polling', '--no-warm'])
+
+        assert result.exit_code == 0
+        assert lint.call_args_list == [call([os.path.join('app', 'a.py')])]
+        assert run_tests.call_args_list == [
+            call([os.path.join('tests', 'test_a.py')], False)]
+        lines = result.output.splitlines()
+        assert lines[2] == 'watching app, tests (polling), press Ctrl+C to stop'
+        assert lines[-1].startswith(
+            '[WATCH] lint: 0 error(s), tests: failed in ')
+
+    def test_watch__watches_exhausted(self):
+
+        self.mocker.patch.object(Config, '__init__', return_value=None)
+        self.mocker.patch.object(
+            Config, 'src_dir', new_callable=PropertyMock, return_value='app')
+        self.base_dir.mkdir('app').join('a.py').write('a = 1\n')
+        watcher = Mock()
+        self.mocker.patch(
+            'lily_assistant.cli.watch.get_watcher', return_value=watcher)
+        self.mocker.patch(
+            'lily_assistant.cli.watch.collect',
+            side_effect=[
+                InotifyWatcher.Exhausted(
+                    'inotify watch limit reached',
+                    {os.path.join('app', 'a.py')}),
+                KeyboardInterrupt,
+            ])
+        polling_watcher = Mock()
+        fall_back = self.mocker.patch(
+            'lily_assistant.cli.watch.fall_back',
+            return_value=polling_watcher)
+        lint = self.mocker.patch.object(
+            WatchSession, 'lint', return_value=0)
+
+        result = self.runner.invoke(cli, ['watch', '--no-test'])
+
+        assert result.exit_code == 0
+        assert fall_back.call_args_list == [call(watcher, interval=0.5)]
+        assert lint.call_args_list == [call([os.path.join('app', 'a.py')])]
+        assert (
+            'inotify watch limit reached, switching to polling' in
+            result.output)
+        assert polling_watcher.close.call_count == 1
+
+    def test_watch__no_lint(self):
+
+        self.mocker.patch.object(Config, '__init__', return_value=None)
+        self.mocker.patch.object(
+            Config, 'src_dir', new_callable=PropertyMock, return_value='app')
+        self.base_dir.mkdir('app').join('a.py').write('a = 1\n')
+        self.mocker.patch(
+            'lily_assistant.cli.watch.collect',
+            side_effect=[{os.path.join('app', 'a.py')}, KeyboardInterrupt])
+        lint = self.mocker.patch.object(WatchSession, 'lint')
+
+        result = self.runner.invoke(
+            cli, ['watch', '--polling', '--no-lint'])
+
+        assert result.exit_code == 0
+        assert lint.call_count == 0
+        assert '[WATCH]' not in result.output
+
+    #
+    # VERIFY_RANGE
+    #
+    def mock_verify_range(self, commits):
+
+        self.mocker.patch.object(
+            Config, 'get_lily_path').return_value = str(self.base_dir)
+        self.mocker.patch.object(
+            Config, 'get_cache_path').return_value = str(self.base_dir)
+        self.mocker.patch(
+            'lily_assistant.cli.verify.get_commits', return_value=commits)
+        self.mocker.patch.object(RangeVerifier, 'save')
+
+    def test_verify_range__passed(self):
+
+        commits = [Commit('1' * 40, 't1', 'feat: a')]
+        self.mock_verify_range(commits)
+        verify_all = self.mocker.patch.object(
+            RangeVerifier, 'verify_all', return_value=None)
+
+        result = self.runner.invoke(
+            cli, ['verify-range', 'master..HEAD', '--jobs', '3'])
+
+        assert result.exit_code == 0
+        assert result.output.strip() == textwrap.dedent('''
+            [INFO]
+
+            all 1 commit(s) of master..HEAD passed
+        ''').strip()
+        assert verify_all.call_args_list == [call(commits)]
+
+    def test_verify_range__bisect_failed(self):
+
+        commits = [
+            Commit('1' * 40, 't1', 'feat: a'),
+            Commit('2' * 40, 't2', 'feat: b'),
+        ]
+        self.mock_verify_range(commits)
+        bisect = self.mocker.patch.object(
+            RangeVerifier, 'bisect', return_value=commits[1])
+
+        result = self.runner.invoke(
+            cli, ['verify-range', 'master..HEAD', '--bisect'])
+
+        assert result.exit_code == 1
+        assert result.output.strip() == (
+            'Error: first failing commit: 2222222222 feat: b')
+        assert bisect.call_args_list == [call(commits)]
+
+    def test_verify_range__no_commits(self):
+
+        self.mock_verify_range([])
+
+        result = self.runner.invoke(cli, ['verify-range', 'HEAD..HEAD'])
+
+        assert result.exit_code == 0
+        assert result.output.strip().endswith('no commits in HEAD..HEAD')
+
+    #
+    # IMPORT_BUDGET
+    #
+    def create_slow_package(self):
+
+        self.mocker.patch.object(Config, 'exists').return_value = False
+        lily_dir = self.base_dir.join('.lily')
+        self.mocker.patch.object(
+            Config, 'get_lily_path').return_value = str(lily_dir)
+        self.base_dir.join('app', '__init__.py').write(
+            'import app.slow\n', ensure=True)
+        self.base_dir.join('app', 'slow.py').write(
+            'import time\ntime.sleep(0.02)\n')
+
+        return lily_dir
+
+    def test_import_budget__stores_baseline(self):
+
+        lily_dir = self.create_slow_package()
+
+        result = self.runner.invoke(cli, ['import-budget', 'app'])
+
+        assert result.exit_code == 0
+        assert 'stored it as the baseline' in result.output
+        stored = json.loads(lily_dir.join('import_budget.json').read())
+        assert stored['module'] == 'app'
+        assert set(stored['modules']) == {'app', 'app.slow'}
+
+    def test_import_budget__exceeded(self):
+
+        lily_dir = self.create_slow_package()
+        lily_dir.join('import_budget.json').write(json.dumps({
+            'module': 'app',
+            'modules': {'app': [0.1, 1.0], 'app.slow': [0.5, 0.5]},
+        }), ensure=True)
+
+        result = self.runner.invoke(
+            cli, ['import-budget', 'app', '--repeat', '1'])
+
+        assert result.exit_code == 1
+        lines = result.output.splitlines()
+        assert lines[0].split() == ['self', 'cumulative', 'change', 'module']
+        assert lines[1].endswith('  app.slow')
+        assert lines[-1].startswith('Error: import of app took ')
+        assert lines[-1].endswith('budget: 6.00ms (baseline: 1.00ms)')
+
+    def test_import_budget__pre_commit_disabled(self):
+
+        lily_dir = self.create_slow_package()
+
+        result = self.runner.invoke(
+            cli, ['import-budget', 'app', '--pre-commit'])
+
+        assert result.exit_code == 0
+        assert result.output == ''
+        assert not lily_dir.join('import_budget.json').exists()
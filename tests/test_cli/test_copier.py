@@ -1,6 +1,8 @@
 
 import os
 import json
+import subprocess
+import sys
 from unittest import TestCase
 from unittest.mock import call
 import textwrap
@@ -30,13 +32,18 @@ class CopierTestCase(TestCase):
     #
     def test_copy__makes_the_right_calls(self):
 
+        subprocess.check_call(['git', 'init', '-q', str(self.project_dir)])
         copy_hooks = self.mocker.patch.object(Copier, 'copy_hooks')
         copy_makefile = self.mocker.patch.object(Copier, 'copy_makefile')
+        copy_ci = self.mocker.patch.object(Copier, 'copy_ci')
 
         Copier().copy('my_code')
 
-        assert copy_hooks.call_args_list == [call()]
+        assert copy_hooks.call_args_list == [call(symlink=False)]
         assert copy_makefile.call_args_list == [call('my_code')]
+        assert copy_ci.call_args_list == [call('my_code')]
+        exclude_path = self.project_dir.join('.git', 'info', 'exclude')
+        assert exclude_path.read().endswith('\n/.lily/cache/\n/.lily/logs/\n')
 
     #
     # CREATE_EMPTY_CONFIG
@@ -94,6 +101,22 @@ class CopierTestCase(TestCase):
             'surprise',
         ])
 
+    def test_copy_hooks__renders_python_interpreter(self):
+
+        gitdir = self.project_dir.mkdir('.git')
+
+        hooks_dir = self.lily_assistant_dir.mkdir('hooks')
+        hooks_dir.join('commit-msg').write(
+            'PYTHON="{% PYTHON %}"\n$PYTHON -m lily_assistant.hooks.commit_msg')
+        self.mocker.patch.object(Copier, 'base_hooks_path', str(hooks_dir))
+
+        Copier().copy_hooks()
+
+        assert gitdir.join('hooks', 'commit-msg').read() == (
+            'PYTHON="{python}"\n'
+            '$PYTHON -m lily_assistant.hooks.commit_msg'.format(
+                python=sys.executable))
+
     def test_copy_hooks__not_root(self):
 
         self.project_dir.mkdir('.git')
@@ -156,6 +179,129 @@ class CopierTestCase(TestCase):
             open(os.path.join(str(copy_hooks_dir), 'surprise')).read() ==
             'NEW surprise me')
 
+    def test_copy_hooks__keeps_custom_hooks(self):
+
+        gitdir = self.project_dir.mkdir('.git')
+
+        hooks_dir = self.lily_assistant_dir.mkdir('hooks')
+        hooks_dir.join('pre-commit').write('NEW pre commit it')
+        self.mocker.patch.object(Copier, 'base_hooks_path', str(hooks_dir))
+        copy_hooks_dir = gitdir.mkdir('hooks')
+        copy_hooks_dir.join('post-merge').write('my custom hook')
+
+        Copier().copy_hooks()
+
+        assert set(os.listdir(str(copy_hooks_dir))) == set([
+            'pre-commit',
+            'post-merge',
+        ])
+        assert copy_hooks_dir.join('post-merge').read() == 'my custom hook'
+
+    def test_copy_hooks__makes_hooks_executable(self):
+
+        gitdir = self.project_dir.mkdir('.git')
+
+        hooks_dir = self.lily_assistant_dir.mkdir('hooks')
+        hooks_dir.join('pre-commit').write('pre commit it')
+        os.chmod(str(hooks_dir.join('pre-commit')), 0o644)
+        self.mocker.patch.object(Copier, 'base_hooks_path', str(hooks_dir))
+
+        Copier().copy_hooks()
+
+        mode = os.stat(str(gitdir.join('hooks', 'pre-commit'))).st_mode
+        assert mode & 0o777 == 0o755
+
+    def test_copy_hooks__up_to_date_hooks_are_not_rewritten(self):
+
+        gitdir = self.project_dir.mkdir('.git')
+
+        hooks_dir = self.lily_assistant_dir.mkdir('hooks')
+        hooks_dir.join('pre-commit').write('pre commit it')
+        hooks_dir.join('commit-msg').write('commit msg it')
+        self.mocker.patch.object(Copier, 'base_hooks_path', str(hooks_dir))
+        Copier().copy_hooks()
+        hooks_dir.join('commit-msg').write('NEW commit msg it')
+        replace = self.mocker.spy(os, 'replace')
+        secho = self.mocker.patch('lily_assistant.cli.logger.click.secho')
+
+        Copier().copy_hooks()
+
+        copy_hooks_dir = str(gitdir.join('hooks'))
+        assert replace.call_count == 1
+        assert replace.call_args[0][1] == os.path.join(
+            copy_hooks_dir, 'commit-msg')
+        assert gitdir.join('hooks', 'commit-msg').read() == 'NEW commit msg it'
+        assert secho.call_args_list == [
+            call(
+                'installed git hooks commit-msg to {}'.format(copy_hooks_dir),
+                fg='blue'),
+        ]
+
+        # -- nothing to do on the next run
+        Copier().copy_hooks()
+
+        assert replace.call_count == 1
+        assert secho.call_args_list[-1] == call(
+            'git hooks in {} are up to date'.format(copy_hooks_dir),
+            fg='blue')
+
+    def test_copy_hooks__symlink(self):
+
+        gitdir = self.project_dir.mkdir('.git')
+
+        hooks_dir = self.lily_assistant_dir.mkdir('hooks')
+        hooks_dir.join('pre-commit').write('{% PYTHON %} pre commit it')
+        self.mocker.patch.object(Copier, 'base_hooks_path', str(hooks_dir))
+        copy_hooks_dir = gitdir.mkdir('hooks')
+        copy_hooks_dir.join('pre-commit').write('OLD pre commit it')
+
+        Copier().copy_hooks(symlink=True)
+
+        # -- linked to the hook rendered in the project
+        hook_path = str(copy_hooks_dir.join('pre-commit'))
+        rendered_path = str(self.project_dir.join('.lily', 'hooks', 'pre-commit'))
+        assert os.readlink(hook_path) == rendered_path
+        assert os.listdir(str(copy_hooks_dir)) == ['pre-commit']
+        with open(hook_path) as f:
+            assert f.read() == '{} pre commit it'.format(sys.executable)
+
+        assert os.access(rendered_path, os.X_OK)
+        assert gitdir.join('info', 'exclude').read() == '/.lily/hooks/\n'
+
+    def test_copy_hooks__symlink_up_to_date(self):
+
+        self.project_dir.mkdir('.git')
+        hooks_dir = self.lily_assistant_dir.mkdir('hooks')
+        hooks_dir.join('pre-commit').write('{% PYTHON %} pre commit it')
+        self.mocker.patch.object(Copier, 'base_hooks_path', str(hooks_dir))
+        Copier().copy_hooks(symlink=True)
+        link_hook = self.mocker.spy(Copier, 'link_hook')
+
+        Copier().copy_hooks(symlink=True)
+
+        assert link_hook.spy_return is False
+        assert self.project_dir.join(
+            '.git', 'info', 'exclude').read() == '/.lily/hooks/\n'
+
+    def test_copy_hooks__core_hooks_path(self):
+
+        subprocess.check_call(
+            ['git', 'init', '-q', str(self.project_dir)])
+        subprocess.check_call(
+            ['git', 'config', 'core.hooksPath', 'githooks'],
+            cwd=str(self.project_dir))
+
+        hooks_dir = self.lily_assistant_dir.mkdir('hooks')
+        hooks_dir.join('pre-commit').write('pre commit it')
+        self.mocker.patch.object(Copier, 'base_hooks_path', str(hooks_dir))
+
+        Copier().copy_hooks()
+
+        assert self.project_dir.join(
+            'githooks', 'pre-commit').read() == 'pre commit it'
+        assert not self.project_dir.join(
+            '.git', 'hooks', 'pre-commit').exists()
+
     #
     # COPY_MAKEFILE
     #
@@ -198,3 +344,42 @@ class CopierTestCase(TestCase):
         assert (
             self.project_dir.join('.lily/lily_assistant.makefile').read() ==
             'NEW make it')
+
+    def test_copy_makefile__version_is_resolved_lazily_once(self):
+
+        Copier().copy_makefile(str('gigly'))
+
+        content = self.project_dir.join('.lily/lily_assistant.makefile').read()
+        assert (
+            'VERSION = $(eval VERSION := '
+            '$(shell lily_assistant version --fast))$(VERSION)') in content
+        assert 'setup.py --version' not in content
+
+    def test_copy_makefile__unchanged_makefile_is_not_rewritten(self):
+
+        makefile = self.lily_assistant_dir.join('lily_assistant.makefile')
+        makefile.write('lint: {% SRC_DIR %}')
+        self.mocker.patch.object(Copier, 'base_makefile_path', str(makefile))
+        Copier().copy_makefile(str('gigly'))
+        result_path = str(self.project_dir.join('.lily/lily_assistant.makefile'))
+        os.utime(result_path, ns=(1, 1))
+
+        Copier().copy_makefile(str('gigly'))
+
+        assert os.stat(result_path).st_mtime_ns == 1
+
+    #
+    # COPY_CI
+    #
+    def test_copy_ci(self):
+
+        ci_dir = self.lily_assistant_dir.mkdir('ci')
+        ci_dir.join('github-actions.yml').write(
+            'python: {% PYTHON_VERSION %}\nsrc: {% SRC_DIR %}\n')
+        self.mocker.patch.object(Copier, 'base_ci_path', str(ci_dir))
+
+        Copier().copy_ci('gigly')
+
+        assert self.project_dir.join(
+            '.lily', 'ci', 'github-actions.yml').read() == (
+            'python: {0}.{1}\nsrc: gigly\n'.format(*sys.version_info[:2]))
@@ -0,0 +1,239 @@
+import io
+import json
+from unittest import TestCase
+from unittest.mock import Mock
+
+import pytest
+
+from lily_assistant.cli.archive import ArchiveTee
+from lily_assistant.cli.logger import JsonSink, Logger
+
+
+class JsonSinkTestCase(TestCase):
+
+    def test_write__buffers_events(self):
+
+        stream = io.StringIO()
+        sink = JsonSink(stream, buffer_size=30)
+
+        sink.write({'a': 1})
+        assert stream.getvalue() == ''
+
+        sink.write({'b': 'x' * 20})
+        assert stream.getvalue() == '{"a": 1}\n{"b": "xxxxxxxxxxxxxxxxxxxx"}\n'
+
+    def test_flush(self):
+
+        stream = io.StringIO()
+        sink = JsonSink(stream)
+        sink.write({'message': 'żółw'})
+
+        sink.flush()
+
+        assert stream.getvalue() == '{"message": "żółw"}\n'
+        assert sink.buffer == []
+        assert sink.size == 0
+
+
+class LoggerTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, capsys):
+        self.capsys = capsys
+
+        yield
+
+        Logger.configure()
+
+    def read_events(self, stream):
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    #
+    # TEXT
+    #
+    def test_info__text(self):
+
+        Logger().info('''
+            hello
+        ''')
+
+        assert self.capsys.readouterr().out == '[INFO]\n\nhello\n'
+
+    def test_output__text(self):
+
+        Logger().output('hi\n', 'echo', prefix='[task] ')
+
+        assert self.capsys.readouterr().out == '[task] hi\n'
+
+    #
+    # JSON
+    #
+    def test_json(self):
+
+        stream = io.StringIO()
+        Logger.configure(log_format='json', stream=stream)
+        logger = Logger()
+
+        logger.info('started')
+        logger.echo('[EXECUTE] ls', level='debug', command='ls')
+        logger.output('a.py\n', 'ls')
+        assert stream.getvalue() == ''
+
+        logger.error('failed')
+
+        events = self.read_events(stream)
+        for event in events:
+            assert isinstance(event.pop('time'), float)
+
+        assert events == [
+            {'level': 'info', 'message': 'started'},
+            {'level': 'debug', 'command': 'ls', 'message': '[EXECUTE] ls'},
+            {
+                'level': 'debug',
+                'source': 'ls',
+                'event': 'output',
+                'message': 'a.py',
+            },
+            {'level': 'error', 'message': 'failed'},
+        ]
+        assert self.capsys.readouterr().out == ''
+
+    def test_report__json(self):
+
+        stream = io.StringIO()
+        Logger.configure(log_format='json', stream=stream)
+
+        Logger().report('mean  test')
+        Logger.flush()
+
+        events = self.read_events(stream)
+        assert [(e['event'], e['message']) for e in events] == [
+            ('report', 'mean  test')]
+
+    #
+    # STREAM
+    #
+    def test_stream__text(self):
+
+        assert Logger().stream('py.test') is None
+
+    def test_stream__json(self):
+
+        stream = io.StringIO()
+        Logger.configure(log_format='json', stream=stream)
+        output = Logger().stream('py.test')
+
+        output.write('collected 2 items\npass')
+        output.write(b'ed \xc5')
+        output.write(b'\x82\n')
+        output.write('last')
+        output.finish(failed=False)
+        Logger.flush()
+
+        assert [
+            (e['source'], e['message']) for e in self.read_events(stream)
+        ] == [
+            ('py.test', 'collected 2 items'),
+            ('py.test', 'passed \u0142'),
+            ('py.test', 'last'),
+        ]
+
+    def test_stream__quiet(self):
+
+        Logger.configure(quiet=True)
+        logger = Logger()
+
+        output = logger.stream('py.test')
+        output.write('passed\n')
+        output.finish(failed=False)
+
+        output = logger.stream('py.test')
+        output.write('failed\n')
+        output.finish(failed=True)
+
+        assert self.capsys.readouterr().out == 'failed\n'
+
+    def test_configure__flushes_previous_sink(self):
+
+        stream = io.StringIO()
+        Logger.configure(log_format='json', stream=stream)
+        Logger().info('hello')
+
+        Logger.configure()
+
+        assert [e['message'] for e in self.read_events(stream)] == ['hello']
+
+    #
+    # QUIET
+    #
+    def test_quiet__dump_output(self):
+
+        Logger.configure(quiet=True)
+        logger = Logger()
+
+        logger.output('a\n', 'first', prefix='[first] ')
+        logger.output('b\n', 'second')
+        logger.output('c\n', 'first', prefix='[first] ')
+        assert self.capsys.readouterr().out == ''
+
+        logger.dump_output('first')
+        logger.discard_output('second')
+        logger.dump_output('second')
+
+        assert self.capsys.readouterr().out == '[first] a\n[first] c\n'
+
+    def test_quiet__keeps_last_lines(self):
+
+        Logger.configure(quiet=True)
+        logger = Logger()
+
+        for i in range(Logger.QUIET_LINES + 5):
+            logger.output('{}\n'.format(i), 'spam')
+
+        logger.dump_output('spam')
+
+        lines = self.capsys.readouterr().out.splitlines()
+        assert len(lines) == Logger.QUIET_LINES
+        assert lines[0] == '5'
+        assert lines[-1] == str(Logger.QUIET_LINES + 4)
+
+    #
+    # ARCHIVE
+    #
+    def test_archive__records_everything(self):
+
+        archive = Mock()
+        Logger.configure(quiet=True, archive=archive)
+        logger = Logger()
+
+        logger.info('hi')
+        logger.echo('[EXECUTE] ls', level='debug')
+        logger.output('a.py\n', 'ls', prefix='[ls] ')
+        Logger.close('passed')
+
+        assert ''.join(
+            call[0][0] for call in archive.write.call_args_list) == (
+            '[INFO]\n\nhi\n[EXECUTE] ls\n[ls] a.py\n')
+        assert archive.close.call_args_list == [(('passed',),)]
+        assert Logger.archive is None
+
+    def test_archive__disabled_on_error(self):
+
+        archive = Mock()
+        archive.write.side_effect = OSError('disk full')
+        Logger.configure(archive=archive)
+
+        Logger().output('a\n', 'ls')
+        Logger().output('b\n', 'ls')
+
+        assert archive.write.call_count == 1
+        assert self.capsys.readouterr().out == 'a\nb\n'
+
+    def test_tee(self):
+
+        stream = io.StringIO()
+        assert Logger.tee(stream) is stream
+
+        Logger.configure(archive=Mock())
+
+        assert isinstance(Logger.tee(stream), ArchiveTee)
@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+import lily_assistant
+
+
+class StartupTestCase(TestCase):
+    """Guard the cold startup of the trivial gates run by the hooks.
+
+    Each gate is executed in a fresh interpreter with `-X importtime` and
+    the cumulative import time of `lily_assistant` and its dependencies is
+    compared against the budget.
+
+    """
+
+    BUDGET_MS = 150
+
+    HEAVY_MODULES = [
+        'setuptools',
+        'concurrent.futures',
+        'lily_assistant.cli.checkers',
+        'lily_assistant.cli.copier',
+        'lily_assistant.checkers.commit_message',
+        'lily_assistant.checkers.push',
+        'lily_assistant.checkers.structure',
+        'lily_assistant.repo.repo',
+        'lily_assistant.repo.verify',
+        'lily_assistant.repo.worktrees',
+    ]
+
+    def import_times(self, *args):
+
+        code = (
+            'from lily_assistant.cli.cli import cli; '
+            'cli({args!r})'.format(args=list(args)))
+        root_dir = os.path.dirname(
+            os.path.dirname(os.path.abspath(lily_assistant.__file__)))
+        env = dict(os.environ, VIRTUAL_ENV='venv', PYTHONPATH=root_dir)
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            env=env)
+
+        times = {}
+        for line in proc.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+
+            _, cumulative, name = line.split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = (
+                    len(name) - len(name.lstrip()),
+                    int(cumulative) / 1000.0)
+
+        return times
+
+    def assert_startup(self, *args, loaded=()):
+
+        times = self.import_times(*args)
+
+        # -- modules imported by `importlib` itself are not reported, only
+        # -- their dependencies are
+        assert 'lily_assistant.checkers.repo' in times
+        for module in self.HEAVY_MODULES:
+            if module not in loaded:
+                assert module not in times, module
+
+        # -- only top level imports, the nested ones are already included
+        total = sum(
+            cumulative
+            for name, (depth, cumulative) in times.items()
+            if depth == 1 and (
+                name.startswith('lily_assistant') or name == 'click'))
+
+        assert total < self.BUDGET_MS, total
+
+    def test_is_virtualenv__startup(self):
+        self.assert_startup('is-virtualenv')
+
+    def test_is_not_master__startup(self):
+        self.assert_startup('is-not-master')
+
+    def test_is_commit_message_valid__startup(self):
+
+        # -- the gates sharing its module (and the walker of the structure
+        # -- checker) are loaded, the push stack is not
+        self.assert_startup(
+            'is-commit-message-valid',
+            os.path.abspath(__file__),
+            loaded=[
+                'concurrent.futures',
+                'lily_assistant.cli.checkers',
+                'lily_assistant.checkers.commit_message',
+                'lily_assistant.checkers.structure',
+            ])
@@ -0,0 +1,108 @@
+import os
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.cli.template import Template, write_if_changed
+
+
+class TemplateTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+
+    #
+    # RENDER
+    #
+    def test_render(self):
+
+        template = Template(
+            '# {% VERSION %}\nlint:  ## lint {%SRC_DIR%} & tests\n'
+            '\tflake8 {%  SRC_DIR  %}\n')
+
+        assert template.render({'VERSION': '1.0.1', 'SRC_DIR': 'gigly'}) == (
+            '# 1.0.1\nlint:  ## lint gigly & tests\n\tflake8 gigly\n')
+
+    def test_render__missing_variables_are_rendered_verbatim(self):
+
+        template = Template('{% PYTHON %} -m {% MODULE %}')
+
+        assert template.render({'PYTHON': 'python3'}) == (
+            'python3 -m {% MODULE %}')
+
+    def test_render__no_variables(self):
+
+        assert Template('just text').render({}) == 'just text'
+
+    #
+    # FROM_FILE
+    #
+    def test_from_file__is_cached_until_file_changes(self):
+
+        path = self.tmpdir.join('template')
+        path.write('v{% VERSION %}')
+
+        template = Template.from_file(str(path))
+
+        assert Template.from_file(str(path)) is template
+
+        path.write('version {% VERSION %}')
+        os.utime(str(path), ns=(1, 1))
+
+        assert Template.from_file(str(path)).render({'VERSION': 1}) == (
+            'version 1')
+
+
+class WriteIfChangedTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+
+    def test_write_if_changed__missing(self):
+
+        path = self.tmpdir.join('deep', 'file.txt')
+
+        assert write_if_changed(str(path), 'hello') is True
+        assert path.read() == 'hello'
+        assert os.listdir(str(self.tmpdir.join('deep'))) == ['file.txt']
+
+    def test_write_if_changed__unchanged(self):
+
+        path = self.tmpdir.join('file.txt')
+        path.write('hello')
+        os.utime(str(path), ns=(1, 1))
+
+        assert write_if_changed(str(path), 'hello') is False
+        assert os.stat(str(path)).st_mtime_ns == 1
+
+    def test_write_if_changed__changed(self):
+
+        path = self.tmpdir.join('file.txt')
+        path.write('hello')
+
+        assert write_if_changed(str(path), 'hello world') is True
+        assert path.read() == 'hello world'
+
+    def test_write_if_changed__mode_changed(self):
+
+        path = self.tmpdir.join('hook')
+        path.write('hello')
+        os.chmod(str(path), 0o644)
+
+        assert write_if_changed(str(path), 'hello', 0o755) is True
+        assert os.stat(str(path)).st_mode & 0o777 == 0o755
+        assert write_if_changed(str(path), 'hello', 0o755) is False
+
+    def test_write_if_changed__failure_leaves_no_temp_files(self):
+
+        path = self.tmpdir.join('file.txt')
+        self.mocker.patch.object(os, 'replace').side_effect = OSError('boom')
+
+        with pytest.raises(OSError):
+            write_if_changed(str(path), 'hello')
+
+        assert os.listdir(str(self.tmpdir)) == []
@@ -54,6 +54,14 @@ class ConfigTestCase(TestCase):
 
         assert Config.get_lily_path() == str(self.tmpdir.join('.lily'))
 
+    #
+    # GET_CACHE_PATH
+    #
+    def test_get_cache_path(self):
+
+        assert Config.get_cache_path() == str(
+            self.tmpdir.join('.lily').join('cache'))
+
     #
     # EXISTS
     #
@@ -148,3 +156,78 @@ class ConfigTestCase(TestCase):
         # -- next_last_commit_hash
         config.next_last_commit_hash = 'f7d87cd78'
         assert read_from_conf('next_last_commit_hash') == 'f7d87cd78'
+
+    def test_properties__setters__preserves_optional_sections(self):
+
+        conf = json.loads(self.lily_dir.join('config.json').read())
+        conf['structure'] = {'deep': True}
+        self.lily_dir.join('config.json').write(json.dumps(conf))
+
+        config = Config()
+        config.version = '9.9.1'
+
+        conf = json.loads(self.lily_dir.join('config.json').read())
+        assert conf['version'] == '9.9.1'
+        assert conf['structure'] == {'deep': True}
+        assert config.structure == {'deep': True}
+
+    def test_properties__structure__missing(self):
+
+        assert Config().structure == {}
+
+    def test_properties__import_budget(self):
+
+        assert Config().import_budget == {}
+
+        conf = json.loads(self.lily_dir.join('config.json').read())
+        conf['import_budget'] = {'pre_commit': True}
+        self.lily_dir.join('config.json').write(json.dumps(conf))
+
+        assert Config().import_budget == {'pre_commit': True}
+
+    def test_properties__pre_commit(self):
+
+        assert Config().pre_commit == {}
+
+        conf = json.loads(self.lily_dir.join('config.json').read())
+        conf['pre_commit'] = {'snapshot': True}
+        self.lily_dir.join('config.json').write(json.dumps(conf))
+
+        assert Config().pre_commit == {'snapshot': True}
+
+    #
+    # READ
+    #
+    def test_read__is_cached_until_file_changes(self):
+
+        config_path = str(self.lily_dir.join('config.json'))
+        loads = self.mocker.spy(json, 'loads')
+
+        assert Config().version == '0.1.9'
+        assert Config().version == '0.1.9'
+        assert loads.call_count == 1
+
+        conf = json.loads(self.lily_dir.join('config.json').read())
+        conf['version'] = '0.1.10'
+        self.lily_dir.join('config.json').write(json.dumps(conf))
+        os.utime(config_path, ns=(1, 1))
+
+        assert Config().version == '0.1.10'
+
+    def test_read__nested_sections_are_not_shared(self):
+
+        conf = json.loads(self.lily_dir.join('config.json').read())
+        conf['structure'] = {'allowed_package_files': ['*.py']}
+        self.lily_dir.join('config.json').write(json.dumps(conf))
+
+        Config().structure['allowed_package_files'].append('*.makefile')
+
+        assert Config().structure == {'allowed_package_files': ['*.py']}
+
+    def test_read__save_refreshes_cache(self):
+
+        Config().version = '9.9.1'
+        loads = self.mocker.spy(json, 'loads')
+
+        assert Config().version == '9.9.1'
+        assert loads.call_count == 0
@@ -0,0 +1,42 @@
+import sqlite3
+
+from lily_assistant.coverage.data import lines_to_numbits
+
+
+def create_coverage_data(path, lines, arcs=None):
+    """Create `.coverage` SQLite database the way coverage.py does it."""
+
+    connection = sqlite3.connect(path)
+    connection.executescript('''
+        CREATE TABLE coverage_schema (version integer);
+        CREATE TABLE meta (key text, value text, unique (key));
+        CREATE TABLE file (id integer primary key, path text, unique (path));
+        CREATE TABLE context (
+            id integer primary key, context text, unique (context));
+        CREATE TABLE line_bits (
+            file_id integer, context_id integer, numbits blob,
+            unique (file_id, context_id));
+        CREATE TABLE arc (
+            file_id integer, context_id integer, fromno integer,
+            tono integer, unique (file_id, context_id, fromno, tono));
+        INSERT INTO coverage_schema VALUES (7);
+        INSERT INTO context VALUES (1, '');
+    ''')
+    connection.execute(
+        'INSERT INTO meta VALUES (?, ?)', ('has_arcs', '1' if arcs else '0'))
+
+    for file_id, path in enumerate(sorted(set(lines) | set(arcs or {})), 1):
+        connection.execute('INSERT INTO file VALUES (?, ?)', (file_id, path))
+        if arcs:
+            for from_line, to_line in arcs.get(path, []):
+                connection.execute(
+                    'INSERT INTO arc VALUES (?, 1, ?, ?)',
+                    (file_id, from_line, to_line))
+
+        else:
+            connection.execute(
+                'INSERT INTO line_bits VALUES (?, 1, ?)',
+                (file_id, lines_to_numbits(lines[path])))
+
+    connection.commit()
+    connection.close()
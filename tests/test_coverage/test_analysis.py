@@ -0,0 +1,113 @@
+import textwrap
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.coverage.analysis import Analysis
+
+
+class AnalysisTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+
+    def analyse(self, source, executed, exclude_lines=None):
+
+        path = self.tmpdir.join('module.py')
+        path.write(textwrap.dedent(source).lstrip())
+
+        return Analysis(str(path), executed, exclude_lines)
+
+    #
+    # STATEMENTS
+    #
+    def test_statements(self):
+
+        analysis = self.analyse('''
+            """Module docstring."""
+            import os
+
+
+            def f(x):
+                """Function docstring."""
+                if x:
+                    return os.path.join(
+                        'a',
+                        'b')
+
+                else:
+                    return 2
+
+
+            class A:
+                """Class docstring."""
+
+                a = 1
+
+                @property
+                @staticmethod
+                def m():
+                    try:
+                        return 1
+                    except ValueError:
+                        return 2
+        ''', [])
+
+        assert sorted(analysis.statements) == [
+            2, 5, 7, 8, 13, 16, 19, 21, 22, 23, 24, 25, 26, 27]
+
+    def test_statements__pragma_no_cover(self):
+
+        analysis = self.analyse('''
+            a = 1
+            b = 2  # pragma: no cover
+            if a:  # pragma: no cover
+                c = 3
+                d = 4
+            e = 5
+        ''', [])
+
+        assert sorted(analysis.statements) == [1, 6]
+
+    def test_statements__exclude_lines(self):
+
+        source = '''
+            a = 1  # pragma: no cover
+            if __name__ == '__main__':
+                main()
+            raise NotImplementedError
+        '''
+
+        analysis = self.analyse(
+            source, [], [r'if __name__ == .__main__.:', 'NotImplemented'])
+
+        assert sorted(analysis.statements) == [1]
+
+        analysis = self.analyse(source, [], [])
+
+        assert sorted(analysis.statements) == [1, 2, 3, 4]
+
+    def test_statements__syntax_error(self):
+
+        analysis = self.analyse('def (:', [])
+
+        assert analysis.statements == set()
+        assert analysis.percent == 100.0
+
+    #
+    # EXECUTED & MISSING
+    #
+    def test_executed_and_missing(self):
+
+        analysis = self.analyse('''
+            a = (
+                1)
+            if a:
+                b = 2
+            c = 3
+        ''', [1, 2, 3, 4, 99])
+
+        assert sorted(analysis.executed) == [1, 3, 4]
+        assert sorted(analysis.missing) == [5]
+        assert analysis.percent == 75.0
@@ -0,0 +1,93 @@
+import os
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.coverage.analysis import Analysis
+from lily_assistant.coverage.config import CoverageConfig
+
+
+class CoverageConfigTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+        self.mocker.patch.dict(os.environ)
+        os.environ.pop('COVERAGE_RCFILE', None)
+
+    def get_config(self):
+        return CoverageConfig(str(self.tmpdir))
+
+    #
+    # FIND
+    #
+    def test_no_config(self):
+
+        self.tmpdir.join('setup.cfg').write('[flake8]\nmax-line-length = 80\n')
+
+        config = self.get_config()
+
+        assert config.path is None
+        assert config.omit == []
+        assert config.source == []
+        assert config.exclude is None
+
+    def test_coveragerc(self):
+
+        self.tmpdir.join('.coveragerc').write(
+            '[run]\n'
+            'source = app, lib\n'
+            'omit =\n'
+            '    app/migrations/*\n'
+            '    */settings.py\n'
+            '\n'
+            '[report]\n'
+            'exclude_lines =\n'
+            '    pragma: no cover\n'
+            '    raise (NotImplementedError, ValueError)\n')
+        self.tmpdir.join('setup.cfg').write('[coverage:run]\nsource = other\n')
+
+        config = self.get_config()
+
+        assert config.path == str(self.tmpdir.join('.coveragerc'))
+        assert config.source == ['app', 'lib']
+        assert config.omit == ['app/migrations/*', '*/settings.py']
+        assert config.exclude == [
+            'pragma: no cover', 'raise (NotImplementedError, ValueError)']
+
+    def test_setup_cfg_and_tox_ini(self):
+
+        self.tmpdir.join('setup.cfg').write('[flake8]\nmax-line-length = 80\n')
+        self.tmpdir.join('tox.ini').write(
+            '[coverage:report]\nexclude_also = if TYPE_CHECKING:\n')
+
+        config = self.get_config()
+
+        assert config.path == str(self.tmpdir.join('tox.ini'))
+        assert config.exclude == [
+            Analysis.EXCLUDE_REGEX.pattern, 'if TYPE_CHECKING:']
+
+    def test_rcfile_from_env(self):
+
+        self.tmpdir.join('.coveragerc').write('[run]\nsource = app\n')
+        self.tmpdir.join('custom.rc').write('[run]\nsource = lib\n')
+        os.environ['COVERAGE_RCFILE'] = 'custom.rc'
+
+        assert self.get_config().source == ['lib']
+
+    #
+    # IS_OMITTED
+    #
+    def test_is_omitted(self):
+
+        self.tmpdir.join('.coveragerc').write(
+            '[run]\nomit = app/migrations/*, */settings.py\n')
+
+        config = self.get_config()
+
+        assert config.is_omitted(os.path.join('app', 'migrations', 'a.py'))
+        assert config.is_omitted(os.path.join('app', 'conf', 'settings.py'))
+        assert not config.is_omitted(os.path.join('app', 'models.py'))
+        assert not config.is_omitted(
+            os.path.join('lib', 'app', 'migrations', 'a.py'))
@@ -0,0 +1,110 @@
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.coverage.data import (
+    CoverageData,
+    lines_to_numbits,
+    numbits_to_lines,
+)
+from tests.test_coverage import create_coverage_data
+
+
+class NumbitsTestCase(TestCase):
+
+    def test_numbits_to_lines(self):
+
+        assert numbits_to_lines(b'') == set()
+        assert numbits_to_lines(b'\x9a#') == {1, 3, 4, 7, 8, 9, 13}
+        assert numbits_to_lines(
+            lines_to_numbits({2, 100, 101})) == {2, 100, 101}
+
+    def test_lines_to_numbits(self):
+
+        assert lines_to_numbits(set()) == b''
+        assert lines_to_numbits({1, 3, 4, 7, 8, 9, 13}) == b'\x9a#'
+
+
+class CoverageDataTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+
+    #
+    # READ
+    #
+    def test_read__lines(self):
+
+        path = str(self.tmpdir.join('.coverage'))
+        create_coverage_data(path, {
+            '/code/a.py': {1, 2, 5},
+            '/code/b.py': {3},
+        })
+
+        assert CoverageData(path).read() == {
+            '/code/a.py': {1, 2, 5},
+            '/code/b.py': {3},
+        }
+
+    def test_read__arcs(self):
+
+        path = str(self.tmpdir.join('.coverage'))
+        create_coverage_data(path, {}, arcs={
+            '/code/a.py': [(-1, 1), (1, 2), (2, -1), (4, 5)],
+        })
+
+        assert CoverageData(path).read() == {'/code/a.py': {1, 2, 4, 5}}
+
+    def test_read__missing_file(self):
+
+        path = str(self.tmpdir.join('.coverage'))
+
+        with pytest.raises(CoverageData.MissingData) as e:
+            CoverageData(path).read()
+
+        assert e.value.args[0] == (
+            'coverage data file {} does not exist, run the tests with '
+            'coverage first (e.g. `make test_all`)'.format(path))
+
+    #
+    # WRITE / COMBINE
+    #
+    def test_write(self):
+
+        path = str(self.tmpdir.join('.coverage'))
+        CoverageData(path).write({'/code/a.py': {1, 2}, '/code/b.py': set()})
+
+        assert CoverageData(path).read() == {
+            '/code/a.py': {1, 2},
+            '/code/b.py': set(),
+        }
+
+    def test_write__readable_by_coverage(self):
+
+        coverage = pytest.importorskip('coverage')
+        path = str(self.tmpdir.join('.coverage'))
+        CoverageData(path).write({'/code/a.py': {1, 2}})
+
+        data = coverage.CoverageData(basename=path)
+        data.read()
+
+        assert sorted(data.lines('/code/a.py')) == [1, 2]
+
+    def test_combine(self):
+
+        shard_1 = str(self.tmpdir.join('.coverage.1'))
+        shard_2 = str(self.tmpdir.join('.coverage.2'))
+        path = str(self.tmpdir.join('.coverage'))
+        create_coverage_data(shard_1, {'/code/a.py': {1, 2}})
+        create_coverage_data(shard_2, {}, arcs={
+            '/code/a.py': [(-1, 3), (3, -1)],
+            '/code/b.py': [(-1, 1)],
+        })
+
+        lines = CoverageData.combine([shard_1, shard_2], path)
+
+        assert lines == CoverageData(path).read() == {
+            '/code/a.py': {1, 2, 3},
+            '/code/b.py': {1},
+        }
@@ -0,0 +1,72 @@
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.config import Config
+from lily_assistant.coverage.diff import DiffCoverage
+from lily_assistant.coverage.report import CoverageReport
+from tests.test_coverage import create_coverage_data
+
+
+class DiffCoverageTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+
+    def setUp(self):
+        self.base_dir = self.tmpdir.mkdir('base')
+        self.mocker.patch.object(
+            Config, 'get_project_path').return_value = str(self.base_dir)
+
+        code_dir = self.base_dir.mkdir('code')
+        code_dir.join('a.py').write(
+            '# comment\n'
+            'a = 1\n'
+            'b = [\n'
+            '    2,\n'
+            ']\n'
+            'c = 3\n')
+        code_dir.join('new.py').write('x = 1\ny = 2\n')
+        self.base_dir.mkdir('tests').join('test_a.py').write('t = 1\n')
+
+        create_coverage_data(str(self.base_dir.join('.coverage')), {
+            str(code_dir.join('a.py')): {2, 3},
+            str(self.base_dir.join('tests', 'test_a.py')): {1},
+        })
+        self.report = CoverageReport(source='code')
+
+    def test_files(self):
+
+        diff = DiffCoverage(self.report, {
+            'code/a.py': {1, 4, 6},
+            'code/new.py': {2},
+            'code/gone.py': {1},
+            'code/data.json': {1},
+            'tests/test_a.py': {1},
+        })
+
+        assert diff.files == [
+            ('code/a.py', {3, 6}, {6}),
+            ('code/new.py', {2}, {2}),
+        ]
+        assert diff.statements == 3
+        assert diff.missing == 2
+        assert round(diff.percent, 2) == 33.33
+
+    def test_files__no_statements_changed(self):
+
+        diff = DiffCoverage(self.report, {'code/a.py': {1}})
+
+        assert diff.files == []
+        assert diff.statements == 0
+        assert diff.percent == 100.0
+
+    def test_render(self):
+
+        diff = DiffCoverage(self.report, {'code/a.py': {2, 3, 4, 5, 6}})
+
+        assert diff.render() == (
+            'code/a.py: 2 / 3 changed statement(s) covered, missing: 6\n'
+            'TOTAL: 2 / 3 changed statement(s) covered (66.67%)')
@@ -0,0 +1,100 @@
+import os
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.config import Config
+from lily_assistant.coverage.html_report import HtmlReport
+from lily_assistant.coverage.report import CoverageReport
+from tests.test_coverage import create_coverage_data
+
+
+class HtmlReportTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+
+    def setUp(self):
+        self.base_dir = self.tmpdir.mkdir('base')
+        self.mocker.patch.object(
+            Config, 'get_project_path').return_value = str(self.base_dir)
+
+        self.code_dir = self.base_dir.mkdir('code')
+        self.code_dir.join('a.py').write('a = 1\nb = "<b>"\n')
+        self.code_dir.join('b.py').write('x = 1\n')
+
+        self.data_path = str(self.base_dir.join('.coverage'))
+        self.html_dir = str(self.base_dir.join('coverage_html'))
+        self.write_data({1})
+
+    def write_data(self, a_lines):
+
+        if os.path.exists(self.data_path):
+            os.remove(self.data_path)
+
+        create_coverage_data(self.data_path, {
+            str(self.code_dir.join('a.py')): a_lines,
+            str(self.code_dir.join('b.py')): {1},
+        })
+
+    def render(self):
+        return HtmlReport(
+            CoverageReport(source='code'), self.html_dir).render()
+
+    #
+    # RENDER
+    #
+    def test_render(self):
+
+        rendered = self.render()
+
+        assert sorted(os.path.basename(p) for p in rendered) == [
+            'code_a_py.html',
+            'code_b_py.html',
+            'index.html',
+        ]
+        page = open(os.path.join(self.html_dir, 'code_a_py.html')).read()
+        assert '<tr class="run"><td>1</td><td><pre>a = 1</pre></td></tr>' in (
+            page)
+        assert (
+            '<tr class="mis"><td>2</td><td><pre>b = &quot;&lt;b&gt;&quot;'
+            '</pre></td></tr>') in page
+        index = open(os.path.join(self.html_dir, 'index.html')).read()
+        assert '<title>Coverage report: 67%</title>' in index
+
+    def test_render__nothing_changed(self):
+
+        self.render()
+
+        assert self.render() == []
+
+    def test_render__only_changed_files_are_rendered(self):
+
+        self.render()
+        self.write_data({1, 2})
+
+        assert sorted(os.path.basename(p) for p in self.render()) == [
+            'code_a_py.html',
+            'index.html',
+        ]
+
+    def test_render__changed_source_is_rendered(self):
+
+        self.render()
+        self.code_dir.join('b.py').write('y = 1\n')
+
+        assert sorted(os.path.basename(p) for p in self.render()) == [
+            'code_b_py.html',
+        ]
+
+    def test_render__removed_files_are_removed(self):
+
+        self.render()
+        self.code_dir.join('b.py').remove()
+
+        self.render()
+
+        assert not os.path.exists(
+            os.path.join(self.html_dir, 'code_b_py.html'))
@@ -0,0 +1,120 @@
+import os
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.config import Config
+from lily_assistant.coverage.report import CoverageReport
+from tests.test_coverage import create_coverage_data
+
+
+class CoverageReportTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+
+    def setUp(self):
+        self.base_dir = self.tmpdir.mkdir('base')
+        self.mocker.patch.object(
+            Config, 'get_project_path').return_value = str(self.base_dir)
+
+        code_dir = self.base_dir.mkdir('code')
+        code_dir.join('__init__.py').write('')
+        code_dir.join('a.py').write('a = 1\nb = 2\nc = 3\nd = 4\ne = 5\n')
+        code_dir.join('never.py').write('x = 1\n')
+        self.base_dir.mkdir('tests').join('test_a.py').write('t = 1\n')
+
+        self.data_path = str(self.base_dir.join('.coverage'))
+        create_coverage_data(self.data_path, {
+            str(code_dir.join('__init__.py')): set(),
+            str(code_dir.join('a.py')): {1, 4},
+            str(self.base_dir.join('tests', 'test_a.py')): {1},
+            '/usr/lib/python3/site-packages/lib.py': {1},
+        })
+
+    #
+    # ANALYSES
+    #
+    def test_analyses__source(self):
+
+        report = CoverageReport(source='code')
+
+        assert [path for path, _ in report.analyses] == [
+            os.path.join('code', '__init__.py'),
+            os.path.join('code', 'a.py'),
+            os.path.join('code', 'never.py'),
+        ]
+        assert report.statements == 6
+        assert report.missing == 4
+        assert round(report.percent, 2) == 33.33
+
+    def test_analyses__no_source(self):
+
+        report = CoverageReport(data_path=self.data_path)
+
+        assert [path for path, _ in report.analyses] == [
+            os.path.join('code', '__init__.py'),
+            os.path.join('code', 'a.py'),
+            os.path.join('tests', 'test_a.py'),
+        ]
+
+    def test_analyses__coverage_config(self):
+
+        self.base_dir.join('.coveragerc').write(
+            '[run]\n'
+            'source = code\n'
+            'omit =\n'
+            '    code/never.py\n'
+            '    */__init__.py\n'
+            '\n'
+            '[report]\n'
+            'exclude_also =\n'
+            '    ^e =\n')
+
+        report = CoverageReport(data_path=self.data_path)
+
+        assert [path for path, _ in report.analyses] == [
+            os.path.join('code', 'a.py')]
+        assert report.statements == 4
+        assert report.missing == 2
+        assert report.percent == 50.0
+
+    def test_analyses__omitted_with_source(self):
+
+        self.base_dir.join('setup.cfg').write(
+            '[coverage:run]\nomit = code/never.py\n')
+
+        report = CoverageReport(source='code')
+
+        assert [path for path, _ in report.analyses] == [
+            os.path.join('code', '__init__.py'),
+            os.path.join('code', 'a.py'),
+        ]
+        assert report.is_reported(os.path.join('code', 'never.py')) is False
+
+    def test_percent__no_statements(self):
+
+        create_coverage_data(self.data_path + '.empty', {})
+
+        report = CoverageReport(data_path=self.data_path + '.empty')
+
+        assert report.percent == 100.0
+
+    #
+    # RENDER
+    #
+    def test_render(self):
+
+        report = CoverageReport(source='code')
+
+        assert report.render().splitlines() == [
+            'Name               Stmts    Miss   Cover   Missing',
+            '--------------------------------------------------',
+            'code/__init__.py       0       0    100%',
+            'code/a.py              5       3     40%   2-3, 5',
+            'code/never.py          1       1      0%   1',
+            '--------------------------------------------------',
+            'TOTAL                  6       4     33%',
+        ]
@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+import pytest
+
+import lily_assistant
+from lily_assistant.checkers.commit_message import CommitMessageChecker
+from lily_assistant.hooks.commit_msg import main
+
+
+class CommitMsgTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker, capsys):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+        self.capsys = capsys
+
+    def setUp(self):
+        self.commit_msg = self.tmpdir.join('COMMIT_EDITMSG')
+        self.commit_msg.write('hello world')
+
+    #
+    # MAIN
+    #
+    def test_main__valid(self):
+
+        self.mocker.patch.object(
+            CommitMessageChecker, 'is_valid').return_value = True
+
+        assert main([str(self.commit_msg)]) == 0
+        assert self.capsys.readouterr().out == (
+            '[INFO]\n\nCOMMIT MESSAGE: hello world\n')
+
+    def test_main__invalid(self):
+
+        self.mocker.patch.object(
+            CommitMessageChecker, 'is_valid').return_value = False
+
+        assert main([str(self.commit_msg)]) == 1
+        assert self.capsys.readouterr().err == (
+            '[ERROR]\n\nyour commit message is not following the commit '
+            'message convention.\n')
+
+    def test_main__wrong_arguments(self):
+
+        assert main([]) == 2
+        assert 'usage:' in self.capsys.readouterr().err
+
+    def test_main__invalid__renders_errors(self):
+
+        self.commit_msg.write('Added stuff.')
+
+        assert main([str(self.commit_msg)]) == 1
+        assert self.capsys.readouterr().err == (
+            '[ERROR]\n\nyour commit message is not following the commit '
+            'message convention.\n\n'
+            'line 1: header must follow the `<type>(<scope>): <subject>` '
+            'format [header-format]\n')
+
+    def test_main__imports_only_the_checker(self):
+
+        self.commit_msg.write('feat(cli): add fast commit-msg hook')
+
+        root_dir = os.path.dirname(
+            os.path.dirname(os.path.abspath(lily_assistant.__file__)))
+        code = (
+            'import sys, runpy; '
+            'sys.argv = ["commit_msg", {path!r}]; '
+            'exit_code = 0\n'
+            'try:\n'
+            '    runpy.run_module("lily_assistant.hooks.commit_msg", '
+            'run_name="__main__")\n'
+            'except SystemExit as e:\n'
+            '    exit_code = e.code\n'
+            'print(exit_code, "click" in sys.modules)'
+        ).format(path=str(self.commit_msg))
+
+        output = subprocess.check_output(
+            [sys.executable, '-c', code],
+            env=dict(os.environ, PYTHONPATH=root_dir),
+            universal_newlines=True)
+
+        assert output.strip().splitlines()[-1] == '0 False'
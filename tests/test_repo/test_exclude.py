@@ -0,0 +1,87 @@
+import os
+import subprocess
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.repo.exclude import (
+    exclude,
+    exclude_state,
+    get_exclude_path,
+)
+
+
+class ExcludeTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+        self.work_dir = tmpdir.mkdir('work')
+        subprocess.check_call(['git', 'init', '-q', str(self.work_dir)])
+
+    def test_get_exclude_path(self):
+
+        assert get_exclude_path(str(self.work_dir)) == str(
+            self.work_dir.join('.git', 'info', 'exclude'))
+
+    def test_get_exclude_path__linked_worktree(self):
+
+        subprocess.check_call(
+            ['git', 'commit', '-q', '--allow-empty', '-m', 'feat: initial'],
+            cwd=str(self.work_dir),
+            env=dict(
+                os.environ,
+                GIT_AUTHOR_NAME='dev',
+                GIT_AUTHOR_EMAIL='dev@example.com',
+                GIT_COMMITTER_NAME='dev',
+                GIT_COMMITTER_EMAIL='dev@example.com'))
+        worktree = str(self.tmpdir.join('worktree'))
+        subprocess.check_call(
+            ['git', 'worktree', 'add', '-q', '--detach', worktree],
+            cwd=str(self.work_dir))
+
+        assert os.path.samefile(
+            get_exclude_path(worktree),
+            str(self.work_dir.join('.git', 'info', 'exclude')))
+
+    def test_get_exclude_path__not_a_repository(self):
+
+        base_dir = self.tmpdir.mkdir('base')
+
+        assert get_exclude_path(str(base_dir)) is None
+
+        exclude(str(base_dir), str(base_dir.join('.lily', 'logs')))
+
+        assert not base_dir.join('.git').exists()
+
+    def test_exclude(self):
+
+        exclude_path = self.work_dir.join('.git', 'info', 'exclude')
+        exclude_path.write('*.swp')
+
+        exclude(str(self.work_dir), str(self.work_dir.join('.lily', 'hooks')))
+        exclude(str(self.work_dir), str(self.work_dir.join('.lily', 'hooks')))
+
+        assert exclude_path.read() == '*.swp\n/.lily/hooks/\n'
+
+        self.work_dir.mkdir('.lily').mkdir('hooks').join('pre-commit').write('')
+
+        assert subprocess.check_output(
+            ['git', 'status', '--porcelain'], cwd=str(self.work_dir)) == b''
+
+    def test_exclude__outside_of_the_project(self):
+
+        exclude_path = self.work_dir.join('.git', 'info', 'exclude')
+        exclude_path.write('*.swp\n')
+
+        exclude(str(self.work_dir), str(self.tmpdir.join('other')))
+
+        assert exclude_path.read() == '*.swp\n'
+
+    def test_exclude_state(self):
+
+        exclude_state(str(self.work_dir))
+        exclude_state(str(self.work_dir))
+
+        assert self.work_dir.join('.git', 'info', 'exclude').read().endswith(
+            '\n/.lily/cache/\n/.lily/logs/\n')
@@ -1,10 +1,15 @@
 
+import json
 import os
+import subprocess
 from unittest import TestCase
 from unittest.mock import call
 
+from click.testing import CliRunner
 import pytest
 
+from lily_assistant.cli.cli import cli
+from lily_assistant.cli.logger import Logger
 from lily_assistant.repo.repo import Repo
 from lily_assistant.config import Config
 
@@ -12,9 +17,10 @@ from lily_assistant.config import Config
 class RepoTestCase(TestCase):
 
     @pytest.fixture(autouse=True)
-    def initfixture(self, mocker, tmpdir):
+    def initfixture(self, mocker, tmpdir, capsys):
         self.mocker = mocker
         self.tmpdir = tmpdir
+        self.capsys = capsys
 
         self.base_dir = self.tmpdir.mkdir('base')
         self.mocker.patch.object(
@@ -98,6 +104,32 @@ class RepoTestCase(TestCase):
 
         assert git.call_args_list == [call('add .'), call('add -u .')]
 
+    def test_add_all__skips_logs_of_the_runs(self):
+
+        subprocess.check_call(['git', 'init', '-q', str(self.base_dir)])
+        self.base_dir.mkdir('.lily').join('config.json').write(
+            json.dumps({'version': '0.1.2'}))
+        self.base_dir.join('setup.py').write(
+            'from setuptools import setup\nsetup(version="0.1.2")\n')
+        os.chdir(str(self.base_dir))
+
+        try:
+            result = CliRunner().invoke(cli, ['version'])
+
+        finally:
+            Logger.configure()
+
+        assert result.exit_code == 0
+        assert self.base_dir.join('.lily', 'logs').listdir()
+
+        Repo().add_all()
+
+        assert subprocess.check_output(
+            ['git', 'diff', '--cached', '--name-only'],
+            cwd=str(self.base_dir),
+            universal_newlines=True).split() == [
+                '.lily/config.json', 'setup.py']
+
     #
     # ADD
     #
@@ -204,6 +236,25 @@ class RepoTestCase(TestCase):
             'Command: python -c "import sys; sys.exit(125)" '
             'return exit code: 125')
 
+    def test_execute__quiet(self):
+
+        Logger.configure(quiet=True)
+        try:
+            assert Repo().execute('echo "hello"') == 'hello\n'
+            assert 'hello' not in self.capsys.readouterr().out.replace(
+                '[EXECUTE] echo "hello"', '')
+
+            with pytest.raises(OSError):
+                Repo().execute('python -c "print(123); raise SystemExit(1)"')
+
+        finally:
+            Logger.configure()
+
+        out = self.capsys.readouterr().out
+        assert out.startswith(
+            '[EXECUTE] python -c "print(123); raise SystemExit(1)"\n')
+        assert out.endswith('123\n')
+
     #
     # GENERIC - SPLIT COMMAND
     #
@@ -0,0 +1,219 @@
+import json
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.repo.snapshot import IndexSnapshot
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+class IndexSnapshotTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.work_dir = tmpdir.mkdir('work')
+        self.git('init', '-q')
+        self.git('config', 'user.email', 'dev@example.com')
+        self.git('config', 'user.name', 'dev')
+        self.work_dir.join('a.py').write('a = 1\n')
+        self.work_dir.mkdir('app').join('b.py').write('b = 1\n')
+        self.git('add', '.')
+        self.git('commit', '-q', '-m', 'feat: initial')
+        self.snapshots_path = str(self.work_dir.join('.lily', 'snapshots'))
+
+    def git(self, *args, cwd=None, env=None):
+        return subprocess.check_output(
+            ['git'] + list(args),
+            cwd=cwd or str(self.work_dir),
+            env=env and dict(os.environ, **env),
+            universal_newlines=True).strip()
+
+    def read(self, *path):
+        with open(os.path.join(*path)) as f:
+            return f.read()
+
+    def test_create__staged_versions(self):
+
+        self.work_dir.join('a.py').write('a = 2\n')
+        self.git('add', 'a.py')
+        self.work_dir.join('a.py').write('a = 3  # unstaged\n')
+        self.work_dir.join('app', 'c.py').write('c = 1\n')
+        self.git('add', 'app/c.py')
+        self.work_dir.join('untracked.py').write('u = 1\n')
+
+        with IndexSnapshot(str(self.work_dir), self.snapshots_path) as s:
+            assert self.read(s.path, 'a.py') == 'a = 2\n'
+            assert self.read(s.path, 'app', 'c.py') == 'c = 1\n'
+            assert not os.path.exists(os.path.join(s.path, 'untracked.py'))
+            assert s.checked_out == ['a.py']
+            assert s.linked == 2
+
+            # -- unchanged files are hardlinked, not copied
+            assert os.path.samefile(
+                os.path.join(s.path, 'app', 'b.py'),
+                str(self.work_dir.join('app', 'b.py')))
+
+            path = s.path
+
+        assert not os.path.exists(path)
+
+    def test_create__deleted_in_working_tree(self):
+
+        os.remove(str(self.work_dir.join('app', 'b.py')))
+
+        with IndexSnapshot(str(self.work_dir), self.snapshots_path) as s:
+            assert self.read(s.path, 'app', 'b.py') == 'b = 1\n'
+
+    def test_create__deleted_from_index(self):
+
+        self.git('rm', '-q', '--cached', 'a.py')
+
+        with IndexSnapshot(str(self.work_dir), self.snapshots_path) as s:
+            assert not os.path.exists(os.path.join(s.path, 'a.py'))
+
+    def test_create__unmerged(self):
+
+        self.git('checkout', '-q', '-b', 'other')
+        self.work_dir.join('a.py').write('a = 2\n')
+        self.git('commit', '-q', '-am', 'feat: other')
+        self.git('checkout', '-q', '-')
+        self.work_dir.join('a.py').write('a = 3\n')
+        self.git('commit', '-q', '-am', 'feat: main')
+        subprocess.call(
+            ['git', 'merge', '-q', 'other'],
+            cwd=str(self.work_dir),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL)
+
+        with pytest.raises(IndexSnapshot.SnapshotError) as e:
+            IndexSnapshot(str(self.work_dir), self.snapshots_path).create()
+
+        assert str(e.value) == 'unmerged path: a.py'
+
+    def test_is_needed(self):
+
+        snapshot = IndexSnapshot(str(self.work_dir), self.snapshots_path)
+
+        assert snapshot.is_needed() is False
+
+        self.work_dir.join('untracked.py').write('u = 1\n')
+
+        assert snapshot.is_needed() is True
+
+        os.remove(str(self.work_dir.join('untracked.py')))
+        self.work_dir.join('a.py').write('a = 2\n')
+
+        assert snapshot.is_needed() is True
+
+    def test_create__excluded_from_untracked(self):
+
+        snapshot = IndexSnapshot(str(self.work_dir), self.snapshots_path)
+        with snapshot:
+            assert self.git('status', '--porcelain') == ''
+            assert snapshot.is_needed() is False
+
+        with snapshot:
+            pass
+
+        assert self.read(
+            str(self.work_dir.join('.git', 'info', 'exclude'))
+        ).splitlines().count('/.lily/snapshots/') == 1
+
+    def test_create__local_files(self):
+
+        self.work_dir.join('env.sh').write('export A=1\n')
+        self.work_dir.join('.lily').ensure_dir().join(
+            'lily_assistant.makefile').write('lint:\n')
+        self.work_dir.join('local.cfg').write('[local]\n')
+        self.work_dir.join('a.py').write('a = 2\n')
+
+        snapshot = IndexSnapshot(
+            str(self.work_dir), self.snapshots_path, ['local.cfg', 'a.py'])
+        with snapshot as s:
+            assert self.read(s.path, 'env.sh') == 'export A=1\n'
+            assert self.read(
+                s.path, '.lily', 'lily_assistant.makefile') == 'lint:\n'
+            assert self.read(s.path, 'local.cfg') == '[local]\n'
+            assert not os.path.exists(
+                os.path.join(s.path, '.lily', 'config.json'))
+
+            # -- tracked files stay staged
+            assert self.read(s.path, 'a.py') == 'a = 1\n'
+
+    def test_get_env(self):
+
+        self.work_dir.join('a.py').write('a = 2\n')
+        self.git('add', 'a.py')
+        self.work_dir.join('a.py').write('a = 3  # unstaged\n')
+        index = self.work_dir.join('.git', 'index').read_binary()
+
+        with IndexSnapshot(str(self.work_dir), self.snapshots_path) as s:
+            env = s.get_env()
+            app_path = os.path.join(s.path, 'app')
+
+            assert self.git(
+                'diff', '--cached', '--name-only', cwd=s.path, env=env) == (
+                    'a.py')
+            assert self.git('diff', '--name-only', cwd=s.path, env=env) == ''
+            assert self.git(
+                'diff', '--cached', '--relative', '--name-only',
+                cwd=app_path, env=env) == ''
+            assert self.git(
+                'rev-parse', '--show-toplevel', cwd=app_path, env=env) == (
+                    os.path.realpath(s.path))
+
+            index_path = env['GIT_INDEX_FILE']
+
+        assert not os.path.exists(index_path)
+        assert self.work_dir.join('.git', 'index').read_binary() == index
+
+    def test_check_staged__staged_coverage_regression(self):
+
+        self.work_dir.join('.lily', 'config.json').ensure().write(
+            json.dumps({'src_dir': 'app'}))
+        self.work_dir.join('app', 'calc.py').write(
+            'def add(a, b):\n    return a + b\n')
+        self.work_dir.mkdir('tests').join('test_calc.py').write(
+            'from app.calc import add\n\n\n'
+            'def test_add():\n    assert add(1, 2) == 3\n')
+        self.git('add', '.')
+        self.git('commit', '-q', '-m', 'feat: add')
+
+        # -- only the staged version misses tests
+        self.work_dir.join('app', 'calc.py').write(
+            'def add(a, b):\n    return a + b\n\n\n'
+            'def sub(a, b):\n    c = a - b\n    return c\n')
+        self.git('add', 'app/calc.py')
+        self.work_dir.join('app', 'calc.py').write(
+            'def add(a, b):\n    return a + b\n')
+
+        lily = '{} -c "from lily_assistant.cli.cli import cli; cli()"'.format(
+            sys.executable)
+        process = subprocess.run(
+            [
+                sys.executable, '-c',
+                'from lily_assistant.cli.cli import cli; cli()',
+                'check-staged',
+                '--command', (
+                    '{python} -m pytest -q -p no:randomly -p no:cacheprovider '
+                    '--cov=app tests && '
+                    '{lily} coverage diff --fail-under 90'.format(
+                        python=sys.executable, lily=lily)),
+            ],
+            cwd=str(self.work_dir),
+            env=dict(os.environ, PYTHONPATH=ROOT_DIR),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True)
+
+        assert process.returncode == 1, process.stdout
+        assert (
+            'coverage of changed lines 33.33% is less than 90.00%' in
+            process.stdout)
+        assert 'checks of the staged files failed' in process.stdout
@@ -0,0 +1,135 @@
+import subprocess
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.repo.verify import get_commits, RangeVerifier
+from lily_assistant.repo.worktrees import WorktreePool
+
+
+class VerifyTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+        self.mocker.patch('lily_assistant.cli.logger.click.secho')
+        self.work_dir = tmpdir.mkdir('work')
+        self.git('init', '-q')
+        self.git('config', 'user.email', 'dev@example.com')
+        self.git('config', 'user.name', 'dev')
+        self.base = self.commit('feat: initial', 'a.py')
+        self.cache_path = str(tmpdir.join('cache', 'verify.json'))
+
+    def git(self, *args):
+        return subprocess.check_output(
+            ['git'] + list(args),
+            cwd=str(self.work_dir),
+            universal_newlines=True).strip()
+
+    def commit(self, message, path):
+        self.work_dir.join(path).write(message + '\n')
+        self.git('add', path)
+        self.git('commit', '-q', '-m', message)
+
+        return self.git('rev-parse', 'HEAD')
+
+    def make_commits(self, count, broken_from=None):
+        for i in range(count):
+            path = 'broken' if i == broken_from else 'f{}.py'.format(i)
+            self.commit('feat: commit {}'.format(i), path)
+
+        return get_commits(str(self.work_dir), '{}..HEAD'.format(self.base))
+
+    def get_verifier(self, jobs=2, command='test ! -f broken'):
+        return RangeVerifier(
+            WorktreePool(
+                str(self.work_dir), jobs, str(self.tmpdir.join('worktrees'))),
+            command,
+            self.cache_path,
+            jobs=jobs)
+
+    #
+    # GET_COMMITS
+    #
+    def test_get_commits(self):
+
+        commits = self.make_commits(2)
+
+        assert [c.subject for c in commits] == [
+            'feat: commit 0', 'feat: commit 1']
+        assert commits[1].sha == self.git('rev-parse', 'HEAD')
+        assert commits[1].tree == self.git('rev-parse', 'HEAD^{tree}')
+
+    def test_get_commits__invalid_range(self):
+
+        with pytest.raises(OSError):
+            get_commits(str(self.work_dir), 'nope..HEAD')
+
+    #
+    # VERIFY_ALL
+    #
+    def test_verify_all__passes(self):
+
+        commits = self.make_commits(4)
+        verifier = self.get_verifier()
+
+        assert verifier.verify_all(commits) is None
+        assert len(verifier.passed) == 4
+
+    def test_verify_all__first_failing(self):
+
+        commits = self.make_commits(6, broken_from=2)
+        verifier = self.get_verifier()
+
+        assert verifier.verify_all(commits) == commits[2]
+        assert verifier.get_key(commits[2]) not in verifier.passed
+
+    def test_verify_all__passed_trees_are_cached(self):
+
+        commits = self.make_commits(3)
+        verifier = self.get_verifier()
+        verifier.verify_all(commits)
+        verifier.save()
+
+        verifier = self.get_verifier()
+        checkout = self.mocker.spy(verifier.pool, 'checkout')
+
+        assert verifier.verify_all(commits) is None
+        assert checkout.call_count == 0
+
+    def test_verify_all__other_command_not_cached(self):
+
+        commits = self.make_commits(1)
+        verifier = self.get_verifier()
+        verifier.verify_all(commits)
+        verifier.save()
+
+        verifier = self.get_verifier(command='false')
+
+        assert verifier.verify_all(commits) == commits[0]
+
+    #
+    # BISECT
+    #
+    def test_bisect(self):
+
+        commits = self.make_commits(10, broken_from=6)
+        verifier = self.get_verifier(jobs=3)
+        verify = self.mocker.spy(verifier, 'verify')
+
+        assert verifier.bisect(commits) == commits[6]
+        # -- 3 midpoints per round: 10 commits take at most 2 rounds
+        assert verify.call_count <= 6
+
+    def test_bisect__all_pass(self):
+
+        commits = self.make_commits(5)
+
+        assert self.get_verifier(jobs=2).bisect(commits) is None
+
+    def test_bisect__first_commit_fails(self):
+
+        commits = self.make_commits(5, broken_from=0)
+
+        assert self.get_verifier(jobs=1).bisect(commits) == commits[0]
@@ -0,0 +1,106 @@
+import os
+import subprocess
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.repo.worktrees import WorktreePool
+
+
+class WorktreePoolTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+        self.work_dir = tmpdir.mkdir('work')
+        self.git('init', '-q')
+        self.git('config', 'user.email', 'dev@example.com')
+        self.git('config', 'user.name', 'dev')
+        self.commit('.gitignore', '*.pyc\ncache/\n')
+        self.first = self.commit('a.py', 'a = 1\n')
+        self.second = self.commit('a.py', 'a = 2\n')
+        self.path = str(self.tmpdir.join('worktrees'))
+
+    def git(self, *args):
+        return subprocess.check_output(
+            ['git'] + list(args),
+            cwd=str(self.work_dir),
+            universal_newlines=True).strip()
+
+    def commit(self, path, content):
+        self.work_dir.join(path).write(content)
+        self.git('add', path)
+        self.git('commit', '-q', '-m', 'feat: change {}'.format(path))
+
+        return self.git('rev-parse', 'HEAD')
+
+    def test_checkout(self):
+
+        pool = WorktreePool(str(self.work_dir), 2, self.path)
+
+        with pool.checkout(self.first) as worktree:
+            with open(os.path.join(worktree, 'a.py')) as f:
+                assert f.read() == 'a = 1\n'
+
+        with pool.checkout(self.second) as other:
+            with open(os.path.join(other, 'a.py')) as f:
+                assert f.read() == 'a = 2\n'
+
+        # -- released worktree gets reused
+        assert other == worktree
+        assert pool.created == 1
+
+    def test_checkout__cleans_untracked_keeps_ignored(self):
+
+        pool = WorktreePool(str(self.work_dir), 1, self.path)
+
+        with pool.checkout(self.first) as worktree:
+            os.mkdir(os.path.join(worktree, 'cache'))
+            open(os.path.join(worktree, 'cache', 'x'), 'w').close()
+            open(os.path.join(worktree, 'untracked.py'), 'w').close()
+
+        with pool.checkout(self.first) as worktree:
+            assert os.path.exists(os.path.join(worktree, 'cache', 'x'))
+            assert not os.path.exists(os.path.join(worktree, 'untracked.py'))
+
+    def test_checkout__reuses_worktrees_of_previous_runs(self):
+
+        pool = WorktreePool(str(self.work_dir), 1, self.path)
+        with pool.checkout(self.first):
+            pass
+
+        marker = os.path.join(self.path, '0', 'marker.pyc')
+        open(marker, 'w').close()
+
+        pool = WorktreePool(str(self.work_dir), 1, self.path)
+        with pool.checkout(self.second):
+            assert os.path.exists(marker)
+
+    def test_checkout__recreates_broken_worktree(self):
+
+        os.makedirs(os.path.join(self.path, '0'))
+
+        pool = WorktreePool(str(self.work_dir), 1, self.path)
+        with pool.checkout(self.second) as worktree:
+            assert os.path.exists(os.path.join(worktree, '.git'))
+
+    def test_checkout__unknown_commit(self):
+
+        pool = WorktreePool(str(self.work_dir), 1, self.path)
+
+        with pytest.raises(WorktreePool.WorktreeError) as e:
+            with pool.checkout('f' * 40):
+                pass
+
+        assert str(e.value).startswith('git checkout --detach failed')
+        assert pool.free.qsize() == 1
+
+    def test_checkout__in_git_dir_by_default(self):
+
+        pool = WorktreePool(str(self.work_dir), 1)
+
+        with pool.checkout(self.first) as worktree:
+            assert worktree == str(
+                self.work_dir.join('.git', 'lily', 'worktrees', '0'))
+
+        assert self.git('status', '--porcelain', '--ignored') == ''
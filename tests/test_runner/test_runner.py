@@ -0,0 +1,270 @@
+import json
+import os
+import sys
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.cli.logger import Logger
+from lily_assistant.config import Config
+from lily_assistant.runner.runner import Runner
+from lily_assistant.runner.task import Task
+
+
+def python(code):
+    return [sys.executable, '-c', code]
+
+
+class RunnerTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker, capsys):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+        self.capsys = capsys
+
+    def setUp(self):
+        self.base_dir = self.tmpdir.mkdir('base')
+        self.base_dir.mkdir('.lily')
+        self.base_dir.mkdir('code').join('a.py').write('a = 1')
+        self.mocker.patch.object(
+            Config, 'get_project_path').return_value = str(self.base_dir)
+        self.mocker.patch.object(
+            Config, 'get_lily_path'
+        ).return_value = str(self.base_dir.join('.lily'))
+
+    def log(self, name):
+        return python(
+            'open("log.txt", "a").write("{name}\\n")'.format(name=name))
+
+    def read_log(self):
+        return self.base_dir.join('log.txt').read().split()
+
+    #
+    # RUN
+    #
+    def test_run__respects_dependencies(self):
+
+        Runner([
+            Task('teardown', self.log('teardown'), deps=['test']),
+            Task('test', self.log('test'), deps=['setup']),
+            Task('setup', self.log('setup')),
+        ]).run()
+
+        assert self.read_log() == ['setup', 'test', 'teardown']
+
+    def test_run__independent_tasks_run_concurrently(self):
+
+        # -- each task waits for the other one to start
+        def wait_for(mine, other):
+            return python(
+                'import os, time\n'
+                'open("{mine}", "w").close()\n'
+                'for _ in range(200):\n'
+                '    if os.path.exists("{other}"):\n'
+                '        break\n'
+                '    time.sleep(0.01)\n'
+                'else:\n'
+                '    raise SystemExit(1)\n'.format(mine=mine, other=other))
+
+        Runner([
+            Task('lint_src', wait_for('src', 'tests')),
+            Task('lint_tests', wait_for('tests', 'src')),
+        ], workers=2).run()
+
+    def test_run__failure_stops_dependent_tasks(self):
+
+        with pytest.raises(Runner.TaskFailed) as e:
+            Runner([
+                Task('setup', python('raise SystemExit(3)')),
+                Task('test', self.log('test'), deps=['setup']),
+            ]).run()
+
+        assert e.value.args[0] == 'setup returned exit code: 3'
+        assert not self.base_dir.join('log.txt').exists()
+
+    def test_run__placeholders_are_skipped(self):
+
+        Runner([
+            Task('test_setup'),
+            Task('test', self.log('test'), deps=['test_setup']),
+        ]).run()
+
+        assert self.read_log() == ['test']
+
+    def test_run__overrides_are_delegated_to_make(self):
+
+        self.base_dir.join('Makefile').write(
+            'VAR := 1\n'
+            'test_setup:\n'
+            '\techo setup >> log.txt\n')
+
+        Runner([
+            Task('test_setup'),
+            Task('test', self.log('test'), deps=['test_setup']),
+        ]).run()
+
+        assert self.read_log() == ['setup', 'test']
+
+    def test_load_overrides(self):
+
+        self.base_dir.join('Makefile').write(
+            'VAR := 1\n'
+            'OTHER=2\n'
+            'test_setup:\n'
+            '\techo setup\n'
+            'deploy: test_all\n')
+
+        assert Runner([]).load_overrides() == {'test_setup', 'deploy'}
+
+    def test_run__env_sh_is_loaded(self):
+
+        self.base_dir.join('env.sh').write('export LILY_VALUE=hello\n')
+
+        Runner([
+            Task(
+                'echo',
+                python(
+                    'import os; open("log.txt", "w").write('
+                    'os.environ["LILY_VALUE"])')),
+        ]).run()
+
+        assert self.read_log() == ['hello']
+
+    def test_run__makefile_variables_win_over_env_sh(self):
+
+        self.base_dir.join('env.sh').write(
+            'export LILY_VALUE=env\nexport LILY_DEFAULT=env\n')
+        self.base_dir.join('Makefile').write(
+            'LILY_VALUE := makefile\n'
+            'LILY_DEFAULT ?= makefile\n'
+            'LILY_OTHER = makefile\n'
+            'LILY_DERIVED = $(LILY_VALUE)\n')
+
+        Runner([
+            Task(
+                'echo',
+                python(
+                    'import os; open("log.txt", "w").write(" ".join('
+                    'os.environ.get(name, "-") for name in ['
+                    '"LILY_VALUE", "LILY_DEFAULT", "LILY_OTHER", '
+                    '"LILY_DERIVED"]))'),
+                env=['LILY_VALUE', 'LILY_DEFAULT', 'LILY_DERIVED']),
+        ]).run()
+
+        assert self.read_log() == ['makefile', 'env', '-', '-']
+
+    def test_run__changed_env_reruns_tasks(self):
+
+        def run(threshold):
+            self.base_dir.join('env.sh').write(
+                'export THRESHOLD={}\n'.format(threshold))
+            Runner([
+                Task(
+                    'test',
+                    self.log('test'),
+                    inputs=['code/**/*.py'],
+                    env=['THRESHOLD']),
+            ]).run()
+
+        run(90)
+        run(90)
+        run(95)
+
+        assert self.read_log() == ['test', 'test']
+
+    def test_run__up_to_date_tasks_are_skipped(self):
+
+        def run():
+            Runner([
+                Task('lint', self.log('lint'), inputs=['code/**/*.py']),
+            ]).run()
+
+        run()
+        run()
+
+        assert self.read_log() == ['lint']
+        assert '[lint] up to date, skipping' in self.capsys.readouterr().out
+
+        self.base_dir.join('code', 'a.py').write('a = 2')
+        run()
+
+        assert self.read_log() == ['lint', 'lint']
+
+    def test_run__lifecycle_steps_of_up_to_date_tasks_are_skipped(self):
+
+        self.base_dir.join('Makefile').write(
+            'test_setup:\n'
+            '\techo setup >> log.txt\n')
+
+        def run():
+            Runner([
+                Task('test_setup'),
+                Task(
+                    'test',
+                    self.log('test'),
+                    deps=['test_setup'],
+                    inputs=['code']),
+                Task('test_teardown', deps=['test']),
+            ]).run()
+
+        run()
+        run()
+
+        assert self.read_log() == ['setup', 'test']
+
+        self.base_dir.join('code', 'data.json').write('{}')
+        run()
+
+        assert self.read_log() == ['setup', 'test', 'setup', 'test']
+
+    def test_run__force(self):
+
+        def run(force):
+            Runner([
+                Task('lint', self.log('lint'), inputs=['code/**/*.py']),
+            ], force=force).run()
+
+        run(False)
+        run(True)
+
+        assert self.read_log() == ['lint', 'lint']
+
+    def test_run__failed_tasks_are_not_cached(self):
+
+        state_path = self.base_dir.join('.lily', 'cache', 'run.json')
+
+        with pytest.raises(Runner.TaskFailed):
+            Runner([
+                Task(
+                    'lint',
+                    python('raise SystemExit(1)'),
+                    inputs=['code/**/*.py']),
+            ]).run()
+
+        state = json.loads(state_path.read())
+        assert state['tasks'] == {}
+        assert list(state['files'].keys()) == [os.path.join('code', 'a.py')]
+
+    def test_run__output_is_prefixed(self):
+
+        Runner([Task('hello', python('print("hi")'))]).run()
+
+        assert '[hello] hi\n' in self.capsys.readouterr().out
+
+    def test_run__quiet_prints_output_of_failed_tasks_only(self):
+
+        Logger.configure(quiet=True)
+        try:
+            Runner([Task('ok', python('print("fine")'))]).run()
+            with pytest.raises(Runner.TaskFailed):
+                Runner([
+                    Task('broken', python('print("oops"); raise SystemExit(1)')),
+                ]).run()
+
+        finally:
+            Logger.configure()
+
+        out = self.capsys.readouterr().out
+        assert '[ok] fine\n' not in out
+        assert '[broken] oops\n' in out
@@ -0,0 +1,152 @@
+import json
+import os
+import subprocess
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.runner.targets import FAIL_UNDER, get_targets, shell
+
+
+class TargetsTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+
+    def setUp(self):
+        self.tmpdir.mkdir('.lily').join('config.json').write(json.dumps({
+            'src_dir': 'gigly',
+        }))
+        os.chdir(str(self.tmpdir))
+
+    def get_graph(self, tasks):
+        return [(t.name, t.deps, t.command is not None) for t in tasks]
+
+    #
+    # GET_TARGETS
+    #
+    def test_get_targets__lint(self):
+
+        lint_tests, lint_src = get_targets()['lint']
+
+        assert (lint_tests.deps, lint_src.deps) == ([], [])
+        assert lint_src.command[-1] == 'gigly'
+        assert lint_src.inputs == ['gigly', '.flake8', 'setup.cfg', 'tox.ini']
+
+    def test_get_targets__test_inputs(self):
+
+        tasks = get_targets()['test_all']
+
+        assert tasks[1].inputs[:3] == ['gigly', 'tests', 'conftest.py']
+        assert 'tox.ini' in tasks[1].inputs
+
+    def test_get_targets__overrides(self):
+
+        targets = get_targets(overrides={'lint', 'test_setup'})
+
+        assert self.get_graph(targets['lint']) == [('lint', [], False)]
+        assert [t.name for t in targets['check']] == [
+            'lint',
+            'test_setup',
+            'lily_assistant_test_all',
+            'test_teardown',
+        ]
+        # -- overrides of steps are handled by the runner
+        assert targets['test_all'][0].name == 'test_setup'
+
+    def test_get_targets__test_all(self):
+
+        tasks = get_targets()['test_all']
+
+        assert self.get_graph(tasks) == [
+            ('test_setup', [], False),
+            ('lily_assistant_test_all', ['test_setup'], True),
+            ('test_teardown', ['lily_assistant_test_all'], False),
+        ]
+        assert tasks[1].command == [
+            'sh', '-c',
+            'py.test -p lily_assistant.testing.tracker --cov=gigly '
+            '--cov-fail-under="${TEST_COVERAGE_THRESHOLD:-90}" '
+            '-r w -s -vv tests',
+        ]
+        assert tasks[1].env == ['TEST_COVERAGE_THRESHOLD']
+
+    def test_get_targets__test__passes_args(self):
+
+        tasks = get_targets(['tests/test_a.py', '-k', 'b c'])['test']
+
+        assert tasks[1].command[2].endswith(" tests/test_a.py -k 'b c'")
+        assert tasks[1].env == ['TEST_COVERAGE_THRESHOLD']
+
+    #
+    # SHELL
+    #
+    def test_shell__threshold_is_resolved_by_the_shell(self):
+
+        command = shell(['echo', FAIL_UNDER, '$HOME'])
+
+        def run(env):
+            return subprocess.check_output(
+                command, env=env).decode('utf-8').strip()
+
+        assert run({}) == '--cov-fail-under=90 $HOME'
+        assert run({'TEST_COVERAGE_THRESHOLD': '95'}) == (
+            '--cov-fail-under=95 $HOME')
+
+    def test_get_targets__test_diff_coverage(self):
+
+        tasks = get_targets(['tests/test_a.py'])['test_diff_coverage']
+
+        assert self.get_graph(tasks) == [
+            ('assert_test_setup_was_run', [], False),
+            (
+                'lily_assistant_test_diff_coverage',
+                ['assert_test_setup_was_run'],
+                True,
+            ),
+            (
+                'lily_assistant_diff_coverage',
+                ['lily_assistant_test_diff_coverage'],
+                True,
+            ),
+        ]
+        assert tasks[1].command == [
+            'py.test',
+            '-p', 'lily_assistant.testing.tracker',
+            '--cov=gigly',
+            '-r', 'w', '-s', '-vv',
+            'tests/test_a.py',
+        ]
+        # -- the threshold is read from the environment of the task
+        assert tasks[2].command == ['lily_assistant', 'coverage', 'diff']
+        assert tasks[2].env == ['TEST_COVERAGE_THRESHOLD']
+
+    def test_get_targets__upgrade_version(self):
+
+        tasks = get_targets()['upgrade_version_minor']
+
+        assert self.get_graph(tasks) == [
+            ('upgrade_version_setup', [], False),
+            (
+                'lily_assistant_upgrade_version_minor',
+                ['upgrade_version_setup'],
+                True,
+            ),
+            (
+                'upgrade_version_post_upgrade',
+                ['lily_assistant_upgrade_version_minor'],
+                False,
+            ),
+            (
+                'lily_assistant_push_upgraded_version',
+                ['upgrade_version_post_upgrade'],
+                True,
+            ),
+            (
+                'upgrade_version_teardown',
+                ['lily_assistant_push_upgraded_version'],
+                False,
+            ),
+        ]
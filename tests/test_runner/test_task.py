@@ -0,0 +1,83 @@
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.runner.task import Task
+
+
+class TaskTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+
+    def setUp(self):
+        self.code_dir = self.tmpdir.mkdir('code')
+        self.code_dir.join('a.py').write('a')
+        self.code_dir.mkdir('sub').join('b.py').write('b')
+        self.code_dir.join('notes.txt').write('notes')
+
+    #
+    # GET_INPUT_PATHS
+    #
+    def test_get_input_paths(self):
+
+        task = Task('lint', ['flake8'], inputs=['code/**/*.py', 'missing'])
+
+        assert task.get_input_paths(str(self.tmpdir)) == [
+            'code/a.py',
+            'code/sub/b.py',
+        ]
+
+    def test_get_input_paths__directory(self):
+
+        self.code_dir.join('.flake8').write('[flake8]')
+        pycache_dir = self.code_dir.mkdir('__pycache__')
+        pycache_dir.join('a.cpython-36.pyc').write('')
+        self.code_dir.mkdir('.mypy_cache').join('a.json').write('{}')
+        self.code_dir.join('sub', 'b.pyc').write('')
+
+        task = Task('test', ['py.test'], inputs=['code'])
+
+        assert task.get_input_paths(str(self.tmpdir)) == [
+            'code/.flake8',
+            'code/a.py',
+            'code/notes.txt',
+            'code/sub/b.py',
+        ]
+
+    #
+    # GET_DIGEST
+    #
+    def test_get_digest(self):
+
+        contents = {'code/a.py': 'a', 'code/sub/b.py': 'b'}
+        task = Task('lint', ['flake8'], inputs=['code/**/*.py'])
+
+        digest = task.get_digest(str(self.tmpdir), contents.get)
+
+        # -- same inputs, same digest
+        assert task.get_digest(str(self.tmpdir), contents.get) == digest
+
+        # -- changed input
+        contents['code/a.py'] = 'aa'
+        assert task.get_digest(str(self.tmpdir), contents.get) != digest
+
+        # -- changed command
+        contents['code/a.py'] = 'a'
+        task.command = ['flake8', '--strict']
+        assert task.get_digest(str(self.tmpdir), contents.get) != digest
+
+    def test_get_digest__env(self):
+
+        task = Task(
+            'test', ['py.test'], inputs=['code/**/*.py'], env=['THRESHOLD'])
+
+        def get_digest(env):
+            return task.get_digest(str(self.tmpdir), lambda path: '', env)
+
+        digest = get_digest({'THRESHOLD': '90', 'OTHER': '1'})
+
+        assert get_digest({'THRESHOLD': '90', 'OTHER': '2'}) == digest
+        assert get_digest({'THRESHOLD': '95', 'OTHER': '1'}) != digest
+        assert get_digest({}) != digest
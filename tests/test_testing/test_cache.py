@@ -0,0 +1,106 @@
+import os
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.testing.cache import KeyBuilder, ResultCache
+from lily_assistant.testing.imports import ImportGraph
+
+
+class ResultCacheTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+
+    def test_add_contains(self):
+
+        cache = ResultCache(str(self.tmpdir.join('tests')))
+
+        assert cache.contains('abc123') is False
+
+        cache.add('abc123', 'tests/test_a.py')
+
+        assert cache.contains('abc123') is True
+        assert self.tmpdir.join('tests', 'ab', 'abc123').read() == (
+            'tests/test_a.py')
+
+    def test_evict__least_recently_used(self):
+
+        cache = ResultCache(str(self.tmpdir.join('tests')), max_entries=2)
+        for index, key in enumerate(['aa1', 'bb2', 'cc3']):
+            cache.add(key, key)
+            os.utime(cache.get_entry_path(key), ns=(index, index))
+
+        # -- makes it the most recently used one
+        assert cache.contains('aa1') is True
+
+        cache.evict()
+
+        assert cache.contains('aa1') is True
+        assert cache.contains('bb2') is False
+        assert cache.contains('cc3') is True
+
+
+class KeyBuilderTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+
+    def setUp(self):
+        code_dir = self.tmpdir.mkdir('code')
+        code_dir.join('__init__.py').write('')
+        code_dir.join('a.py').write('A = 1\n')
+        code_dir.join('other.py').write('O = 1\n')
+        tests_dir = self.tmpdir.mkdir('tests')
+        tests_dir.join('test_a.py').write('from code.a import A\n')
+        tests_dir.join('conftest.py').write('')
+
+    def get_key(self, path=os.path.join('tests', 'test_a.py')):
+
+        base_path = str(self.tmpdir)
+        return KeyBuilder(base_path, ImportGraph(base_path)).get_key(path)
+
+    def test_get_key__stable(self):
+
+        assert self.get_key() == self.get_key()
+
+    def test_get_key__changes_with_imported_module(self):
+
+        key = self.get_key()
+        self.tmpdir.join('code', 'a.py').write('A = 2\n')
+
+        assert self.get_key() != key
+
+    def test_get_key__changes_with_conftest(self):
+
+        key = self.get_key()
+        self.tmpdir.join('tests', 'conftest.py').write('X = 1\n')
+
+        assert self.get_key() != key
+
+    def test_get_key__changes_with_environment(self):
+
+        key = self.get_key()
+        self.tmpdir.join('pytest.ini').write('[pytest]\n')
+
+        assert self.get_key() != key
+
+    def test_get_key__ignores_not_imported_modules(self):
+
+        key = self.get_key()
+        self.tmpdir.join('code', 'other.py').write('O = 2\n')
+
+        assert self.get_key() == key
+
+    def test_get_conftests(self):
+
+        base_path = str(self.tmpdir)
+        self.tmpdir.join('conftest.py').write('')
+        builder = KeyBuilder(base_path, ImportGraph(base_path))
+
+        assert builder.get_conftests(os.path.join('tests', 'test_a.py')) == [
+            'conftest.py',
+            os.path.join('tests', 'conftest.py'),
+        ]
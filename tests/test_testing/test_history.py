@@ -0,0 +1,86 @@
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.testing.history import ResultHistory
+
+
+class ResultHistoryTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+
+    def setUp(self):
+        self.path = str(self.tmpdir.join('cache', 'test_history'))
+
+    #
+    # APPEND / READ
+    #
+    def test_append_read(self):
+
+        history = ResultHistory(self.path)
+        history.append(1, [('t.py::a', 'p', 0.5), ('t.py::b', 'f', 1.25)])
+        history.append(2, [('t.py::a', 's', 0.0)])
+        history.append(3, [])
+
+        assert history.read() == {
+            't.py::a': [(1, 'p', 0.5), (2, 's', 0.0)],
+            't.py::b': [(1, 'f', 1.25)],
+        }
+
+    def test_read__missing_or_broken(self):
+
+        history = ResultHistory(self.path)
+
+        assert history.read() == {}
+
+        self.tmpdir.join('cache', 'test_history').write(
+            'broken\n1\tp\tNaN?\tt.py::a\n2\tp\t0.1\tt.py::a\n',
+            ensure=True)
+
+        assert history.read() == {'t.py::a': [(2, 'p', 0.1)]}
+
+    def test_append__compacts(self):
+
+        history = ResultHistory(self.path, max_size=100, max_runs=2)
+        for run in range(5):
+            history.append(run, [('t.py::a', 'p', run), ('t.py::b', 'f', 0)])
+
+        assert history.read() == {
+            't.py::a': [(3, 'p', 3.0), (4, 'p', 4.0)],
+            't.py::b': [(3, 'f', 0.0), (4, 'f', 0.0)],
+        }
+
+    #
+    # REPORTS
+    #
+    def test_get_slowest(self):
+
+        history = ResultHistory(self.path)
+        history.append(1, [
+            ('t.py::a', 'p', 1.0),
+            ('t.py::b', 'p', 3.0),
+            ('t.py::c', 's', 9.0),
+        ])
+        history.append(2, [('t.py::a', 'p', 2.0), ('t.py::b', 'f', 1.0)])
+
+        assert history.get_slowest() == [
+            ('t.py::b', 2.0, 1.0),
+            ('t.py::a', 1.5, 2.0),
+        ]
+        assert history.get_slowest(1) == [('t.py::b', 2.0, 1.0)]
+
+    def test_get_flaky(self):
+
+        history = ResultHistory(self.path)
+        for run, outcomes in enumerate(['ppp', 'fpf', 'ffs', 'ppf']):
+            history.append(run, [
+                ('t.py::{}'.format(name), outcome, 0.1)
+                for name, outcome in zip('abc', outcomes)])
+
+        assert history.get_flaky() == [
+            ('t.py::a', 2, 2, 4),
+            ('t.py::b', 2, 1, 4),
+            ('t.py::c', 1, 2, 3),
+        ]
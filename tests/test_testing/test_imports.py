@@ -0,0 +1,90 @@
+import os
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.testing.imports import ImportGraph
+
+
+class ImportGraphTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+
+    def setUp(self):
+        code_dir = self.tmpdir.mkdir('code')
+        code_dir.join('__init__.py').write('')
+        code_dir.join('a.py').write('from .b import B\nimport os\n')
+        code_dir.join('b.py').write('from code.deep import c\nB = 1\n')
+        code_dir.join('unused.py').write('')
+        deep_dir = code_dir.mkdir('deep')
+        deep_dir.join('__init__.py').write('from .. import a\n')
+        deep_dir.join('c.py').write('def c():\n    import code.unused\n')
+        deep_dir.join('broken.py').write('def (\n')
+
+        tests_dir = self.tmpdir.mkdir('tests')
+        tests_dir.join('__init__.py').write('')
+        tests_dir.join('test_a.py').write('from code.a import B\n')
+        tests_dir.join('test_star.py').write(
+            'from code.deep import *\nfrom . import missing\n')
+
+        self.graph = ImportGraph(str(self.tmpdir))
+
+    #
+    # GET_IMPORTS
+    #
+    def test_get_imports(self):
+
+        assert self.graph.get_imports(os.path.join('code', 'a.py')) == {
+            os.path.join('code', '__init__.py'),
+            os.path.join('code', 'b.py'),
+        }
+        assert self.graph.get_imports(os.path.join('code', 'b.py')) == {
+            os.path.join('code', '__init__.py'),
+            os.path.join('code', 'deep', '__init__.py'),
+            os.path.join('code', 'deep', 'c.py'),
+        }
+        assert self.graph.get_imports(
+            os.path.join('code', 'deep', '__init__.py')) == {
+                os.path.join('code', '__init__.py'),
+                os.path.join('code', 'a.py'),
+        }
+
+    def test_get_imports__nested_import(self):
+
+        assert self.graph.get_imports(
+            os.path.join('code', 'deep', 'c.py')) == {
+                os.path.join('code', '__init__.py'),
+                os.path.join('code', 'unused.py'),
+        }
+
+    def test_get_imports__star_and_missing(self):
+
+        assert self.graph.get_imports(
+            os.path.join('tests', 'test_star.py')) == {
+                os.path.join('code', '__init__.py'),
+                os.path.join('code', 'deep', '__init__.py'),
+                os.path.join('tests', '__init__.py'),
+        }
+
+    def test_get_imports__broken_or_missing_file(self):
+
+        assert self.graph.get_imports(
+            os.path.join('code', 'deep', 'broken.py')) == set()
+        assert self.graph.get_imports('nothing.py') == set()
+
+    #
+    # GET_DEPENDENCIES
+    #
+    def test_get_dependencies(self):
+
+        assert self.graph.get_dependencies('./tests/test_a.py') == {
+            os.path.join('tests', 'test_a.py'),
+            os.path.join('code', '__init__.py'),
+            os.path.join('code', 'a.py'),
+            os.path.join('code', 'b.py'),
+            os.path.join('code', 'unused.py'),
+            os.path.join('code', 'deep', '__init__.py'),
+            os.path.join('code', 'deep', 'c.py'),
+        }
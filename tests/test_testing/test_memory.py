@@ -0,0 +1,310 @@
+import os
+import subprocess
+import sys
+import tracemalloc
+from unittest import TestCase
+from unittest.mock import call, Mock
+
+import pytest
+
+from lily_assistant.config import Config
+from lily_assistant.testing.memory import (
+    format_size,
+    MemoryHistory,
+    MemoryPlugin,
+    pytest_configure,
+)
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+class MemoryTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+
+    def setUp(self):
+        self.path = str(self.tmpdir.join('.lily', 'cache', 'memory_history'))
+
+    #
+    # FORMAT_SIZE
+    #
+    def test_format_size(self):
+
+        assert format_size(12) == '12.0B'
+        assert format_size(1536) == '1.5KiB'
+        assert format_size(3 * 1024 * 1024) == '3.0MiB'
+        assert format_size(5 * 1024 ** 3) == '5.0GiB'
+
+    #
+    # MEMORY_HISTORY
+    #
+    def test_append_read(self):
+
+        history = MemoryHistory(self.path)
+        history.append(1, [('t.py::a', 100, 10), ('t.py::b', 200, 0)])
+        history.append(2, [('t.py::a', 300, 30)])
+        history.append(3, [])
+
+        assert history.read() == {
+            't.py::a': [(1, 100, 10), (2, 300, 30)],
+            't.py::b': [(1, 200, 0)],
+        }
+
+    def test_read__missing_or_broken(self):
+
+        assert MemoryHistory(self.path).read() == {}
+
+        self.tmpdir.join('.lily', 'cache', 'memory_history').write(
+            'broken\n1\tx\t1\tt.py::a\n2\t5\t1\tt.py::a\n', ensure=True)
+
+        assert MemoryHistory(self.path).read() == {'t.py::a': [(2, 5, 1)]}
+
+    def test_append__compacts(self):
+
+        history = MemoryHistory(self.path, max_size=40, max_runs=2)
+        for run in range(5):
+            history.append(run, [('t.py::a', run, 0)])
+
+        assert history.read() == {'t.py::a': [(3, 3, 0), (4, 4, 0)]}
+
+    def test_get_baselines_and_largest(self):
+
+        history = MemoryHistory(self.path, max_runs=3)
+        history.append(1, [('t.py::a', 900, 0), ('t.py::b', 50, 5)])
+        history.append(2, [('t.py::a', 100, 0)])
+        history.append(3, [('t.py::a', 300, 0)])
+        history.append(4, [('t.py::a', 200, 20)])
+
+        assert history.get_baselines() == {'t.py::a': 200, 't.py::b': 50}
+        assert history.get_largest(count=1) == [('t.py::a', 200, 200, 20)]
+
+    #
+    # RECORDING
+    #
+    def test_get_limit(self):
+
+        plugin = MemoryPlugin(MemoryHistory(self.path), ROOT_DIR)
+        plugin.baselines = {'t.py::a': 1024, 't.py::b': 10 * 1024 * 1024}
+
+        assert plugin.get_limit('t.py::a') == 1024 + 256 * 1024
+        assert plugin.get_limit('t.py::b') == 12 * 1024 * 1024
+        assert plugin.get_limit('t.py::c') is None
+
+    def test_sessionstart__loads_baselines(self):
+
+        history = MemoryHistory(self.path)
+        history.append(1, [('t.py::a', 100, 0)])
+        history.append(2, [('t.py::a', 300, 0)])
+        plugin = MemoryPlugin(history, ROOT_DIR)
+
+        plugin.pytest_sessionstart(Mock())
+
+        assert plugin.baselines == {'t.py::a': 200}
+
+    def run_protocol(self, plugin, nodeid, size):
+
+        protocol = plugin.pytest_runtest_protocol(Mock(nodeid=nodeid), None)
+        next(protocol)
+        data = bytearray(size)
+        del data
+        with pytest.raises(StopIteration):
+            next(protocol)
+
+    def test_runtest_protocol(self):
+
+        plugin = MemoryPlugin(MemoryHistory(self.path), ROOT_DIR)
+        plugin.baselines = {'t.py::a': 1024, 't.py::b': 4 * 1024 * 1024}
+
+        try:
+            self.run_protocol(plugin, 't.py::a', 1024 * 1024)
+            self.run_protocol(plugin, 't.py::b', 1024 * 1024)
+            self.run_protocol(plugin, 't.py::c', 1024 * 1024)
+
+        finally:
+            tracemalloc.stop()
+
+        assert not tracemalloc.is_tracing()
+        for peak, retained in plugin.results.values():
+            assert peak >= 1024 * 1024 > 64 * 1024 > retained
+
+        assert plugin.flagged == [
+            ('t.py::a',) + (plugin.results['t.py::a'][0], 1024) +
+            (plugin.results['t.py::a'][1],),
+        ]
+
+    def test_runtest_call__sites_of_tests_over_limit(self):
+
+        plugin = MemoryPlugin(
+            MemoryHistory(self.path), ROOT_DIR, min_growth=0, top=1)
+        plugin.baselines = {'t.py::a': 1024, 't.py::b': 256 * 1024}
+        kept = []
+
+        tracemalloc.start()
+        try:
+            call_a = plugin.pytest_runtest_call(Mock(nodeid='t.py::a'))
+            next(call_a)
+            kept.append(bytearray(512 * 1024))
+            with pytest.raises(StopIteration):
+                next(call_a)
+
+            # -- traced from scratch, like the protocol does for each test
+            tracemalloc.stop()
+            tracemalloc.start()
+            call_b = plugin.pytest_runtest_call(Mock(nodeid='t.py::b'))
+            next(call_b)
+            with pytest.raises(StopIteration):
+                next(call_b)
+
+        finally:
+            tracemalloc.stop()
+
+        assert list(plugin.sites) == ['t.py::a']
+        [(location, size, count)] = plugin.sites['t.py::a']
+        assert location.startswith(
+            os.path.join('tests', 'test_testing', 'test_memory.py') + ':')
+        assert size >= 512 * 1024
+        assert count >= 1
+
+    def test_sessionfinish__appends_results(self):
+
+        self.mocker.patch('time.time').return_value = 1234.5
+        history = MemoryHistory(self.path)
+        plugin = MemoryPlugin(history, ROOT_DIR)
+        plugin.results = {'t.py::a': (300, 30), 't.py::b': (200, 0)}
+
+        plugin.pytest_sessionfinish(Mock(), 0)
+
+        assert history.read() == {
+            't.py::a': [(1234, 300, 30)],
+            't.py::b': [(1234, 200, 0)],
+        }
+
+    #
+    # REPORTING
+    #
+    def test_terminal_summary(self):
+
+        plugin = MemoryPlugin(MemoryHistory(self.path), ROOT_DIR)
+        plugin.flagged = [
+            ('t.py::a', 3 * 1024, 2 * 1024, 0),
+            ('t.py::b', 4 * 1024 * 1024, 1024 * 1024, 2048),
+        ]
+        plugin.sites = {'t.py::b': [('app.py:12', 3 * 1024 * 1024, 10)]}
+        reporter = Mock()
+
+        plugin.pytest_terminal_summary(reporter)
+
+        assert reporter.section.call_args_list == [
+            call('lily_assistant memory', yellow=True)]
+        assert reporter.write_line.call_args_list == [
+            call(
+                't.py::b: peak 4.0MiB (baseline 1.0MiB, +300%), '
+                'retained 2.0KiB'),
+            call('        3.0MiB       10 blocks  app.py:12'),
+            call(
+                't.py::a: peak 3.0KiB (baseline 2.0KiB, +50%), '
+                'retained 0.0B'),
+        ]
+
+    def test_terminal_summary__nothing_flagged(self):
+
+        reporter = Mock()
+
+        MemoryPlugin(
+            MemoryHistory(self.path), ROOT_DIR).pytest_terminal_summary(
+                reporter)
+
+        assert reporter.section.call_count == 0
+        assert reporter.write_line.call_count == 0
+
+    def test_configure(self):
+
+        self.mocker.patch.object(
+            Config, 'get_lily_path').return_value = str(
+                self.tmpdir.join('.lily'))
+        self.mocker.patch.object(
+            Config, 'get_project_path').return_value = str(self.tmpdir)
+        options = {
+            'lily_memory': True,
+            'collectonly': False,
+            'lily_memory_threshold': 50.0,
+        }
+        config = Mock()
+        config.getoption.side_effect = options.get
+
+        pytest_configure(config)
+
+        [(plugin, name), _] = config.pluginmanager.register.call_args
+        assert name == 'lily_assistant_memory'
+        assert plugin.history.path == self.path
+        assert plugin.threshold == 50.0
+
+        options['collectonly'] = True
+        config.pluginmanager.register.reset_mock()
+
+        pytest_configure(config)
+
+        assert config.pluginmanager.register.call_count == 0
+
+    #
+    # PLUGIN
+    #
+    def run_tests(self, size):
+
+        return subprocess.run(
+            [
+                sys.executable, '-m', 'pytest',
+                '-p', 'lily_assistant.testing.memory',
+                '-p', 'no:randomly',
+                '-p', 'no:cacheprovider',
+                '--lily-memory',
+                'tests',
+            ],
+            cwd=str(self.tmpdir),
+            env=dict(os.environ, PYTHONPATH=ROOT_DIR, APP_SIZE=str(size)),
+            stdout=subprocess.PIPE,
+            universal_newlines=True)
+
+    def test_plugin(self):
+
+        self.tmpdir.join('tests', 'test_app.py').write(
+            'import os\n'
+            '\n'
+            'KEPT = []\n'
+            '\n'
+            'def test_allocate():\n'
+            '    data = [bytearray(1024) for _ in range(int(os.environ["APP_SIZE"]))]\n'
+            '    KEPT.append(data[:10])\n'
+            '\n'
+            'def test_nothing():\n'
+            '    pass\n',
+            ensure=True)
+
+        for _ in range(2):
+            process = self.run_tests(1000)
+            assert process.returncode == 0, process.stdout
+            assert 'lily_assistant memory' not in process.stdout
+
+        process = self.run_tests(10000)
+
+        assert process.returncode == 0, process.stdout
+        lines = [
+            line
+            for line in process.stdout.split(
+                'lily_assistant memory')[1].splitlines()
+            if line.strip()]
+        assert lines[1].startswith(
+            'tests/test_app.py::test_allocate: peak ')
+        assert lines[2].endswith('  tests/test_app.py:6')
+        assert 'test_nothing' not in process.stdout
+
+        history = MemoryHistory(
+            str(self.tmpdir.join('.lily', 'cache', 'memory_history'))).read()
+        assert len(history['tests/test_app.py::test_allocate']) == 3
+        peak, retained = history['tests/test_app.py::test_allocate'][-1][1:]
+        assert peak > 10000 * 1024 > 10 * 1024 < retained < peak
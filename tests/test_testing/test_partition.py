@@ -0,0 +1,42 @@
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.testing.partition import parse_shard, split
+
+
+class PartitionTestCase(TestCase):
+
+    #
+    # PARSE_SHARD
+    #
+    def test_parse_shard(self):
+
+        assert parse_shard('1/4') == (1, 4)
+        assert parse_shard('4/4') == (4, 4)
+
+    def test_parse_shard__invalid(self):
+
+        for value, message in (
+                ('1', 'shard must be given as i/N (e.g. 1/4), got: 1'),
+                ('a/2', 'shard must be given as i/N (e.g. 1/4), got: a/2'),
+                ('0/2', 'shard index must be between 1 and 2, got: 0'),
+                ('3/2', 'shard index must be between 1 and 2, got: 3')):
+            with pytest.raises(ValueError) as e:
+                parse_shard(value)
+
+            assert e.value.args[0] == message
+
+    #
+    # SPLIT
+    #
+    def test_split(self):
+
+        assert split({'a': 5, 'b': 4, 'c': 3, 'd': 3, 'e': 1}, 2) == [
+            ['a', 'd'],
+            ['b', 'c', 'e'],
+        ]
+
+    def test_split__ties_and_empty_bins(self):
+
+        assert split({'b': 1, 'a': 1}, 3) == [['a'], ['b'], []]
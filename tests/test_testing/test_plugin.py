@@ -0,0 +1,123 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+import pytest
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+class CachePluginTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+
+    def setUp(self):
+        self.tmpdir.mkdir('.lily').join('config.json').write('{}')
+        code_dir = self.tmpdir.mkdir('app')
+        code_dir.join('__init__.py').write('')
+        code_dir.join('a.py').write('A = 1\n')
+        tests_dir = self.tmpdir.mkdir('tests')
+        tests_dir.join('__init__.py').write('')
+        tests_dir.join('test_a.py').write(
+            'from app.a import A\n\n'
+            'def test_a():\n    assert A == 1\n\n'
+            'def test_b():\n    assert True\n')
+        tests_dir.join('test_c.py').write('def test_c():\n    assert True\n')
+
+    def run_pytest(self, *args):
+
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([
+            ROOT_DIR, str(self.tmpdir)]))
+        process = subprocess.run(
+            [
+                sys.executable, '-m', 'pytest',
+                '-p', 'lily_assistant.testing.plugin',
+                '-p', 'no:randomly',
+                '-p', 'no:cacheprovider',
+            ] + list(args),
+            cwd=str(self.tmpdir),
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True)
+
+        return process.returncode, process.stdout
+
+    def test_cached_pass(self):
+
+        code, output = self.run_pytest('tests')
+        assert code == 0
+        assert '3 passed' in output
+
+        code, output = self.run_pytest('tests')
+        assert code == 0
+        assert 'tests/test_a.py: cached pass (2 tests)' in output
+        assert 'tests/test_c.py: cached pass (1 tests)' in output
+
+    def test_imported_module_changed(self):
+
+        self.run_pytest('tests')
+        self.tmpdir.join('app', 'a.py').write('A = 2\n')
+
+        code, output = self.run_pytest('tests')
+
+        assert code == 1
+        assert '1 failed, 1 passed' in output
+        assert 'tests/test_c.py: cached pass (1 tests)' in output
+
+        # -- failures are never cached
+        code, output = self.run_pytest('tests')
+
+        assert code == 1
+        assert '1 failed, 1 passed' in output
+
+    def test_partial_run_is_not_cached(self):
+
+        self.run_pytest('tests/test_a.py', '-k', 'test_b')
+
+        code, output = self.run_pytest('tests/test_a.py')
+
+        assert code == 0
+        assert '2 passed' in output
+
+    def test_run_selected_by_node_id_is_not_cached(self):
+
+        self.tmpdir.join('tests', 'test_a.py').write(
+            'def test_one():\n    assert True\n\n'
+            'def test_two():\n    assert False\n')
+        self.run_pytest('tests/test_a.py::test_one')
+
+        code, output = self.run_pytest('tests/test_a.py')
+
+        assert code == 1
+        assert '1 failed, 1 passed' in output
+        assert 'cached pass' not in output
+
+    def test_run_selected_by_class_node_id_is_not_cached(self):
+
+        self.tmpdir.join('tests', 'test_a.py').write(
+            'class TestA:\n'
+            '    def test_one(self):\n        assert True\n\n'
+            'class TestB:\n'
+            '    def test_two(self):\n        assert False\n')
+        self.run_pytest('tests/test_a.py::TestA')
+
+        code, output = self.run_pytest('tests/test_a.py')
+
+        assert code == 1
+        assert 'cached pass' not in output
+
+    def test_no_cache(self):
+
+        self.run_pytest('tests')
+
+        code, output = self.run_pytest('tests', '--lily-no-cache')
+
+        assert code == 0
+        assert '3 passed' in output
+        assert 'cached pass' not in output
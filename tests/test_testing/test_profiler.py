@@ -0,0 +1,152 @@
+import json
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.testing.profiler import ProfileReport, Sampler
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+STACKS = {
+    ('t.py::a', 't.py:test_a', 'app.py:parse', 'app.py:tokenize'): 6,
+    ('t.py::a', 't.py:test_a', 'app.py:parse'): 2,
+    ('t.py::b', 't.py:test_b', 'app.py:walk', 'app.py:walk'): 3,
+    ('t.py::b', 't.py:test_b'): 1,
+    ('t.py::c',): 1,
+}
+
+
+class ProfilerTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+
+    #
+    # SAMPLER
+    #
+    def test_get_label(self):
+
+        sampler = Sampler(ROOT_DIR)
+
+        assert sampler.get_label(self.test_get_label.__code__) == (
+            'tests/test_testing/test_profiler.py:'
+            'ProfilerTestCase.test_get_label'
+            if sys.version_info >= (3, 11) else
+            'tests/test_testing/test_profiler.py:test_get_label')
+        assert sampler.get_label(json.dumps.__code__) == (
+            'json/__init__.py:dumps')
+
+    def test_sample(self):
+
+        sampler = Sampler(ROOT_DIR)
+        frame = sys._getframe()
+
+        sampler.sample(None, frame)
+        sampler.label = 't.py::a'
+        sampler.sample(None, frame)
+        sampler.sample(None, frame)
+
+        [(stack, count)] = sampler.stacks.items()
+        assert count == 2
+        assert stack[0] == 't.py::a'
+        assert stack[-1] == sampler.get_label(self.test_sample.__code__)
+        assert not any('_pytest' in frame for frame in stack)
+
+    #
+    # PROFILE_REPORT
+    #
+    def test_get_functions(self):
+
+        assert ProfileReport(STACKS, 0.01).get_functions() == {
+            't.py:test_a': (0, 8),
+            'app.py:parse': (2, 8),
+            'app.py:tokenize': (6, 6),
+            't.py:test_b': (1, 4),
+            'app.py:walk': (3, 3),
+        }
+
+    def test_get_tests(self):
+
+        assert ProfileReport(STACKS, 0.01).get_tests() == {
+            't.py::a': (8, 'app.py:tokenize'),
+            't.py::b': (4, 'app.py:walk'),
+            't.py::c': (1, None),
+        }
+
+    def test_render(self):
+
+        assert ProfileReport(STACKS, 0.01).render(top=2).splitlines() == [
+            '13 samples taken every 10ms of CPU time (~0.13s)',
+            '',
+            'FUNCTIONS (by self time)',
+            '     self      total  function',
+            '    0.06s      0.06s  app.py:tokenize',
+            '    0.03s      0.03s  app.py:walk',
+            '',
+            'TESTS',
+            '    total  test (hottest function)',
+            '    0.08s  t.py::a (app.py:tokenize)',
+            '    0.04s  t.py::b (app.py:walk)',
+        ]
+
+    def test_render_collapsed(self):
+
+        assert ProfileReport(STACKS, 0.01).render_collapsed().splitlines() == [
+            't.py::a;t.py:test_a;app.py:parse 2',
+            't.py::a;t.py:test_a;app.py:parse;app.py:tokenize 6',
+            't.py::b;t.py:test_b 1',
+            't.py::b;t.py:test_b;app.py:walk;app.py:walk 3',
+            't.py::c 1',
+        ]
+
+    #
+    # PLUGIN
+    #
+    def test_plugin(self):
+
+        self.tmpdir.join('app', '__init__.py').write(
+            'def burn():\n'
+            '    total = 0\n'
+            '    for i in range(3000000):\n'
+            '        total += i\n'
+            '    return total\n',
+            ensure=True)
+        self.tmpdir.join('tests', 'test_app.py').write(
+            'from app import burn\n'
+            '\n'
+            'def test_burn():\n'
+            '    assert burn()\n',
+            ensure=True)
+
+        process = subprocess.run(
+            [
+                sys.executable, '-m', 'pytest',
+                '-p', 'lily_assistant.testing.profiler',
+                '-p', 'no:randomly',
+                '-p', 'no:cacheprovider',
+                '--lily-profile',
+                '--lily-profile-interval=1',
+                'tests',
+            ],
+            cwd=str(self.tmpdir),
+            env=dict(os.environ, PYTHONPATH=ROOT_DIR),
+            stdout=subprocess.PIPE,
+            universal_newlines=True)
+
+        assert process.returncode == 0, process.stdout
+        assert 'lily_assistant profile' in process.stdout
+        report = self.tmpdir.join('coverage_html', 'profile.txt').read()
+        assert 'app/__init__.py:burn' in report
+        assert 'tests/test_app.py::test_burn (app/__init__.py:burn)' in report
+        collapsed = self.tmpdir.join(
+            'coverage_html', 'profile.collapsed').read()
+        assert (
+            'tests/test_app.py::test_burn;tests/test_app.py:test_burn;'
+            'app/__init__.py:burn ') in collapsed
@@ -0,0 +1,140 @@
+import json
+import os
+import subprocess
+import sys
+from unittest import TestCase
+from unittest.mock import Mock
+
+import pytest
+
+from lily_assistant.config import Config
+from lily_assistant.testing.shard import (
+    load_timings,
+    ShardPlugin,
+)
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+class ShardTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+
+    #
+    # WEIGHTS
+    #
+    def test_get_weights(self):
+
+        items = [
+            Mock(nodeid='tests/test_a.py::test_1'),
+            Mock(nodeid='tests/test_a.py::test_2'),
+            Mock(nodeid='tests/test_b.py::test_1'),
+        ]
+        plugin = ShardPlugin(1, 2, {
+            'tests/test_a.py::test_1': 1.0,
+            'tests/test_b.py::test_1': 3.0,
+        })
+
+        assert plugin.get_weights(items) == {
+            os.path.join('tests', 'test_a.py'): 3.0,
+            os.path.join('tests', 'test_b.py'): 3.0,
+        }
+
+    def test_get_weights__no_timings(self):
+
+        items = [
+            Mock(nodeid='tests/test_a.py::test_1'),
+            Mock(nodeid='tests/test_a.py::test_2'),
+            Mock(nodeid='tests/test_b.py::test_1'),
+        ]
+
+        assert ShardPlugin(1, 2, {}).get_weights(items) == {
+            os.path.join('tests', 'test_a.py'): 1.0,
+            os.path.join('tests', 'test_b.py'): 1.0,
+        }
+
+    #
+    # LOAD_TIMINGS
+    #
+    def test_load_timings(self):
+
+        lily_dir = self.tmpdir.mkdir('.lily')
+        self.mocker.patch.object(
+            Config, 'get_lily_path').return_value = str(lily_dir)
+        self.mocker.patch.object(
+            Config, 'get_cache_path').return_value = str(lily_dir)
+        lily_dir.join('test_history').write(
+            '1\tp\t1.0000\tt.py::a\n2\tp\t2.0000\tt.py::a\n')
+
+        assert load_timings() == {'t.py::a': 1.5}
+
+        lily_dir.join('test_timings.json').write(json.dumps({'t.py::b': 3}))
+
+        assert load_timings() == {'t.py::b': 3}
+
+    #
+    # PLUGIN
+    #
+    def test_shards_cover_all_tests_once(self):
+
+        self.tmpdir.mkdir('.lily').join('config.json').write('{}')
+        tests_dir = self.tmpdir.mkdir('tests')
+        for name in 'abcde':
+            tests_dir.join('test_{}.py'.format(name)).write(
+                'def test_1():\n    pass\n\ndef test_2():\n    pass\n')
+
+        selected = []
+        for index in (1, 2, 3):
+            process = subprocess.run(
+                [
+                    sys.executable, '-m', 'pytest',
+                    '-p', 'lily_assistant.testing.shard',
+                    '-p', 'no:randomly',
+                    '-p', 'no:cacheprovider',
+                    '--lily-shard={}/3'.format(index),
+                    '--collect-only', '-q',
+                    'tests',
+                ],
+                cwd=str(self.tmpdir),
+                env=dict(os.environ, PYTHONPATH=ROOT_DIR),
+                stdout=subprocess.PIPE,
+                universal_newlines=True)
+            assert process.returncode == 0
+            selected.append([
+                line for line in process.stdout.splitlines()
+                if '::' in line])
+
+        assert [len(tests) for tests in selected] == [4, 4, 2]
+        assert sorted(sum(selected, [])) == sorted(
+            'tests/test_{}.py::test_{}'.format(name, number)
+            for name in 'abcde'
+            for number in (1, 2))
+
+    def test_cli_shard__warnings_as_errors(self):
+
+        self.tmpdir.mkdir('.lily').join('config.json').write('{}')
+        self.tmpdir.join('pytest.ini').write(
+            '[pytest]\nfilterwarnings =\n    error\n')
+        self.tmpdir.mkdir('tests').join('test_a.py').write(
+            'def test_1():\n    pass\n')
+
+        process = subprocess.run(
+            [
+                sys.executable, '-c',
+                'from lily_assistant.cli.cli import cli; cli()',
+                'test', '--shard', '1/1', '-p', 'no:randomly', 'tests',
+            ],
+            cwd=str(self.tmpdir),
+            env=dict(os.environ, PYTHONPATH=ROOT_DIR),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True)
+
+        assert process.returncode == 0, process.stdout
+        assert 'lily_assistant shard: 1/1' in process.stdout
+        assert '1 passed' in process.stdout
@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.testing.history import ResultHistory
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+class TrackerPluginTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+
+    def setUp(self):
+        self.tmpdir.mkdir('.lily').join('config.json').write('{}')
+        tests_dir = self.tmpdir.mkdir('tests')
+        tests_dir.join('test_a.py').write(
+            'import time\n'
+            'import pytest\n\n'
+            'def test_slow():\n    time.sleep(0.2)\n\n'
+            'def test_fails():\n    assert False\n\n'
+            '@pytest.mark.skip\n'
+            'def test_skipped():\n    pass\n')
+        tests_dir.join('test_b.py').write('def test_b():\n    pass\n')
+
+    def run_pytest(self, *args):
+
+        process = subprocess.run(
+            [
+                sys.executable, '-m', 'pytest',
+                '-p', 'lily_assistant.testing.tracker',
+                '-p', 'no:randomly',
+                '-p', 'no:cacheprovider',
+            ] + list(args),
+            cwd=str(self.tmpdir),
+            env=dict(os.environ, PYTHONPATH=ROOT_DIR),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True)
+
+        return process.returncode, process.stdout
+
+    def get_history(self):
+        return ResultHistory(
+            str(self.tmpdir.join('.lily', 'cache', 'test_history'))).read()
+
+    def test_records_history(self):
+
+        code, _ = self.run_pytest('tests')
+
+        assert code == 1
+        history = self.get_history()
+        assert sorted(
+            (nodeid, results[0][1]) for nodeid, results in history.items()
+        ) == [
+            ('tests/test_a.py::test_fails', 'f'),
+            ('tests/test_a.py::test_skipped', 's'),
+            ('tests/test_a.py::test_slow', 'p'),
+            ('tests/test_b.py::test_b', 'p'),
+        ]
+        assert history['tests/test_a.py::test_slow'][0][2] >= 0.2
+
+    def test_test_budget(self):
+
+        code, output = self.run_pytest(
+            'tests/test_b.py', 'tests/test_a.py::test_slow',
+            '--lily-test-budget=0.1')
+
+        assert code == 1
+        assert 'lily_assistant time budgets' in output
+        assert 'tests/test_a.py::test_slow took 0.2' in output
+        assert 'test_b' not in output.split('time budgets')[1]
+
+    def test_suite_budget__ini(self):
+
+        self.tmpdir.join('pytest.ini').write(
+            '[pytest]\nlily_suite_budget = 0.05\n')
+
+        code, output = self.run_pytest('tests/test_a.py::test_slow')
+
+        assert code == 1
+        assert 'whole run took' in output
+
+    def test_within_budgets(self):
+
+        code, output = self.run_pytest(
+            'tests/test_b.py',
+            '--lily-test-budget=5',
+            '--lily-suite-budget=60')
+
+        assert code == 0
+        assert 'time budgets' not in output
@@ -0,0 +1,236 @@
+import io
+import json
+import os
+import socket
+import tempfile
+from unittest import TestCase
+from unittest.mock import Mock
+
+import pytest
+
+from lily_assistant.testing.warm import (
+    find_dependencies,
+    get_env_digest,
+    get_socket_path,
+    make_socket_dir,
+    WarmClient,
+    WarmServer,
+)
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+class WarmTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+
+    #
+    # GET_SOCKET_PATH
+    #
+    def test_get_socket_path(self):
+
+        self.mocker.patch.dict(os.environ, {'XDG_RUNTIME_DIR': ''})
+
+        path = get_socket_path('/some/project')
+
+        assert path == get_socket_path('/some/project')
+        assert path != get_socket_path('/other/project')
+        assert os.path.dirname(path) == os.path.join(
+            tempfile.gettempdir(), 'lily_assistant-{}'.format(os.getuid()))
+
+    def test_get_socket_path__runtime_dir(self):
+
+        self.mocker.patch.dict(
+            os.environ, {'XDG_RUNTIME_DIR': str(self.tmpdir)})
+
+        assert os.path.dirname(get_socket_path('/some/project')) == str(
+            self.tmpdir.join('lily_assistant'))
+
+    #
+    # MAKE_SOCKET_DIR
+    #
+    def test_make_socket_dir(self):
+
+        path = str(self.tmpdir.join('sockets'))
+
+        make_socket_dir(path)
+        make_socket_dir(path)
+
+        assert os.stat(path).st_mode & 0o777 == 0o700
+
+    def test_make_socket_dir__not_private(self):
+
+        path = self.tmpdir.mkdir('sockets')
+        path.chmod(0o755)
+
+        with pytest.raises(OSError) as e:
+            make_socket_dir(str(path))
+
+        assert e.value.args[0] == (
+            '{} must be a directory accessible only by its owner'.format(path))
+
+    def test_make_socket_dir__other_user(self):
+
+        path = self.tmpdir.mkdir('sockets')
+        path.chmod(0o700)
+        self.mocker.patch('os.getuid').return_value = os.getuid() + 1
+
+        with pytest.raises(OSError) as e:
+            make_socket_dir(str(path))
+
+        assert e.value.args[0] == (
+            '{} is not owned by the current user'.format(path))
+
+    def test_check__socket_of_other_user(self):
+
+        self.mocker.patch.dict(
+            os.environ, {'XDG_RUNTIME_DIR': str(self.tmpdir)})
+        client = WarmClient(str(self.tmpdir), ['tests'])
+        client.check()
+        open(client.socket_path, 'w').close()
+        lstat = os.lstat
+        self.mocker.patch('os.lstat').side_effect = lambda path: (
+            Mock(st_uid=os.getuid() + 1)
+            if path == client.socket_path else lstat(path))
+
+        with pytest.raises(OSError) as e:
+            client.check()
+
+        assert e.value.args[0] == (
+            '{} is not owned by the current user'.format(client.socket_path))
+
+    #
+    # GET_ENV_DIGEST
+    #
+    def test_get_env_digest(self):
+
+        digest = get_env_digest({'A': '1', 'TERM': 'xterm', 'SHLVL': '1'})
+
+        assert digest == get_env_digest({'A': '1', 'TERM': 'dumb'})
+        assert digest != get_env_digest({'A': '2'})
+
+    #
+    # FIND_DEPENDENCIES
+    #
+    def test_find_dependencies(self):
+
+        app_dir = self.tmpdir.mkdir('app')
+        app_dir.join('__init__.py').write('')
+        app_dir.join('a.py').write(
+            'import json\nimport xml.dom\nfrom app import b\nfrom . import c\n')
+        app_dir.join('broken.py').write('def (\n')
+        self.tmpdir.mkdir('tests').join('test_a.py').write(
+            'from unittest import TestCase\nimport utils\n')
+        self.tmpdir.join('utils.py').write('')
+
+        assert find_dependencies(str(self.tmpdir), ['app', 'tests']) == [
+            'json', 'unittest', 'xml']
+
+    #
+    # WARM SERVER
+    #
+    def test_is_stale(self):
+
+        module_path = self.tmpdir.join('module.py')
+        module_path.write('')
+        server = WarmServer(str(self.tmpdir), 'socket')
+        server.modules = {str(module_path): os.stat(str(module_path)).st_mtime_ns}
+
+        assert server.is_stale() is False
+
+        os.utime(str(module_path), ns=(1, 1))
+
+        assert server.is_stale() is True
+
+        module_path.remove()
+
+        assert server.is_stale() is True
+
+    def test_handle__other_environment(self):
+
+        server = WarmServer(str(self.tmpdir), 'socket')
+        connection, client = socket.socketpair()
+        with connection, client:
+            client.sendall(json.dumps({
+                'args': [],
+                'cwd': str(self.tmpdir),
+                'env': {},
+                'env_digest': get_env_digest(dict(os.environ, A='changed')),
+            }).encode('utf-8') + b'\n')
+
+            assert server.handle(connection, None) is False
+            assert client.recv(1024) == b'\0' + WarmServer.RECYCLE.encode()
+
+    def test_snapshot(self):
+
+        modules = WarmServer(str(self.tmpdir), 'socket').snapshot()
+
+        assert os.__file__ in modules
+
+    #
+    # WARM CLIENT
+    #
+    def test_request__sends_only_run_environment(self):
+
+        self.mocker.patch.dict(
+            os.environ, {'SECRET_TOKEN': 'abc', 'TERM': 'xterm'})
+        connection, server = socket.socketpair()
+        self.mocker.patch.object(
+            WarmClient, 'connect').return_value = connection
+        server.sendall(b'\x000')
+        server.shutdown(socket.SHUT_WR)
+
+        with server:
+            assert WarmClient(str(self.tmpdir), []).request(
+                ['tests'], io.BytesIO()) == 0
+
+            request = json.loads(server.recv(64 * 1024).decode('utf-8'))
+
+        assert request['env'] == {'TERM': 'xterm'}
+        assert request['env_digest'] == get_env_digest(os.environ)
+        assert 'abc' not in json.dumps(request)
+
+    def test_run__spawns_and_recycles_parent(self):
+
+        deps_dir = self.tmpdir.mkdir('deps')
+        deps_dir.join('heavy.py').write('VALUE = 1\n')
+        base_dir = self.tmpdir.mkdir('base')
+        tests_dir = base_dir.mkdir('tests')
+        tests_dir.join('test_a.py').write(
+            'import heavy\n\n'
+            'def test_a():\n    assert heavy.VALUE == 1\n')
+        self.mocker.patch.dict(os.environ, {
+            'PYTHONPATH': os.pathsep.join([ROOT_DIR, str(deps_dir)]),
+        })
+        self.mocker.patch('os.getcwd').return_value = str(base_dir)
+        client = WarmClient(str(base_dir), ['tests'])
+        args = ['-p', 'no:cacheprovider', '-p', 'no:randomly', 'tests']
+
+        try:
+            output = io.BytesIO()
+            assert client.run(args, output) == 0
+            assert b'1 passed' in output.getvalue()
+
+            # -- served by the very same parent
+            inode = os.stat(client.socket_path).st_ino
+            output = io.BytesIO()
+            assert client.run(args, output) == 0
+            assert os.stat(client.socket_path).st_ino == inode
+
+            # -- module imported by the parent changed
+            deps_dir.join('heavy.py').write('VALUE = 2\n')
+            os.utime(str(deps_dir.join('heavy.py')), ns=(1, 1))
+            output = io.BytesIO()
+            assert client.run(args, output) == 1
+            assert b'1 failed' in output.getvalue()
+
+        finally:
+            assert client.stop() is True
+
+        assert not os.path.exists(client.socket_path)
+        assert client.stop() is False
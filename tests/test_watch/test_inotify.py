@@ -0,0 +1,128 @@
+import os
+import struct
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.watch import inotify
+from lily_assistant.watch.inotify import InotifyWatcher
+
+
+@pytest.mark.skipif(
+    inotify.load_libc() is None, reason='inotify is not available')
+class InotifyWatcherTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+        self.base_dir = tmpdir.mkdir('base')
+        self.base_dir.mkdir('app').join('a.py').write('a = 1')
+        self.base_dir.mkdir('tests')
+        self.base_dir.join('app').mkdir('__pycache__')
+
+        self.watcher = InotifyWatcher(str(self.base_dir), ['app', 'tests'])
+
+        yield
+
+        self.watcher.close()
+
+    def test_wait__timeout(self):
+
+        assert self.watcher.wait(0.01) == set()
+
+    def test_wait__modified(self):
+
+        self.base_dir.join('app', 'a.py').write('a = 2')
+
+        assert self.watcher.wait(1) == {os.path.join('app', 'a.py')}
+
+    def test_wait__created_and_removed(self):
+
+        self.base_dir.join('tests', 'test_a.py').write('')
+        self.base_dir.join('app', 'a.py').remove()
+
+        assert self.watcher.wait(1) == {
+            os.path.join('tests', 'test_a.py'),
+            os.path.join('app', 'a.py'),
+        }
+
+    def test_wait__new_directories_are_watched(self):
+
+        # -- files created along with the directory are reported too
+        sub_dir = self.base_dir.join('app').mkdir('sub')
+        sub_dir.join('b.py').write('b = 1')
+        assert os.path.join('app', 'sub', 'b.py') in self.watcher.wait(1)
+
+        sub_dir.join('b.py').write('b = 2')
+
+        assert self.watcher.wait(1) == {os.path.join('app', 'sub', 'b.py')}
+
+    def test_wait__skipped_directories(self):
+
+        self.base_dir.join('app', '__pycache__').join('a.pyc').write('')
+
+        assert self.watcher.wait(0.05) == set()
+
+    def test_parse__watches_exhausted(self):
+
+        sub_dir = self.base_dir.join('app').mkdir('sub')
+        sub_dir.join('b.py').write('b = 1')
+        self.mocker.patch.object(
+            self.watcher,
+            'add_watch',
+            side_effect=InotifyWatcher.Unavailable('limit reached'))
+        app_wd, = [
+            wd
+            for wd, path in self.watcher.paths.items()
+            if path == str(self.base_dir.join('app'))]
+
+        with pytest.raises(InotifyWatcher.Exhausted) as e:
+            self.watcher.parse(
+                struct.pack(
+                    'iIII',
+                    app_wd,
+                    inotify.IN_CREATE | inotify.IN_ISDIR,
+                    0,
+                    16) +
+                b'sub'.ljust(16, b'\0'))
+
+        assert str(e.value) == 'limit reached'
+        assert e.value.changed == {os.path.join('app', 'sub', 'b.py')}
+
+    def test_parse__overflow(self):
+
+        changed = self.watcher.parse(
+            struct.pack('iIII', -1, inotify.IN_Q_OVERFLOW, 0, 0))
+
+        assert changed == {os.path.join('app', 'a.py')}
+
+
+class LoadLibcTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, mocker):
+        self.mocker = mocker
+
+    def test_unavailable(self):
+
+        self.mocker.patch('ctypes.CDLL', side_effect=OSError('no libc'))
+
+        assert inotify.load_libc() is None
+        with pytest.raises(InotifyWatcher.Unavailable):
+            InotifyWatcher('.', [])
+
+    @pytest.mark.skipif(
+        inotify.load_libc() is None, reason='inotify is not available')
+    def test_watches_exhausted__closes(self):
+
+        self.mocker.patch.object(
+            InotifyWatcher,
+            'add_tree',
+            side_effect=InotifyWatcher.Unavailable('limit reached'))
+        close = self.mocker.spy(InotifyWatcher, 'close')
+
+        with pytest.raises(InotifyWatcher.Unavailable):
+            InotifyWatcher('.', ['app'])
+
+        assert close.call_count == 1
@@ -0,0 +1,46 @@
+import os
+import time
+from unittest import TestCase
+
+import pytest
+
+from lily_assistant.watch.polling import PollingWatcher
+
+
+class PollingWatcherTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir):
+        self.tmpdir = tmpdir
+        self.base_dir = tmpdir.mkdir('base')
+        self.base_dir.mkdir('app').join('a.py').write('a = 1')
+        self.base_dir.join('app').mkdir('.hidden').join('x.py').write('')
+
+        self.watcher = PollingWatcher(
+            str(self.base_dir), ['app'], interval=0.01)
+
+    def test_scan(self):
+
+        assert list(self.watcher.files) == [os.path.join('app', 'a.py')]
+
+    def test_wait__timeout(self):
+
+        started = time.monotonic()
+
+        assert self.watcher.wait(0.05) == set()
+        assert time.monotonic() - started >= 0.05
+
+    def test_wait__changes(self):
+
+        self.base_dir.join('app', 'a.py').write('a = 22')
+        self.base_dir.join('app', 'b.py').write('b = 1')
+
+        assert self.watcher.wait(1) == {
+            os.path.join('app', 'a.py'),
+            os.path.join('app', 'b.py'),
+        }
+
+        self.base_dir.join('app', 'b.py').remove()
+
+        assert self.watcher.wait(1) == {os.path.join('app', 'b.py')}
+        assert self.watcher.wait(0.02) == set()
@@ -0,0 +1,187 @@
+import os
+from unittest import TestCase
+from unittest.mock import Mock
+
+import pytest
+
+from lily_assistant.watch.inotify import InotifyWatcher
+from lily_assistant.watch.polling import PollingWatcher
+from lily_assistant.watch.session import (
+    collect,
+    fall_back,
+    get_watcher,
+    WatchSession,
+)
+
+
+class CollectTestCase(TestCase):
+
+    def test_collect__debounces(self):
+
+        watcher = Mock(wait=Mock(side_effect=[{'a.py'}, {'b.py'}, set()]))
+
+        assert collect(watcher, debounce=0.1) == {'a.py', 'b.py'}
+        assert [c[0][0] for c in watcher.wait.call_args_list] == [
+            None, 0.1, 0.1]
+
+    def test_collect__max_delay(self):
+
+        watcher = Mock(wait=Mock(return_value={'a.py'}))
+
+        assert collect(watcher, max_delay=0.05) == {'a.py'}
+
+    def test_collect__exhausted(self):
+
+        watcher = Mock(wait=Mock(side_effect=[
+            {'a.py'},
+            InotifyWatcher.Exhausted('limit reached', {'b.py'}),
+        ]))
+
+        with pytest.raises(InotifyWatcher.Exhausted) as e:
+            collect(watcher, debounce=0.1)
+
+        assert e.value.changed == {'a.py', 'b.py'}
+
+    def test_collect__timeout(self):
+
+        watcher = Mock(wait=Mock(return_value=set()))
+
+        assert collect(watcher, timeout=1) == set()
+        assert watcher.wait.call_count == 1
+
+
+class GetWatcherTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, mocker):
+        self.tmpdir = tmpdir
+        self.mocker = mocker
+
+    def test_polling(self):
+
+        assert isinstance(
+            get_watcher(str(self.tmpdir), [], polling=True), PollingWatcher)
+
+    def test_fallback(self):
+
+        self.mocker.patch(
+            'lily_assistant.watch.session.InotifyWatcher.__init__',
+            side_effect=InotifyWatcher.Unavailable('no inotify'))
+
+        assert isinstance(get_watcher(str(self.tmpdir), []), PollingWatcher)
+
+    def test_fall_back(self):
+
+        self.tmpdir.mkdir('app').join('a.py').write('a = 1')
+        watcher = Mock(base_path=str(self.tmpdir), directories=['app'])
+
+        polling_watcher = fall_back(watcher, interval=0.1)
+
+        assert watcher.close.call_count == 1
+        assert isinstance(polling_watcher, PollingWatcher)
+        assert polling_watcher.interval == 0.1
+        assert list(polling_watcher.files) == [os.path.join('app', 'a.py')]
+
+
+class WatchSessionTestCase(TestCase):
+
+    @pytest.fixture(autouse=True)
+    def init_fixtures(self, tmpdir, capsys):
+        self.tmpdir = tmpdir
+        self.capsys = capsys
+
+        self.base_dir = tmpdir.mkdir('base')
+        app_dir = self.base_dir.mkdir('app')
+        app_dir.join('__init__.py').write('')
+        app_dir.join('models.py').write('x = 1\n')
+        app_dir.join('views.py').write('from .models import x\n')
+        app_dir.join('utils.py').write('y = 1\n')
+        tests_dir = self.base_dir.mkdir('tests')
+        tests_dir.join('__init__.py').write('')
+        tests_dir.join('test_views.py').write('from app.views import x\n')
+        tests_dir.join('test_utils.py').write('from app import utils\n')
+        tests_dir.join('helpers.py').write('from app.models import x\n')
+
+        self.session = WatchSession(str(self.base_dir), ['app', 'tests'])
+
+    def path(self, *parts):
+        return os.path.join(*parts)
+
+    def test_get_affected__transitive_imports(self):
+
+        assert self.session.get_affected({self.path('app', 'models.py')}) == (
+            [self.path('app', 'models.py')],
+            [self.path('tests', 'test_views.py')],
+        )
+
+    def test_get_affected__test_module(self):
+
+        assert self.session.get_affected({
+            self.path('tests', 'test_utils.py'),
+            self.path('app', 'notes.txt'),
+        }) == (
+            [self.path('tests', 'test_utils.py')],
+            [self.path('tests', 'test_utils.py')],
+        )
+
+    def test_get_affected__changed_imports(self):
+
+        self.session.get_affected({self.path('app', 'utils.py')})
+        self.base_dir.join('app', 'utils.py').write('from .models import x\n')
+        self.session.get_affected({self.path('app', 'utils.py')})
+
+        assert self.session.get_affected({self.path('app', 'models.py')})[1] == [
+            self.path('tests', 'test_utils.py'),
+            self.path('tests', 'test_views.py'),
+        ]
+
+    def test_get_affected__created_and_removed_modules(self):
+
+        self.base_dir.join('app', 'models.py').remove()
+        self.base_dir.join('app').mkdir('models').join('__init__.py').write('')
+
+        assert self.session.get_affected({
+            self.path('app', 'models.py'),
+            self.path('app', 'models', '__init__.py'),
+        }) == (
+            [self.path('app', 'models', '__init__.py')],
+            [self.path('tests', 'test_views.py')],
+        )
+
+        self.base_dir.join('tests', 'test_views.py').remove()
+
+        assert self.session.get_affected({
+            self.path('tests', 'test_views.py'),
+        }) == ([], [])
+
+    def test_get_affected__conftest(self):
+
+        self.base_dir.join('tests', 'conftest.py').write('')
+
+        assert self.session.get_affected({
+            self.path('tests', 'conftest.py'),
+        })[1] == [
+            self.path('tests', 'test_utils.py'),
+            self.path('tests', 'test_views.py'),
+        ]
+
+    def test_lint(self):
+
+        self.base_dir.join('app', 'utils.py').write('y=1\n')
+
+        errors = self.session.lint([self.path('app', 'utils.py')])
+
+        assert errors == 1
+        assert 'E225' in self.capsys.readouterr().out
+
+    def test_lint__style_guide_reused(self):
+
+        self.base_dir.join('app', 'utils.py').write('y=1\n')
+        self.session.lint([self.path('app', 'utils.py')])
+        style_guide = self.session.style_guide
+
+        self.base_dir.join('app', 'utils.py').write('y = 1\n')
+        errors = self.session.lint([self.path('app', 'utils.py')])
+
+        assert errors == 0
+        assert self.session.style_guide is style_guide